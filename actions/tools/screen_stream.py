@@ -0,0 +1,292 @@
+"""
+Screen Stream — delta-encoded binary screen frames for the Sam dashboard.
+
+Instead of broadcasting every capture as a base64 PNG inside JSON (what
+screen_view.show_screen does for single screenshots), the streamer:
+  - compresses with JPEG or WebP at a configurable quality
+  - splits each frame into tiles and, after a keyframe, sends only the tiles
+    whose contents changed since the last frame *that client* received;
+    horizontally adjacent changed tiles are merged and encoded as one rect
+  - sends binary WebSocket frames on the "screen_frame" topic, which only
+    clients that subscribed to it explicitly receive
+  - adapts each client's frame rate to its send-queue depth, so a slow
+    client gets fewer frames rather than a growing backlog
+
+Tile hashing happens once per captured frame and each rect is encoded at
+most once per frame, no matter how many clients need it.
+
+Wire format (big-endian):
+    header  ">4sBBIHHHH"   b"SVF1", flags (bit0 = keyframe), codec (1 = jpeg, 2 = webp),
+                           seq, width, height, tile size, rect count
+    rect    ">HHHHI"       x, y, w, h, nbytes — followed by nbytes of encoded image
+A keyframe is a single rect covering the whole frame.
+
+Requires: numpy, Pillow, mss (capture only).
+
+Usage:
+    from actions.tools.screen_stream import ScreenStreamer
+    streamer = ScreenStreamer(ws_manager, fps=8, quality=60)
+    await streamer.start()
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import struct
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("sam.tools.screen_stream")
+
+TOPIC = "screen_frame"
+MAGIC = b"SVF1"
+HEADER = struct.Struct(">4sBBIHHHH")
+TILE_HEADER = struct.Struct(">HHHHI")
+FLAG_KEYFRAME = 1
+CODECS = {"jpeg": 1, "webp": 2}
+PIL_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+DEFAULT_TILE = 64
+DEFAULT_QUALITY = 60
+DEFAULT_FPS = 8.0
+MIN_FPS = 0.5
+KEYFRAME_INTERVAL_S = 10.0      # periodic keyframe so late decoding errors heal
+KEYFRAME_CHANGED_RATIO = 0.5    # above this share of changed tiles a keyframe is cheaper
+BACKLOG_DEPTH = 2               # client queue depth at which its frame rate backs off
+
+
+class PreparedFrame:
+    """One captured frame: tile hashes computed up front, encodings produced lazily and cached."""
+
+    def __init__(self, rgb, tile: int, quality: int, codec: str) -> None:
+        self.rgb = rgb
+        self.height, self.width = rgb.shape[:2]
+        self.tile = tile
+        self.quality = quality
+        self.codec = codec
+        self.cols = -(-self.width // tile)
+        self.rows = -(-self.height // tile)
+        self.hashes: List[bytes] = [
+            hashlib.blake2b(self._tile_pixels(i).tobytes(), digest_size=8).digest()
+            for i in range(self.cols * self.rows)
+        ]
+        self._encoded: Dict[Tuple[int, int], bytes] = {}
+        self._full: Optional[bytes] = None
+
+    def _box(self, first: int, last: int) -> Tuple[int, int, int, int]:
+        """Pixel rect covering tiles first..last (same tile row)."""
+        x = (first % self.cols) * self.tile
+        y = (first // self.cols) * self.tile
+        x_end = min(((last % self.cols) + 1) * self.tile, self.width)
+        return x, y, x_end - x, min(self.tile, self.height - y)
+
+    def _tile_pixels(self, i: int):
+        x, y, w, h = self._box(i, i)
+        return self.rgb[y:y + h, x:x + w]
+
+    def _runs(self, tiles: List[int]) -> List[Tuple[int, int]]:
+        """Group sorted tile indices into runs of adjacent tiles within a row."""
+        runs: List[Tuple[int, int]] = []
+        for i in tiles:
+            if runs and i == runs[-1][1] + 1 and i % self.cols != 0:
+                runs[-1] = (runs[-1][0], i)
+            else:
+                runs.append((i, i))
+        return runs
+
+    def _encode(self, pixels) -> bytes:
+        from PIL import Image
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, PIL_FORMATS[self.codec], quality=self.quality)
+        return buf.getvalue()
+
+    def changed_tiles(self, base: Optional[List[bytes]]) -> List[int]:
+        if base is None or len(base) != len(self.hashes):
+            return list(range(len(self.hashes)))
+        return [i for i, (a, b) in enumerate(zip(self.hashes, base)) if a != b]
+
+    def packet(self, seq: int, tiles: Optional[List[int]]) -> bytes:
+        """Binary frame: a keyframe when tiles is None, otherwise just those tiles."""
+        codec = CODECS[self.codec]
+        if tiles is None:
+            if self._full is None:
+                self._full = self._encode(self.rgb)
+            body = TILE_HEADER.pack(0, 0, self.width, self.height, len(self._full)) + self._full
+            return HEADER.pack(MAGIC, FLAG_KEYFRAME, codec, seq, self.width, self.height,
+                               self.tile, 1) + body
+        runs = self._runs(tiles)
+        parts = [HEADER.pack(MAGIC, 0, codec, seq, self.width, self.height, self.tile, len(runs))]
+        for run in runs:
+            x, y, w, h = self._box(*run)
+            data = self._encoded.get(run)
+            if data is None:
+                data = self._encoded[run] = self._encode(self.rgb[y:y + h, x:x + w])
+            parts.append(TILE_HEADER.pack(x, y, w, h, len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+
+def unpack_frame(data: bytes) -> dict:
+    """Parse a binary frame (used by tests and the benchmark)."""
+    magic, flags, codec, seq, width, height, tile, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a screen frame")
+    offset = HEADER.size
+    tiles = []
+    for _ in range(count):
+        x, y, w, h, n = TILE_HEADER.unpack_from(data, offset)
+        offset += TILE_HEADER.size
+        tiles.append({"x": x, "y": y, "w": w, "h": h, "data": data[offset:offset + n]})
+        offset += n
+    return {"keyframe": bool(flags & FLAG_KEYFRAME), "codec": codec, "seq": seq,
+            "width": width, "height": height, "tile": tile, "tiles": tiles}
+
+
+def capture_screen(max_width: int = 0):
+    """Grab the whole desktop with mss as an RGB numpy array, optionally downscaled."""
+    import mss
+    import numpy as np
+    with mss.mss() as sct:
+        shot = sct.grab(sct.monitors[0])
+    rgb = np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)[:, :, 2::-1]
+    if max_width and shot.width > max_width:
+        from PIL import Image
+        height = int(shot.height * max_width / shot.width)
+        return np.asarray(Image.fromarray(rgb).resize((max_width, height), Image.BILINEAR))
+    return np.ascontiguousarray(rgb)
+
+
+class _ClientState:
+    __slots__ = ("interval", "last_sent", "last_keyframe", "base", "seq", "frames", "bytes")
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.last_sent = 0.0
+        self.last_keyframe = 0.0
+        self.base: Optional[List[bytes]] = None
+        self.seq = 0
+        self.frames = 0
+        self.bytes = 0
+
+
+class ScreenStreamer:
+    def __init__(
+        self,
+        manager,
+        capture: Optional[Callable] = None,
+        fps: float = DEFAULT_FPS,
+        quality: int = DEFAULT_QUALITY,
+        codec: str = "jpeg",
+        tile: int = DEFAULT_TILE,
+        max_width: int = 1280,
+    ) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"codec must be one of {sorted(CODECS)}")
+        self._manager = manager
+        self._capture = capture or (lambda: capture_screen(max_width))
+        self._min_interval = 1.0 / max(fps, MIN_FPS)
+        self._max_interval = 1.0 / MIN_FPS
+        self.quality = quality
+        self.codec = codec
+        self.tile = tile
+        self._clients: Dict[object, _ClientState] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"captures": 0, "keyframes": 0, "deltas": 0, "bytes": 0, "encode_ms": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._loop(), name="sam-screen-stream")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._clients.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "running": self.running,
+            "clients": {
+                str(id(ws)): {"fps": round(1.0 / st.interval, 2), "frames": st.frames, "bytes": st.bytes}
+                for ws, st in self._clients.items()
+            },
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            subscribers = self._manager.subscribers(TOPIC)
+            for ws in list(self._clients):
+                if ws not in subscribers:
+                    del self._clients[ws]
+            now = time.monotonic()
+            due = {ws: depth for ws, depth in subscribers.items() if self._due(ws, depth, now)}
+            if due:
+                try:
+                    rgb = await asyncio.to_thread(self._capture)
+                    packets = await asyncio.to_thread(self._build_packets, rgb, due, now)
+                except Exception as e:
+                    logger.warning(f"[ScreenStream] capture failed: {e}")
+                    await asyncio.sleep(1.0)
+                    continue
+                for ws, data in packets:
+                    self._manager.send_binary(ws, TOPIC, data)
+            await asyncio.sleep(self._next_wakeup(subscribers))
+
+    def _due(self, ws, depth: int, now: float) -> bool:
+        state = self._clients.get(ws)
+        if state is None:
+            state = self._clients[ws] = _ClientState(self._min_interval)
+        # Back off while the client's queue has a backlog; recover when it drains.
+        if depth >= BACKLOG_DEPTH:
+            state.interval = min(state.interval * 2, self._max_interval)
+            return False
+        if depth == 0:
+            state.interval = max(state.interval / 1.5, self._min_interval)
+        return now - state.last_sent >= state.interval
+
+    def _next_wakeup(self, subscribers: dict) -> float:
+        if not subscribers:
+            return 0.5
+        now = time.monotonic()
+        waits = [st.last_sent + st.interval - now for ws, st in self._clients.items() if ws in subscribers]
+        return min(max(min(waits, default=self._min_interval), 0.01), self._max_interval)
+
+    def _build_packets(self, rgb, due: dict, now: float) -> List[Tuple[object, bytes]]:
+        started = time.process_time()
+        frame = PreparedFrame(rgb, self.tile, self.quality, self.codec)
+        self._stats["captures"] += 1
+        packets = []
+        for ws in due:
+            state = self._clients[ws]
+            changed = frame.changed_tiles(state.base)
+            keyframe = (
+                state.base is None
+                or now - state.last_keyframe >= KEYFRAME_INTERVAL_S
+                or len(changed) > KEYFRAME_CHANGED_RATIO * len(frame.hashes)
+            )
+            if not keyframe and not changed:
+                state.last_sent = now          # nothing new; don't re-check until next interval
+                continue
+            state.seq += 1
+            data = frame.packet(state.seq, None if keyframe else changed)
+            self._stats["keyframes" if keyframe else "deltas"] += 1
+            if keyframe:
+                state.last_keyframe = now
+            state.base = frame.hashes
+            state.last_sent = now
+            state.frames += 1
+            state.bytes += len(data)
+            self._stats["bytes"] += len(data)
+            packets.append((ws, data))
+        self._stats["encode_ms"] += (time.process_time() - started) * 1000
+        return packets
@@ -2,13 +2,19 @@
 Screen View Tool — Broadcast screenshots to the Sam dashboard.
 Ported from Jarvis src/actions/tools/screen-view.ts
 
+Single screenshots go out as JSON "screen_view" events. Live viewing uses
+start_screen_stream(), which sends delta-encoded binary frames to dashboards
+subscribed to "screen_frame" (see actions/tools/screen_stream.py).
+
 Usage:
     from actions.tools.screen_view import show_screen, close_screen_view
     show_screen(image_base64="...", label="Chrome — Gmail")
+    await start_screen_stream(fps=8, quality=60)
 """
 
 import asyncio
 import base64
+import importlib.util
 import logging
 from typing import Callable, Optional
 
@@ -16,8 +22,10 @@ logger = logging.getLogger("sam.tools.screen_view")
 
 SCREEN_VIEW_ID = "sam-screen-view"
 
-# Injected at startup by daemon/main.py via set_broadcast()
+# Injected at startup by daemon/main.py via set_broadcast() / set_stream_manager()
 _broadcast: Optional[Callable] = None
+_stream_manager = None
+_streamer = None
 
 
 def set_broadcast(fn: Callable) -> None:
@@ -26,6 +34,12 @@ def set_broadcast(fn: Callable) -> None:
     _broadcast = fn
 
 
+def set_stream_manager(manager) -> None:
+    """Wire in the ws_service manager used for per-client binary frame streaming."""
+    global _stream_manager
+    _stream_manager = manager
+
+
 async def show_screen(image_base64: str, label: str = "") -> str:
     """
     Broadcast a screenshot to the dashboard live panel.
@@ -66,20 +80,89 @@ async def close_screen_view() -> str:
 async def show_screen_from_capture() -> str:
     """
     Convenience: capture the current screen via Sam's mss and broadcast it.
-    Requires: mss, Pillow (for PNG encoding)
+    Requires: mss; Pillow + numpy for JPEG (falls back to PNG without them)
     """
+    if importlib.util.find_spec("mss") is None:
+        return "Error: mss is required for screen capture. pip install mss"
+    try:
+        image_bytes = await asyncio.to_thread(_capture_still)
+        b64 = base64.b64encode(image_bytes).decode()
+        return await show_screen(b64, label="Desktop")
+    except Exception as e:
+        return f"Error capturing screen: {e}"
+
+
+def _capture_still() -> bytes:
+    cfg = _stream_config()
     try:
+        from io import BytesIO
+        from PIL import Image
+        from actions.tools.screen_stream import capture_screen
+        buf = BytesIO()
+        rgb = capture_screen(int(cfg.get("max_width", 0)))
+        Image.fromarray(rgb).save(buf, "JPEG", quality=int(cfg.get("quality", 70)))
+        return buf.getvalue()
+    except ImportError:
         import mss
         import mss.tools
-        from io import BytesIO
-
         with mss.mss() as sct:
             screenshot = sct.grab(sct.monitors[0])
-            png_bytes = mss.tools.to_png(screenshot.rgb, screenshot.size)
+            return mss.tools.to_png(screenshot.rgb, screenshot.size)
 
-        b64 = base64.b64encode(png_bytes).decode()
-        return await show_screen(b64, label="Desktop")
-    except ImportError:
-        return "Error: mss is required for screen capture. pip install mss"
-    except Exception as e:
-        return f"Error capturing screen: {e}"
+
+def _stream_config() -> dict:
+    try:
+        from config.loader import get
+        return get("tools", "screen_stream", {}) or {}
+    except Exception:
+        return {}
+
+
+async def start_screen_stream(fps: float = 0, quality: int = 0, codec: str = "") -> str:
+    """
+    Start live screen streaming to dashboards subscribed to "screen_frame".
+    Defaults come from tools.screen_stream in config/sam.yaml.
+    """
+    global _streamer
+    if _stream_manager is None:
+        return "Screen stream not available (dashboard not connected)."
+    try:
+        from actions.tools.screen_stream import ScreenStreamer
+        cfg = _stream_config()
+        if _streamer is not None:
+            await _streamer.stop()
+        _streamer = ScreenStreamer(
+            _stream_manager,
+            fps=float(fps or cfg.get("fps", 8)),
+            quality=int(quality or cfg.get("quality", 60)),
+            codec=codec or cfg.get("codec", "jpeg"),
+            tile=int(cfg.get("tile", 64)),
+            max_width=int(cfg.get("max_width", 1280)),
+        )
+        await _streamer.start()
+    except (ImportError, ValueError) as e:
+        return f"Error starting screen stream: {e}"
+    if _broadcast:
+        await _broadcast("screen_view", {
+            "viewId": SCREEN_VIEW_ID,
+            "imageBase64": "",
+            "active": True,
+            "streaming": True,
+            "label": "Live desktop",
+        })
+    return f"Live screen stream started ({_streamer.codec}, q{_streamer.quality})."
+
+
+async def stop_screen_stream() -> str:
+    """Stop live screen streaming and close the panel."""
+    global _streamer
+    if _streamer is None:
+        return "Screen stream is not running."
+    await _streamer.stop()
+    _streamer = None
+    await close_screen_view()
+    return "Live screen stream stopped."
+
+
+def screen_stream_stats() -> dict:
+    return _streamer.stats() if _streamer else {"running": False}
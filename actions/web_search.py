@@ -3,6 +3,7 @@ from serpapi import GoogleSearch
 from tts import edge_speak
 from conversation_state import controller, State
 from memory.config_manager import get_serpapi_key
+from system.singleflight import group
 
 # Initialize logging
 from log.logger import get_logger, log_function_entry, log_function_exit, log_error, log_performance
@@ -10,6 +11,11 @@ logger = get_logger("ACTION.WEB")
 
 MAX_NEWS_ITEMS = 3
 
+# The same question often arrives from voice, the dashboard and a channel bot
+# at once; one SerpAPI call answers them all, and repeats within the TTL.
+SEARCH_TTL_S = 30.0
+_SEARCHES = group("web_search", ttl_s=SEARCH_TTL_S)
+
 def clean(text: str) -> str:
     if not text:
         return ""
@@ -76,6 +82,13 @@ def format_news_output(news_items: list) -> str:
         return result
     
 def serpapi_search(query: str) -> str:
+    try:
+        return _SEARCHES.do(" ".join(query.lower().split()), _serpapi_search, query)
+    except ConnectionError:
+        return "I couldn't connect to the search service."   # not cached: the next ask retries
+
+
+def _serpapi_search(query: str) -> str:
     api_key = get_serpapi_key()
     if not api_key:
         return "The web search system is not configured."
@@ -104,8 +117,8 @@ def serpapi_search(query: str) -> str:
             search = GoogleSearch({**params, "api_key": api_key})
             data = search.get_dict()
             results = data.get("organic_results", [])
-        except Exception:
-            return "I couldn't connect to the search service."
+        except Exception as e:
+            raise ConnectionError("search service unreachable") from e
 
     if not results:
         return "I couldn't find any recent news about that."
@@ -8,6 +8,7 @@ import sys
 import threading
 import subprocess
 import tempfile
+import time
 import os
 from pathlib import Path
 from typing import Callable
@@ -15,6 +16,7 @@ from typing import Callable
 from agent.planner       import create_plan, replan
 from agent.error_handler import analyze_error, generate_fix, ErrorDecision
 from agent.llm_bridge    import agent_llm_call
+from agent.plan_cache    import plan_cache
 
 
 def get_base_dir() -> Path:
@@ -223,7 +225,9 @@ class AgentExecutor:
         replan_attempts = 0
         completed_steps: list = []
         step_results:    dict = {}
+        started_at      = time.monotonic()
         plan = create_plan(goal)
+        first_plan      = plan
 
         while True:
             steps = plan.get("steps", [])
@@ -280,8 +284,7 @@ class AgentExecutor:
 
                         if decision == ErrorDecision.RETRY:
                             attempt += 1
-                            import time as _time
-                            _time.sleep(2)
+                            time.sleep(2)
                             continue
 
                         elif decision == ErrorDecision.SKIP:
@@ -329,8 +332,13 @@ class AgentExecutor:
                     break
 
             if success:
+                self._record_plan(goal, first_plan, completed_steps, replan_attempts, started_at)
                 return self._summarize(goal, completed_steps, speak)
 
+            if replan_attempts == 0 and first_plan.get("_cached"):
+                # Cached template failed on this goal — count it against the template
+                plan_cache.record_outcome(goal, first_plan, success=False)
+
             if replan_attempts >= self.MAX_REPLAN_ATTEMPTS:
                 msg = f"Task could not be completed after {replan_attempts} attempts."
                 if speak:
@@ -343,6 +351,24 @@ class AgentExecutor:
             replan_attempts += 1
             plan = replan(goal, completed_steps, failed_step, failed_error)
 
+    def _record_plan(self, goal: str, first_plan: dict, completed_steps: list,
+                     replan_attempts: int, started_at: float) -> None:
+        """Store the plan that actually succeeded as a reusable template."""
+        if first_plan.get("_fallback"):
+            return
+        if replan_attempts == 0:
+            succeeded = first_plan
+        else:
+            steps = [dict(s, step=i + 1) for i, s in enumerate(completed_steps)]
+            succeeded = {"goal": goal, "steps": steps}
+        try:
+            plan_cache.record_outcome(
+                goal, succeeded, success=True,
+                duration_s=time.monotonic() - started_at,
+            )
+        except Exception as e:
+            print(f"[Executor] plan cache update failed: {e}")
+
     def _summarize(self, goal: str, completed_steps: list, speak: Callable | None) -> str:
         fallback  = f"All done. Completed {len(completed_steps)} steps for: {goal[:60]}."
         steps_str = "\n".join(f"- {s.get('description', '')}" for s in completed_steps)
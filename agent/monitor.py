@@ -3,13 +3,29 @@ agent/monitor.py — Global agent task tracker
 
 All long-running tasks (agent_task, build_project, code_helper, browser_control, etc.)
 register here. The UI subscribes to get live status updates.
+
+Tasks are indexed by id and kept in a bounded history; each task keeps only
+its most recent output lines. Producers never wait on subscribers: events go
+onto a queue drained by one dispatcher thread, which coalesces bursts of
+output lines for the same task into a single event before fanning out to
+sync callbacks and asyncio subscribers.
 """
+import asyncio
+import queue
 import threading
 import time
 import uuid
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from typing import Callable, List, Optional
 
+MAX_TASKS        = 200     # tasks kept in history (running tasks are never evicted)
+MAX_OUTPUT_LINES = 500     # per-task output ring buffer
+COALESCE_WINDOW  = 0.05    # seconds the dispatcher waits to merge a burst
+ASYNC_QUEUE_SIZE = 256     # per async subscriber; oldest events dropped when full
+
+_FINISHED = ("done", "error", "cancelled")
+
 
 @dataclass
 class AgentTask:
@@ -17,7 +33,7 @@ class AgentTask:
     name: str
     description: str
     status: str          # 'running' | 'done' | 'error' | 'cancelled'
-    output_lines: list = field(default_factory=list)
+    output_lines: deque = field(default_factory=lambda: deque(maxlen=MAX_OUTPUT_LINES))
     start_time: float = field(default_factory=time.time)
     end_time: Optional[float] = None
 
@@ -27,6 +43,18 @@ class AgentTask:
         secs = int(end - self.start_time)
         return f"{secs}s" if secs < 60 else f"{secs // 60}m {secs % 60}s"
 
+    def to_dict(self, last_lines: int = 20) -> dict:
+        return {
+            "task_id": self.task_id,
+            "name": self.name,
+            "description": self.description,
+            "status": self.status,
+            "output": list(self.output_lines)[-last_lines:],
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "elapsed": self.elapsed,
+        }
+
 
 class AgentMonitor:
     """Singleton that tracks every spawned agent/task and notifies listeners."""
@@ -38,11 +66,19 @@ class AgentMonitor:
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
-                cls._instance._tasks: List[AgentTask] = []
-                cls._instance._callbacks: List[Callable] = []
-                cls._instance._tasks_lock = threading.Lock()
+                cls._instance._init()
         return cls._instance
 
+    def _init(self, max_tasks: int = MAX_TASKS):
+        self._tasks: "OrderedDict[str, AgentTask]" = OrderedDict()
+        self._tasks_lock = threading.Lock()
+        self._max_tasks = max_tasks
+        self._callbacks: List[Callable] = []
+        self._async_subscribers: list = []      # [(loop, asyncio.Queue)]
+        self._events: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._dropped_events = 0
+
     # ── Registration ────────────────────────────────────────────────────────
 
     def register_task(self, name: str, description: str = "") -> str:
@@ -50,62 +86,162 @@ class AgentMonitor:
         task_id = str(uuid.uuid4())[:8]
         task = AgentTask(task_id=task_id, name=name, description=description, status="running")
         with self._tasks_lock:
-            self._tasks.append(task)
+            self._tasks[task_id] = task
+            self._evict()
         self._notify(task)
         return task_id
 
     def update_task(self, task_id: str, status: str, output_line: str = None):
         """Update task status; optionally append a line of output."""
         with self._tasks_lock:
-            task = self._find(task_id)
+            task = self._tasks.get(task_id)
             if task is None:
                 return
             task.status = status
-            if status in ("done", "error", "cancelled"):
+            if status in _FINISHED:
                 task.end_time = time.time()
             if output_line:
                 task.output_lines.append(output_line)
-        self._notify(task)
+        self._notify(task, output_line)
 
     def append_output(self, task_id: str, line: str):
         """Append a line of output without changing status."""
         with self._tasks_lock:
-            task = self._find(task_id)
+            task = self._tasks.get(task_id)
             if task is None:
                 return
             task.output_lines.append(line)
-        self._notify(task)
+        self._notify(task, line)
 
     # ── Query ────────────────────────────────────────────────────────────────
 
+    def get_task(self, task_id: str) -> Optional[AgentTask]:
+        with self._tasks_lock:
+            return self._tasks.get(task_id)
+
     def get_tasks(self) -> List[AgentTask]:
         with self._tasks_lock:
-            return list(self._tasks)
+            return list(self._tasks.values())
+
+    def get_all_tasks(self) -> List[AgentTask]:
+        """All tracked tasks (running + bounded history), oldest first."""
+        return self.get_tasks()
 
     def get_running(self) -> List[AgentTask]:
         with self._tasks_lock:
-            return [t for t in self._tasks if t.status == "running"]
+            return [t for t in self._tasks.values() if t.status == "running"]
 
-    def _find(self, task_id: str) -> Optional[AgentTask]:
-        """Must be called with _tasks_lock held."""
-        for t in self._tasks:
-            if t.task_id == task_id:
-                return t
-        return None
+    def _evict(self):
+        """Must be called with _tasks_lock held. Drops the oldest finished tasks."""
+        overflow = len(self._tasks) - self._max_tasks
+        if overflow <= 0:
+            return
+        for task_id in [tid for tid, t in self._tasks.items() if t.status in _FINISHED][:overflow]:
+            del self._tasks[task_id]
 
     # ── Subscription ────────────────────────────────────────────────────────
 
     def subscribe(self, callback: Callable[[AgentTask], None]):
-        """Subscribe to task update events. Callback runs on a background thread."""
+        """
+        Subscribe to task update events. Callback runs on the dispatcher thread
+        and receives a snapshot AgentTask whose output_lines holds only the
+        lines appended since the previous event for that task.
+        """
         self._callbacks.append(callback)
-
-    def _notify(self, task: AgentTask):
+        self._ensure_dispatcher()
+
+    def subscribe_async(self, maxsize: int = ASYNC_QUEUE_SIZE) -> "asyncio.Queue":
+        """
+        Return an asyncio.Queue of event dicts for the running event loop.
+        Must be called from inside that loop. A full queue drops its oldest event.
+        """
+        loop = asyncio.get_running_loop()
+        q: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._async_subscribers.append((loop, q))
+        self._ensure_dispatcher()
+        return q
+
+    def unsubscribe_async(self, q: "asyncio.Queue"):
+        self._async_subscribers = [(l, sq) for l, sq in self._async_subscribers if sq is not q]
+
+    def _notify(self, task: AgentTask, line: Optional[str] = None):
+        if not self._callbacks and not self._async_subscribers:
+            return
+        self._events.put((task, task.status, line))
+
+    # ── Dispatcher ──────────────────────────────────────────────────────────
+
+    def _ensure_dispatcher(self):
+        with self._lock:
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, daemon=True, name="AgentMonitorDispatch"
+                )
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._events.get()]
+            deadline = time.monotonic() + COALESCE_WINDOW
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._events.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            for task, status, lines in self._coalesce(batch):
+                self._deliver(task, status, lines)
+
+    @staticmethod
+    def _coalesce(batch: list) -> list:
+        """Merge consecutive same-status events per task; status changes stay separate."""
+        merged: list = []
+        last_for_task: dict = {}
+        for task, status, line in batch:
+            idx = last_for_task.get(task.task_id)
+            if idx is not None and merged[idx][1] == status:
+                if line:
+                    merged[idx][2].append(line)
+                continue
+            merged.append((task, status, [line] if line else []))
+            last_for_task[task.task_id] = len(merged) - 1
+        return merged
+
+    def _deliver(self, task: AgentTask, status: str, lines: list):
+        snapshot = AgentTask(
+            task_id=task.task_id, name=task.name, description=task.description,
+            status=status, output_lines=deque(lines, maxlen=MAX_OUTPUT_LINES),
+            start_time=task.start_time, end_time=task.end_time,
+        )
         for cb in list(self._callbacks):
             try:
-                cb(task)
+                cb(snapshot)
             except Exception:
                 pass
 
+        if not self._async_subscribers:
+            return
+        event = snapshot.to_dict(last_lines=len(lines))
+        for loop, q in list(self._async_subscribers):
+            if loop.is_closed():
+                self.unsubscribe_async(q)
+                continue
+            try:
+                loop.call_soon_threadsafe(self._put_drop_oldest, q, event)
+            except RuntimeError:
+                self.unsubscribe_async(q)
+
+    def _put_drop_oldest(self, q: "asyncio.Queue", event: dict):
+        if q.full():
+            try:
+                q.get_nowait()
+                self._dropped_events += 1
+            except asyncio.QueueEmpty:
+                pass
+        q.put_nowait(event)
+
 
 # Module-level singleton — import this everywhere
 monitor = AgentMonitor()
@@ -0,0 +1,303 @@
+# agent/plan_cache.py
+# Plan template cache for Sam's agent layer.
+#
+# Recurring goals ("check my emails and summarize", "research X", "run the
+# tests and fix failures") are normalized into templates with parameter slots.
+# Plans that finished successfully are stored against their template, so the
+# next matching goal gets a plan without an LLM round trip.
+#
+# Lookup order: exact template signature, then a stored template with the same
+# slots whose words differ only in filler ("check my emails" / "check emails").
+# A stored plan's literal arguments belong to its own goal, so templates that
+# differ in any other word never share a plan. A template whose plan keeps
+# failing is dropped.
+# Persisted to ~/.sam/plan_cache.json.
+
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+
+_SAM_DIR    = Path.home() / ".sam"
+_CACHE_FILE = _SAM_DIR / "plan_cache.json"
+
+MAX_TEMPLATES    = 200
+MIN_INLINE_PARAM = 3      # shorter param values are only slotted as whole fields
+
+# Leading phrases whose remainder is a free-text topic ("research quantum computing")
+_TOPIC_PREFIXES = (
+    "research", "look up", "search for", "search", "find information about",
+    "find info on", "find out about", "tell me about", "summarize",
+    "write a report on", "write a report about", "write about", "compare",
+    "learn about", "read about", "news about", "news on",
+)
+
+_SLOT_PATTERNS = [
+    ("url",   re.compile(r"https?://\S+")),
+    ("email", re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")),
+    ("path",  re.compile(r"(?<![\w/])(?:[a-zA-Z]:\\|~?/)[^\s\"']+")),
+    ("quote", re.compile(r"\"([^\"]+)\"|'([^']+)'")),
+    ("num",   re.compile(r"\b\d+(?:[.:]\d+)*\b")),
+]
+
+_STOPWORDS = {"a", "an", "the", "my", "me", "please", "and", "to", "for", "of", "on", "in", "it", "all"}
+
+
+def normalize_goal(goal: str) -> tuple[str, dict]:
+    """
+    Turn a goal into (template, params).
+
+    "Research quantum computing" -> ("research {topic}", {"topic": "quantum computing"})
+    "open https://x.io and save to ~/a.txt" -> ("open {url0} and save to {path0}", {...})
+    """
+    text   = " ".join(goal.strip().split())
+    params: dict = {}
+    counts: dict = {}
+
+    def _slot(kind: str, value: str) -> str:
+        idx  = counts.get(kind, 0)
+        counts[kind] = idx + 1
+        name = f"{kind}{idx}"
+        params[name] = value
+        return "{" + name + "}"
+
+    for kind, pattern in _SLOT_PATTERNS:
+        def _sub(m, kind=kind):
+            value = next((g for g in m.groups() if g), None) if m.groups() else None
+            return _slot(kind, value or m.group(0))
+        text = pattern.sub(_sub, text)
+
+    lowered = text.lower().rstrip(" .!?")
+    for prefix in sorted(_TOPIC_PREFIXES, key=len, reverse=True):
+        if lowered.startswith(prefix + " "):
+            topic = text[len(prefix):].strip().rstrip(" .!?")
+            if topic and not topic.startswith("{"):
+                params["topic"] = topic
+                lowered = f"{prefix} {{topic}}"
+            break
+
+    template = re.sub(r"[^\w{} ]", "", lowered).strip()
+    return template, params
+
+
+def template_signature(template: str) -> str:
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:16]
+
+
+def _tokens(template: str) -> set:
+    return {t for t in template.split() if t not in _STOPWORDS}
+
+
+def _interchangeable(a: str, b: str) -> bool:
+    """True if every word the two templates don't share is a slot (filler words aside)."""
+    ta, tb = _tokens(a), _tokens(b)
+    return bool(ta and tb) and all(t.startswith("{") and t.endswith("}") for t in ta ^ tb)
+
+
+def _replace_strings(obj, mapping: dict):
+    """Recursively replace substrings in every str inside a plan structure."""
+    if isinstance(obj, str):
+        for old, new in mapping.items():
+            if old:
+                obj = obj.replace(old, new)
+        return obj
+    if isinstance(obj, list):
+        return [_replace_strings(v, mapping) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _replace_strings(v, mapping) for k, v in obj.items()}
+    return obj
+
+
+def _templatize(obj, params: dict):
+    """
+    Put {slot} placeholders back into a finished plan. A field equal to a
+    param value becomes its slot outright; inside longer strings only whole
+    tokens are replaced, and never for short or purely numeric values ("3"
+    must not turn "python3" into "python{num0}").
+    """
+    if isinstance(obj, str):
+        for name, value in sorted(params.items(), key=lambda kv: -len(kv[1])):
+            if obj.strip() == value:
+                return "{" + name + "}"
+        for name, value in sorted(params.items(), key=lambda kv: -len(kv[1])):
+            if len(value) < MIN_INLINE_PARAM or re.fullmatch(r"[\d.:]+", value):
+                continue
+            obj = re.sub(rf"(?<!\w){re.escape(value)}(?!\w)", "{" + name + "}", obj)
+        return obj
+    if isinstance(obj, list):
+        return [_templatize(v, params) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _templatize(v, params) for k, v in obj.items()}
+    return obj
+
+
+def _strip_internal(plan: dict) -> dict:
+    return {k: v for k, v in plan.items() if not k.startswith("_")}
+
+
+class PlanCache:
+    """
+    Thread-safe store of plan templates keyed by template signature.
+
+    Usage:
+        cache = PlanCache()
+        plan  = cache.lookup(goal)               # None on miss
+        cache.record_outcome(goal, plan, True)   # after AgentExecutor finishes
+        cache.stats()                            # hit rates
+    """
+
+    def __init__(self, path: Path | None = None, max_templates: int = MAX_TEMPLATES):
+        self._path          = Path(path) if path else _CACHE_FILE
+        self._max_templates = max_templates
+        self._lock          = threading.Lock()
+        self._entries: dict = {}
+        self._stats         = {"lookups": 0, "exact_hits": 0, "similar_hits": 0, "misses": 0, "stored": 0}
+        self._loaded        = False
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def lookup(self, goal: str) -> dict | None:
+        """Return a ready-to-run plan for this goal, or None."""
+        template, params = normalize_goal(goal)
+        sig = template_signature(template)
+
+        with self._lock:
+            self._load()
+            self._stats["lookups"] += 1
+            entry = self._entries.get(sig)
+            kind  = "exact"
+            if not self._usable(entry):
+                entry = self._find_similar(template, set(params))
+                kind  = "similar"
+            if not self._usable(entry):
+                self._stats["misses"] += 1
+                return None
+
+            self._stats[f"{kind}_hits"] += 1
+            entry["hits"]      = entry.get("hits", 0) + 1
+            entry["last_used"] = time.time()
+            plan = copy.deepcopy(entry["plan"])
+
+        mapping = {"{" + k + "}": v for k, v in params.items()}
+        plan = _replace_strings(plan, mapping)
+        plan["goal"]      = goal
+        plan["_cached"]   = kind
+        plan["_template"] = entry["template"]      # failures are charged to the entry that served it
+        print(f"[PlanCache] {kind} hit for '{template}' ({len(plan.get('steps', []))} steps)")
+        return plan
+
+    def record_outcome(self, goal: str, plan: dict, success: bool, duration_s: float = 0.0) -> None:
+        """
+        Store a plan that finished successfully, or count a failure against it.
+        Fallback plans are never stored.
+        """
+        if not plan or plan.get("_fallback") or not plan.get("steps"):
+            return
+
+        template, params = normalize_goal(goal)
+        sig = template_signature(template)
+
+        with self._lock:
+            self._load()
+            entry = self._entries.get(sig)
+
+            if not success:
+                # Charge the failure to the template the plan was served from
+                if plan.get("_template"):
+                    sig   = template_signature(plan["_template"])
+                    entry = self._entries.get(sig)
+                if entry:
+                    entry["failures"] = entry.get("failures", 0) + 1
+                    if not self._usable(entry):
+                        del self._entries[sig]
+                        print(f"[PlanCache] dropped template '{entry['template']}' after failures")
+                    self._save()
+                return
+
+            template_plan = _templatize(_strip_internal(copy.deepcopy(plan)), params)
+            template_plan.pop("goal", None)
+
+            if entry is None:
+                entry = {
+                    "template":       template,
+                    "slots":          sorted(params),
+                    "successes":      0,
+                    "failures":       0,
+                    "hits":           0,
+                    "avg_duration_s": 0.0,
+                    "created_at":     time.time(),
+                }
+                self._entries[sig] = entry
+                self._stats["stored"] += 1
+            n = entry["successes"]
+            entry["avg_duration_s"] = round((entry["avg_duration_s"] * n + duration_s) / (n + 1), 2)
+            entry["successes"] = n + 1
+            entry["plan"]      = template_plan
+            entry["last_used"] = time.time()
+            self._evict()
+            self._save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s    = dict(self._stats)
+            hits = s["exact_hits"] + s["similar_hits"]
+            s["hits"]      = hits
+            s["hit_rate"]  = round(hits / s["lookups"], 3) if s["lookups"] else 0.0
+            s["templates"] = len(self._entries)
+            return s
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._save()
+
+    # ── Internals (call with _lock held) ────────────────────────────────────
+
+    @staticmethod
+    def _usable(entry: dict | None) -> bool:
+        if not entry or not entry.get("plan"):
+            return False
+        return entry.get("successes", 0) > entry.get("failures", 0)
+
+    def _find_similar(self, template: str, slots: set) -> dict | None:
+        for entry in self._entries.values():
+            if set(entry.get("slots", [])) == slots and _interchangeable(template, entry["template"]) \
+                    and self._usable(entry):
+                return entry
+        return None
+
+    def _evict(self) -> None:
+        overflow = len(self._entries) - self._max_templates
+        if overflow <= 0:
+            return
+        oldest = sorted(self._entries, key=lambda k: self._entries[k].get("last_used", 0))
+        for sig in oldest[:overflow]:
+            del self._entries[sig]
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            if isinstance(data, dict):
+                self._entries = data
+        except (OSError, ValueError):
+            pass
+
+    def _save(self) -> None:
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries), encoding="utf-8")
+            tmp.replace(self._path)
+        except OSError:
+            pass  # non-fatal — cache just won't survive a restart
+
+
+plan_cache = PlanCache()
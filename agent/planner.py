@@ -50,7 +50,17 @@ OUTPUT — return ONLY valid JSON (no markdown, no explanation):
 """
 
 
-def create_plan(goal: str, context: str = "") -> dict:
+def create_plan(goal: str, context: str = "", use_cache: bool = True) -> dict:
+    """
+    Plan a goal. Context-free goals are served from the plan template cache
+    when a matching successful plan exists; otherwise the LLM plans it.
+    """
+    if use_cache and not context:
+        from agent.plan_cache import plan_cache
+        cached = plan_cache.lookup(goal)
+        if cached:
+            return cached
+
     from agent.llm_bridge import agent_llm_call
 
     user_input = f"Goal: {goal}"
@@ -82,8 +92,9 @@ def create_plan(goal: str, context: str = "") -> dict:
 def _fallback_plan(goal: str) -> dict:
     print("[Planner] using fallback plan (web_search)")
     return {
-        "goal":  goal,
-        "steps": [
+        "goal":      goal,
+        "_fallback": True,
+        "steps":     [
             {
                 "step":        1,
                 "tool":        "web_search",
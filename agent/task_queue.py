@@ -1,14 +1,33 @@
 # agent/task_queue.py
 # Priority task queue for Sam's agent layer.
 # Ported from Mark-XXX-main — pure threading, no AI.
+#
+# Heap-ordered (priority, submit order) with a fixed pool of worker threads.
+# Each task has a task_class ("agent", "research", ...) with its own
+# concurrency limit. Queued and running tasks are persisted to the vault so a
+# restart resumes pending work; finished tasks move to a bounded history.
+#
+# Each persisted row records its owner (host:pid). Several daemon workers can
+# share the vault, so a starting queue only reclaims rows whose owner process
+# is gone — never tasks another live worker is still running.
 
+import heapq
+import itertools
+import os
+import socket
+import sqlite3
+import sys
 import threading
 import time
 import uuid
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
 from typing import Callable, Any
 
+from system.metrics import TASK_RUNS, TASK_WAIT
+
 
 class TaskStatus(Enum):
     PENDING   = "pending"
@@ -24,6 +43,50 @@ class TaskPriority(Enum):
     HIGH   = 1
 
 
+_FINISHED = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+DEFAULT_CLASS   = "agent"
+HISTORY_SIZE    = 200
+_TIMING_SAMPLES = 500
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS agent_task_queue (
+        task_id    TEXT PRIMARY KEY,
+        goal       TEXT NOT NULL,
+        priority   INTEGER NOT NULL DEFAULT 2,
+        task_class TEXT NOT NULL DEFAULT 'agent',
+        status     TEXT NOT NULL DEFAULT 'pending',
+        created_at REAL NOT NULL,
+        owner      TEXT
+    )
+"""
+
+_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: str | None) -> bool:
+    """True while the process that owns a persisted row is still running."""
+    if not owner or owner == _OWNER:
+        return False       # legacy row, or left behind by this process's earlier queue
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True        # can't check another machine's processes
+    if sys.platform == "win32":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, int(pid))  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
 @dataclass(order=True)
 class Task:
     priority:    int
@@ -36,19 +99,72 @@ class Task:
     speak:       Any              = field(compare=False, default=None)
     on_complete: Any              = field(compare=False, default=None)
     cancel_flag: threading.Event  = field(compare=False, default_factory=threading.Event)
+    task_class:  str              = field(compare=False, default=DEFAULT_CLASS)
+    started_at:  float | None     = field(compare=False, default=None)
+    finished_at: float | None     = field(compare=False, default=None)
+
+    def to_status(self) -> dict:
+        return {
+            "task_id":    self.task_id,
+            "goal":       self.goal,
+            "status":     self.status.value,
+            "result":     self.result,
+            "error":      self.error,
+            "task_class": self.task_class,
+            "wait_s":     round(self.started_at - self.created_at, 3) if self.started_at else None,
+            "run_s":      round(self.finished_at - self.started_at, 3)
+                          if self.started_at and self.finished_at else None,
+        }
+
+
+class _Timing:
+    """Rolling count/avg/p95/max over the last N samples."""
+
+    def __init__(self, size: int = _TIMING_SAMPLES):
+        self._samples: deque = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max   = 0.0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        self.max    = max(self.max, value)
+
+    def summary(self) -> dict:
+        recent = sorted(self._samples)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "count": self.count,
+            "avg_s": round(self.total / self.count, 3) if self.count else 0.0,
+            "p95_s": round(p95, 3),
+            "max_s": round(self.max, 3),
+        }
 
 
 class TaskQueue:
-    def __init__(self, max_concurrent: int = 1):
-        self._queue:         list      = []
+    def __init__(self, max_concurrent: int = 2, class_limits: dict | None = None,
+                 history_size: int = HISTORY_SIZE, db_path: str | Path | None = None,
+                 persist: bool = True):
+        self._heap:          list      = []
+        self._seq                      = itertools.count()
         self._lock:          threading.Lock      = threading.Lock()
         self._condition:     threading.Condition = threading.Condition(self._lock)
-        self._tasks:         dict      = {}
+        self._tasks:         dict      = {}          # live (pending/running) tasks only
+        self._history:       OrderedDict = OrderedDict()
+        self._history_size   = history_size
         self._running:       bool      = False
-        self._worker_thread  = None
-        self._max_concurrent = max_concurrent
-        self._active_count   = 0
+        self._workers:       list      = []
+        self._max_concurrent = max(1, max_concurrent)
+        self._class_limits   = dict(class_limits or {})
+        self._active_by_class: dict    = {}
+        self._pending_count  = 0
         self._executor       = None
+        self._wait_timing    = _Timing()
+        self._run_timing     = _Timing()
+        self._db_path        = db_path
+        self._persist        = persist
 
     def _get_executor(self):
         if self._executor is None:
@@ -59,21 +175,31 @@ class TaskQueue:
     def start(self) -> None:
         if self._running:
             return
-        self._running       = True
-        self._worker_thread = threading.Thread(
-            target=self._worker_loop, daemon=True, name="AgentTaskQueue"
-        )
-        self._worker_thread.start()
-        print("[TaskQueue] started")
+        self._running = True
+        self._resume_persisted()
+        for i in range(self._max_concurrent):
+            worker = threading.Thread(
+                target=self._worker_loop, daemon=True, name=f"AgentTaskQueue-{i}"
+            )
+            worker.start()
+            self._workers.append(worker)
+        print(f"[TaskQueue] started ({self._max_concurrent} workers)")
 
     def stop(self) -> None:
         self._running = False
         with self._condition:
             self._condition.notify_all()
+        self._workers.clear()
         print("[TaskQueue] stopped")
 
+    def set_class_limit(self, task_class: str, limit: int) -> None:
+        with self._condition:
+            self._class_limits[task_class] = max(1, limit)
+            self._condition.notify_all()
+
     def submit(self, goal: str, priority: TaskPriority = TaskPriority.NORMAL,
-               speak: Callable = None, on_complete: Callable = None) -> str:
+               speak: Callable = None, on_complete: Callable = None,
+               task_class: str = DEFAULT_CLASS) -> str:
         task_id = str(uuid.uuid4())[:8]
         task    = Task(
             priority    = priority.value,
@@ -82,74 +208,119 @@ class TaskQueue:
             goal        = goal,
             speak       = speak,
             on_complete = on_complete,
+            task_class  = task_class,
         )
+        # Persist before any worker can see the task, so its _db_delete always comes after
+        self._db_insert(task)
         with self._condition:
-            self._queue.append(task)
-            self._queue.sort(key=lambda t: (t.priority, t.created_at))
-            self._tasks[task_id] = task
+            self._enqueue(task)
             self._condition.notify()
-        print(f"[TaskQueue] queued [{task_id}]: {goal[:60]}")
+        print(f"[TaskQueue] queued [{task_id}] ({task_class}): {goal[:60]}")
         return task_id
 
     def cancel(self, task_id: str) -> bool:
         with self._lock:
             task = self._tasks.get(task_id)
-            if not task:
-                return False
-            if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+            if not task or task.status in _FINISHED:
                 return False
             task.cancel_flag.set()
-            task.status = TaskStatus.CANCELLED
+            if task.status == TaskStatus.PENDING:
+                # Lazily dropped from the heap when a worker reaches it
+                self._pending_count -= 1
+                task.status = TaskStatus.CANCELLED
+                self._finish(task)
+            else:
+                task.status = TaskStatus.CANCELLED
             print(f"[TaskQueue] cancelled [{task_id}]")
-            return True
+        self._db_delete(task_id)
+        return True
 
     def get_status(self, task_id: str) -> dict | None:
         with self._lock:
             task = self._tasks.get(task_id)
-            if not task:
-                return None
-            return {
-                "task_id": task.task_id,
-                "goal":    task.goal,
-                "status":  task.status.value,
-                "result":  task.result,
-                "error":   task.error,
-            }
+            if task:
+                return task.to_status()
+            return self._history.get(task_id)
 
     def pending_count(self) -> int:
         with self._lock:
-            return sum(1 for t in self._queue if t.status == TaskStatus.PENDING)
+            return self._pending_count
+
+    def history(self, limit: int = 50) -> list:
+        with self._lock:
+            return list(self._history.values())[-limit:][::-1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers":      self._max_concurrent,
+                "pending":      self._pending_count,
+                "running":      dict(self._active_by_class),
+                "class_limits": dict(self._class_limits),
+                "history":      len(self._history),
+                "wait_time":    self._wait_timing.summary(),
+                "run_time":     self._run_timing.summary(),
+            }
+
+    # ── Scheduling (call with _lock held) ───────────────────────────────────
+
+    def _enqueue(self, task: Task) -> None:
+        heapq.heappush(self._heap, (task.priority, task.created_at, next(self._seq), task))
+        self._tasks[task.task_id] = task
+        self._pending_count += 1
+
+    def _class_has_capacity(self, task_class: str) -> bool:
+        limit = self._class_limits.get(task_class, self._max_concurrent)
+        return self._active_by_class.get(task_class, 0) < limit
+
+    def _next_task(self) -> Task | None:
+        """Pop the highest-priority runnable task; skip classes at their limit."""
+        skipped = []
+        found   = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            task  = entry[-1]
+            if task.status != TaskStatus.PENDING or task.cancel_flag.is_set():
+                continue
+            if self._class_has_capacity(task.task_class):
+                found = task
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def _finish(self, task: Task) -> None:
+        """Move a finished task from the live index to the bounded history."""
+        task.finished_at = task.finished_at or time.time()
+        self._tasks.pop(task.task_id, None)
+        self._history[task.task_id] = task.to_status()
+        while len(self._history) > self._history_size:
+            self._history.popitem(last=False)
+
+    # ── Workers ─────────────────────────────────────────────────────────────
 
     def _worker_loop(self) -> None:
         while self._running:
-            task = None
             with self._condition:
-                while self._running and not self._next_task():
-                    self._condition.wait(timeout=1.0)
                 task = self._next_task()
-                if task:
-                    task.status = TaskStatus.RUNNING
-                    self._active_count += 1
-                    try:
-                        self._queue.remove(task)
-                    except ValueError:
-                        pass
-            if task:
-                threading.Thread(
-                    target=self._run_task, args=(task,),
-                    daemon=True, name=f"AgentTask-{task.task_id}"
-                ).start()
-
-    def _next_task(self):
-        if self._active_count >= self._max_concurrent:
-            return None
-        for task in self._queue:
-            if task.status == TaskStatus.PENDING and not task.cancel_flag.is_set():
-                return task
-        return None
+                while self._running and task is None:
+                    self._condition.wait(timeout=1.0)
+                    task = self._next_task()
+                if task is None:
+                    return
+                task.status     = TaskStatus.RUNNING
+                task.started_at = time.time()
+                self._pending_count -= 1
+                self._active_by_class[task.task_class] = self._active_by_class.get(task.task_class, 0) + 1
+                self._wait_timing.add(task.started_at - task.created_at)
+                TASK_WAIT.labels(task.task_class).observe(task.started_at - task.created_at)
+            self._db_set_status(task)
+            self._run_task(task)
 
     def _run_task(self, task: Task) -> None:
         print(f"[TaskQueue] running [{task.task_id}]: {task.goal[:60]}")
+        result = None
         try:
             executor = self._get_executor()
             result   = executor.execute(
@@ -163,33 +334,159 @@ class TaskQueue:
                 else:
                     task.status = TaskStatus.COMPLETED
                     task.result = result
-                self._active_count -= 1
-
-            if task.on_complete and not task.cancel_flag.is_set():
-                try:
-                    task.on_complete(task.task_id, result)
-                except Exception as e:
-                    print(f"[TaskQueue] on_complete error: {e}")
-
         except Exception as e:
             with self._lock:
                 task.status = TaskStatus.FAILED
                 task.error  = str(e)
-                self._active_count -= 1
             print(f"[TaskQueue] failed [{task.task_id}]: {e}")
 
         with self._condition:
-            self._condition.notify()
+            task.finished_at = time.time()
+            self._run_timing.add(task.finished_at - task.started_at)
+            TASK_RUNS.labels(task.task_class, task.status.value).observe(task.finished_at - task.started_at)
+            self._active_by_class[task.task_class] -= 1
+            self._finish(task)
+            self._condition.notify_all()
+        self._db_delete(task.task_id)
+
+        if task.status == TaskStatus.COMPLETED and task.on_complete:
+            try:
+                task.on_complete(task.task_id, result)
+            except Exception as e:
+                print(f"[TaskQueue] on_complete error: {e}")
+
+    # ── Vault persistence ───────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if not self._persist:
+            return None
+        try:
+            if self._db_path is None:
+                from vault.schema import DB_PATH
+                self._db_path = DB_PATH
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._db_path), timeout=5)
+            conn.execute(_CREATE_TABLE)
+            cols = {row[1] for row in conn.execute("PRAGMA table_info(agent_task_queue)")}
+            if "owner" not in cols:
+                conn.execute("ALTER TABLE agent_task_queue ADD COLUMN owner TEXT")
+            return conn
+        except Exception as e:
+            print(f"[TaskQueue] vault unavailable, persistence disabled: {e}")
+            self._persist = False
+            return None
+
+    def _db_insert(self, task: Task) -> None:
+        conn = self._connect()
+        if not conn:
+            return
+        try:
+            with conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO agent_task_queue
+                       (task_id, goal, priority, task_class, status, created_at, owner)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (task.task_id, task.goal, task.priority, task.task_class,
+                     task.status.value, task.created_at, _OWNER),
+                )
+        except sqlite3.Error as e:
+            print(f"[TaskQueue] persist failed [{task.task_id}]: {e}")
+        finally:
+            conn.close()
+
+    def _db_set_status(self, task: Task) -> None:
+        """Update a persisted row; an UPDATE can't bring back a row a cancel already deleted."""
+        conn = self._connect()
+        if not conn:
+            return
+        try:
+            with conn:
+                conn.execute("UPDATE agent_task_queue SET status = ? WHERE task_id = ?",
+                             (task.status.value, task.task_id))
+        except sqlite3.Error as e:
+            print(f"[TaskQueue] persist failed [{task.task_id}]: {e}")
+        finally:
+            conn.close()
+
+    def _db_delete(self, task_id: str) -> None:
+        conn = self._connect()
+        if not conn:
+            return
+        try:
+            with conn:
+                conn.execute("DELETE FROM agent_task_queue WHERE task_id = ?", (task_id,))
+        except sqlite3.Error as e:
+            print(f"[TaskQueue] persist delete failed [{task_id}]: {e}")
+        finally:
+            conn.close()
+
+    def _resume_persisted(self) -> None:
+        """Re-queue tasks left pending or running by a process that has since exited."""
+        conn = self._connect()
+        if not conn:
+            return
+        rows = []
+        try:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")      # one worker claims an orphaned row, not all of them
+            try:
+                for row in conn.execute(
+                    "SELECT task_id, goal, priority, task_class, created_at, owner FROM agent_task_queue "
+                    "WHERE status IN ('pending', 'running') ORDER BY priority, created_at"
+                ).fetchall():
+                    if row[0] in self._tasks or _owner_alive(row[5]):
+                        continue
+                    rows.append(row[:5])
+                    conn.execute("UPDATE agent_task_queue SET status = 'pending', owner = ? WHERE task_id = ?",
+                                 (_OWNER, row[0]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"[TaskQueue] resume failed: {e}")
+            return
+        finally:
+            conn.close()
+
+        with self._condition:
+            for task_id, goal, priority, task_class, created_at in rows:
+                if task_id in self._tasks:
+                    continue
+                self._enqueue(Task(
+                    priority   = priority,
+                    created_at = created_at,
+                    task_id    = task_id,
+                    goal       = goal,
+                    task_class = task_class,
+                ))
+        if rows:
+            print(f"[TaskQueue] resumed {len(rows)} persisted task(s)")
+
+
+def _queue_from_config() -> TaskQueue:
+    try:
+        from config.loader import get
+        cfg = get("agent", "task_queue", {}) or {}
+    except Exception:
+        cfg = {}
+    return TaskQueue(
+        max_concurrent = int(cfg.get("workers", 2)),
+        class_limits   = {k: int(v) for k, v in (cfg.get("class_limits") or {}).items()},
+        history_size   = int(cfg.get("history_size", HISTORY_SIZE)),
+    )
 
 
-_queue         = TaskQueue()
+_queue         = None
 _queue_started = False
 _queue_lock    = threading.Lock()
 
 
 def get_queue() -> TaskQueue:
-    global _queue_started
+    global _queue, _queue_started
     with _queue_lock:
+        if _queue is None:
+            _queue = _queue_from_config()
         if not _queue_started:
             _queue.start()
             _queue_started = True
@@ -1,21 +1,52 @@
 """Delegate a task to a specific agent role."""
 
 
-async def delegate_to_agent(task, role, llm) -> str:
+async def delegate_to_agent(task, role, llm, max_tokens: int = 2048) -> str:
     """
     Build a prompt from the role's context + task, execute with LLM.
     Uses local model by default; cloud only if task.requires_cloud.
     """
     system_prompt = build_system_prompt(role)
-    user_prompt = f"""Task: {task.task}
+    tier = "cloud" if task.requires_cloud else "local"
+    return await llm.complete(
+        build_task_prompt(task), system=system_prompt, model_tier=tier, max_tokens=max_tokens
+    )
+
+
+async def delegate_with_usage(task, role, llm, max_tokens: int = 2048) -> tuple:
+    """
+    Same as delegate_to_agent but also returns tokens spent, for budgeted fan-out.
+    Falls back to a ~4 chars/token estimate when the manager reports no usage.
+    """
+    system_prompt = build_system_prompt(role)
+    user_prompt = build_task_prompt(task)
+    tier = "cloud" if task.requires_cloud else "local"
+
+    if hasattr(llm, "complete_with_usage"):
+        resp = await llm.complete_with_usage(
+            user_prompt, system=system_prompt, model_tier=tier, max_tokens=max_tokens
+        )
+        text = resp.text
+        tokens = resp.usage.input_tokens + resp.usage.output_tokens
+    else:
+        text = await llm.complete(user_prompt, system=system_prompt, model_tier=tier, max_tokens=max_tokens)
+        tokens = 0
+    if not tokens:
+        tokens = estimate_tokens(system_prompt + user_prompt + text)
+    return text, tokens
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def build_task_prompt(task) -> str:
+    return f"""Task: {task.task}
 
 Context: {task.context}
 
 Complete this task."""
 
-    tier = "cloud" if task.requires_cloud else "local"
-    return await llm.complete(user_prompt, system=system_prompt, model_tier=tier)
-
 
 def build_system_prompt(role) -> str:
     """Build system prompt from role definition."""
@@ -21,15 +21,18 @@ def get_escalation_path(role_name: str) -> list:
     return HIERARCHY.get(role_name, ["personal-assistant"])
 
 
+# Task-type keywords each role is known to handle (also seeds agents/router.py)
+ROLE_CAPABILITIES = {
+    "dev-lead": ["code", "debug", "build", "deploy", "git", "test"],
+    "research-specialist": ["research", "search", "analyze", "find"],
+    "marketing-director": ["write", "content", "email", "post", "blog"],
+    "system-admin": ["system", "server", "config", "install", "process"],
+    "personal-assistant": ["schedule", "remind", "calendar", "note"],
+    "executive-assistant": ["meeting", "email", "document", "plan"],
+}
+
+
 def can_handle(role_name: str, task_type: str) -> bool:
     """Check if a role can handle a task type."""
-    role_capabilities = {
-        "dev-lead": ["code", "debug", "build", "deploy", "git", "test"],
-        "research-specialist": ["research", "search", "analyze", "find"],
-        "marketing-director": ["write", "content", "email", "post", "blog"],
-        "system-admin": ["system", "server", "config", "install", "process"],
-        "personal-assistant": ["schedule", "remind", "calendar", "note"],
-        "executive-assistant": ["meeting", "email", "document", "plan"],
-    }
-    caps = role_capabilities.get(role_name, [])
+    caps = ROLE_CAPABILITIES.get(role_name, [])
     return any(cap in task_type.lower() for cap in caps)
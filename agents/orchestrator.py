@@ -1,13 +1,17 @@
 """
 Agent orchestrator - decides which specialist handles a task.
-Uses local LLM (Ollama) for routing decisions to minimize token cost.
+Routes locally via agents/router.py; the local LLM (Ollama) is only asked to
+break ties when the keyword scores are ambiguous.
 """
 
 from dataclasses import dataclass, field
 from agents.role_loader import load_roles, Role
 from agents.delegation import delegate_to_agent
+from agents.router import RoleRouter
 from llm.manager import get_manager
 
+FALLBACK_ROLE = "personal-assistant"
+
 
 @dataclass
 class AgentTask:
@@ -18,34 +22,60 @@ class AgentTask:
 
 
 class Orchestrator:
-    def __init__(self, llm_manager=None):
+    def __init__(self, llm_manager=None, roles_dir: str = None):
         self.llm = llm_manager or get_manager()
-        self.roles = load_roles()  # dict of role_name -> Role
+        self._roles_dir = roles_dir
+        self.roles = {}        # dict of role_name -> Role
+        self.router = None
+        self.stats = {"local": 0, "llm": 0, "fallback": 0}
+        self._refresh_roles()
+
+    def _refresh_roles(self) -> None:
+        """Pick up edited role files; the router index is rebuilt only when roles change."""
+        roles = load_roles(self._roles_dir)
+        if self.router is None or any(self.roles.get(k) is not v for k, v in roles.items()) \
+                or roles.keys() != self.roles.keys():
+            self.roles = roles
+            self.router = RoleRouter(roles)
 
     async def route(self, task: AgentTask) -> str:
         """
         Pick the best specialist role for this task.
-        Uses Ollama for routing (cheap, fast).
+        Scores roles locally; only an ambiguous result costs an LLM call,
+        and then only the top candidates are offered.
         Returns role_name string.
         """
-        role_names = list(self.roles.keys())
+        self._refresh_roles()
+        decision = self.router.route(task.task)
+        if not decision.ambiguous:
+            self.stats["local"] += 1
+            return decision.role
+
+        candidates = [name for name, _ in decision.candidates] or list(self.roles.keys())
         prompt = f"""You are a task router. Given this task, pick the most suitable specialist.
 
 Task: {task.task}
 
-Available specialists: {', '.join(role_names)}
+Available specialists: {', '.join(candidates)}
 
 Reply with ONLY the specialist name, nothing else."""
 
         # Always use local model for routing
-        response = await self.llm.complete(prompt, model_tier="local")
-        role_name = response.strip().lower()
+        try:
+            response = await self.llm.complete(prompt, model_tier="local")
+            role_name = response.strip().lower()
+        except Exception:
+            role_name = ""
 
-        # Validate — fall back to personal-assistant if unknown
-        if role_name not in self.roles:
-            role_name = "personal-assistant"
+        if role_name in self.roles:
+            self.stats["llm"] += 1
+            return role_name
 
-        return role_name
+        # Validate — fall back to the best local match, then personal-assistant
+        self.stats["fallback"] += 1
+        if decision.role:
+            return decision.role
+        return FALLBACK_ROLE if FALLBACK_ROLE in self.roles else next(iter(self.roles))
 
     async def execute(self, task: AgentTask) -> str:
         """Route task to best agent and execute."""
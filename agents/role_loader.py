@@ -1,11 +1,23 @@
-"""Load agent role definitions from YAML files."""
+"""Load agent role definitions from YAML files.
+
+Roles come from roles/*.yaml plus roles/specialists/*.yaml (top-level files win
+on a name clash). Parsed roles are cached per directory and only re-read when
+a file is added, removed, or its mtime/size changes.
+"""
 
 import yaml
 import os
+import threading
 from dataclasses import dataclass, field
 from typing import Optional
 
 
+SUBDIRS = ("", "specialists")
+
+_cache: dict = {}          # roles_dir -> (signature, roles)
+_cache_lock = threading.Lock()
+
+
 @dataclass
 class Role:
     name: str
@@ -15,9 +27,11 @@ class Role:
     constraints: list = field(default_factory=list)
     interaction_style: str = ""
     tools: list = field(default_factory=list)
+    responsibilities: list = field(default_factory=list)
+    keywords: list = field(default_factory=list)
 
 
-def load_roles(roles_dir: str = None) -> dict:
+def load_roles(roles_dir: str = None, use_cache: bool = True) -> dict:
     """Load all YAML role files. Returns dict of role_name -> Role."""
     if roles_dir is None:
         roles_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "roles")
@@ -25,30 +39,74 @@ def load_roles(roles_dir: str = None) -> dict:
     if not roles_dir or not os.path.isdir(roles_dir):
         return _default_roles()
 
+    files = _role_files(roles_dir)
+    signature = tuple(files)
+    if use_cache:
+        with _cache_lock:
+            cached = _cache.get(roles_dir)
+        if cached and cached[0] == signature:
+            return dict(cached[1])
+
     roles = {}
-    for fname in os.listdir(roles_dir):
-        if fname.endswith(".yaml") or fname.endswith(".yml"):
-            path = os.path.join(roles_dir, fname)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = yaml.safe_load(f)
-                if data and isinstance(data, dict):
-                    role_name = fname.replace(".yaml", "").replace(".yml", "")
-                    roles[role_name] = Role(
-                        name=data.get("name", role_name),
-                        description=data.get("description", ""),
-                        context=data.get("context", ""),
-                        knowledge=data.get("knowledge", []),
-                        constraints=data.get("constraints", []),
-                        interaction_style=data.get("interaction_style", ""),
-                        tools=data.get("tools", []),
-                    )
-            except Exception:
-                pass
+    for role_name, path, _mtime, _size in files:
+        if role_name in roles:
+            continue
+        role = _parse_role(role_name, path)
+        if role:
+            roles[role_name] = role
 
     if not roles:
         return _default_roles()
-    return roles
+
+    with _cache_lock:
+        _cache[roles_dir] = (signature, roles)
+    return dict(roles)
+
+
+def clear_role_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _role_files(roles_dir: str) -> list:
+    """[(role_name, path, mtime_ns, size)] — top-level files first."""
+    files = []
+    for sub in SUBDIRS:
+        folder = os.path.join(roles_dir, sub) if sub else roles_dir
+        if not os.path.isdir(folder):
+            continue
+        for fname in sorted(os.listdir(folder)):
+            if not (fname.endswith(".yaml") or fname.endswith(".yml")):
+                continue
+            path = os.path.join(folder, fname)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            role_name = fname.replace(".yaml", "").replace(".yml", "")
+            files.append((role_name, path, st.st_mtime_ns, st.st_size))
+    return files
+
+
+def _parse_role(role_name: str, path: str) -> Optional[Role]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    except Exception:
+        return None
+    if not data or not isinstance(data, dict):
+        return None
+    return Role(
+        name=data.get("name", role_name),
+        description=data.get("description", ""),
+        context=data.get("context", ""),
+        knowledge=data.get("knowledge", []),
+        constraints=data.get("constraints", []),
+        interaction_style=data.get("interaction_style", ""),
+        tools=data.get("tools", []),
+        responsibilities=data.get("responsibilities", []) or [],
+        keywords=data.get("keywords", []) or [],
+    )
 
 
 def _default_roles() -> dict:
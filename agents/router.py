@@ -0,0 +1,106 @@
+"""
+Local role router — scores a task against every role without an LLM call.
+
+Each role's name, capability keywords, responsibilities and description are
+compiled once into a weighted token index (IDF-scaled so words every role
+mentions count for little). A task is tokenized the same way and scored
+against the index; the orchestrator only asks the LLM when the best two
+scores are too close to call or nothing matched at all.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+
+from agents.hierarchy import ROLE_CAPABILITIES
+
+
+# Field weights — explicit keywords beat prose
+W_KEYWORD        = 3.0
+W_NAME           = 2.5
+W_RESPONSIBILITY = 1.5
+W_DESCRIPTION    = 0.5
+
+MIN_SCORE    = 1.0     # below this nothing matched well enough
+MIN_MARGIN   = 1.25    # top score must beat the runner-up by this ratio
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "to", "for", "of", "on", "in", "at", "by", "with",
+    "is", "are", "be", "it", "this", "that", "you", "your", "me", "my", "i", "we",
+    "our", "as", "from", "into", "all", "any", "can", "will", "please", "need",
+    "want", "help", "some", "make", "get", "do", "what", "how", "when", "not",
+}
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ies", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def tokenize(text: str) -> list:
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+@dataclass
+class RouteDecision:
+    role: str
+    score: float
+    ambiguous: bool
+    candidates: list = field(default_factory=list)   # [(role_name, score)] best first
+
+
+class RoleRouter:
+    """Precompiled keyword/description index over a roles dict."""
+
+    def __init__(self, roles: dict):
+        self.roles = roles
+        self._index: dict = {}       # token -> {role_name: weight}
+        self._build()
+
+    def _build(self) -> None:
+        raw: dict = {}
+        for role_name, role in self.roles.items():
+            weights: dict = {}
+
+            def add(text, weight):
+                for tok in tokenize(str(text)):
+                    weights[tok] = max(weights.get(tok, 0.0), weight)
+
+            add(role_name.replace("-", " "), W_NAME)
+            add(role.name, W_NAME)
+            for kw in list(role.keywords) + ROLE_CAPABILITIES.get(role_name, []):
+                add(kw, W_KEYWORD)
+            for line in role.responsibilities:
+                add(line, W_RESPONSIBILITY)
+            add(role.description, W_DESCRIPTION)
+            for tok, w in weights.items():
+                raw.setdefault(tok, {})[role_name] = w
+
+        n_roles = max(len(self.roles), 1)
+        for tok, per_role in raw.items():
+            idf = math.log(1 + n_roles / len(per_role))
+            self._index[tok] = {r: w * idf for r, w in per_role.items()}
+
+    def rank(self, text: str) -> list:
+        scores: dict = {}
+        for tok in set(tokenize(text)):
+            for role_name, w in self._index.get(tok, {}).items():
+                scores[role_name] = scores.get(role_name, 0.0) + w
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+    def route(self, text: str, top_k: int = 3) -> RouteDecision:
+        ranked = self.rank(text)
+        if not ranked:
+            return RouteDecision(role="", score=0.0, ambiguous=True)
+        best, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        ambiguous = best_score < MIN_SCORE or (runner_up and best_score < runner_up * MIN_MARGIN)
+        return RouteDecision(
+            role=best,
+            score=round(best_score, 3),
+            ambiguous=bool(ambiguous),
+            candidates=[(r, round(s, 3)) for r, s in ranked[:top_k]],
+        )
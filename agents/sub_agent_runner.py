@@ -1,23 +1,41 @@
 """
 Sub-agent runner: breaks a complex task into steps and executes them.
 Based on Sam's existing agent/executor.py but wired to the role system.
+
+Two modes:
+  run(goal)                 — sequential steps, each sees the previous result
+  run(goal, parallel=True)  — fan-out: independent sub-tasks go to several
+                              roles at once (bounded by MAX_PARALLEL and a
+                              token budget), partial results stream to
+                              AgentMonitor, and one synthesis pass merges them
 """
 
+import asyncio
+import time
+
 from agents.orchestrator import Orchestrator, AgentTask
+from agents.delegation import delegate_with_usage, estimate_tokens
+from llm.manager import is_llm_error
 
 
 class SubAgentRunner:
     MAX_STEPS = 5
+    MAX_PARALLEL = 3
+    TOKEN_BUDGET = 12000         # whole fan-out, synthesis included
+    MIN_SUBTASK_TOKENS = 256
 
     def __init__(self, llm_manager):
         self.orchestrator = Orchestrator(llm_manager)
         self.llm = llm_manager
 
-    async def run(self, goal: str, context: dict = None) -> dict:
+    async def run(self, goal: str, context: dict = None, parallel: bool = False, **fan_out_kw) -> dict:
         """
         Break goal into steps, execute each with the right agent.
         Returns: {"steps": [...], "result": "...", "success": bool}
         """
+        if parallel:
+            return await self.fan_out(goal, context, **fan_out_kw)
+
         context = context or {}
         steps = await self._plan_steps(goal)
         results = []
@@ -46,6 +64,88 @@ class SubAgentRunner:
             "success": all(r.get("success") for r in results),
         }
 
+    async def fan_out(
+        self,
+        goal: str,
+        context: dict = None,
+        roles: list = None,
+        max_parallel: int = None,
+        token_budget: int = None,
+    ) -> dict:
+        """
+        Run independent sub-tasks on several roles concurrently and merge them.
+
+        roles: explicit role names — each gets the whole goal from its own angle.
+               Otherwise the goal is split into independent sub-tasks and each
+               one is routed (locally) to a role.
+        Returns the run() shape plus "mode", "tokens_used" and "elapsed_s".
+        """
+        from agent.monitor import monitor
+
+        context = context or {}
+        max_parallel = max_parallel or self.MAX_PARALLEL
+        budget = token_budget or self.TOKEN_BUDGET
+        started = time.monotonic()
+
+        subtasks = await self._plan_subtasks(goal, roles)
+        # Reserve one share of the budget for the synthesis pass
+        per_task = max(self.MIN_SUBTASK_TOKENS, budget // (len(subtasks) + 1))
+        spent = {"tokens": 0}
+        semaphore = asyncio.Semaphore(max_parallel)
+        monitor_id = monitor.register_task("fan_out", goal[:60])
+
+        async def _one(index: int, role_name: str, text: str) -> dict:
+            async with semaphore:
+                remaining = budget - spent["tokens"]
+                if remaining < self.MIN_SUBTASK_TOKENS:
+                    monitor.append_output(monitor_id, f"[{role_name}] skipped — token budget spent")
+                    return {"step": text, "role": role_name, "error": "token budget exhausted", "success": False}
+                task = AgentTask(task=text, context={**context, "goal": goal, "subtask": index + 1})
+                try:
+                    result, used = await delegate_with_usage(
+                        task, self.orchestrator.roles[role_name], self.llm,
+                        max_tokens=min(per_task, remaining),
+                    )
+                    _check_answer(result)
+                except Exception as e:
+                    monitor.append_output(monitor_id, f"[{role_name}] failed: {e}")
+                    return {"step": text, "role": role_name, "error": str(e), "success": False}
+                spent["tokens"] += used
+                preview = result.strip().splitlines()[0][:120] if result.strip() else "(empty)"
+                monitor.append_output(monitor_id, f"[{role_name}] {preview}")
+                return {"step": text, "role": role_name, "result": result, "success": True}
+
+        results = await asyncio.gather(
+            *(_one(i, role_name, text) for i, (role_name, text) in enumerate(subtasks))
+        )
+        succeeded = [r for r in results if r["success"]]
+        status = "done" if succeeded else "error"
+
+        if not succeeded:
+            final = "Task could not be completed."
+        elif len(succeeded) == 1:
+            final = succeeded[0]["result"]
+        else:
+            monitor.append_output(monitor_id, f"Synthesizing {len(succeeded)} results")
+            try:
+                final = await self._synthesize(goal, succeeded, max(self.MIN_SUBTASK_TOKENS, budget - spent["tokens"]))
+                spent["tokens"] += estimate_tokens(final)
+            except Exception as e:
+                # Keep the specialists' work: hand back their results unmerged
+                monitor.append_output(monitor_id, f"Synthesis failed: {e}")
+                final = "\n\n".join(f"## {r['role']} — {r['step']}\n{r['result']}" for r in succeeded)
+                status = "error"
+
+        monitor.update_task(monitor_id, status)
+        return {
+            "steps": list(results),
+            "result": final,
+            "success": bool(succeeded),
+            "mode": "fanout",
+            "tokens_used": spent["tokens"],
+            "elapsed_s": round(time.monotonic() - started, 2),
+        }
+
     async def _plan_steps(self, goal: str) -> list:
         """Break goal into max 5 concrete steps using local LLM."""
         prompt = f"""Break this goal into at most 5 concrete steps. One step per line. No numbering or bullets.
@@ -54,3 +154,47 @@ Goal: {goal}"""
         response = await self.llm.complete(prompt, model_tier="local")
         steps = [s.strip() for s in response.strip().split("\n") if s.strip()]
         return steps[: self.MAX_STEPS]
+
+    async def _plan_subtasks(self, goal: str, roles: list = None) -> list:
+        """Return [(role_name, subtask_text)] — one entry per role, no duplicates."""
+        if roles:
+            known = [r for r in roles if r in self.orchestrator.roles]
+            return [(r, goal) for r in dict.fromkeys(known)][: self.MAX_STEPS]
+
+        prompt = f"""Split this goal into at most {self.MAX_STEPS} sub-tasks that can be done independently and in parallel (none may need another's output). One sub-task per line. No numbering or bullets.
+
+Goal: {goal}"""
+        response = await self.llm.complete(prompt, model_tier="local")
+        lines = [s.strip(" -*\t") for s in response.strip().split("\n") if s.strip(" -*\t")]
+
+        subtasks, seen = [], set()
+        for line in lines[: self.MAX_STEPS]:
+            role_name = await self.orchestrator.route(AgentTask(task=line))
+            if role_name in seen:
+                # Same specialist twice — fold into its existing sub-task
+                idx = next(i for i, (r, _) in enumerate(subtasks) if r == role_name)
+                subtasks[idx] = (role_name, f"{subtasks[idx][1]}\n{line}")
+                continue
+            seen.add(role_name)
+            subtasks.append((role_name, line))
+        return subtasks or [(await self.orchestrator.route(AgentTask(task=goal)), goal)]
+
+    async def _synthesize(self, goal: str, results: list, max_tokens: int) -> str:
+        """Single pass that merges specialist outputs into one answer."""
+        sections = "\n\n".join(f"## {r['role']} — {r['step']}\n{r['result']}" for r in results)
+        prompt = f"""Combine these specialist results into one coherent answer to the goal. Resolve overlaps and contradictions; keep it concise.
+
+Goal: {goal}
+
+{sections}"""
+        merged = await self.llm.complete(prompt, model_tier="local", max_tokens=max_tokens)
+        _check_answer(merged)
+        return merged
+
+
+def _check_answer(text: str) -> None:
+    """LLMManager reports a failed call as text, not an exception: turn it back into one."""
+    if is_llm_error(text):
+        raise RuntimeError(text.strip("[]"))
+    if not text.strip():
+        raise RuntimeError("empty answer")
@@ -13,7 +13,7 @@ from typing import Literal, Optional
 
 import aiosqlite
 
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 
 ApprovalStatus = Literal["pending", "approved", "denied", "expired", "executed"]
 ApprovalUrgency = Literal["urgent", "normal"]
@@ -59,7 +59,7 @@ class ApprovalManager:
         now = datetime.utcnow().isoformat() + "Z"
         tool_args = json.dumps(tool_arguments)
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             await db.execute(
                 """INSERT INTO approval_requests
@@ -81,14 +81,14 @@ class ApprovalManager:
         )
 
     async def get(self, request_id: str) -> Optional[ApprovalRequest]:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute("SELECT * FROM approval_requests WHERE id = ?", (request_id,))
             row = await cur.fetchone()
         return _row_to_request(dict(row)) if row else None
 
     async def find_by_prefix(self, prefix: str) -> Optional[ApprovalRequest]:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 "SELECT * FROM approval_requests WHERE id LIKE ? AND status = 'pending'",
@@ -99,7 +99,7 @@ class ApprovalManager:
 
     async def approve(self, request_id: str, decided_by: str) -> Optional[ApprovalRequest]:
         now = datetime.utcnow().isoformat() + "Z"
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             cur = await db.execute(
                 "UPDATE approval_requests SET status='approved', decided_at=?, decided_by=? WHERE id=? AND status='pending'",
                 (now, decided_by, request_id),
@@ -111,7 +111,7 @@ class ApprovalManager:
 
     async def deny(self, request_id: str, decided_by: str) -> Optional[ApprovalRequest]:
         now = datetime.utcnow().isoformat() + "Z"
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             cur = await db.execute(
                 "UPDATE approval_requests SET status='denied', decided_at=?, decided_by=? WHERE id=? AND status='pending'",
                 (now, decided_by, request_id),
@@ -123,7 +123,7 @@ class ApprovalManager:
 
     async def mark_executed(self, request_id: str, result: str) -> None:
         now = datetime.utcnow().isoformat() + "Z"
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 "UPDATE approval_requests SET status='executed', executed_at=?, execution_result=? WHERE id=?",
                 (now, result, request_id),
@@ -131,7 +131,7 @@ class ApprovalManager:
             await db.commit()
 
     async def get_pending(self) -> list[ApprovalRequest]:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 "SELECT * FROM approval_requests WHERE status='pending' ORDER BY created_at DESC"
@@ -157,7 +157,7 @@ class ApprovalManager:
         where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         values.append(limit)
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 f"SELECT * FROM approval_requests {where} ORDER BY created_at DESC LIMIT ?",
@@ -169,7 +169,7 @@ class ApprovalManager:
     async def expire_old(self, max_age_seconds: int = 3600) -> int:
         from datetime import timedelta
         cutoff = (datetime.utcnow() - timedelta(seconds=max_age_seconds)).isoformat() + "Z"
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             cur = await db.execute(
                 "UPDATE approval_requests SET status='expired' WHERE status='pending' AND created_at < ?",
                 (cutoff,),
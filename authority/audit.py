@@ -11,7 +11,7 @@ from typing import Literal, Optional
 
 import aiosqlite
 
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 
 AuthorityDecisionType = Literal["allowed", "denied", "approval_required"]
 
@@ -61,7 +61,7 @@ class AuditTrail:
         entry_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat() + "Z"
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 """INSERT INTO audit_log
                    (id, agent_id, agent_name, tool_name, action_category,
@@ -104,7 +104,7 @@ class AuditTrail:
         where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         values.append(limit)
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 f"SELECT * FROM audit_log {where} ORDER BY created_at DESC LIMIT ?",
@@ -116,7 +116,7 @@ class AuditTrail:
     async def get_stats(self, since: str = "") -> dict:
         where = f"WHERE created_at >= '{since}'" if since else ""
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
 
             cur = await db.execute(
@@ -0,0 +1,10 @@
+"""
+Offline benchmarks for Sam. Run each module with `python -m benchmarks.<name>`:
+
+  screen_stream  — bytes and CPU per frame, legacy vs delta screen stream
+  daemon_load    — daemon latency, throughput and memory under concurrent load,
+                   against fake LLM providers (fake_llm) and a throwaway vault
+  fake_llm       — the fake Ollama / OpenAI-compatible servers on their own
+
+load.py holds the shared load driver, percentiles and baseline comparison.
+"""
@@ -0,0 +1,372 @@
+"""
+Daemon load benchmark — latency, throughput and memory of the FastAPI daemon.
+
+Starts the fake LLM providers (benchmarks/fake_llm.py) and the daemon
+(uvicorn daemon.main:app) as subprocesses against a throwaway vault, seeds
+it, then drives each scenario with concurrent requests:
+
+  chat          POST /api/chat, timed until the reply's chat_message arrives on /ws
+  chat_stream   POST /api/chat/stream, total time plus time to first frame (ttft)
+  ws_fanout     POST /api/chat with --ws-clients sockets open, timed until every
+                socket has the broadcast (delivery = per-socket time)
+  vault_search  GET /api/vault/search over seeded entities and facts
+  workflow      POST /api/workflows/{id}/run of a log → condition → notify workflow
+
+Reports p50/p95/p99 latency, requests per second and the daemon's resident
+memory per scenario, and compares them with the stored baseline
+(benchmarks/baselines/daemon_load.json). Baselines are machine-specific:
+record one with --save-baseline on the box that will run the comparison.
+
+Usage:
+    python -m benchmarks.daemon_load
+    python -m benchmarks.daemon_load --scenarios chat_stream,vault_search --concurrency 32 --requests 500
+    python -m benchmarks.daemon_load --provider openai --latency-ms 400 --tokens-per-s 30
+    python -m benchmarks.daemon_load --save-baseline
+    python -m benchmarks.daemon_load --check      # exit 1 on a regression beyond --tolerance
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import aiohttp
+
+from benchmarks.fake_llm import FakeLLMConfig
+from benchmarks.load import Samples, compare, load_baseline, process_memory_mb, run_load, save_baseline, summarize
+
+SCENARIOS = ("chat", "chat_stream", "ws_fanout", "vault_search", "workflow")
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "daemon_load.json"
+STARTUP_TIMEOUT_S = 90
+REPLY_TIMEOUT_S = 60
+
+# Cleared in the daemon's environment so nothing reaches a real service
+_REAL_SERVICE_ENV = ("ANTHROPIC_API_KEY", "GROQ_API_KEY", "GEMINI_API_KEY", "OPENROUTER_API_KEY",
+                     "TELEGRAM_BOT_TOKEN", "DISCORD_BOT_TOKEN")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_for_port(port: int, proc: subprocess.Popen, timeout_s: float) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{proc.args[2]} exited with {proc.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"nothing listening on port {port} after {timeout_s}s")
+
+
+def _seed_vault(db_path: Path, entities: int) -> list[str]:
+    """Insert entities with a few facts each; returns search terms that hit them."""
+    rng = random.Random(7)
+    kinds = ("person", "project", "company", "place")
+    terms = [f"{word}{n}" for word in ("alpha", "bravo", "delta", "kilo") for n in range(10)]
+    conn = sqlite3.connect(str(db_path))
+    try:
+        for i in range(entities):
+            term = terms[i % len(terms)]
+            cur = conn.execute(
+                "INSERT INTO entities (name, type, description) VALUES (?, ?, ?)",
+                (f"{term} entity {i}", rng.choice(kinds), f"seeded for the load benchmark ({term})"),
+            )
+            conn.executemany(
+                "INSERT INTO facts (entity_id, fact, source) VALUES (?, ?, 'benchmark')",
+                [(cur.lastrowid, f"fact {j} about {term}") for j in range(3)],
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    return terms
+
+
+class _ChatListener:
+    """One /ws client that resolves waiters when a matching chat_message arrives."""
+
+    def __init__(self) -> None:
+        self.waiters: dict[tuple, asyncio.Future] = {}
+        self._task = None
+
+    async def start(self, session: aiohttp.ClientSession, url: str) -> None:
+        ws = await session.ws_connect(url)
+        await ws.send_str(json.dumps({"action": "subscribe", "topics": ["chat_message"]}))
+        self._task = asyncio.create_task(self._read(ws))
+
+    async def _read(self, ws) -> None:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            event = json.loads(msg.data)
+            if event.get("type") != "chat_message":
+                continue
+            payload = event.get("payload", {})
+            fut = self.waiters.pop((payload.get("role"), payload.get("session_id")), None)
+            if fut is not None and not fut.done():
+                fut.set_result(payload)
+
+    def expect(self, role: str, session_id: str) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters[(role, session_id)] = fut
+        return fut
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+
+class DaemonBench:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.tmp = Path(tempfile.mkdtemp(prefix="sam-bench-"))
+        self.db_path = self.tmp / "sam.db"
+        self.port = _free_port()
+        self.base = f"http://127.0.0.1:{self.port}"
+        self.procs: list[subprocess.Popen] = []
+        self.terms: list[str] = []
+        self.workflow_id = ""
+        self._cleanup: list = []
+
+    # ── Processes ─────────────────────────────────────────────────────────────
+
+    def _spawn(self, args: list[str], env: dict) -> subprocess.Popen:
+        with open(self.tmp / f"{args[1].split('.')[-1]}.log", "wb") as log:
+            proc = subprocess.Popen([sys.executable, *args], cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.procs.append(proc)
+        return proc
+
+    async def start(self) -> None:
+        a = self.args
+        ollama_port, openai_port = _free_port(), _free_port()
+        fake = self._spawn(["-m", "benchmarks.fake_llm", "--ollama-port", str(ollama_port),
+                            "--openai-port", str(openai_port), "--latency-ms", str(a.latency_ms),
+                            "--tokens-per-s", str(a.tokens_per_s), "--tokens", str(a.tokens)], dict(os.environ))
+        await _wait_for_port(openai_port, fake, 15)
+
+        env = dict(os.environ)
+        env.update({name: "" for name in _REAL_SERVICE_ENV})
+        env.update({
+            "SAM_DB_PATH": str(self.db_path),
+            "OPENAI_API_KEY": "benchmark",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+            # With --provider openai, Ollama looks down and everything routes to the cloud path
+            "OLLAMA_BASE_URL": f"http://127.0.0.1:{ollama_port if a.provider == 'local' else _free_port()}",
+        })
+        self.daemon = self._spawn(["-m", "uvicorn", "daemon.main:app", "--host", "127.0.0.1",
+                                   "--port", str(self.port), "--log-level", "warning"], env)
+        await _wait_for_port(self.port, self.daemon, STARTUP_TIMEOUT_S)
+        self.terms = _seed_vault(self.db_path, a.entities)
+
+    def stop(self) -> None:
+        for proc in reversed(self.procs):
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if self.args.keep_tmp:
+            print(f"vault and process logs kept in {self.tmp}")
+        else:
+            shutil.rmtree(self.tmp, ignore_errors=True)
+
+    # ── Scenarios ─────────────────────────────────────────────────────────────
+
+    async def chat(self, session: aiohttp.ClientSession, listener: _ChatListener):
+        async def call(i: int, samples: Samples) -> None:
+            session_id = f"bench-{uuid.uuid4().hex[:8]}"
+            reply = listener.expect("assistant", session_id)
+            async with session.post(f"{self.base}/api/chat",
+                                    json={"message": f"benchmark message {i}", "session_id": session_id}) as r:
+                r.raise_for_status()
+            await asyncio.wait_for(reply, REPLY_TIMEOUT_S)
+        return call
+
+    async def chat_stream(self, session: aiohttp.ClientSession, listener: _ChatListener):
+        async def call(i: int, samples: Samples) -> None:
+            start = time.perf_counter()
+            first = None
+            async with session.post(f"{self.base}/api/chat/stream",
+                                    json={"message": f"benchmark stream {i}", "model_tier": self.args.provider}) as r:
+                r.raise_for_status()
+                async for line in r.content:
+                    if line.startswith(b"data: {\"chunk\"") and first is None:
+                        first = time.perf_counter()
+                        samples.add("ttft", (first - start) * 1000)
+                    elif line.startswith(b"data: {\"error\""):
+                        raise RuntimeError(line[6:].decode().strip())
+            if first is None:
+                raise RuntimeError("stream ended without a chunk")
+        return call
+
+    async def ws_fanout(self, session: aiohttp.ClientSession, listener: _ChatListener):
+        clients = [_ChatListener() for _ in range(self.args.ws_clients)]
+        for client in clients:
+            await client.start(session, self.base.replace("http", "ws") + "/ws")
+        self._cleanup.extend(client.stop for client in clients)
+
+        async def call(i: int, samples: Samples) -> None:
+            session_id = f"fanout-{uuid.uuid4().hex[:8]}"
+            waits = [client.expect("user", session_id) for client in clients]
+            start = time.perf_counter()
+            async with session.post(f"{self.base}/api/chat",
+                                    json={"message": f"fanout {i}", "session_id": session_id}) as r:
+                r.raise_for_status()
+            for fut in asyncio.as_completed(waits, timeout=REPLY_TIMEOUT_S):
+                await fut
+                samples.add("delivery", (time.perf_counter() - start) * 1000)
+        return call
+
+    async def vault_search(self, session: aiohttp.ClientSession, listener: _ChatListener):
+        async def call(i: int, samples: Samples) -> None:
+            term = self.terms[i % len(self.terms)]
+            async with session.get(f"{self.base}/api/vault/search", params={"q": term, "limit": "20"}) as r:
+                r.raise_for_status()
+                await r.read()
+        return call
+
+    async def workflow(self, session: aiohttp.ClientSession, listener: _ChatListener):
+        if not self.workflow_id:
+            definition = {
+                "nodes": [
+                    {"id": "start", "type": "action.log", "config": {"message": "benchmark run"}},
+                    {"id": "check", "type": "logic.condition", "inputs": {"n": "trigger.n"},
+                     "config": {"expression": "n >= 0"}},
+                    {"id": "done", "type": "action.notify", "config": {"message": "run {{ n }}"},
+                     "inputs": {"n": "trigger.n"}},
+                ],
+                "edges": [{"source": "start", "target": "check"}, {"source": "check", "target": "done"}],
+            }
+            async with session.post(f"{self.base}/api/workflows",
+                                    json={"name": "load benchmark", "nodes": definition}) as r:
+                r.raise_for_status()
+                self.workflow_id = (await r.json())["id"]
+
+        async def call(i: int, samples: Samples) -> None:
+            async with session.post(f"{self.base}/api/workflows/{self.workflow_id}/run",
+                                    json={"inputs": {"n": i}}) as r:
+                r.raise_for_status()
+                result = await r.json()
+            if result["status"] != "completed":
+                raise RuntimeError(f"workflow {result['status']}: {result.get('error')}")
+        return call
+
+    async def run(self) -> dict:
+        results = {}
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency + self.args.ws_clients + 4)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            listener = _ChatListener()
+            await listener.start(session, self.base.replace("http", "ws") + "/ws")
+            for name in self.args.scenarios:
+                self._cleanup = []
+                call = await getattr(self, name)(session, listener)
+                # A short warm-up so imports and connection setup aren't timed
+                await run_load(call, min(5, self.args.requests), min(5, self.args.concurrency))
+                samples, wall_s = await run_load(call, self.args.requests, self.args.concurrency)
+                for cleanup in self._cleanup:
+                    cleanup()
+                results[name] = {**summarize(samples, wall_s), **process_memory_mb(self.daemon.pid)}
+                if not self.args.json:
+                    _print_row(name, results[name])
+                if samples.errors:
+                    print(f"  {samples.errors} errors, last: {samples.last_error}")
+            listener.stop()
+        return results
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+
+_COLUMNS = (("requests", "req"), ("errors", "err"), ("rps", "rps"), ("p50_ms", "p50 ms"),
+            ("p95_ms", "p95 ms"), ("p99_ms", "p99 ms"), ("rss_mb", "rss MB"))
+
+
+def _print_header() -> None:
+    print(f"{'scenario':14}" + "".join(f"{label:>10}" for _, label in _COLUMNS))
+
+
+def _print_row(name: str, summary: dict) -> None:
+    print(f"{name:14}" + "".join(f"{summary.get(key, '-'):>10}" for key, _ in _COLUMNS))
+    extra = {k: v for k, v in summary.items() if k.endswith("_ms") and "_p" in k}
+    if extra:
+        print(f"{'':14}" + "  ".join(f"{k} {v}" for k, v in extra.items()))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ws-clients", type=int, default=50, help="sockets open during ws_fanout")
+    parser.add_argument("--entities", type=int, default=2000, help="vault entities seeded for vault_search")
+    parser.add_argument("--provider", choices=("local", "openai"), default="local",
+                        help="fake provider the daemon talks to: Ollama API or OpenAI API")
+    parser.add_argument("--latency-ms", type=float, default=FakeLLMConfig.latency_ms)
+    parser.add_argument("--tokens-per-s", type=float, default=FakeLLMConfig.tokens_per_s)
+    parser.add_argument("--tokens", type=int, default=FakeLLMConfig.tokens)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any metric regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--keep-tmp", action="store_true", help="keep the vault and process logs")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    bench = DaemonBench(args)
+
+    async def run():
+        await bench.start()
+        return await bench.run()
+
+    if not args.json:
+        _print_header()
+    try:
+        results = asyncio.run(run())
+    finally:
+        bench.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.tolerance)
+    if not baseline:
+        print(f"no baseline at {args.baseline} (record one with --save-baseline)")
+    elif regressions:
+        print(f"regressions beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+    else:
+        print(f"no regressions against {args.baseline}")
+    if args.save_baseline:
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"baseline saved to {args.baseline}")
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
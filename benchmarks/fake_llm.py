@@ -0,0 +1,176 @@
+"""
+Fake LLM providers for offline daemon benchmarks.
+
+Serves the two HTTP APIs Sam's LLM clients speak, with scripted timing
+instead of a model:
+
+  Ollama:  GET /api/tags, POST /api/chat         (NDJSON lines when "stream": true)
+  OpenAI:  GET /v1/models, POST /v1/chat/completions  (SSE when "stream": true)
+
+Every reply waits `latency_ms` (time to first token), then produces `tokens`
+tokens at `tokens_per_s`. Non-streaming replies arrive once the last token
+would have, and carry a chat intent as JSON text so the daemon's JSON-parsing
+paths (llm.get_ai_response) accept them.
+
+Point the daemon at it with OLLAMA_BASE_URL=http://127.0.0.1:<ollama-port>
+and OPENAI_BASE_URL=http://127.0.0.1:<openai-port>/v1.
+
+Usage:
+    python -m benchmarks.fake_llm --ollama-port 11435 --openai-port 8089
+    python -m benchmarks.fake_llm --latency-ms 400 --tokens-per-s 30 --tokens 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+
+from aiohttp import web
+
+_WORDS = ("sure", "here", "is", "what", "I", "found", "about", "that", "and", "the",
+          "details", "you", "asked", "for", "in", "short", "form")
+
+
+@dataclass
+class FakeLLMConfig:
+    latency_ms: float = 150.0
+    tokens_per_s: float = 60.0
+    tokens: int = 64
+    model: str = "llama3.2"
+
+
+def tokens(cfg: FakeLLMConfig) -> list[str]:
+    return [("" if i == 0 else " ") + _WORDS[i % len(_WORDS)] for i in range(cfg.tokens)]
+
+
+def reply_text(cfg: FakeLLMConfig) -> str:
+    return json.dumps({"intent": "chat", "parameters": {}, "needs_clarification": False,
+                       "text": "".join(tokens(cfg)).strip(), "memory_update": None})
+
+
+async def _paced(cfg: FakeLLMConfig):
+    await asyncio.sleep(cfg.latency_ms / 1000)
+    interval = 1 / cfg.tokens_per_s if cfg.tokens_per_s > 0 else 0.0
+    start = time.monotonic()
+    for i, token in enumerate(tokens(cfg)):
+        # Pace against the start time so sleep overshoot doesn't accumulate
+        delay = start + i * interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield token
+
+
+async def _generation_time(cfg: FakeLLMConfig) -> None:
+    generate_s = cfg.tokens / cfg.tokens_per_s if cfg.tokens_per_s > 0 else 0.0
+    await asyncio.sleep(cfg.latency_ms / 1000 + generate_s)
+
+
+def _prompt_tokens(body: dict) -> int:
+    return sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+
+
+# ── Ollama ────────────────────────────────────────────────────────────────────
+
+def ollama_app(cfg: FakeLLMConfig) -> web.Application:
+    async def tags(request: web.Request) -> web.Response:
+        return web.json_response({"models": [{"name": f"{cfg.model}:latest"}]})
+
+    async def chat(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        if not body.get("stream", True):     # Ollama streams unless told not to
+            await _generation_time(cfg)
+            return web.json_response({
+                "model": cfg.model, "done": True,
+                "message": {"role": "assistant", "content": reply_text(cfg)},
+                "prompt_eval_count": _prompt_tokens(body), "eval_count": cfg.tokens,
+            })
+        resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await resp.prepare(request)
+        async for token in _paced(cfg):
+            line = {"model": cfg.model, "done": False, "message": {"role": "assistant", "content": token}}
+            await resp.write(json.dumps(line).encode() + b"\n")
+        final = {"model": cfg.model, "done": True, "message": {"role": "assistant", "content": ""},
+                 "prompt_eval_count": _prompt_tokens(body), "eval_count": cfg.tokens}
+        await resp.write(json.dumps(final).encode() + b"\n")
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/api/tags", tags)
+    app.router.add_post("/api/chat", chat)
+    return app
+
+
+# ── OpenAI-compatible ─────────────────────────────────────────────────────────
+
+def openai_app(cfg: FakeLLMConfig) -> web.Application:
+    async def models(request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": cfg.model, "object": "model"}]})
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", cfg.model)
+        if not body.get("stream"):
+            await _generation_time(cfg)
+            return web.json_response({
+                "object": "chat.completion", "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": reply_text(cfg)}}],
+                "usage": {"prompt_tokens": _prompt_tokens(body), "completion_tokens": cfg.tokens},
+            })
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await resp.prepare(request)
+        async for token in _paced(cfg):
+            event = {"object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": token}}]}
+            await resp.write(f"data: {json.dumps(event)}\n\n".encode())
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/v1/models", models)
+    app.router.add_post("/v1/chat/completions", completions)
+    return app
+
+
+async def serve(cfg: FakeLLMConfig, ollama_port: int, openai_port: int, host: str = "127.0.0.1") -> list:
+    runners = []
+    for app, port in ((ollama_app(cfg), ollama_port), (openai_app(cfg), openai_port)):
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        runners.append(runner)
+    return runners
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ollama-port", type=int, default=11435)
+    parser.add_argument("--openai-port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=FakeLLMConfig.latency_ms, help="time to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=FakeLLMConfig.tokens_per_s)
+    parser.add_argument("--tokens", type=int, default=FakeLLMConfig.tokens, help="tokens per reply")
+    args = parser.parse_args(argv)
+    cfg = FakeLLMConfig(args.latency_ms, args.tokens_per_s, args.tokens)
+
+    async def run():
+        runners = await serve(cfg, args.ollama_port, args.openai_port, args.host)
+        print(f"fake ollama on http://{args.host}:{args.ollama_port}  "
+              f"fake openai on http://{args.host}:{args.openai_port}/v1", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Load driver, latency statistics and baseline comparison for the benchmarks.
+
+run_load() calls a scenario coroutine `requests` times with at most
+`concurrency` calls in flight. Each call's wall time is recorded as its
+"latency"; a scenario can record further metrics (time to first token,
+per-client delivery time, …) through the Samples it is handed. summarize()
+turns the samples into p50/p95/p99 per metric plus requests per second.
+
+Baselines are JSON files of {scenario: summary}. compare() flags a metric
+that got worse than the baseline by more than `tolerance` (relative):
+latencies and memory going up, requests per second going down.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class Samples:
+    def __init__(self) -> None:
+        self.values: Dict[str, List[float]] = defaultdict(list)
+        self.errors = 0
+        self.last_error = ""
+
+    def add(self, metric: str, ms: float) -> None:
+        self.values[metric].append(ms)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """q-th percentile (0-100) with linear interpolation; values need not be sorted."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lo, hi = math.floor(rank), math.ceil(rank)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+async def run_load(
+    call: Callable[[int, Samples], Awaitable[None]],
+    requests: int,
+    concurrency: int,
+) -> Tuple[Samples, float]:
+    """Run call(i, samples) for i in range(requests); returns the samples and wall seconds."""
+    samples = Samples()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                await call(i, samples)
+            except Exception as e:
+                samples.errors += 1
+                samples.last_error = f"{type(e).__name__}: {e}"
+                continue
+            samples.add("latency", (time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, requests)))))
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples: Samples, wall_s: float) -> dict:
+    completed = len(samples.values.get("latency", ()))
+    out = {
+        "requests": completed + samples.errors,
+        "errors": samples.errors,
+        "rps": round(completed / wall_s, 2) if wall_s > 0 else 0.0,
+    }
+    for metric, values in samples.values.items():
+        prefix = "" if metric == "latency" else f"{metric}_"
+        for q in (50, 95, 99):
+            out[f"{prefix}p{q}_ms"] = round(percentile(values, q), 2)
+    return out
+
+
+def process_memory_mb(pid: Optional[int] = None) -> Dict[str, float]:
+    """Current and peak resident set size of a process, from /proc (Linux only)."""
+    path = Path(f"/proc/{pid or os.getpid()}/status")
+    out = {}
+    try:
+        for line in path.read_text().splitlines():
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                out["rss_mb" if key == "VmRSS" else "peak_rss_mb"] = round(int(value.split()[0]) / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return out
+
+
+# ── Baselines ─────────────────────────────────────────────────────────────────
+
+def load_baseline(path: Path) -> dict:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path: Path, results: dict) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def _worse_when_higher(key: str) -> Optional[bool]:
+    if key == "rps":
+        return False
+    if key.endswith("_ms") or key.endswith("_mb") or key == "errors":
+        return True
+    return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.2, min_abs_ms: float = 2.0) -> List[str]:
+    """Regressions of `results` against `baseline`, one line each."""
+    regressions = []
+    for scenario, summary in results.items():
+        base = baseline.get(scenario)
+        if not base:
+            continue
+        for key, value in summary.items():
+            higher_is_worse = _worse_when_higher(key)
+            if higher_is_worse is None or key not in base:
+                continue
+            old = base[key]
+            delta = value - old if higher_is_worse else old - value
+            if key.endswith("_ms") and delta < min_abs_ms:
+                continue        # sub-millisecond jitter on fast paths isn't a regression
+            if delta > 0 and (old == 0 or delta / old > tolerance):
+                change = f"{(value - old) / old:+.0%}" if old else "new"
+                regressions.append(f"{scenario}.{key}: {old} → {value} ({change})")
+    return regressions
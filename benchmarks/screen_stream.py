@@ -0,0 +1,122 @@
+"""
+Screen streaming benchmark — bytes and CPU per frame, legacy vs delta stream.
+
+Legacy:  full PNG per frame, base64 inside a JSON "screen_view" message
+         (what show_screen_from_capture broadcasts).
+Stream:  actions/tools/screen_stream.py — keyframe, then changed tiles only,
+         as binary frames.
+
+The default workload is synthetic so it runs headless: a grainy wallpaper
+with a window whose text changes one line per frame and a moving cursor.
+--capture uses the real screen via mss instead.
+
+Usage:
+    python -m benchmarks.screen_stream
+    python -m benchmarks.screen_stream --frames 120 --codec webp --quality 50
+    python -m benchmarks.screen_stream --capture --frames 30
+"""
+
+import argparse
+import base64
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from PIL import Image
+
+from actions.tools.screen_stream import PreparedFrame, capture_screen
+
+
+def synthetic_frames(count: int, width: int = 1280, height: int = 800):
+    rng = np.random.default_rng(7)
+    # Wallpaper: smooth gradient plus fine grain, like a photo background.
+    base = np.zeros((height, width, 3), dtype=np.uint8)
+    base[:] = np.linspace(40, 90, width, dtype=np.uint8)[None, :, None]
+    base += rng.integers(0, 12, size=base.shape, dtype=np.uint8)
+    base[100:700, 200:1100] = 245                                   # window
+    base[100:130, 200:1100] = (60, 90, 160)                         # title bar
+    text = rng.integers(0, 2, size=(600 // 20, 900 // 8), dtype=np.uint8)
+    for n in range(count):
+        frame = base.copy()
+        line = n % text.shape[0]
+        text[line] = rng.integers(0, 2, size=text.shape[1])          # one line of "typing"
+        glyphs = np.kron(text, np.ones((20, 8), dtype=np.uint8)) * 200
+        frame[130:130 + glyphs.shape[0], 200:200 + glyphs.shape[1]] -= glyphs[:, :, None]
+        cx, cy = 300 + (n * 7) % 700, 400 + (n * 3) % 200              # cursor
+        frame[cy:cy + 16, cx:cx + 10] = 0
+        yield frame
+
+
+def legacy_message(rgb) -> str:
+    buf = io.BytesIO()
+    Image.fromarray(rgb).save(buf, "PNG", compress_level=6)
+    return json.dumps({"type": "screen_view", "payload": {
+        "viewId": "sam-screen-view", "imageBase64": base64.b64encode(buf.getvalue()).decode(),
+        "active": True, "label": "Desktop"}})
+
+
+def run(frames, codec: str, quality: int, tile: int, keyframe_every: int) -> dict:
+    legacy_bytes = legacy_cpu = stream_bytes = stream_cpu = 0.0
+    keyframes = 0
+    base = None
+    n = 0
+    for n, rgb in enumerate(frames, 1):
+        t = time.process_time()
+        legacy_bytes += len(legacy_message(rgb))
+        legacy_cpu += time.process_time() - t
+
+        t = time.process_time()
+        frame = PreparedFrame(rgb, tile, quality, codec)
+        changed = frame.changed_tiles(base)
+        keyframe = base is None or (keyframe_every and n % keyframe_every == 0) or len(changed) > len(frame.hashes) / 2
+        if keyframe or changed:
+            stream_bytes += len(frame.packet(n, None if keyframe else changed))
+        keyframes += bool(keyframe)
+        base = frame.hashes
+        stream_cpu += time.process_time() - t
+    n = max(n, 1)
+    return {
+        "frames": n,
+        "keyframes": keyframes,
+        "legacy_bytes_per_frame": int(legacy_bytes / n),
+        "legacy_cpu_ms_per_frame": round(legacy_cpu * 1000 / n, 2),
+        "stream_bytes_per_frame": int(stream_bytes / n),
+        "stream_cpu_ms_per_frame": round(stream_cpu * 1000 / n, 2),
+        "bytes_ratio": round(stream_bytes / legacy_bytes, 4) if legacy_bytes else None,
+        "cpu_ratio": round(stream_cpu / legacy_cpu, 4) if legacy_cpu else None,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--codec", choices=["jpeg", "webp"], default="jpeg")
+    parser.add_argument("--quality", type=int, default=60)
+    parser.add_argument("--tile", type=int, default=64)
+    parser.add_argument("--keyframe-every", type=int, default=80, help="frames between forced keyframes (8 fps x 10 s)")
+    parser.add_argument("--capture", action="store_true", help="use the real screen (needs mss)")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    if args.capture:
+        frames = (capture_screen(1280) for _ in range(args.frames))
+    else:
+        frames = synthetic_frames(args.frames)
+    result = run(frames, args.codec, args.quality, args.tile, args.keyframe_every)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"frames: {result['frames']}  keyframes: {result['keyframes']}  codec: {args.codec} q{args.quality}")
+    print(f"{'':10}{'bytes/frame':>14}{'cpu ms/frame':>14}")
+    print(f"{'legacy':10}{result['legacy_bytes_per_frame']:>14,}{result['legacy_cpu_ms_per_frame']:>14}")
+    print(f"{'stream':10}{result['stream_bytes_per_frame']:>14,}{result['stream_cpu_ms_per_frame']:>14}")
+    print(f"stream/legacy: bytes {result['bytes_ratio']:.1%}  cpu {result['cpu_ratio']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
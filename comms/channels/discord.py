@@ -28,6 +28,7 @@ logger = logging.getLogger("sam.comms.discord")
 
 class DiscordAdapter:
     name = "discord"
+    supports_edits = True
 
     def __init__(
         self,
@@ -52,18 +53,30 @@ class DiscordAdapter:
         return self._connected
 
     async def send_message(self, channel_id: str | int, text: str) -> None:
-        if not self._client:
-            raise RuntimeError("Discord not connected.")
         try:
-            import discord
-            channel = await self._client.fetch_channel(int(channel_id))
-            if not channel or not hasattr(channel, "send"):
-                raise ValueError(f"Not a text channel: {channel_id}")
             for chunk in split_text(text, 2000):
-                await channel.send(chunk)
+                await self.send_chunk(channel_id, chunk)
         except Exception as e:
             logger.error(f"[Discord] send_message error: {e}")
 
+    async def _channel(self, channel_id: str | int):
+        if not self._client:
+            raise RuntimeError("Discord not connected.")
+        channel = self._client.get_channel(int(channel_id)) or await self._client.fetch_channel(int(channel_id))
+        if not channel or not hasattr(channel, "send"):
+            raise ValueError(f"Not a text channel: {channel_id}")
+        return channel
+
+    async def send_chunk(self, channel_id: str | int, text: str) -> int:
+        """Send one message of at most 2000 characters; returns its message id."""
+        channel = await self._channel(channel_id)
+        sent = await channel.send(text)
+        return sent.id
+
+    async def edit_message(self, channel_id: str | int, message_id: int, text: str) -> None:
+        channel = await self._channel(channel_id)
+        await channel.get_partial_message(int(message_id)).edit(content=text)
+
     async def connect(self) -> None:
         try:
             import discord
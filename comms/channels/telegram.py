@@ -27,6 +27,7 @@ logger = logging.getLogger("sam.comms.telegram")
 
 class TelegramAdapter:
     name = "telegram"
+    supports_edits = True
 
     def __init__(
         self,
@@ -48,22 +49,34 @@ class TelegramAdapter:
         return self._connected
 
     async def send_message(self, chat_id: str | int, text: str) -> None:
+        for chunk in split_text(text, 4096):
+            try:
+                await self.send_chunk(chat_id, chunk)
+            except Exception as e:
+                logger.error(f"[Telegram] send_message error: {e}")
+
+    async def send_chunk(self, chat_id: str | int, text: str) -> int:
+        """Send one message of at most 4096 characters; returns its message id."""
         if not self._app:
             raise RuntimeError("Telegram not connected.")
         bot = self._app.bot
-        for chunk in split_text(text, 4096):
-            try:
-                await bot.send_message(
-                    chat_id=int(chat_id),
-                    text=chunk,
-                    parse_mode="Markdown",
-                )
-            except Exception:
-                # Retry without markdown if parse fails
-                try:
-                    await bot.send_message(chat_id=int(chat_id), text=chunk)
-                except Exception as e:
-                    logger.error(f"[Telegram] send_message error: {e}")
+        try:
+            sent = await bot.send_message(chat_id=int(chat_id), text=text, parse_mode="Markdown")
+        except Exception:
+            # Retry without markdown if parse fails
+            sent = await bot.send_message(chat_id=int(chat_id), text=text)
+        return sent.message_id
+
+    async def edit_message(self, chat_id: str | int, message_id: int, text: str) -> None:
+        if not self._app:
+            raise RuntimeError("Telegram not connected.")
+        bot = self._app.bot
+        try:
+            await bot.edit_message_text(chat_id=int(chat_id), message_id=message_id,
+                                        text=text, parse_mode="Markdown")
+        except Exception:
+            # A half-streamed reply often has unbalanced markdown
+            await bot.edit_message_text(chat_id=int(chat_id), message_id=message_id, text=text)
 
     async def connect(self) -> None:
         try:
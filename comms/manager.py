@@ -2,9 +2,14 @@
 Channel Manager — starts/stops all enabled comms channels and routes messages
 through Sam's ai_loop via the same queue used by the REST API.
 
+Each queued message carries a reply_to {channel, chat_id}; the session worker
+that answers it hands its replies back to deliver(), which queues them on
+that channel's Outbox (comms/outbox.py) for rate-limited, batched sending.
+
 Wire up at daemon startup:
     from comms.manager import ChannelManager
     mgr = ChannelManager(chat_input_queue)
+    get_session_manager().set_reply_router(mgr.deliver)
     await mgr.start()
     # on shutdown:
     await mgr.stop()
@@ -14,21 +19,27 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
-from typing import Optional
+import time
+import uuid
+from dataclasses import replace
+from typing import AsyncIterator, Optional
 
 from comms.channels.base import ChannelMessage
+from comms.outbox import DEFAULT_BATCH_MS, DEFAULT_EDIT_INTERVAL_MS, PLATFORM_LIMITS, Outbox
 
 logger = logging.getLogger("sam.comms.manager")
 
 
 class ChannelManager:
-    def __init__(self, chat_queue: asyncio.Queue) -> None:
+    def __init__(self, chat_queue) -> None:
         """
-        chat_queue: the same asyncio.Queue that api_routes.chat_input_queue uses.
-        Messages pushed here are picked up by the ai_loop bridge.
+        chat_queue: api_routes.chat_input_queue (a daemon/broker.py queue), or
+        anything with an async put(). Messages pushed here are picked up by the
+        session bridge in daemon/main.py.
         """
         self._queue = chat_queue
         self._adapters: list = []
+        self._outboxes: dict[str, Outbox] = {}
         self._tasks: list[asyncio.Task] = []
 
     async def start(self) -> None:
@@ -41,6 +52,8 @@ class ChannelManager:
         logger.info(f"[ChannelManager] {len(self._adapters)} channel(s) active.")
 
     async def stop(self) -> None:
+        for outbox in self._outboxes.values():
+            await outbox.close()
         for adapter in self._adapters:
             try:
                 await adapter.disconnect()
@@ -54,29 +67,53 @@ class ChannelManager:
                 except asyncio.CancelledError:
                     pass
         self._adapters.clear()
+        self._outboxes.clear()
         self._tasks.clear()
         logger.info("[ChannelManager] All channels stopped.")
 
+    async def deliver(self, reply_to: dict, text: str) -> bool:
+        """Queue a reply to the chat a message came from. False if that channel isn't connected."""
+        outbox = self._outboxes.get(reply_to.get("channel", ""))
+        if outbox is None or reply_to.get("chat_id") is None:
+            return False
+        outbox.put(reply_to["chat_id"], text)
+        return True
+
+    async def stream_reply(self, reply_to: dict, chunks: AsyncIterator[str]) -> str:
+        """Send a reply while it is generated, editing it in place where the platform allows."""
+        outbox = self._outboxes.get(reply_to.get("channel", ""))
+        if outbox is None:
+            return "".join([piece async for piece in chunks])
+        return await outbox.stream(reply_to["chat_id"], chunks)
+
+    def stats(self) -> dict:
+        return {name: outbox.stats() for name, outbox in self._outboxes.items()}
+
     # ── Private helpers ───────────────────────────────────────────────────────
 
     async def _message_handler(self, msg: ChannelMessage) -> str:
         """
         Receive a message from any channel, push to ai_loop queue.
-        The queue item format matches api_routes.post_chat's enqueue format.
+        The queue item format matches api_routes.post_chat's enqueue format,
+        plus reply_to so the session worker's answer finds its way back here.
         """
-        import uuid
-        message_id = str(uuid.uuid4())
         await self._queue.put({
-            "message_id": message_id,
+            "message_id": str(uuid.uuid4()),
             "session_id": f"{msg.channel}:{msg.from_}",
             "message": msg.text,
-            # Reply callback — ai_loop response is broadcast via WS; channel adapter
-            # gets the reply via the return value of the handler. For now we return ""
-            # and rely on the WS broadcast reaching the dashboard. A future enhancement
-            # can hook into the response pipeline to auto-reply on Telegram/Discord.
+            "source": msg.channel,
+            "queued_at": time.monotonic(),
+            "reply_to": {
+                "channel": msg.channel,
+                "chat_id": msg.metadata.get("chatId") or msg.metadata.get("channelId"),
+            },
         })
         logger.info(f"[ChannelManager] [{msg.channel}] {msg.from_}: {msg.text[:60]}")
-        return ""  # response will come via WS; direct reply not wired yet
+        return ""  # the reply is sent later through deliver()
+
+    def _attach(self, adapter) -> None:
+        self._adapters.append(adapter)
+        self._outboxes[adapter.name] = _outbox_from_config(adapter)
 
     async def _try_start_telegram(self) -> None:
         token = os.getenv("TELEGRAM_BOT_TOKEN", "")
@@ -88,7 +125,7 @@ class ChannelManager:
             adapter = TelegramAdapter(token=token)
             adapter.on_message(self._message_handler)
             await adapter.connect()
-            self._adapters.append(adapter)
+            self._attach(adapter)
             logger.info("[ChannelManager] Telegram channel connected.")
         except ImportError:
             logger.warning("[ChannelManager] Telegram: python-telegram-bot not installed. pip install python-telegram-bot")
@@ -105,9 +142,29 @@ class ChannelManager:
             adapter = DiscordAdapter(token=token)
             adapter.on_message(self._message_handler)
             await adapter.connect()
-            self._adapters.append(adapter)
+            self._attach(adapter)
             logger.info("[ChannelManager] Discord channel connected.")
         except ImportError:
             logger.warning("[ChannelManager] Discord: discord.py not installed. pip install discord.py")
         except Exception as e:
             logger.error(f"[ChannelManager] Discord connect failed: {e}")
+
+
+def _outbox_from_config(adapter) -> Outbox:
+    """Outbox for adapter; channels.outbox and channels.<name> in config/sam.yaml tune it."""
+    try:
+        from config.loader import get
+        cfg = get("channels", "outbox", {}) or {}
+        overrides = get("channels", adapter.name, {}) or {}
+    except Exception:
+        cfg, overrides = {}, {}
+    limits = PLATFORM_LIMITS[adapter.name]
+    for key in ("rate_per_s", "chat_rate_per_s"):
+        if key in overrides:
+            limits = replace(limits, **{key: float(overrides[key])})
+    return Outbox(
+        adapter,
+        limits,
+        batch_ms=float(cfg.get("batch_ms", DEFAULT_BATCH_MS)),
+        edit_interval_ms=float(cfg.get("edit_interval_ms", DEFAULT_EDIT_INTERVAL_MS)),
+    )
@@ -0,0 +1,219 @@
+"""
+comms/outbox.py — per-channel outbound queues for replies to Telegram/Discord.
+
+Each connected adapter gets one Outbox. Replies are queued per chat id and
+sent by a drain task per chat, so a slow or rate-limited chat never holds up
+another:
+
+  - two token buckets pace every send and edit: one for the bot as a whole
+    and one per chat, sized to the platform's documented limits
+  - replies that reach the same chat within batch_ms go out as one message
+  - long text is split with base.split_text at the platform's length limit
+  - stream() shows a reply while it is still being generated: the first text
+    is sent and the same message is edited as more arrives (no more often
+    than edit_interval_ms), moving on to a new message when it grows past
+    the length limit. Adapters without edit support get the full text once.
+
+Adapters expose send_chunk(chat_id, text) -> message id, and, when
+supports_edits is true, edit_message(chat_id, message_id, text).
+
+Usage:
+    outbox = Outbox(adapter, PLATFORM_LIMITS["telegram"])
+    outbox.put(chat_id, "Done — the report is on your desktop.")
+    await outbox.stream(chat_id, llm.stream(prompt))
+    await outbox.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from comms.channels.base import split_text
+from system.metrics import registry
+
+logger = logging.getLogger("sam.comms.outbox")
+
+DEFAULT_BATCH_MS = 250
+DEFAULT_EDIT_INTERVAL_MS = 1000
+
+MESSAGES = registry.counter("sam_channel_messages", "Outbound channel messages by kind", ["channel", "kind"])
+RATE_WAIT = registry.histogram(
+    "sam_channel_rate_wait_seconds", "Time an outbound message waited for a rate-limit token",
+    ["channel"], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10))
+
+
+@dataclass(frozen=True)
+class ChannelLimits:
+    max_length: int            # characters per message
+    rate_per_s: float          # sends/edits per second, whole bot
+    burst: int
+    chat_rate_per_s: float     # sends/edits per second, one chat
+    chat_burst: int
+
+
+# Telegram: ~30 messages/s per bot, about one per second per chat.
+# Discord: 50 requests/s per bot, 5 messages per 5 s per channel.
+PLATFORM_LIMITS: Dict[str, ChannelLimits] = {
+    "telegram": ChannelLimits(max_length=4096, rate_per_s=30, burst=30, chat_rate_per_s=1, chat_burst=3),
+    "discord": ChannelLimits(max_length=2000, rate_per_s=50, burst=50, chat_rate_per_s=1, chat_burst=5),
+}
+
+
+class TokenBucket:
+    """
+    Classic token bucket. take() reserves a token and returns how long the
+    caller must wait for it, so concurrent callers queue up fairly instead of
+    all retrying at once.
+    """
+
+    def __init__(self, rate_per_s: float, burst: int) -> None:
+        self.rate = max(rate_per_s, 1e-6)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+
+    def take(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        wait = self.take()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class _Chat:
+    __slots__ = ("chat_id", "bucket", "pending", "lock", "task")
+
+    def __init__(self, chat_id: str, limits: ChannelLimits) -> None:
+        self.chat_id = chat_id
+        self.bucket = TokenBucket(limits.chat_rate_per_s, limits.chat_burst)
+        self.pending: List[str] = []
+        self.lock = asyncio.Lock()        # one sender per chat keeps messages in order
+        self.task: Optional[asyncio.Task] = None
+
+
+class Outbox:
+    def __init__(
+        self,
+        adapter,
+        limits: ChannelLimits,
+        batch_ms: float = DEFAULT_BATCH_MS,
+        edit_interval_ms: float = DEFAULT_EDIT_INTERVAL_MS,
+    ) -> None:
+        self.adapter = adapter
+        self.channel = adapter.name
+        self.limits = limits
+        self.batch_s = batch_ms / 1000
+        self.edit_interval_s = edit_interval_ms / 1000
+        self._bucket = TokenBucket(limits.rate_per_s, limits.burst)
+        self._chats: Dict[str, _Chat] = {}
+        self._counts = {"queued": 0, "sent": 0, "edited": 0, "batched": 0, "failed": 0}
+
+    def _chat(self, chat_id) -> _Chat:
+        key = str(chat_id)
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = _Chat(key, self.limits)
+        return chat
+
+    # ── Queued replies ────────────────────────────────────────────────────────
+
+    def put(self, chat_id, text: str) -> None:
+        """Queue a reply for chat_id; it is sent after batch_ms together with any that follow."""
+        if not text:
+            return
+        chat = self._chat(chat_id)
+        chat.pending.append(text)
+        self._counts["queued"] += 1
+        if chat.task is None or chat.task.done():
+            chat.task = asyncio.create_task(self._drain(chat), name=f"sam-outbox-{self.channel}-{chat.chat_id}")
+
+    async def _drain(self, chat: _Chat) -> None:
+        await asyncio.sleep(self.batch_s)
+        async with chat.lock:
+            while chat.pending:
+                batch, chat.pending = chat.pending, []
+                self._counts["batched"] += len(batch) - 1
+                for chunk in split_text("\n\n".join(batch), self.limits.max_length):
+                    await self._show(chat, None, chunk)
+
+    # ── Streamed replies ──────────────────────────────────────────────────────
+
+    async def stream(self, chat_id, chunks: AsyncIterator[str]) -> str:
+        """Send a reply as it is generated, editing the message in place; returns the full text."""
+        parts: List[str] = []
+        if not getattr(self.adapter, "supports_edits", False):
+            async for piece in chunks:
+                parts.append(piece)
+            self.put(chat_id, "".join(parts))
+            return "".join(parts)
+
+        chat = self._chat(chat_id)
+        async with chat.lock:
+            current, shown, message_id = "", "", None
+            next_edit = 0.0
+            async for piece in chunks:
+                parts.append(piece)
+                current += piece
+                while len(current) > self.limits.max_length:
+                    head = split_text(current, self.limits.max_length)[0]
+                    current = current[len(head):].lstrip()
+                    await self._show(chat, message_id, head)
+                    message_id, shown = None, ""
+                now = time.monotonic()
+                if current.strip() and current != shown and now >= next_edit:
+                    message_id = await self._show(chat, message_id, current)
+                    shown, next_edit = current, now + self.edit_interval_s
+            if current.strip() and current != shown:
+                await self._show(chat, message_id, current)
+        return "".join(parts)
+
+    # ── Sending ───────────────────────────────────────────────────────────────
+
+    async def _show(self, chat: _Chat, message_id, text: str):
+        """Send text as a new message, or replace message_id's text; returns the message id."""
+        waited = await chat.bucket.acquire() + await self._bucket.acquire()
+        RATE_WAIT.labels(self.channel).observe(waited)
+        kind = "sent" if message_id is None else "edited"
+        try:
+            if message_id is None:
+                message_id = await self.adapter.send_chunk(chat.chat_id, text)
+            else:
+                await self.adapter.edit_message(chat.chat_id, message_id, text)
+        except Exception as e:
+            kind = "failed"
+            logger.error(f"[Outbox] {self.channel} chat {chat.chat_id}: send failed: {e}")
+        self._counts[kind] += 1
+        MESSAGES.labels(self.channel, kind).inc()
+        return message_id
+
+    async def flush(self) -> None:
+        """Wait until every queued reply has been sent."""
+        tasks = [c.task for c in self._chats.values() if c.task is not None and not c.task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[Outbox] {self.channel}: dropping unsent replies on shutdown")
+        for chat in self._chats.values():
+            if chat.task is not None and not chat.task.done():
+                chat.task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            **self._counts,
+            "chats": len(self._chats),
+            "pending": sum(len(c.pending) for c in self._chats.values()),
+        }
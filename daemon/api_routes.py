@@ -8,8 +8,14 @@ Routes:
   PATCH /api/tasks/{id}
   GET  /api/conversations
   POST /api/chat
+  GET  /api/chat/stream
+  POST /api/chat/stream
+  GET  /api/input/stats
+  GET  /api/sessions
   GET  /api/settings
   POST /api/settings
+  GET  /api/ws/stats
+  GET  /api/broker/stats
   GET  /ws  (WebSocket)
 """
 
@@ -17,18 +23,21 @@ import asyncio
 import json
 import logging
 import os
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Optional
 
 import aiosqlite
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
+from daemon.broker import queue as broker_queue
+from daemon.http_cache import spa_file_response
 from daemon.ws_service import manager as ws_manager
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 from authority.engine import AuthorityEngine, AuthorityConfig
 from authority.approval import ApprovalManager
 from authority.audit import AuditTrail
@@ -77,7 +86,7 @@ class SettingUpdate(BaseModel):
 
 async def _get_db():
     """Return an open aiosqlite connection. Caller must close."""
-    return await aiosqlite.connect(str(DB_PATH))
+    return await connect_db(DB_PATH)
 
 
 def _row_to_dict(cursor: aiosqlite.Cursor, row: Any) -> dict:
@@ -189,8 +198,8 @@ async def list_conversations(limit: int = 50):
 
 # ── Chat ───────────────────────────────────────────────────────────────────────
 
-# Module-level chat queue — ai_loop drains this in daemon/main.py
-chat_input_queue: asyncio.Queue = asyncio.Queue()
+# Chat queue — the primary worker's bridge in daemon/main.py drains it
+chat_input_queue = broker_queue("chat")
 
 
 @router.post("/api/chat")
@@ -206,6 +215,8 @@ async def post_chat(body: ChatMessage):
         "message_id": message_id,
         "session_id": session_id,
         "message": body.message,
+        "source": "api",
+        "queued_at": time.monotonic(),
     })
 
     # Persist to conversations table
@@ -468,44 +479,121 @@ async def set_personality_style(body: StyleBody):
 
 # ── LLM streaming + stats ─────────────────────────────────────────────────────
 
-@router.get("/api/chat/stream")
-async def stream_chat(message: str, session_id: str = "default", system: str = ""):
-    """
-    Stream a chat response via Server-Sent Events.
-    Client receives: data: {"chunk": "..."}\n\n
-    Finishes with:  data: [DONE]\n\n
-    Personality style instruction is automatically injected into the system prompt.
-    """
+_background_tasks: set = set()
+
+
+class ChatStreamRequest(BaseModel):
+    message: str
+    session_id: str = "default"     # turns are stored under it; its history is used when none is sent
+    system: str = ""
+    history: list[dict] = []        # prior turns: {"role": "user"|"assistant", "content": "..."}
+    model_tier: str = "auto"
+    max_tokens: int = 2048
+
+
+# Bound what a client can make us send upstream on every message
+_HISTORY_MAX_TURNS = 20
+_HISTORY_MAX_CHARS = 4000
+
+
+def _clean_history(history: list[dict]) -> list[dict]:
+    cleaned = []
+    for turn in history[-_HISTORY_MAX_TURNS:]:
+        role, content = turn.get("role"), turn.get("content")
+        if role in ("user", "assistant") and isinstance(content, str) and content:
+            cleaned.append({"role": role, "content": content[:_HISTORY_MAX_CHARS]})
+    return cleaned
+
+
+async def _session_history(session_id: str) -> list[dict]:
+    """The session's last turns from the conversations table, oldest first."""
+    db = await _get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT role, content FROM conversations WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (session_id, _HISTORY_MAX_TURNS),
+        )
+        rows = await cursor.fetchall()
+    finally:
+        await db.close()
+    return _clean_history([{"role": r[0], "content": r[1]} for r in reversed(rows)])
+
+
+async def _record_turns(session_id: str, turns: list[tuple[str, str]]) -> None:
+    db = await _get_db()
+    try:
+        now = datetime.utcnow().isoformat() + "Z"
+        await db.executemany(
+            "INSERT INTO conversations (session_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+            [(session_id, role, content, now) for role, content in turns if content],
+        )
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def _chat_event_stream(request: Request, body: ChatStreamRequest) -> StreamingResponse:
+    from daemon.chat_stream import ChatStream, cancel_on_disconnect, _settings_from_config
     from llm.manager import get_manager
     from personality.model import get_learner
 
     learner = get_learner()
     style_hint = await learner.get_style_instruction()
-    effective_system = " ".join(filter(None, [system, style_hint])) or None
+    effective_system = " ".join(filter(None, [body.system, style_hint]))
+    session_id = body.session_id or "default"
+    history = _clean_history(body.history) if body.history else await _session_history(session_id)
+    chunks = get_manager().stream(
+        body.message,
+        system=effective_system,
+        model_tier=body.model_tier,  # type: ignore[arg-type]
+        max_tokens=body.max_tokens,
+        history=history,
+    )
+    stream = ChatStream(chunks, **_settings_from_config())
 
     async def generate():
-        full_response: list[str] = []
+        watcher = asyncio.create_task(cancel_on_disconnect(request.receive, stream))
         try:
-            async for chunk in get_manager().stream(
-                message,
-                system=effective_system,
-                model_tier="auto",
-            ):
-                full_response.append(chunk)
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-        except Exception as exc:
-            logger.error(f"[SSE] stream error: {exc}")
-            yield f"data: {json.dumps({'error': str(exc)})}\n\n"
+            async for frame in stream.frames():
+                yield f"data: {json.dumps({'chunk': frame})}\n\n"
+            if stream.error is not None:
+                logger.error(f"[SSE] stream error: {stream.error}")
+                yield f"data: {json.dumps({'error': str(stream.error)})}\n\n"
+            if not stream.cancelled:
+                yield "data: [DONE]\n\n"
         finally:
-            yield "data: [DONE]\n\n"
-            # Record interaction for personality adaptation (fire-and-forget)
-            asyncio.create_task(
-                learner.record_interaction(message, sum(len(c) for c in full_response))
-            )
+            watcher.cancel()
+            stream.cancel()
+            # Store the turn in the session's history and record it for personality
+            # adaptation (fire-and-forget; keep references so the tasks aren't
+            # garbage-collected mid-write)
+            for coro in (_record_turns(session_id, [("user", body.message), ("assistant", stream.text)]),
+                         learner.record_interaction(body.message, len(stream.text))):
+                task = asyncio.create_task(coro)
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 
+@router.post("/api/chat/stream")
+async def post_stream_chat(body: ChatStreamRequest, request: Request):
+    """
+    Stream a chat response via Server-Sent Events.
+    Client receives: data: {"chunk": "..."}\n\n   (provider chunks coalesced per frame)
+    Finishes with:  data: [DONE]\n\n
+    Closing the connection cancels the upstream LLM request.
+    Personality style instruction is automatically injected into the system prompt.
+    """
+    return await _chat_event_stream(request, body)
+
+
+@router.get("/api/chat/stream")
+async def stream_chat(request: Request, message: str, session_id: str = "default", system: str = ""):
+    """Query-string form of POST /api/chat/stream (for EventSource clients); history comes from the session."""
+    return await _chat_event_stream(request, ChatStreamRequest(message=message, session_id=session_id, system=system))
+
+
 @router.get("/api/llm/stats")
 async def get_llm_stats():
     """Return token usage + cost totals for the current daemon session."""
@@ -513,6 +601,36 @@ async def get_llm_stats():
     return session_stats()
 
 
+# ── WebSocket stats ────────────────────────────────────────────────────────────
+# Declared before the SPA catch-all below, which would otherwise shadow it.
+
+@router.get("/api/ws/stats")
+async def ws_stats():
+    """Per-client queue depth, drops and coalescing for the /ws broadcast fan-out."""
+    return ws_manager.stats()
+
+
+@router.get("/api/broker/stats")
+async def broker_stats():
+    """Broker backend, and whether the worker that answered is the primary."""
+    from daemon.broker import get_broker
+    return get_broker().stats()
+
+
+@router.get("/api/input/stats")
+async def input_stats():
+    """Per-source wait between enqueue and ai_loop pickup (voice, ui, api, channels)."""
+    from input_mux import get_input_mux
+    return get_input_mux().stats()
+
+
+@router.get("/api/sessions")
+async def list_sessions():
+    """Active per-session conversation workers and the shared LLM cap."""
+    from daemon.sessions import get_session_manager
+    return get_session_manager().stats()
+
+
 # ── React SPA static file serving ─────────────────────────────────────────────
 
 UI_DIST = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui", "dist")
@@ -520,7 +638,7 @@ UI_DIST = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui", "dist")
 
 @router.get("/")
 async def serve_dashboard():
-    return FileResponse(os.path.join(UI_DIST, "index.html"))
+    return spa_file_response(os.path.join(UI_DIST, "index.html"))
 
 
 @router.get("/{full_path:path}")
@@ -529,8 +647,8 @@ async def serve_spa(full_path: str):
         raise HTTPException(status_code=404, detail="Not found")
     file_path = os.path.join(UI_DIST, full_path)
     if os.path.exists(file_path) and os.path.isfile(file_path):
-        return FileResponse(file_path)
-    return FileResponse(os.path.join(UI_DIST, "index.html"))
+        return spa_file_response(file_path)
+    return spa_file_response(os.path.join(UI_DIST, "index.html"))
 
 
 # ── WebSocket endpoint ─────────────────────────────────────────────────────────
@@ -539,16 +657,14 @@ async def serve_spa(full_path: str):
 async def websocket_endpoint(ws: WebSocket):
     await ws_manager.connect(ws)
     try:
-        # Send initial connection acknowledgement
-        await ws.send_text(json.dumps({
-            "type": "system_status",
-            "payload": {"status": "connected", "version": "2.0.0"},
-        }))
+        # Send initial connection acknowledgement (through the client's writer queue)
+        await ws_manager.send(ws, "system_status", {"status": "connected", "version": "2.0.0"})
 
-        # Keep the connection alive; messages from client are logged/ignored for now
+        # Client messages are subscribe/unsubscribe requests (see daemon/ws_service.py)
         while True:
             data = await ws.receive_text()
             logger.debug(f"[WS] Received from client: {data[:120]}")
+            await ws_manager.handle_client_message(ws, data)
     except WebSocketDisconnect:
         logger.info("[WS] Client disconnected (WebSocketDisconnect)")
     except Exception as exc:
@@ -0,0 +1,392 @@
+"""
+daemon/broker.py — message broker between daemon worker processes.
+
+A single daemon process keeps its cross-request state in memory. To serve
+HTTP and WebSockets from several uvicorn workers (daemon.workers > 1), that
+state goes through a broker instead:
+
+  queues  — work items with exactly one consumer. "chat" carries /api/chat
+            and comms channel messages to the conversation worker.
+  topics  — fan-out to every worker. "ws" carries WebSocket broadcasts
+            (replies, task events, AgentMonitor events), so a dashboard
+            connected to any worker sees what the primary produces.
+            "scheduler" asks the primary to reload workflow triggers
+            edited through another worker.
+
+Backends (daemon.broker.backend):
+  local   — asyncio queues and callbacks in this process. The default, and
+            the only sensible choice for a single worker.
+  sqlite  — a shared SQLite file (WAL) that every worker polls every
+            poll_ms. Queue items are claimed and deleted in one
+            transaction; topic events are kept for EVENT_TTL_S and each
+            worker reads the ones published by the others.
+
+Exactly one worker, the primary (it holds daemon.lock next to the vault),
+runs ai_loop, the session workers, comms channels and the scheduler, and
+consumes the chat queue; the rest only serve requests. If the primary
+exits, the worker uvicorn starts in its place takes the lock over.
+State that still lives in one process (task queue, session stats,
+/metrics, screen views and the binary screen_frame stream) is per worker.
+State kept in the vault needs no broker only if every writer updates it
+in one transaction from the stored row, as personality/model.py does; a
+cache re-read on a TTL alone would let workers overwrite each other.
+
+Usage:
+    from daemon.broker import get_broker, queue
+    chat = queue("chat")
+    await chat.put({"message": "hi"})          # any worker
+    item = await chat.get()                    # primary
+    get_broker().subscribe("ws", deliver)      # deliver(message) on every worker
+    await get_broker().publish("ws", {"type": "chat_message", "payload": {...}})
+    await get_broker().publish_remote("ws", [m1, m2])   # the other workers only
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("sam.daemon.broker")
+
+DEFAULT_POLL_MS = 20
+EVENT_TTL_S = 60.0
+PRUNE_EVERY_S = 10.0
+CLAIM_BATCH = 32
+
+_CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS broker_queue (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        queue      TEXT NOT NULL,
+        payload    TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_broker_queue ON broker_queue(queue, id)",
+    # AUTOINCREMENT: ids are never reused after pruning, so "id > last seen" stays valid
+    """
+    CREATE TABLE IF NOT EXISTS broker_events (
+        id         INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic      TEXT NOT NULL,
+        origin     TEXT NOT NULL,
+        payload    TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+)
+
+Handler = Callable[[dict], None]
+
+
+class Broker:
+    """In-process broker; also the interface the other backends implement."""
+
+    backend = "local"
+    distributed = False
+
+    def __init__(self) -> None:
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._published = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def _local_queue(self, name: str) -> asyncio.Queue:
+        q = self._queues.get(name)
+        if q is None:
+            q = self._queues[name] = asyncio.Queue()
+        return q
+
+    async def put(self, queue: str, item: dict) -> None:
+        await self._local_queue(queue).put(item)
+
+    async def get(self, queue: str) -> dict:
+        return await self._local_queue(queue).get()
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """Call handler(message) for every message published on `topic`, from any worker."""
+        self._handlers[topic].append(handler)
+
+    async def publish(self, topic: str, message: dict) -> None:
+        self._published += 1
+        self._dispatch(topic, message)
+
+    async def publish_remote(self, topic: str, messages: List[dict]) -> None:
+        """Hand messages to the other workers' subscribers only; there are none in-process."""
+
+    def _dispatch(self, topic: str, message: dict) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"[Broker] '{topic}' handler failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "pid": os.getpid(),
+            "primary": is_primary(),
+            "published": self._published,
+            "queued": {name: q.qsize() for name, q in self._queues.items()},
+        }
+
+
+class SqliteBroker(Broker):
+    """Broker shared by worker processes through one SQLite file."""
+
+    backend = "sqlite"
+    distributed = True
+
+    def __init__(self, path: Path, poll_ms: float = DEFAULT_POLL_MS) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.poll_s = poll_ms / 1000
+        self._origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._consuming: set = set()
+        self._last_event = 0
+        self._last_prune = 0.0
+        self._poller: Optional[asyncio.Task] = None
+        self._received = 0
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _CREATE_TABLES:
+                conn.execute(statement)
+            self._last_event = conn.execute("SELECT COALESCE(MAX(id), 0) FROM broker_events").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn, *args):
+        with self._db_lock:
+            return fn(self._connect(), *args)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._run, lambda conn: None)
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll(), name="sam-broker-poll")
+        logger.info(f"[Broker] sqlite broker at {self.path} (poll {self.poll_s * 1000:.0f} ms)")
+
+    async def close(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ── Queues ────────────────────────────────────────────────────────────────
+
+    async def put(self, queue: str, item: dict) -> None:
+        payload = json.dumps(item)
+        await asyncio.to_thread(self._run, _insert_queue_item, queue, payload)
+
+    async def get(self, queue: str) -> dict:
+        # Items for a queue are only claimed once this worker is consuming it
+        self._consuming.add(queue)
+        return await self._local_queue(queue).get()
+
+    # ── Topics ────────────────────────────────────────────────────────────────
+
+    async def publish(self, topic: str, message: dict) -> None:
+        self._published += 1
+        self._dispatch(topic, message)       # this worker's subscribers don't wait on the poll
+        payload = json.dumps(message)
+        await asyncio.to_thread(self._run, _insert_events, topic, self._origin, [payload])
+
+    async def publish_remote(self, topic: str, messages: List[dict]) -> None:
+        """Write a batch of messages for the other workers in one insert; this worker's subscribers are skipped."""
+        if not messages:
+            return
+        self._published += len(messages)
+        payloads = [json.dumps(m) for m in messages]
+        await asyncio.to_thread(self._run, _insert_events, topic, self._origin, payloads)
+
+    # ── Polling ───────────────────────────────────────────────────────────────
+
+    def _poll_once(self, conn: sqlite3.Connection) -> tuple:
+        rows = conn.execute(
+            "SELECT id, topic, origin, payload FROM broker_events WHERE id > ? ORDER BY id",
+            (self._last_event,),
+        ).fetchall()
+        if rows:
+            self._last_event = rows[-1][0]
+        claimed = {queue: _claim(conn, queue, CLAIM_BATCH) for queue in tuple(self._consuming)}
+        now = time.time()
+        if now - self._last_prune > PRUNE_EVERY_S:
+            self._last_prune = now
+            conn.execute("DELETE FROM broker_events WHERE created_at < ?", (now - EVENT_TTL_S,))
+        return [(topic, payload) for _, topic, origin, payload in rows if origin != self._origin], claimed
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                events, claimed = await asyncio.to_thread(self._run, self._poll_once)
+            except sqlite3.Error as e:
+                logger.warning(f"[Broker] poll failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            for topic, payload in events:
+                self._received += 1
+                self._dispatch(topic, json.loads(payload))
+            for queue, payloads in claimed.items():
+                for payload in payloads:
+                    self._local_queue(queue).put_nowait(json.loads(payload))
+            if not events and not any(claimed.values()):
+                await asyncio.sleep(self.poll_s)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "path": str(self.path), "received": self._received,
+                "consuming": sorted(self._consuming)}
+
+
+def _insert_queue_item(conn: sqlite3.Connection, queue: str, payload: str) -> None:
+    conn.execute("INSERT INTO broker_queue (queue, payload, created_at) VALUES (?, ?, ?)",
+                 (queue, payload, time.time()))
+
+
+def _insert_events(conn: sqlite3.Connection, topic: str, origin: str, payloads: List[str]) -> None:
+    """Insert a batch of events in one transaction (the connection is otherwise in autocommit)."""
+    now = time.time()
+    conn.execute("BEGIN")
+    try:
+        conn.executemany("INSERT INTO broker_events (topic, origin, payload, created_at) VALUES (?, ?, ?, ?)",
+                         [(topic, origin, payload, now) for payload in payloads])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _claim(conn: sqlite3.Connection, queue: str, limit: int) -> List[str]:
+    """Take up to `limit` items off a queue; the IMMEDIATE transaction keeps two consumers apart."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute("SELECT id, payload FROM broker_queue WHERE queue = ? ORDER BY id LIMIT ?",
+                            (queue, limit)).fetchall()
+        if rows:
+            conn.execute(f"DELETE FROM broker_queue WHERE id IN ({','.join('?' * len(rows))})",
+                         [r[0] for r in rows])
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [r[1] for r in rows]
+
+
+class BrokerQueue:
+    """asyncio.Queue-like handle on a broker queue, resolved when first used."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    async def put(self, item: dict) -> None:
+        await get_broker().put(self.name, item)
+
+    async def get(self) -> dict:
+        return await get_broker().get(self.name)
+
+
+def queue(name: str) -> BrokerQueue:
+    return BrokerQueue(name)
+
+
+# ── Primary worker election ───────────────────────────────────────────────────
+
+_primary_lock = None      # open lock file while this process is the primary
+
+
+def acquire_primary(path: Path) -> bool:
+    """Try to become the primary worker by locking `path`; held until the process exits."""
+    global _primary_lock
+    if _primary_lock is not None:
+        return True
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _primary_lock = handle
+    return True
+
+
+def is_primary() -> bool:
+    return _primary_lock is not None
+
+
+def release_primary() -> None:
+    global _primary_lock
+    if _primary_lock is not None:
+        _primary_lock.close()      # closing the file drops the lock
+        _primary_lock = None
+
+
+# ── Singleton ─────────────────────────────────────────────────────────────────
+
+def _broker_from_config() -> Broker:
+    try:
+        from config.loader import get
+        cfg = get("daemon", "broker", {}) or {}
+        workers = int(get("daemon", "workers", 1))
+    except Exception:
+        cfg, workers = {}, 1
+    backend = cfg.get("backend", "local")
+    if workers > 1 and backend == "local":
+        logger.warning("[Broker] daemon.workers > 1 needs a shared broker; using the sqlite backend")
+        backend = "sqlite"
+    if backend == "sqlite":
+        from vault.schema import DB_PATH
+        path = Path(os.path.expanduser(cfg.get("path") or DB_PATH.parent / "broker.db"))
+        return SqliteBroker(path, poll_ms=float(cfg.get("poll_ms", DEFAULT_POLL_MS)))
+    return Broker()
+
+
+_broker: Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    global _broker
+    if _broker is None:
+        _broker = _broker_from_config()
+    return _broker
+
+
+def primary_lock_path() -> Path:
+    from vault.schema import DB_PATH
+    return DB_PATH.parent / "daemon.lock"
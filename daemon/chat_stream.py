@@ -0,0 +1,133 @@
+"""
+daemon/chat_stream.py — coalesced, cancellable LLM streaming for /api/chat/stream.
+
+Providers yield a chunk per token (or less), and one SSE event per chunk
+costs more in framing and client re-renders than the text itself. ChatStream
+pumps the provider iterator in its own task and hands out frames that are
+flushed when `flush_ms` has passed since the first buffered chunk or
+`max_bytes` of text are waiting, whichever comes first.
+
+Because the upstream request lives in that task, cancel() stops it at once:
+the provider's HTTP response is closed and no more tokens are generated.
+cancel_on_disconnect() calls it as soon as the HTTP client goes away, rather
+than waiting for the next write to fail.
+
+Usage:
+    stream = ChatStream(get_manager().stream(prompt, history=history))
+    watcher = asyncio.create_task(cancel_on_disconnect(request.receive, stream))
+    async for frame in stream.frames():
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from system.metrics import registry
+
+logger = logging.getLogger("sam.daemon.chat_stream")
+
+DEFAULT_FLUSH_MS = 40
+DEFAULT_MAX_BYTES = 512
+
+STREAMS = registry.counter("sam_chat_streams", "Chat streams by outcome", ["outcome"])
+STREAM_FRAMES = registry.histogram(
+    "sam_chat_stream_chunks_per_frame", "Provider chunks coalesced into each frame",
+    buckets=(1, 2, 4, 8, 16, 32, 64))
+
+_END = object()
+
+
+class ChatStream:
+    def __init__(
+        self,
+        chunks: AsyncIterator[str],
+        flush_ms: float = DEFAULT_FLUSH_MS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.flush_s = flush_ms / 1000
+        self.max_bytes = max_bytes
+        self.parts: List[str] = []
+        self.cancelled = False
+        self.error: Optional[Exception] = None
+        self._chunks = chunks
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pump: Optional[asyncio.Task] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    async def _run_pump(self) -> None:
+        try:
+            async for chunk in self._chunks:
+                if chunk:
+                    self._queue.put_nowait(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._queue.put_nowait(_END)
+
+    def cancel(self) -> None:
+        """Stop the upstream request; frames() ends after what is already buffered."""
+        if self._pump is not None and not self._pump.done():
+            self.cancelled = True
+            self._pump.cancel()
+            self._queue.put_nowait(_END)
+
+    async def frames(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        if self._pump is None:
+            self._pump = asyncio.create_task(self._run_pump(), name="sam-chat-stream")
+        buf: List[str] = []
+        size = 0
+        deadline = 0.0
+        try:
+            while True:
+                timeout = max(0.0, deadline - loop.time()) if buf else None
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    item = None
+                if item is not None and item is not _END:
+                    if not buf:
+                        deadline = loop.time() + self.flush_s
+                    buf.append(item)
+                    size += len(item.encode())
+                    if size < self.max_bytes:
+                        continue
+                if buf:
+                    frame = "".join(buf)
+                    STREAM_FRAMES.observe(len(buf))
+                    self.parts.append(frame)
+                    buf, size = [], 0
+                    yield frame
+                if item is _END:
+                    break
+        finally:
+            self.cancel()
+            STREAMS.labels("cancelled" if self.cancelled else "error" if self.error else "completed").inc()
+
+
+async def cancel_on_disconnect(receive: Callable[[], Awaitable[dict]], stream: ChatStream) -> None:
+    """Cancel `stream` when the ASGI client disconnects (run as a task; cancel it when done)."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            logger.info("[ChatStream] client disconnected — cancelling upstream LLM request")
+            stream.cancel()
+            return
+
+
+def _settings_from_config() -> dict:
+    try:
+        from config.loader import get
+        cfg = get("daemon", "chat_stream", {}) or {}
+    except Exception:
+        cfg = {}
+    return {
+        "flush_ms": float(cfg.get("flush_ms", DEFAULT_FLUSH_MS)),
+        "max_bytes": int(cfg.get("max_bytes", DEFAULT_MAX_BYTES)),
+    }
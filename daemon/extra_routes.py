@@ -32,7 +32,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import Response
 from pydantic import BaseModel
 
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 
 router = APIRouter()
 
@@ -40,7 +40,7 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 
 async def _db():
-    conn = await aiosqlite.connect(str(DB_PATH))
+    conn = await connect_db(DB_PATH)
     conn.row_factory = aiosqlite.Row
     return conn
 
@@ -0,0 +1,225 @@
+"""
+daemon/http_cache.py — conditional GET, JSON compression and static asset caching.
+
+The dashboard keeps polling a handful of list endpoints. Three layers keep
+that cheap:
+
+  - ConditionalGetMiddleware: the routes in CACHED_ROUTES get an ETag built
+    from the vault's per-table write counters (vault.schema.table_versions)
+    and the query string. A matching If-None-Match is answered with 304
+    before the route runs, so an unchanged list costs no query and no JSON.
+    With several workers the counters live in the vault (share_table_versions),
+    so a write through one worker changes the tag every worker serves.
+    The tag also rolls over every ETAG_MAX_AGE_S, which bounds staleness
+    for writes made outside the daemon (they don't bump the counters).
+  - CompressionMiddleware: JSON bodies of at least `minimum_size` bytes are
+    brotli-compressed (if the optional `brotli` package is installed and
+    the client accepts it) or gzipped. Streaming bodies (SSE, NDJSON) and
+    other content types pass through untouched.
+  - ImmutableStaticFiles / spa_file_response: Vite's content-hashed files
+    are served with a one-year immutable Cache-Control, index.html with
+    no-cache so a rebuilt dashboard is picked up on the next load.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+import re
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+
+from vault.schema import table_versions
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# GET path → vault tables its response is built from
+CACHED_ROUTES: Dict[str, Tuple[str, ...]] = {
+    "/api/tasks": ("tasks",),
+    "/api/goals": ("goals",),
+    "/api/pipeline": ("documents",),
+    "/api/vault/entities": ("entities",),
+    "/api/authority/pending": ("approval_requests",),
+}
+
+ETAG_MAX_AGE_S = 60
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+NO_CACHE = "no-cache"
+# Vite names built files <name>-<8+ char base64url hash>.<ext>
+_HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+_EPOCH = f"{int(time.time()):x}"      # tags from a previous daemon never match
+
+
+def _header(scope: dict, name: bytes) -> str:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _set_header(headers: List[Tuple[bytes, bytes]], name: bytes, value: str) -> List[Tuple[bytes, bytes]]:
+    out = [(k, v) for k, v in headers if k != name]
+    out.append((name, value.encode("latin-1")))
+    return out
+
+
+# ── Conditional GET ───────────────────────────────────────────────────────────
+
+def route_etag(path: str, query: bytes = b"") -> Optional[str]:
+    tables = CACHED_ROUTES.get(path)
+    if tables is None:
+        return None
+    versions = ".".join(str(v) for v in table_versions(*tables))
+    bucket = int(time.time() // ETAG_MAX_AGE_S)
+    return f'W/"{_EPOCH}-{versions}-{bucket:x}-{zlib.crc32(query):x}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    # Weak comparison: W/"x" and "x" match (proxies may strip the W/ after compressing)
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any((c[2:] if c.startswith("W/") else c) == bare for c in candidates)
+
+
+class ConditionalGetMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        etag = route_etag(scope["path"], scope.get("query_string", b""))
+        if etag is None:
+            await self.app(scope, receive, send)
+            return
+        if _etag_matches(_header(scope, b"if-none-match"), etag):
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": [(b"etag", etag.encode()), (b"cache-control", NO_CACHE.encode())]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = _set_header(list(message.get("headers", [])), b"etag", etag)
+                message = {**message, "headers": _set_header(headers, b"cache-control", NO_CACHE)}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+# ── Compression ───────────────────────────────────────────────────────────────
+
+def _pick_encoding(accept: str) -> Optional[str]:
+    offered = {}
+    for part in accept.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _min_size_from_config() -> int:
+    try:
+        from config.loader import get
+        return int(get("daemon", "compress_min_bytes", DEFAULT_MIN_SIZE))
+    except Exception:
+        return DEFAULT_MIN_SIZE
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: Optional[int] = None) -> None:
+        self.app = app
+        self.minimum_size = _min_size_from_config() if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _pick_encoding(_header(scope, b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if not content_type.startswith("application/json") or b"content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            # First body message of a JSON response
+            body = message.get("body", b"")
+            headers = list(start.get("headers", []))
+            if message.get("more_body") or len(body) < self.minimum_size:
+                passthrough = True          # streamed or small: send as-is
+            else:
+                body = compress(body, encoding)
+                headers = _set_header(headers, b"content-encoding", encoding)
+                headers = _set_header(headers, b"content-length", str(len(body)))
+                message = {**message, "body": body}
+            vary = dict(headers).get(b"vary", b"").decode("latin-1")
+            if "accept-encoding" not in vary.lower():
+                headers = _set_header(headers, b"vary", f"{vary}, Accept-Encoding" if vary else "Accept-Encoding")
+            await send({**start, "headers": headers})
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+# ── Static assets ─────────────────────────────────────────────────────────────
+
+def cache_control_for(path: str) -> str:
+    return IMMUTABLE if _HASHED_NAME.search(os.path.basename(path)) else NO_CACHE
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for the Vite build's /assets: hashed names never change content."""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = cache_control_for(str(full_path))
+        return response
+
+
+def spa_file_response(path: str) -> FileResponse:
+    return FileResponse(path, headers={"Cache-Control": cache_control_for(path)})
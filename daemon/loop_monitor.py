@@ -0,0 +1,231 @@
+"""
+daemon/loop_monitor.py — event-loop lag monitor for the daemon.
+
+Every route, the WebSocket fan-out and the headless ai_loop share one event
+loop, so a single blocking call (a sync LLM request, file I/O, psutil) stalls
+all of them. The monitor makes such stalls visible:
+
+  - a heartbeat task sleeps for `interval_s` and measures how late it wakes up
+  - a watchdog thread notices when the heartbeat is overdue by more than
+    `threshold_ms` and snapshots the loop thread's stack *while it is
+    blocked*, so the stall is recorded with the code that caused it
+  - in debug mode, asyncio's slow-callback warnings are enabled and an audit
+    hook flags blocking I/O (open, socket connect/DNS, subprocess, sqlite3)
+    made from the loop thread, once per call site
+
+Usage:
+    from daemon.loop_monitor import get_loop_monitor
+    monitor = get_loop_monitor()
+    await monitor.start()
+    monitor.stats()        # lag percentiles, recent stalls, sync I/O sites
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("sam.daemon.loop_monitor")
+
+DEFAULT_INTERVAL_S = 0.1
+DEFAULT_THRESHOLD_MS = 100.0
+LAG_SAMPLES = 600            # ~1 minute of heartbeats at the default interval
+MAX_STALLS = 50
+MAX_SYNC_IO_SITES = 200
+STACK_LIMIT = 12
+
+# Audit events that mean the calling thread is about to block on I/O.
+SYNC_IO_EVENTS = {
+    "open", "socket.connect", "socket.getaddrinfo", "socket.gethostbyname",
+    "subprocess.Popen", "os.system", "sqlite3.connect", "urllib.Request",
+}
+
+
+def _format_stack(frame, limit: int = STACK_LIMIT) -> List[str]:
+    """Innermost-last stack lines, trimmed to `limit`, without the monitor's own frames."""
+    # lookup_lines=False: reading source lines would itself be file I/O
+    entries = list(reversed(traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)))
+    entries = [e for e in entries if e.filename != __file__]
+    return [f"{e.filename}:{e.lineno} in {e.name}" for e in entries[-limit:]]
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval_s: float = DEFAULT_INTERVAL_S,
+        threshold_ms: float = DEFAULT_THRESHOLD_MS,
+        debug: bool = False,
+    ) -> None:
+        self.interval_s = interval_s
+        self.threshold_ms = threshold_ms
+        self.debug = debug
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._beat = time.monotonic()           # last heartbeat, written by the loop thread
+        self._stall_stack: Optional[List[str]] = None
+        self._lags: deque = deque(maxlen=LAG_SAMPLES)
+        self._stalls: deque = deque(maxlen=MAX_STALLS)
+        self._stall_count = 0
+        self._max_lag_ms = 0.0
+        self._sync_io: Dict[str, dict] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="sam-loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="sam-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        if self.debug:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.threshold_ms / 1000
+            _install_audit_hook()
+            _audit_monitors.add(self)
+        logger.info(f"[LoopMonitor] started (threshold {self.threshold_ms:.0f} ms, debug={self.debug})")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        _audit_monitors.discard(self)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    # ── Lag measurement ───────────────────────────────────────────────────────
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            now = time.monotonic()
+            self._beat = now
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self._lags.append(lag_ms)
+            self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self._record_stall(lag_ms)
+            else:
+                self._stall_stack = None
+
+    def _record_stall(self, lag_ms: float) -> None:
+        stack, self._stall_stack = self._stall_stack, None
+        self._stall_count += 1
+        self._stalls.append({
+            "at": time.time(),
+            "lag_ms": round(lag_ms, 1),
+            "stack": stack or [],
+        })
+        where = stack[-1] if stack else "unknown (stack not captured)"
+        logger.warning(f"[LoopMonitor] event loop blocked for {lag_ms:.0f} ms at {where}")
+
+    def _watch(self) -> None:
+        """Watchdog thread: snapshot the loop thread's stack while a stall is in progress."""
+        period = min(self.interval_s, self.threshold_ms / 1000) / 2
+        while not self._stop.wait(period):
+            overdue_ms = (time.monotonic() - self._beat - self.interval_s) * 1000
+            if overdue_ms < self.threshold_ms or self._stall_stack is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._stall_stack = _format_stack(frame)
+
+    # ── Sync I/O detection (debug mode) ──────────────────────────────────────
+
+    def _on_audit(self, event: str, args: tuple) -> None:
+        if threading.get_ident() != self._loop_thread:
+            return
+        frame = sys._getframe(2)
+        stack = _format_stack(frame, limit=6)
+        site = stack[-1] if stack else "?"
+        entry = self._sync_io.get(site)
+        if entry is not None:
+            entry["count"] += 1
+            return
+        if len(self._sync_io) >= MAX_SYNC_IO_SITES:
+            return
+        target = str(args[0])[:120] if args else ""
+        self._sync_io[site] = {"event": event, "target": target, "count": 1, "stack": stack}
+        logger.warning(f"[LoopMonitor] sync {event} on the event loop at {site} ({target})")
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        lags = sorted(self._lags)
+
+        def pct(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))], 2) if lags else 0.0
+
+        return {
+            "running": self.running,
+            "debug": self.debug,
+            "threshold_ms": self.threshold_ms,
+            "lag_ms": {"p50": pct(0.5), "p99": pct(0.99), "max": round(self._max_lag_ms, 2)},
+            "stalls": self._stall_count,
+            "recent_stalls": list(self._stalls),
+            "sync_io": sorted(self._sync_io.values(), key=lambda e: -e["count"]),
+        }
+
+
+# Audit hooks cannot be removed once added, so a single hook dispatches to
+# whichever monitors are currently running in debug mode.
+_audit_monitors: set = set()
+_audit_installed = False
+_audit_local = threading.local()
+
+
+def _audit(event: str, args: tuple) -> None:
+    if event not in SYNC_IO_EVENTS or not _audit_monitors or getattr(_audit_local, "active", False):
+        return
+    _audit_local.active = True          # logging from _on_audit must not re-enter
+    try:
+        for monitor in list(_audit_monitors):
+            monitor._on_audit(event, args)
+    finally:
+        _audit_local.active = False
+
+
+def _install_audit_hook() -> None:
+    global _audit_installed
+    if not _audit_installed:
+        sys.addaudithook(_audit)
+        _audit_installed = True
+
+
+def _monitor_from_config() -> LoopMonitor:
+    try:
+        from config.loader import get
+        cfg = get("daemon", "loop_monitor", {}) or {}
+    except Exception:
+        cfg = {}
+    return LoopMonitor(
+        interval_s=float(cfg.get("interval_s", DEFAULT_INTERVAL_S)),
+        threshold_ms=float(cfg.get("threshold_ms", DEFAULT_THRESHOLD_MS)),
+        debug=bool(cfg.get("debug", False)),
+    )
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = _monitor_from_config()
+    return _monitor
@@ -5,15 +5,19 @@ Starts the HTTP/WebSocket server on port 3142 and runs Sam's ai_loop()
 as a background asyncio task.
 
 Usage:
-    python -m daemon.main
+    python -m daemon.main           # daemon.workers uvicorn workers
     # or via uvicorn directly:
-    uvicorn daemon.main:app --host 0.0.0.0 --port 3142
+    uvicorn daemon.main:app --host 0.0.0.0 --port 3142 [--workers N]
+
+With more than one worker, the workers share a broker (daemon/broker.py) and
+only the primary runs ai_loop and the background services.
 """
 
 import asyncio
 import logging
 import sys
 import io
+import time
 from contextlib import asynccontextmanager
 
 # Force UTF-8 output on Windows (mirrors main.py)
@@ -33,13 +37,14 @@ import os
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from vault.schema import init_db
+from vault.schema import init_db, share_table_versions
 from daemon.api_routes import router
 from daemon.vault_routes import router as vault_router
 from daemon.missing_routes import router as missing_router
 from daemon.extra_routes import router as extra_router
+from daemon.metrics_routes import MetricsMiddleware, router as metrics_router
+from daemon.http_cache import CompressionMiddleware, ConditionalGetMiddleware, ImmutableStaticFiles
 
 logger = logging.getLogger("sam.daemon")
 logging.basicConfig(
@@ -51,6 +56,7 @@ logging.basicConfig(
 
 _ai_loop_task: asyncio.Task | None = None
 _bridge_task: asyncio.Task | None = None
+_agent_events_task: asyncio.Task | None = None
 _channel_manager = None
 
 
@@ -59,8 +65,9 @@ async def _run_ai_loop_headless() -> None:
     Run Sam's ai_loop in headless (no Tkinter UI) mode suitable for daemon use.
 
     The real ai_loop requires a SamUI instance for TTS/display.  In daemon mode
-    we provide a lightweight stub so the loop can still process chat messages
-    that arrive via the REST API and push responses over WebSocket.
+    we provide a lightweight stub so the loop can still run the local (voice)
+    session; REST API and channel messages are handled by per-session workers
+    (daemon/sessions.py) that push responses over WebSocket.
     """
     from daemon.ws_service import manager as ws_manager
 
@@ -102,22 +109,31 @@ async def _run_ai_loop_headless() -> None:
 
     ui = _HeadlessUI()
 
-    # Wire the HTTP chat queue into the typed_input_queue expected by ai_loop
+    # /api/chat and comms channel messages get a conversation worker per session;
+    # ai_loop keeps the local (voice) session.
     from daemon.api_routes import chat_input_queue
-    import queue as _queue_mod
+    from daemon.sessions import get_session_manager
+    from input_mux import InputMessage
 
-    # ai_loop expects a stdlib queue.Queue; we bridge from asyncio.Queue
-    typed_q: _queue_mod.Queue = _queue_mod.Queue()
-    ui.set_typed_input_queue(typed_q)
+    sessions = get_session_manager()
+    sessions.set_broadcast(ws_manager.broadcast)
 
     async def _bridge_chat_queue():
-        """Forward messages from the async HTTP queue to the sync typed queue."""
+        """Hand messages from the HTTP/channel queue to their session's worker."""
         while True:
             item = await chat_input_queue.get()
-            typed_q.put(item["message"])
+            sessions.submit(InputMessage(
+                item["message"],
+                source=item.get("source", "api"),
+                session_id=item.get("session_id") or "default",
+                message_id=item.get("message_id", ""),
+                enqueued_at=item.get("queued_at") or time.monotonic(),
+                meta={"reply_to": item["reply_to"]} if item.get("reply_to") else {},
+            ))
             # Broadcast the user message so the dashboard sees it
             await ws_manager.broadcast("chat_message", {
                 "role": "user",
+                "session_id": item.get("session_id") or "default",
                 "message_id": item.get("message_id"),
                 "content": item["message"],
             })
@@ -139,16 +155,25 @@ async def _run_ai_loop_headless() -> None:
         logger.error(f"[daemon] ai_loop crashed: {exc}", exc_info=True)
 
 
-# ── Lifespan ───────────────────────────────────────────────────────────────────
+async def _forward_agent_events() -> None:
+    """Push AgentMonitor task events (coalesced output bursts) to WebSocket clients."""
+    from agent.monitor import monitor
+    from daemon.ws_service import manager as ws_manager
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Startup: init DB + start ai_loop. Shutdown: cancel ai_loop and bridge task."""
-    global _ai_loop_task, _bridge_task
+    events = monitor.subscribe_async()
+    try:
+        while True:
+            event = await events.get()
+            await ws_manager.broadcast("agent_task", event)
+    finally:
+        monitor.unsubscribe_async(events)
 
-    # 1. Initialise the SQLite vault
-    logger.info("[daemon] Initialising SQLite vault...")
-    await init_db()
+
+# ── Lifespan ───────────────────────────────────────────────────────────────────
+
+async def _start_primary() -> None:
+    """Start what only one worker may run: ai_loop, session workers, channels, scheduler."""
+    global _ai_loop_task, _channel_manager, _agent_events_task
 
     # 2. Wire visual tool broadcast callbacks
     from daemon.ws_service import manager as ws_manager
@@ -157,31 +182,57 @@ async def lifespan(app: FastAPI):
     import actions.tools.tutorial as _tut
     import actions.tools.ui_test as _ut
     _sv.set_broadcast(ws_manager.broadcast)
+    _sv.set_stream_manager(ws_manager)
     _to.set_broadcast(ws_manager.broadcast)
     _tut.set_broadcast(ws_manager.broadcast)
     _ut.set_broadcast(ws_manager.broadcast)
     logger.info("[daemon] Visual tool broadcast callbacks wired.")
 
-    # 3. Start comms channels (Telegram, Discord) — skipped if tokens not set
-    global _channel_manager
+    # 3. Start comms channels (Telegram, Discord) — skipped if tokens not set.
+    #    Session workers send channel replies back through the manager's outboxes.
     from comms.manager import ChannelManager
     from daemon.api_routes import chat_input_queue as _cq
+    from daemon.sessions import get_session_manager
     _channel_manager = ChannelManager(_cq)
+    get_session_manager().set_reply_router(_channel_manager.deliver)
     asyncio.create_task(_channel_manager.start(), name="sam-channels")
 
-    # 4. Start Sam's ai_loop as a background task
+    # 4. Start the cron/interval scheduler for time-triggered workflows; other
+    #    workers ask for a reload over the broker after editing a workflow
+    from daemon.broker import get_broker
+    from workflows.scheduler import RELOAD_TOPIC, get_scheduler
+    from workflows.sandbox import get_sandbox
+    await get_scheduler().start()
+    get_broker().subscribe(RELOAD_TOPIC, lambda message: get_scheduler().request_reload())
+    asyncio.create_task(get_sandbox().warm(), name="sam-sandbox-warm")
+
+    # 5. Start the agent task queue, resuming tasks orphaned by an earlier process
+    from agent.task_queue import get_queue
+    await asyncio.to_thread(get_queue)
+
+    # 6. Forward agent task events to the dashboard
+    _agent_events_task = asyncio.create_task(_forward_agent_events(), name="sam-agent-events")
+
+    # 7. Start Sam's ai_loop as a background task
     logger.info("[daemon] Launching Sam ai_loop background task...")
     _ai_loop_task = asyncio.create_task(
         _run_ai_loop_headless(), name="sam-ai-loop"
     )
 
-    logger.info("[daemon] Sam daemon ready on http://0.0.0.0:3142")
-    yield  # ← server is running
 
-    # Shutdown
-    logger.info("[daemon] Shutting down...")
+async def _stop_primary() -> None:
+    from workflows.scheduler import get_scheduler
+    from workflows.sandbox import get_sandbox
     if _channel_manager:
         await _channel_manager.stop()
+    await get_scheduler().stop()
+    get_sandbox().shutdown()
+    from workflows.http import get_http_client
+    await get_http_client().close()
+    import actions.tools.screen_view as _sv
+    await _sv.stop_screen_stream()
+    if _agent_events_task and not _agent_events_task.done():
+        _agent_events_task.cancel()
     if _bridge_task and not _bridge_task.done():
         _bridge_task.cancel()
         try:
@@ -194,6 +245,55 @@ async def lifespan(app: FastAPI):
             await _ai_loop_task
         except asyncio.CancelledError:
             pass
+    from daemon.sessions import get_session_manager
+    from input_mux import get_input_mux
+    await get_session_manager().close()
+    await get_input_mux().close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: init DB, join the broker and, on the primary worker, start ai_loop
+    and the background services. Shutdown: stop them again.
+    """
+    # 0. Watch for event-loop stalls (GET /api/health/loop)
+    from daemon.loop_monitor import get_loop_monitor
+    await get_loop_monitor().start()
+
+    # 1. Initialise the SQLite vault
+    logger.info("[daemon] Initialising SQLite vault...")
+    await init_db()
+
+    # 1b. Join the other workers through the broker; one of them is the primary
+    from daemon.broker import acquire_primary, get_broker, primary_lock_path, release_primary
+    from daemon.ws_service import manager as ws_manager
+    broker = get_broker()
+    await broker.start()
+    if broker.distributed:
+        ws_manager.attach_broker(broker)
+        share_table_versions()      # ETags must see writes made through any worker
+    primary = acquire_primary(primary_lock_path())
+    if not primary and not broker.distributed:
+        logger.error("[daemon] Another daemon worker holds the primary lock; set daemon.broker.backend "
+                     "to sqlite so this worker's chat and broadcasts reach it")
+
+    if primary:
+        await _start_primary()
+        logger.info("[daemon] Sam daemon ready on http://0.0.0.0:3142")
+    else:
+        logger.info(f"[daemon] Worker {os.getpid()} ready (HTTP only; the primary worker runs ai_loop)")
+    yield  # ← server is running
+
+    # Shutdown
+    logger.info("[daemon] Shutting down...")
+    if primary:
+        await _stop_primary()
+        release_primary()
+    if broker.distributed:
+        await ws_manager.detach_broker()
+    await broker.close()
+    await get_loop_monitor().stop()
     logger.info("[daemon] Shutdown complete.")
 
 
@@ -206,6 +306,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# 304s for unchanged dashboard polls; added before CORS so CORS still wraps them
+app.add_middleware(ConditionalGetMiddleware)
+
 # CORS — allow the local React dashboard (any localhost port)
 app.add_middleware(
     CORSMiddleware,
@@ -220,19 +323,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Mount static assets from React build (must come before router to avoid catch-all conflict)
 UI_DIST = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui", "dist")
 if os.path.exists(UI_DIST):
     _assets_dir = os.path.join(UI_DIST, "assets")
     if os.path.exists(_assets_dir):
-        app.mount("/assets", StaticFiles(directory=_assets_dir), name="assets")
+        app.mount("/assets", ImmutableStaticFiles(directory=_assets_dir), name="assets")
 
 # vault_router and missing_router must be registered before the main router
 # (which has a catch-all /{full_path:path} that would swallow them otherwise)
 app.include_router(vault_router)
 app.include_router(missing_router)
 app.include_router(extra_router)
+app.include_router(metrics_router)
 app.include_router(router)
 
 
@@ -241,10 +347,13 @@ app.include_router(router)
 if __name__ == "__main__":
     import uvicorn
 
+    from config.loader import get
+
     uvicorn.run(
         "daemon.main:app",
         host="0.0.0.0",
         port=3142,
         reload=False,
         log_level="info",
+        workers=int(get("daemon", "workers", 1)),
     )
@@ -0,0 +1,132 @@
+"""
+daemon/metrics_routes.py — Prometheus scrape endpoint and HTTP latency middleware.
+
+  GET  /metrics                 — Prometheus text exposition (system/metrics.py registry)
+
+Histograms for the hot paths (LLM calls, intent dispatch, TTS, vault queries,
+workflow and background-task runs) are recorded where the work happens; this
+module adds per-route HTTP latency and, at scrape time, copies live state
+(WebSocket queues, task queue, conversation sessions, event-loop lag) into
+gauges.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from system.metrics import registry
+
+logger = logging.getLogger("sam.daemon.metrics")
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_LATENCY = registry.histogram(
+    "sam_http_request_duration_seconds", "HTTP request latency by route template", ["method", "route", "status"])
+
+WS_CLIENTS = registry.gauge("sam_ws_clients", "Connected WebSocket clients")
+WS_SLOW_CLIENTS = registry.gauge("sam_ws_slow_clients", "WebSocket clients with a backed-up send queue")
+WS_QUEUE_DEPTH = registry.gauge("sam_ws_queue_depth", "Messages waiting in WebSocket send queues", ["stat"])
+WS_EVENTS = registry.counter("sam_ws_events", "WebSocket fan-out events since start", ["event"])
+TASKS_PENDING = registry.gauge("sam_tasks_pending", "Background tasks waiting to run")
+TASKS_RUNNING = registry.gauge("sam_tasks_running", "Background tasks running", ["task_class"])
+SESSIONS_ACTIVE = registry.gauge("sam_sessions_active", "Conversation session workers alive")
+SESSIONS_LLM_IN_USE = registry.gauge("sam_sessions_llm_in_use", "Session LLM slots in use")
+LOOP_LAG = registry.gauge("sam_event_loop_lag_ms", "Daemon event-loop lag over recent heartbeats", ["quantile"])
+LOOP_STALLS = registry.counter("sam_event_loop_stalls", "Event-loop stalls over the monitor threshold")
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+# ── HTTP latency ──────────────────────────────────────────────────────────────
+
+def _route_label(scope: dict) -> str:
+    """Route template ("/api/workflows/{id}") rather than the raw path, to keep label cardinality bounded."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "other")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no response buffering, so streaming routes are unaffected)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_LATENCY.labels(scope["method"], _route_label(scope), status).observe(time.perf_counter() - start)
+
+
+# ── Scrape-time collectors ────────────────────────────────────────────────────
+# These read module singletons directly so a scrape never creates (or starts)
+# a subsystem that hasn't been used yet.
+
+def _collect_ws() -> None:
+    from daemon.ws_service import manager
+    stats = manager.stats()
+    depths = [c["depth"] for c in stats["per_client"]]
+    WS_CLIENTS.set(stats["clients"])
+    WS_SLOW_CLIENTS.set(stats["slow_clients"])
+    WS_QUEUE_DEPTH.labels("total").set(sum(depths))
+    WS_QUEUE_DEPTH.labels("max").set(max(depths, default=0))
+    for event in ("broadcasts", "dropped", "coalesced", "replayed", "slow_disconnects"):
+        WS_EVENTS.labels(event).set(stats[event])
+
+
+def _collect_tasks() -> None:
+    from agent import task_queue
+    if task_queue._queue is None:
+        return
+    stats = task_queue._queue.stats()
+    TASKS_PENDING.set(stats["pending"])
+    TASKS_RUNNING.clear()
+    for task_class, count in stats["running"].items():
+        TASKS_RUNNING.labels(task_class).set(count)
+
+
+def _collect_sessions() -> None:
+    from daemon import sessions
+    if sessions._manager is None:
+        return
+    stats = sessions._manager.stats()
+    SESSIONS_ACTIVE.set(stats["active"])
+    SESSIONS_LLM_IN_USE.set(stats["llm_in_use"])
+
+
+def _collect_loop() -> None:
+    from daemon import loop_monitor
+    if loop_monitor._monitor is None:
+        return
+    stats = loop_monitor._monitor.stats()
+    for quantile, value in stats["lag_ms"].items():
+        LOOP_LAG.labels(quantile).set(value)
+    LOOP_STALLS.set(stats["stalls"])
+
+
+for _collector in (_collect_ws, _collect_tasks, _collect_sessions, _collect_loop):
+    registry.register_collector(_collector)
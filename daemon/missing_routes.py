@@ -13,19 +13,27 @@ daemon/missing_routes.py — stub routes the React dashboard expects but were mi
   POST /api/config/tts          — save TTS config
   POST /api/config/google       — save Google integration config
   GET  /api/health              — system health (memory, uptime, DB)
+  GET  /api/health/loop         — event-loop lag, recent stalls with stacks, sync I/O sites
+  GET  /api/health/coalescing   — single-flight groups: calls executed vs coalesced/cached
+  GET  /api/traces              — slowest (or latest) turn traces with a per-phase breakdown
+  GET  /api/traces/{id}         — one trace's span tree + folded stacks (flame graph)
   GET  /api/agents              — running agent list
   POST /api/agents              — dispatch a new agent task
   GET  /api/agents/tree         — agent hierarchy tree
   GET  /api/agents/specialists  — specialist agent list
+  GET  /api/agents/plan-cache   — plan template cache hit rates
+  GET  /api/agents/queue        — background task queue stats + recent history
   GET  /api/workflows           — workflow list
   POST /api/workflows           — create workflow
   GET  /api/workflows/nodes     — node type catalog
+  GET  /api/workflows/upcoming  — next scheduled (cron/interval) runs
   POST /api/workflows/nl-chat   — NL workflow assistant
   GET  /api/workflows/{id}
   PATCH /api/workflows/{id}
   DELETE /api/workflows/{id}
   POST /api/workflows/{id}/execute
-  GET  /api/workflows/{id}/executions
+  GET  /api/workflows/{id}/executions   — paginated run history (?limit=&cursor=, X-Next-Cursor)
+  GET  /api/workflows/{id}/node-stats   — per-node timing over recent runs
   GET  /api/workflows/{id}/versions
   POST /api/workflows/{id}/versions
   GET  /api/workflows/executions/{exec_id}
@@ -33,6 +41,7 @@ daemon/missing_routes.py — stub routes the React dashboard expects but were mi
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 import time
@@ -42,11 +51,12 @@ from typing import Any, Optional
 from pathlib import Path
 
 import aiosqlite
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from vault.schema import DB_PATH
+from system.singleflight import group
+from vault.schema import DB_PATH, connect_db
 
 router = APIRouter()
 
@@ -115,9 +125,8 @@ class LLMConfigUpdate(BaseModel):
     ollama_model: Optional[str] = None
 
 
-@router.post("/api/config/llm")
-async def save_llm_config(body: LLMConfigUpdate):
-    # Persist to api_keys.json
+def _write_api_keys(updates: dict) -> None:
+    """Merge non-empty keys into config/api_keys.json (runs in a worker thread)."""
     keys_path = Path(__file__).resolve().parent.parent / "config" / "api_keys.json"
     keys: dict = {}
     if keys_path.exists():
@@ -125,16 +134,20 @@ async def save_llm_config(body: LLMConfigUpdate):
             keys = json.loads(keys_path.read_text(encoding="utf-8"))
         except Exception:
             pass
-    if body.openai_api_key:
-        keys["openai_api_key"] = body.openai_api_key
-    if body.anthropic_api_key:
-        keys["anthropic_api_key"] = body.anthropic_api_key
-    if body.groq_api_key:
-        keys["groq_api_key"] = body.groq_api_key
-    if body.gemini_api_key:
-        keys["gemini_api_key"] = body.gemini_api_key
+    keys.update({k: v for k, v in updates.items() if v})
     keys_path.parent.mkdir(parents=True, exist_ok=True)
     keys_path.write_text(json.dumps(keys, indent=2), encoding="utf-8")
+
+
+@router.post("/api/config/llm")
+async def save_llm_config(body: LLMConfigUpdate):
+    # Persist to api_keys.json
+    await asyncio.to_thread(_write_api_keys, {
+        "openai_api_key": body.openai_api_key,
+        "anthropic_api_key": body.anthropic_api_key,
+        "groq_api_key": body.groq_api_key,
+        "gemini_api_key": body.gemini_api_key,
+    })
     return {"ok": True}
 
 
@@ -146,7 +159,8 @@ class LLMTestBody(BaseModel):
 async def test_llm_config(body: LLMTestBody):
     try:
         from llm import get_ai_response
-        result = get_ai_response("Hello, respond with one word: ready")
+        # get_ai_response is a blocking HTTP call — keep it off the event loop
+        result = await asyncio.to_thread(get_ai_response, "Hello, respond with one word: ready")
         return {"ok": True, "model": body.provider, "response": result.get("text", "")}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -207,10 +221,12 @@ async def save_google_config(body: dict):
 
 # ── /api/health ────────────────────────────────────────────────────────────────
 
-@router.get("/api/health")
-async def get_health():
-    uptime = int(time.time() - _START_TIME)
+# Every open dashboard tab polls this; one sample per second serves them all
+_HEALTH_SAMPLES = group("health_sample", ttl_s=1.0)
 
+
+def _health_sample() -> dict:
+    """psutil and filesystem reads for /api/health (runs in a worker thread)."""
     # Memory (psutil preferred, fallback to sys)
     try:
         proc = psutil.Process(os.getpid())
@@ -231,14 +247,6 @@ async def get_health():
         db_connected = False
 
     return {
-        "uptime": uptime,
-        "startedAt": int((_START_TIME) * 1000),
-        "services": {
-            "llm": "running",
-            "tts": "running",
-            "stt": "running",
-            "websocket": "running",
-        },
         "memory": {
             "heapUsed": heap_used,
             "heapTotal": heap_total,
@@ -251,6 +259,80 @@ async def get_health():
     }
 
 
+@router.get("/api/health")
+async def get_health():
+    uptime = int(time.time() - _START_TIME)
+    sample = await _HEALTH_SAMPLES.do_async("sample", asyncio.to_thread, _health_sample)
+    return {
+        "uptime": uptime,
+        "startedAt": int((_START_TIME) * 1000),
+        "services": {
+            "llm": "running",
+            "tts": "running",
+            "stt": "running",
+            "websocket": "running",
+        },
+        **sample,
+    }
+
+
+@router.get("/api/health/loop")
+async def get_loop_health():
+    """Event-loop lag percentiles, recent stalls (with the blocking stack) and sync I/O sites."""
+    from daemon.loop_monitor import get_loop_monitor
+    return get_loop_monitor().stats()
+
+
+@router.get("/api/health/coalescing")
+async def get_coalescing_stats():
+    """Per single-flight group: calls that ran, joined an in-flight call, or hit the short TTL."""
+    from system import singleflight
+    return singleflight.stats()
+
+
+# ── /api/traces ────────────────────────────────────────────────────────────────
+
+@router.get("/api/traces")
+async def list_traces(limit: int = 20, order: str = "slowest", name: str = "turn", since_s: float = 0):
+    """Recorded turns, slowest first by default (?order=recent), each with ms per phase."""
+    from system import tracing
+    recorder = tracing.get_recorder()
+    since = time.time() - since_s if since_s > 0 else None
+    records = await asyncio.to_thread(recorder.query, max(1, min(limit, 200)), order, name or None, since)
+    return {
+        "stats": recorder.stats(),
+        "traces": [
+            {
+                "id": r["id"],
+                "name": r["name"],
+                "started_at": r["started_at"],
+                "duration_ms": r["duration_ms"],
+                "attrs": r["attrs"],
+                "breakdown": tracing.breakdown(r),
+            }
+            for r in records
+        ],
+    }
+
+
+@router.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    from system import tracing
+    record = await asyncio.to_thread(tracing.get_recorder().get, trace_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {
+        "id": record["id"],
+        "name": record["name"],
+        "started_at": record["started_at"],
+        "duration_ms": record["duration_ms"],
+        "attrs": record["attrs"],
+        "breakdown": tracing.breakdown(record),
+        "spans": tracing.expand(record),
+        "folded": tracing.folded(record),
+    }
+
+
 # ── /api/agents ────────────────────────────────────────────────────────────────
 
 @router.get("/api/agents")
@@ -310,10 +392,27 @@ async def list_specialists():
     }
 
 
+@router.get("/api/agents/plan-cache")
+async def get_plan_cache_stats():
+    from agent.plan_cache import plan_cache
+    return plan_cache.stats()
+
+
+@router.get("/api/agents/queue")
+async def get_task_queue_stats(limit: int = 20):
+    # Read-only: never start the queue (and resume persisted tasks) from a poll
+    from agent import task_queue
+    queue = task_queue._queue
+    if queue is None:
+        return {"workers": 0, "pending": 0, "running": {}, "class_limits": {}, "history": 0,
+                "wait_time": {}, "run_time": {}, "recent": []}
+    return {**queue.stats(), "recent": queue.history(limit=limit)}
+
+
 # ── /api/workflows ─────────────────────────────────────────────────────────────
 
 async def _get_db():
-    db = await aiosqlite.connect(str(DB_PATH))
+    db = await connect_db(DB_PATH)
     db.row_factory = aiosqlite.Row
     return db
 
@@ -322,6 +421,35 @@ def _row(r: aiosqlite.Row) -> dict:
     return dict(r)
 
 
+def _validate_definition(nodes: dict) -> None:
+    """Reject cyclic or dangling workflow graphs before they are saved."""
+    from workflows.engine import validate_definition, WorkflowValidationError
+    try:
+        validate_definition(nodes)
+    except WorkflowValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _validate_trigger(trigger_type: Optional[str], trigger_config: Optional[dict], nodes: Optional[dict]) -> None:
+    """Reject malformed cron/interval triggers before they reach the scheduler."""
+    from workflows.scheduler import parse_trigger
+    try:
+        parse_trigger(trigger_type or "manual", trigger_config or {}, nodes or {})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid trigger: {e}")
+
+
+def _reload_schedule() -> None:
+    """Let the scheduler pick up changed cron/interval triggers, on whichever worker runs it."""
+    from daemon.broker import get_broker, is_primary
+    from workflows.scheduler import RELOAD_TOPIC, get_scheduler
+    broker = get_broker()
+    if is_primary() or not broker.distributed:
+        get_scheduler().request_reload()
+    else:
+        asyncio.create_task(broker.publish(RELOAD_TOPIC, {"action": "reload"}))
+
+
 @router.get("/api/workflows")
 async def list_workflows():
     db = await _get_db()
@@ -361,6 +489,8 @@ class WorkflowCreate(BaseModel):
 @router.post("/api/workflows", status_code=201)
 async def create_workflow(body: WorkflowCreate):
     import uuid
+    _validate_definition(body.nodes)
+    _validate_trigger(body.trigger_type, body.trigger_config, body.nodes)
     db = await _get_db()
     try:
         wf_id = str(uuid.uuid4())
@@ -372,6 +502,7 @@ async def create_workflow(body: WorkflowCreate):
              json.dumps(body.nodes), "active" if body.enabled else "inactive"),
         )
         await db.commit()
+        _reload_schedule()
         return {"id": wf_id, "name": body.name, "status": "active", "created_at": now}
     finally:
         await db.close()
@@ -390,6 +521,12 @@ async def list_node_catalog():
     ]
 
 
+@router.get("/api/workflows/upcoming")
+async def upcoming_workflow_runs(limit: int = 20):
+    from workflows.scheduler import get_scheduler
+    return get_scheduler().upcoming(limit)
+
+
 class NLChatBody(BaseModel):
     message: str
     context: Optional[dict] = None
@@ -428,6 +565,9 @@ class WorkflowUpdate(BaseModel):
 
 @router.patch("/api/workflows/{workflow_id}")
 async def update_workflow(workflow_id: str, body: WorkflowUpdate):
+    if body.nodes is not None:
+        _validate_definition(body.nodes)
+    _validate_trigger(body.trigger_type, body.trigger_config, body.nodes)
     db = await _get_db()
     try:
         fields = body.model_dump(exclude_none=True)
@@ -445,6 +585,7 @@ async def update_workflow(workflow_id: str, body: WorkflowUpdate):
         values = [v for k, v in fields.items() if k != "updated_at"] + [workflow_id]
         await db.execute(f"UPDATE workflows SET {set_clause} WHERE id = ?", values)
         await db.commit()
+        _reload_schedule()
         async with db.execute("SELECT * FROM workflows WHERE id = ?", (workflow_id,)) as cur:
             row = await cur.fetchone()
         return _row(row) if row else {}
@@ -458,6 +599,7 @@ async def delete_workflow(workflow_id: str):
     try:
         await db.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
         await db.commit()
+        _reload_schedule()
     finally:
         await db.close()
 
@@ -468,8 +610,59 @@ async def execute_workflow(workflow_id: str):
 
 
 @router.get("/api/workflows/{workflow_id}/executions")
-async def list_executions(workflow_id: str):
-    return []
+async def list_executions(workflow_id: str, response: Response, limit: int = 20,
+                          cursor: Optional[str] = None, before: Optional[int] = None):
+    """
+    Newest runs first. A full page sets X-Next-Cursor ("<started_at>:<id>" of
+    its last row); pass it back as `cursor` for the next page. Keying on
+    (started_at, id) keeps runs that share a timestamp from being skipped.
+    `before` (a bare started_at) is still accepted for older clients.
+    """
+    limit = max(1, min(limit, 200))
+    sql, params = "SELECT * FROM workflow_runs WHERE workflow_id = ?", [workflow_id]
+    if cursor:
+        started_at, _, run_id = cursor.partition(":")
+        if not started_at.lstrip("-").isdigit() or not run_id:
+            raise HTTPException(400, "cursor must be '<started_at>:<id>'")
+        sql += " AND (started_at, id) < (?, ?)"
+        params += [int(started_at), run_id]
+    elif before is not None:
+        sql += " AND started_at < ?"
+        params.append(before)
+    db = await _get_db()
+    try:
+        async with db.execute(sql + " ORDER BY started_at DESC, id DESC LIMIT ?", params + [limit]) as cur:
+            rows = [_row(r) for r in await cur.fetchall()]
+    finally:
+        await db.close()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = f"{rows[-1]['started_at']}:{rows[-1]['id']}"
+    return rows
+
+
+@router.get("/api/workflows/{workflow_id}/node-stats")
+async def workflow_node_stats(workflow_id: str, runs: int = 50):
+    """Per-node timing over the last `runs` executions, slowest first."""
+    db = await _get_db()
+    try:
+        async with db.execute(
+            """SELECT node_id, node_type,
+                      COUNT(*)                                           AS runs,
+                      ROUND(AVG(duration_ms))                            AS avg_ms,
+                      MAX(duration_ms)                                   AS max_ms,
+                      SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) AS failures,
+                      SUM(retry_count)                                   AS retries
+               FROM workflow_node_runs
+               WHERE run_id IN (SELECT id FROM workflow_runs WHERE workflow_id = ?
+                                ORDER BY started_at DESC LIMIT ?)
+               GROUP BY node_id, node_type
+               ORDER BY avg_ms DESC""",
+            (workflow_id, max(1, min(runs, 500))),
+        ) as cur:
+            rows = await cur.fetchall()
+        return [_row(r) for r in rows]
+    finally:
+        await db.close()
 
 
 @router.get("/api/workflows/{workflow_id}/versions")
@@ -484,4 +677,17 @@ async def save_version(workflow_id: str, body: dict):
 
 @router.get("/api/workflows/executions/{exec_id}")
 async def get_execution(exec_id: str):
-    return {"id": exec_id, "status": "completed", "output": {}}
+    db = await _get_db()
+    try:
+        async with db.execute("SELECT * FROM workflow_runs WHERE id = ?", (exec_id,)) as cur:
+            run = await cur.fetchone()
+        if not run:
+            raise HTTPException(status_code=404, detail="Execution not found")
+        async with db.execute(
+            "SELECT * FROM workflow_node_runs WHERE run_id = ? ORDER BY started_at IS NULL, started_at",
+            (exec_id,),
+        ) as cur:
+            steps = await cur.fetchall()
+        return {"execution": _row(run), "steps": [_row(s) for s in steps]}
+    finally:
+        await db.close()
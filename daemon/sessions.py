@@ -0,0 +1,343 @@
+"""
+daemon/sessions.py — per-session conversation workers for the daemon.
+
+ai_loop owns the local session (microphone, speaker, Tk UI). Messages that
+arrive over /api/chat or a comms channel belong to a session id instead
+("default", a dashboard tab's id, "telegram:<user>", …) and each active
+session gets a lightweight worker of its own, so a slow request in one
+session no longer holds up replies in the others:
+
+  - each worker has its own inbox (an InputMux, so per-source wait times are
+    tracked) and its own TemporaryMemory for short-term history and pending
+    intents; messages within a session are handled in order
+  - all workers share one LLM concurrency cap
+  - intent handlers that act on this machine were written for a single
+    caller, so non-chat intents run one at a time under a shared lock.
+    Most handlers start a TracedThread and return at once; the lock is held
+    until those threads finish too (system.tracing.collect_threads), or for
+    at most action_timeout_s, after which the next action may start while a
+    long-running one carries on. Plain chat replies never wait for the lock
+  - a worker that has been idle for idle_timeout_s exits and is dropped
+
+Replies are broadcast as chat_message events tagged with the session id.
+A message from a comms channel also carries meta["reply_to"] (channel and
+chat id); replies to it are handed to the reply router as well, which sends
+them back to that chat (ChannelManager.deliver).
+
+Usage:
+    from daemon.sessions import get_session_manager
+    sessions = get_session_manager()
+    sessions.set_broadcast(ws_manager.broadcast)
+    sessions.set_reply_router(channel_manager.deliver)
+    sessions.submit(InputMessage("hi", source="telegram", session_id="telegram:42",
+                                 meta={"reply_to": {"channel": "telegram", "chat_id": 42}}))
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from input_mux import InputMessage, InputMux
+from system import tracing
+
+logger = logging.getLogger("sam.daemon.sessions")
+
+DEFAULT_LLM_CONCURRENCY = 4
+DEFAULT_IDLE_TIMEOUT_S = 600.0
+DEFAULT_HISTORY = 10
+DEFAULT_ACTION_TIMEOUT_S = 120.0
+PROMPT_HISTORY_LINES = 5      # same window ai_loop sends with each prompt
+CHAT_INTENTS = {"chat"}
+
+_REPLY_PREFIXES = ("AI:", "SAM:", "Sam:", "AI (silent):", "AI (notify):")
+
+
+class SessionUI:
+    """
+    UI stand-in handed to intent handlers for a remote session: spoken or
+    logged replies are forwarded to the session, everything else is a no-op.
+    Handlers call it from worker threads.
+    """
+
+    def __init__(self, worker: "SessionWorker", loop: asyncio.AbstractEventLoop) -> None:
+        self._worker = worker
+        self._loop = loop
+
+    def write_log(self, text: str) -> None:
+        for prefix in _REPLY_PREFIXES:
+            if text.startswith(prefix):
+                text = text[len(prefix):].strip()
+                asyncio.run_coroutine_threadsafe(self._worker.reply(text), self._loop)
+                return
+        logger.info(f"[{self._worker.session_id}] {text}")
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class SessionWorker:
+    def __init__(self, manager: "SessionManager", session_id: str, source: str) -> None:
+        from memory.temporary_memory import TemporaryMemory
+        self.session_id = session_id
+        self.source = source
+        self.memory = TemporaryMemory(max_history=manager.max_history)
+        self.inbox = InputMux()
+        self.inbox.bind()
+        self.handled = 0
+        self.busy = False
+        self.last_active = time.monotonic()
+        self.reply_to: Optional[dict] = None      # chat the message being handled came from
+        self._manager = manager
+        self.task = asyncio.create_task(self._run(), name=f"sam-session-{session_id}")
+
+    async def reply(self, text: str) -> None:
+        if text:
+            await self._manager.publish(self, text)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                msg = await asyncio.wait_for(self.inbox.get(), self._manager.idle_timeout_s)
+            except asyncio.TimeoutError:
+                if self.inbox.pending():
+                    continue
+                self._manager._evict(self)
+                return
+            self.busy = True
+            self.reply_to = msg.meta.get("reply_to")
+            turn = tracing.start("turn", source=msg.source, session=self.session_id)
+            turn.add_span("input_queue", msg.waited_ms / 1000)
+            try:
+                await self._handle(msg)
+            except Exception as e:
+                logger.error(f"[Sessions] {self.session_id} failed on message: {e}", exc_info=True)
+                turn.tag(error=type(e).__name__)
+                await self.reply(f"Something went wrong: {e}")
+            finally:
+                turn.finish()
+                self.busy = False
+                self.handled += 1
+                self.last_active = time.monotonic()
+
+    async def _handle(self, msg: InputMessage) -> None:
+        from memory.memory_manager import load_memory, update_memory, memory_for_prompt
+        memory = self.memory
+        user_text = msg.text
+
+        if memory.get_current_question():
+            memory.update_parameters({memory.get_current_question(): user_text})
+            memory.clear_current_question()
+            user_text = memory.get_last_user_text()
+        memory.set_last_user_text(user_text)
+
+        with tracing.span("load_memory"):
+            prompt = memory_for_prompt(await asyncio.to_thread(load_memory))
+        recent = "\n".join(memory.get_history_for_prompt().split("\n")[-PROMPT_HISTORY_LINES:])
+        if recent:
+            prompt["recent_conversation"] = recent
+        if memory.has_pending_intent():
+            prompt["_pending_intent"] = memory.pending_intent
+            prompt["_collected_params"] = str(memory.get_parameters())
+
+        with tracing.span("llm"):    # includes any wait for a free LLM slot
+            async with self._manager.llm_slot():
+                output = await asyncio.to_thread(self._manager.respond, user_text, prompt)
+
+        intent = output.get("intent", "chat")
+        tracing.current().tag(intent=intent)
+        response = output.get("text")
+        if isinstance(output.get("memory_update"), dict):
+            await asyncio.to_thread(update_memory, output["memory_update"])
+        memory.set_last_ai_response(response)
+
+        if intent in CHAT_INTENTS:
+            await self.reply(response or "")
+            return
+        ui = SessionUI(self, asyncio.get_running_loop())
+        async with self._manager.action_lock:
+            await asyncio.to_thread(self._manager.run_action, intent, output.get("parameters", {}),
+                                    response, ui, memory)
+
+
+def _default_respond(user_text: str, memory_block: dict) -> dict:
+    from llm import get_ai_response
+    return get_ai_response(user_text=user_text, memory_block=memory_block)
+
+
+def _default_act(intent: str, parameters: dict, response, ui, memory) -> None:
+    from intents import handle_intent
+    import main as _sam
+    handle_intent(
+        intent=intent,
+        parameters=parameters,
+        response=response,
+        ui=ui,
+        temp_memory=memory,
+        whatsapp_engine=_sam.whatsapp_engine,
+        whatsapp_assistant=_sam.whatsapp_assistant,
+        watcher=_sam.watcher,
+        reminder_engine=_sam.reminder_engine,
+        terminal_runner=_sam.terminal_runner,
+    )
+
+
+class SessionManager:
+    def __init__(
+        self,
+        respond: Callable[[str, dict], dict] = _default_respond,
+        act: Callable = _default_act,
+        llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+        idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S,
+        max_history: int = DEFAULT_HISTORY,
+        action_timeout_s: float = DEFAULT_ACTION_TIMEOUT_S,
+    ) -> None:
+        self.respond = respond
+        self.act = act
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.idle_timeout_s = idle_timeout_s
+        self.max_history = max_history
+        self.action_timeout_s = action_timeout_s
+        self._workers: Dict[str, SessionWorker] = {}
+        self._llm_slots: Optional[asyncio.Semaphore] = None
+        self._llm_in_use = 0
+        self._action_lock: Optional[asyncio.Lock] = None
+        self._broadcast: Optional[Callable[[str, dict], Awaitable]] = None
+        self._reply_router: Optional[Callable[[dict, str], Awaitable]] = None
+        self._evicted = 0
+
+    def set_broadcast(self, fn: Callable[[str, dict], Awaitable]) -> None:
+        self._broadcast = fn
+
+    def set_reply_router(self, fn: Callable[[dict, str], Awaitable]) -> None:
+        """fn(reply_to, text) sends a reply back to the channel chat a message came from."""
+        self._reply_router = fn
+
+    # ── Shared limits ─────────────────────────────────────────────────────────
+
+    @property
+    def action_lock(self) -> asyncio.Lock:
+        if self._action_lock is None:
+            self._action_lock = asyncio.Lock()
+        return self._action_lock
+
+    def run_action(self, intent: str, parameters: dict, response, ui, memory) -> None:
+        """Run an intent handler (worker thread) and wait for the action threads it started."""
+        with tracing.collect_threads() as threads:
+            self.act(intent, parameters, response, ui, memory)
+        deadline = time.monotonic() + self.action_timeout_s
+        i = 0
+        while i < len(threads):          # joined threads may have started more
+            threads[i].join(max(0.0, deadline - time.monotonic()))
+            if threads[i].is_alive():
+                logger.warning(f"[Sessions] '{intent}' still running after {self.action_timeout_s:.0f}s; "
+                               "releasing the action lock")
+                return
+            i += 1
+
+    def llm_slot(self) -> "_LLMSlot":
+        if self._llm_slots is None:
+            self._llm_slots = asyncio.Semaphore(self.llm_concurrency)
+        return _LLMSlot(self)
+
+    # ── Sessions ──────────────────────────────────────────────────────────────
+
+    def submit(self, msg: InputMessage) -> SessionWorker:
+        """Queue msg on its session's worker, starting one if the session is idle."""
+        worker = self._workers.get(msg.session_id)
+        if worker is None or worker.task.done():
+            worker = self._workers[msg.session_id] = SessionWorker(self, msg.session_id, msg.source)
+        worker.inbox.put_message(msg)
+        return worker
+
+    def _evict(self, worker: SessionWorker) -> None:
+        if self._workers.get(worker.session_id) is worker:
+            del self._workers[worker.session_id]
+            self._evicted += 1
+            logger.info(f"[Sessions] evicted idle session {worker.session_id}")
+
+    async def publish(self, worker: SessionWorker, text: str) -> None:
+        if worker.reply_to and self._reply_router is not None:
+            try:
+                await self._reply_router(worker.reply_to, text)
+            except Exception as e:
+                logger.warning(f"[Sessions] {worker.session_id}: reply routing failed: {e}")
+        if self._broadcast is None:
+            logger.info(f"[{worker.session_id}] Sam: {text}")
+            return
+        await self._broadcast("chat_message", {
+            "role": "assistant",
+            "session_id": worker.session_id,
+            "source": worker.source,
+            "content": text,
+        })
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        self._workers.clear()
+        for worker in workers:
+            worker.task.cancel()
+        for worker in workers:
+            try:
+                await worker.task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "active": len(self._workers),
+            "evicted": self._evicted,
+            "llm_in_use": self._llm_in_use,
+            "llm_concurrency": self.llm_concurrency,
+            "sessions": {
+                sid: {
+                    "source": w.source,
+                    "busy": w.busy,
+                    "pending": w.inbox.pending(),
+                    "handled": w.handled,
+                    "idle_s": 0.0 if w.busy else round(now - w.last_active, 1),
+                    "wait": w.inbox.stats()["sources"],
+                }
+                for sid, w in self._workers.items()
+            },
+        }
+
+
+class _LLMSlot:
+    """async-with guard on the shared LLM semaphore that also counts slots in use."""
+
+    def __init__(self, manager: SessionManager) -> None:
+        self._manager = manager
+
+    async def __aenter__(self) -> None:
+        await self._manager._llm_slots.acquire()
+        self._manager._llm_in_use += 1
+
+    async def __aexit__(self, *exc) -> None:
+        self._manager._llm_in_use -= 1
+        self._manager._llm_slots.release()
+
+
+def _manager_from_config() -> SessionManager:
+    try:
+        from config.loader import get
+        cfg = get("daemon", "sessions", {}) or {}
+    except Exception:
+        cfg = {}
+    return SessionManager(
+        llm_concurrency=int(cfg.get("llm_concurrency", DEFAULT_LLM_CONCURRENCY)),
+        idle_timeout_s=float(cfg.get("idle_timeout_s", DEFAULT_IDLE_TIMEOUT_S)),
+        max_history=int(cfg.get("history", DEFAULT_HISTORY)),
+        action_timeout_s=float(cfg.get("action_timeout_s", DEFAULT_ACTION_TIMEOUT_S)),
+    )
+
+
+_manager: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    global _manager
+    if _manager is None:
+        _manager = _manager_from_config()
+    return _manager
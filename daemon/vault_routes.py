@@ -25,15 +25,22 @@ import aiosqlite
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from vault.schema import DB_PATH
+from system.singleflight import group
+from vault.schema import DB_PATH, connect_db, table_versions
 
 router = APIRouter()
 
+# Knowledge-graph reads: a dashboard reconnect fires the same ones from every
+# tab at once. Keys include the tables' write versions, so a cached result
+# never outlives a write made through the daemon.
+_LOOKUPS = group("vault_lookup", ttl_s=2.0)
+_GRAPH_TABLES = ("entities", "facts", "relationships")
+
 
 # ── DB helpers ─────────────────────────────────────────────────────────────────
 
 async def _get_db() -> aiosqlite.Connection:
-    db = await aiosqlite.connect(str(DB_PATH))
+    db = await connect_db(DB_PATH)
     db.row_factory = aiosqlite.Row
     await db.execute("PRAGMA journal_mode=WAL")
     await db.execute("PRAGMA foreign_keys=ON")
@@ -265,6 +272,11 @@ async def delete_commitment(commitment_id: str):
 
 @router.get("/api/vault/entities")
 async def list_entities(type: str = "", q: str = "", limit: int = 100):
+    key = ("entities", type, q, limit, table_versions("entities"))
+    return await _LOOKUPS.do_async(key, _query_entities, type, q, limit)
+
+
+async def _query_entities(type: str, q: str, limit: int) -> list:
     db = await _get_db()
     try:
         filters, params = [], []
@@ -287,6 +299,11 @@ async def list_entities(type: str = "", q: str = "", limit: int = 100):
 
 @router.get("/api/vault/entities/{entity_id}/facts")
 async def get_entity_facts(entity_id: int):
+    key = ("facts", entity_id, table_versions("facts"))
+    return await _LOOKUPS.do_async(key, _query_entity_facts, entity_id)
+
+
+async def _query_entity_facts(entity_id: int) -> list:
     db = await _get_db()
     try:
         async with db.execute(
@@ -301,6 +318,11 @@ async def get_entity_facts(entity_id: int):
 
 @router.get("/api/vault/entities/{entity_id}/relationships")
 async def get_entity_relationships(entity_id: int):
+    key = ("relationships", entity_id, table_versions("entities", "relationships"))
+    return await _LOOKUPS.do_async(key, _query_entity_relationships, entity_id)
+
+
+async def _query_entity_relationships(entity_id: int) -> list:
     db = await _get_db()
     try:
         async with db.execute(
@@ -323,6 +345,11 @@ async def get_entity_relationships(entity_id: int):
 
 @router.get("/api/vault/search")
 async def search_vault(q: str = "", type: str = "", limit: int = 100):
+    key = ("search", q, type, limit, table_versions(*_GRAPH_TABLES))
+    return await _LOOKUPS.do_async(key, _search_profiles, q, type, limit)
+
+
+async def _search_profiles(q: str, type: str, limit: int) -> list:
     db = await _get_db()
     try:
         filters, params = [], []
@@ -4,13 +4,48 @@ daemon/ws_service.py — WebSocket broadcast manager for Sam's daemon.
 Maintains connected clients and fans out typed events to all of them.
 Supported event types:
   chat_message, task_event, screen_view, takeover_event,
-  tutorial_step, test_result, system_status
+  tutorial_step, test_result, system_status, agent_task
+
+Each client has its own bounded outbound queue drained by a writer task, so
+broadcast() serializes once, enqueues, and returns without awaiting any
+socket. What happens when a client's queue is full depends on the topic:
+  latest    — only the newest pending message is kept (screen frames, status)
+  drop      — the message may be dropped for a slow client
+  reliable  — never dropped; a client too slow to take it is disconnected
+              (it reconnects and catches up)
+
+Topics and replay: every broadcast carries a per-topic "seq". Recent messages
+of each topic are kept in a ring buffer. Clients receive every topic until
+they subscribe; after that only the topics they asked for:
+
+  → {"action": "subscribe", "topics": ["chat_message"], "since": {"chat_message": 41}, "epoch": "..."}
+  ← {"type": "subscribed", "payload": {"topics": [...], "seq": {"chat_message": 57}, "epoch": "..."}}
+  ← buffered chat_message events with seq 42..57, then live events
+  → {"action": "unsubscribe", "topics": ["screen_view"]}
+
+"*" subscribes to every topic except the binary "screen_frame" stream
+(actions/tools/screen_stream.py), which must be named explicitly. If "since" is older than the buffer (or the
+epoch shows the daemon restarted), the client gets
+{"type": "replay_gap", "payload": {"topic", "first_seq"}} and should refetch
+that state over REST.
+
+With several daemon workers, attach_broker() also forwards broadcasts to the
+other workers over the broker's "ws" topic (daemon/broker.py), and each worker
+delivers what it receives to its own clients. broadcast() still delivers to
+this worker's clients at once; the forwarding happens on a relay task that
+sends whatever has piled up as one batch. The relay is bounded: "latest"
+topics keep only their newest event, and when it is full the oldest events
+are dropped. Screen views and frames are never relayed — like the binary
+stream, they only reach clients of the worker that captures them.
 """
 
 import asyncio
+import itertools
 import json
 import logging
-from typing import Set
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional, Set, Union
 
 from fastapi import WebSocket
 
@@ -24,34 +59,185 @@ SUPPORTED_EVENT_TYPES = {
     "tutorial_step",
     "test_result",
     "system_status",
+    "agent_task",
+}
+
+TOPIC_POLICIES = {
+    "screen_view": "latest",
+    "system_status": "latest",
+    "agent_task": "drop",
+    "test_result": "drop",
+    "chat_message": "reliable",
+    "task_event": "reliable",
+    "takeover_event": "reliable",
+    "tutorial_step": "reliable",
+    "screen_frame": "reliable",     # delta frames; the streamer throttles by queue depth instead
 }
+DEFAULT_POLICY = "drop"
+
+# Topics a client only receives when it subscribes to them by name.
+EXPLICIT_TOPICS = {"screen_frame"}
+
+REPLAY_SIZES = {
+    "screen_view": 1,
+    "system_status": 1,
+    "chat_message": 200,
+    "task_event": 200,
+    "agent_task": 500,
+}
+DEFAULT_REPLAY_SIZE = 100
+
+BROKER_TOPIC = "ws"
+LOCAL_ONLY_TOPICS = {"screen_view", "screen_frame"}     # too large and too frequent for the broker
+RELAY_MAX = 512          # events waiting to be forwarded to the other workers
+
+MAX_QUEUE = 256          # pending messages per client
+SEND_TIMEOUT_S = 10.0    # a single send taking longer than this marks the client dead
+SLOW_DEPTH = 32          # queue depth at which a client counts as slow
+
+Message = Union[str, bytes]
+
+
+class _Client:
+    """One connection: bounded outbound queue plus the task that drains it."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, ws: WebSocket, max_queue: int) -> None:
+        self.id = next(self._ids)
+        self.ws = ws
+        self.max_queue = max_queue
+        # Entries are (topic, message, reliable); message is None for a "latest"
+        # slot whose current value lives in _latest[topic].
+        self._queue: deque = deque()
+        self._latest: Dict[str, Message] = {}
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.topics: Optional[Set[str]] = None      # None = every topic
+        self.writer: Optional[asyncio.Task] = None
+
+    def wants(self, topic: str) -> bool:
+        if self.topics is None:
+            return topic not in EXPLICIT_TOPICS
+        return topic in self.topics
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, topic: str, message: Message, policy: str) -> bool:
+        """Queue a message without blocking. Returns False if the client must be dropped."""
+        if self.closed:
+            return True
+        if policy == "latest" and topic in self._latest:
+            self._latest[topic] = message
+            self.coalesced += 1
+            return True
+        if len(self._queue) >= self.max_queue and not self._make_room():
+            if policy == "reliable":
+                return False
+            self.dropped += 1
+            return True
+        if policy == "latest":
+            self._latest[topic] = message
+            self._queue.append((topic, None, False))
+        else:
+            self._queue.append((topic, message, policy == "reliable"))
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+        return True
+
+    def _make_room(self) -> bool:
+        """Drop the oldest droppable entry. False if everything pending is reliable."""
+        for i, (topic, message, reliable) in enumerate(self._queue):
+            if not reliable:
+                del self._queue[i]
+                if message is None:
+                    self._latest.pop(topic, None)
+                self.dropped += 1
+                return True
+        return False
+
+    def _pop(self) -> Message:
+        topic, message, _ = self._queue.popleft()
+        return self._latest.pop(topic) if message is None else message
+
+    async def run(self, on_dead) -> None:
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                message = self._pop()
+                send = self.ws.send_bytes if isinstance(message, bytes) else self.ws.send_text
+                await asyncio.wait_for(send(message), timeout=SEND_TIMEOUT_S)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.debug(f"[WS] Send to client {self.id} failed ({exc}); removing client.")
+            await on_dead(self)
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "slow": self.depth >= SLOW_DEPTH,
+            "topics": sorted(self.topics) if self.topics is not None else ["*"],
+            "connected_s": int(time.time() - self.connected_at),
+        }
 
 
 class WebSocketManager:
-    """Thread-safe manager that broadcasts events to all connected WebSocket clients."""
+    """Broadcasts events to all connected WebSocket clients through per-client queues."""
 
-    def __init__(self) -> None:
-        self._clients: Set[WebSocket] = set()
+    def __init__(self, max_queue: int = MAX_QUEUE) -> None:
+        self._clients: Dict[WebSocket, _Client] = {}
         self._lock = asyncio.Lock()
+        self._max_queue = max_queue
+        self._totals = {"broadcasts": 0, "slow_disconnects": 0, "dropped": 0, "coalesced": 0, "replayed": 0,
+                        "relayed": 0, "relay_dropped": 0, "relay_coalesced": 0}
+        self._seq: Dict[str, int] = {}
+        self._epoch = f"{int(time.time() * 1000):x}"     # seqs restart when the daemon does
+        self._replay: Dict[str, deque] = {}
+        self._broker = None
+        self._relay_queue: deque = deque()
+        self._relay_latest: Dict[str, dict] = {}
+        self._relay_ready = asyncio.Event()
+        self._relay_task: Optional[asyncio.Task] = None
 
     async def connect(self, ws: WebSocket) -> None:
         """Accept and register a new WebSocket client."""
         await ws.accept()
+        client = _Client(ws, self._max_queue)
+        client.writer = asyncio.create_task(client.run(self._on_dead), name=f"ws-writer-{client.id}")
         async with self._lock:
-            self._clients.add(ws)
+            self._clients[ws] = client
         logger.info(f"[WS] Client connected. Total: {len(self._clients)}")
 
     async def disconnect(self, ws: WebSocket) -> None:
         """Remove a WebSocket client (called after close or error)."""
         async with self._lock:
-            self._clients.discard(ws)
+            client = self._clients.pop(ws, None)
+        if client is None:
+            return
+        self._retire(client)
         logger.info(f"[WS] Client disconnected. Total: {len(self._clients)}")
 
     async def broadcast(self, event_type: str, payload: dict) -> None:
         """
-        Send a JSON event to every connected client.
+        Queue a JSON event for every connected client; never waits on a socket.
 
-        Silently drops clients that have disconnected mid-flight.
         Logs a warning for unknown event types but sends anyway.
         """
         if event_type not in SUPPORTED_EVENT_TYPES:
@@ -59,26 +245,240 @@ class WebSocketManager:
                 f"[WS] Unknown event type '{event_type}'. "
                 f"Supported: {sorted(SUPPORTED_EVENT_TYPES)}"
             )
+        event = {"type": event_type, "payload": payload}
+        self._deliver(event)
+        if self._broker is not None and event_type not in LOCAL_ONLY_TOPICS:
+            self._relay(event)
 
-        message = json.dumps({"type": event_type, "payload": payload})
+    def attach_broker(self, broker) -> None:
+        """Share broadcasts with the other workers through a broker (daemon/broker.py)."""
+        self._broker = broker
+        broker.subscribe(BROKER_TOPIC, self._deliver)
 
-        async with self._lock:
-            dead: Set[WebSocket] = set()
-            for client in self._clients:
-                try:
-                    await client.send_text(message)
-                except Exception as exc:
-                    logger.debug(f"[WS] Send failed ({exc}); removing client.")
-                    dead.add(client)
-            self._clients -= dead
-
-        if dead:
-            logger.info(f"[WS] Removed {len(dead)} dead client(s). Total: {len(self._clients)}")
+    async def detach_broker(self) -> None:
+        """Forward what is still pending and stop the relay task."""
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            try:
+                await self._relay_task
+            except asyncio.CancelledError:
+                pass
+            self._relay_task = None
+        if self._broker is not None:
+            await self._forward()
+            self._broker = None
+
+    def _relay(self, event: dict) -> None:
+        event_type = event["type"]
+        if TOPIC_POLICIES.get(event_type) == "latest":
+            if event_type in self._relay_latest:
+                self._totals["relay_coalesced"] += 1
+            self._relay_latest[event_type] = event
+        else:
+            if len(self._relay_queue) >= RELAY_MAX:
+                self._relay_queue.popleft()
+                self._totals["relay_dropped"] += 1
+            self._relay_queue.append(event)
+        self._relay_ready.set()
+        if self._relay_task is None or self._relay_task.done():
+            self._relay_task = asyncio.create_task(self._relay_loop(), name="ws-broker-relay")
+
+    async def _relay_loop(self) -> None:
+        while True:
+            await self._relay_ready.wait()
+            self._relay_ready.clear()
+            await self._forward()       # events broadcast meanwhile go out as the next batch
+
+    async def _forward(self) -> None:
+        batch = [*self._relay_queue, *self._relay_latest.values()]
+        self._relay_queue.clear()
+        self._relay_latest.clear()
+        if not batch:
+            return
+        try:
+            await self._broker.publish_remote(BROKER_TOPIC, batch)
+            self._totals["relayed"] += len(batch)
+        except Exception as e:
+            self._totals["relay_dropped"] += len(batch)
+            logger.warning(f"[WS] Could not forward {len(batch)} event(s) to the other workers: {e}")
+
+    def _deliver(self, event: dict) -> None:
+        # Seqs are per worker: a client only ever sees the seqs of the worker it is connected to
+        event_type = event["type"]
+        seq = self._seq.get(event_type, 0) + 1
+        self._seq[event_type] = seq
+        self.publish(event_type, json.dumps({"type": event_type, "seq": seq, "payload": event["payload"]}), seq)
+
+    async def send(self, ws: WebSocket, event_type: str, payload: dict) -> None:
+        """Queue an event for one client (keeps all writes to a socket on its writer task)."""
+        client = self._clients.get(ws)
+        if client is not None:
+            client.enqueue(event_type, json.dumps({"type": event_type, "payload": payload}), "reliable")
+
+    def subscribers(self, topic: str) -> Dict[WebSocket, int]:
+        """Clients that want a topic, with their current send-queue depth."""
+        return {ws: c.depth for ws, c in self._clients.items() if c.wants(topic)}
+
+    def send_binary(self, ws: WebSocket, topic: str, data: bytes) -> bool:
+        """Queue a binary message for one client. False if the client was gone or too slow."""
+        client = self._clients.get(ws)
+        if client is None:
+            return False
+        if not client.enqueue(topic, data, TOPIC_POLICIES.get(topic, DEFAULT_POLICY)):
+            logger.warning(f"[WS] Client {client.id} too slow for '{topic}' (queue full); disconnecting.")
+            self._totals["slow_disconnects"] += 1
+            self._drop(client)
+            return False
+        return True
+
+    def publish(self, topic: str, message: Message, seq: Optional[int] = None) -> None:
+        """Enqueue an already-serialized message (text or binary) for every subscribed client."""
+        self._totals["broadcasts"] += 1
+        if seq is not None:
+            ring = self._replay.get(topic)
+            if ring is None:
+                ring = self._replay[topic] = deque(maxlen=REPLAY_SIZES.get(topic, DEFAULT_REPLAY_SIZE))
+            ring.append((seq, message))
+        policy = TOPIC_POLICIES.get(topic, DEFAULT_POLICY)
+        for client in list(self._clients.values()):
+            if client.wants(topic) and not client.enqueue(topic, message, policy):
+                logger.warning(f"[WS] Client {client.id} too slow for '{topic}' (queue full); disconnecting.")
+                self._totals["slow_disconnects"] += 1
+                self._drop(client)
+
+    # ── Subscriptions ─────────────────────────────────────────────────────────
+
+    async def handle_client_message(self, ws: WebSocket, text: str) -> None:
+        """Apply a subscribe/unsubscribe request sent by a client; anything else is ignored."""
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return
+        action = msg.get("action")
+        topics = msg.get("topics") or []
+        if isinstance(topics, str):
+            topics = [topics]
+        if action == "subscribe":
+            since = msg.get("since") or {}
+            if msg.get("epoch") and msg["epoch"] != self._epoch:
+                since = {topic: 0 for topic in since}      # seqs are from a previous daemon run
+            try:
+                self.subscribe(ws, topics, since)
+            except (TypeError, ValueError) as exc:
+                logger.debug(f"[WS] Bad subscribe request ignored: {exc}")
+        elif action == "unsubscribe":
+            self.unsubscribe(ws, topics)
+
+    def subscribe(self, ws: WebSocket, topics: Iterable[str], since: Optional[dict] = None) -> None:
+        """
+        Add topics to a client's filter and replay buffered messages newer than
+        since[topic]. Topics without a "since" entry get no replay.
+        """
+        client = self._clients.get(ws)
+        if client is None:
+            return
+        topics = [str(t) for t in topics]
+        since = since or {}
+        if "*" in topics:
+            explicit = EXPLICIT_TOPICS & set(topics)
+            client.topics = (SUPPORTED_EVENT_TYPES | set(self._seq) | explicit) if explicit else None
+            topics = sorted(set(self._replay) | set(since))
+        elif client.topics is None:
+            client.topics = set(topics)
+        else:
+            client.topics.update(topics)
+
+        wanted = [t for t in topics if t in since]
+        # Replay must fit in the client's queue; each topic gets an equal share.
+        share = max(client.max_queue - client.depth - len(wanted) - 1, 0) // max(len(wanted), 1)
+        backlog = []
+        gaps = []
+        for topic in wanted:
+            last_seen = int(since[topic])
+            missed = [(seq, m) for seq, m in self._replay.get(topic, ()) if seq > last_seen]
+            if len(missed) > share:
+                missed = missed[len(missed) - share:] if share else []
+            first = missed[0][0] if missed else self._seq.get(topic, 0) + 1
+            if first > last_seen + 1:
+                gaps.append({"topic": topic, "first_seq": first})
+            backlog.extend((topic, m) for _, m in missed)
+
+        ack = {"topics": sorted(client.topics) if client.topics is not None else ["*"],
+               "seq": {t: self._seq.get(t, 0) for t in topics}, "epoch": self._epoch}
+        client.enqueue("subscribed", json.dumps({"type": "subscribed", "payload": ack}), "reliable")
+        for gap in gaps:
+            client.enqueue("replay_gap", json.dumps({"type": "replay_gap", "payload": gap}), "reliable")
+        for topic, message in backlog:
+            client.enqueue(topic, message, "reliable")
+        self._totals["replayed"] += len(backlog)
+
+    def unsubscribe(self, ws: WebSocket, topics: Iterable[str]) -> None:
+        client = self._clients.get(ws)
+        if client is None:
+            return
+        topics = set(topics)
+        if "*" in topics:
+            client.topics = set()
+        elif client.topics is None:
+            client.topics = (SUPPORTED_EVENT_TYPES | set(self._seq)) - topics
+        else:
+            client.topics -= topics
+
+    # ── Stats / internals ─────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        clients = [c.stats() for c in self._clients.values()]
+        return {
+            **self._totals,
+            "dropped": self._totals["dropped"] + sum(c["dropped"] for c in clients),
+            "coalesced": self._totals["coalesced"] + sum(c["coalesced"] for c in clients),
+            "relay_pending": len(self._relay_queue) + len(self._relay_latest),
+            "clients": len(clients),
+            "slow_clients": sum(1 for c in clients if c["slow"]),
+            "per_client": clients,
+        }
+
+    def _drop(self, client: _Client) -> None:
+        if self._clients.get(client.ws) is client:
+            del self._clients[client.ws]
+        self._retire(client)
+        asyncio.ensure_future(self._close_quietly(client.ws))
+
+    def _retire(self, client: _Client) -> None:
+        if client.closed:
+            return
+        client.closed = True
+        self._totals["dropped"] += client.dropped
+        self._totals["coalesced"] += client.coalesced
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+    async def _on_dead(self, client: _Client) -> None:
+        self._drop(client)
+        logger.info(f"[WS] Removed dead client. Total: {len(self._clients)}")
+
+    @staticmethod
+    async def _close_quietly(ws: WebSocket) -> None:
+        try:
+            await ws.close()
+        except Exception:
+            pass
 
     @property
     def client_count(self) -> int:
         return len(self._clients)
 
 
+def _manager_from_config() -> WebSocketManager:
+    try:
+        from config.loader import get
+        max_queue = int(get("daemon", "ws_max_queue", MAX_QUEUE))
+    except Exception:
+        max_queue = MAX_QUEUE
+    return WebSocketManager(max_queue=max_queue)
+
+
 # Module-level singleton — import this everywhere
-manager = WebSocketManager()
+manager = _manager_from_config()
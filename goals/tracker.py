@@ -22,7 +22,7 @@ from typing import Literal, Optional
 
 import aiosqlite
 
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 
 logger = logging.getLogger("sam.goals")
 
@@ -59,7 +59,7 @@ class GoalTracker:
     ) -> str:
         goal_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat() + "Z"
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 """INSERT INTO goals
                    (id, parent_id, level, title, description, success_criteria,
@@ -78,7 +78,7 @@ class GoalTracker:
         score = max(0.0, min(1.0, score))
         health = _score_to_health(score)
         now = datetime.utcnow().isoformat() + "Z"
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 "UPDATE goals SET score=?, health=?, updated_at=? WHERE id=?",
                 (score, health, now, goal_id),
@@ -106,14 +106,14 @@ class GoalTracker:
     async def _set_status(self, goal_id: str, status: GoalStatus, score: Optional[float] = None) -> None:
         now = datetime.utcnow().isoformat() + "Z"
         if score is not None:
-            async with aiosqlite.connect(str(DB_PATH)) as db:
+            async with connect_db(DB_PATH) as db:
                 await db.execute(
                     "UPDATE goals SET status=?, score=?, health=?, updated_at=? WHERE id=?",
                     (status, score, _score_to_health(score), now, goal_id),
                 )
                 await db.commit()
         else:
-            async with aiosqlite.connect(str(DB_PATH)) as db:
+            async with connect_db(DB_PATH) as db:
                 await db.execute(
                     "UPDATE goals SET status=?, updated_at=? WHERE id=?",
                     (status, now, goal_id),
@@ -140,7 +140,7 @@ class GoalTracker:
         where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
         values.append(limit)
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 f"SELECT * FROM goals {where} ORDER BY score ASC LIMIT ?", values
@@ -149,7 +149,7 @@ class GoalTracker:
         return [dict(r) for r in rows]
 
     async def get_goal(self, goal_id: str) -> Optional[dict]:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute("SELECT * FROM goals WHERE id = ?", (goal_id,))
             row = await cur.fetchone()
@@ -192,7 +192,7 @@ class GoalTracker:
 
     async def ensure_schema(self) -> None:
         """Add goal columns that may not exist in older schema."""
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             cols = {row[1] for row in await (await db.execute("PRAGMA table_info(goals)")).fetchall()}
             extras = {
                 "id": "TEXT",
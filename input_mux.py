@@ -0,0 +1,215 @@
+"""
+input_mux.py — one awaitable inbox for everything Sam listens to.
+
+ai_loop used to poll typed input and then block in record_voice(), so a
+message from the dashboard, Telegram or Discord could sit behind a voice
+timeout. Every source now feeds the same InputMux and ai_loop simply awaits
+the next message, whichever source it comes from:
+
+  voice      — a producer task that listens only while ai_loop is waiting
+  ui         — the Tk text field (thread-safe put via ThreadsafeInput)
+  api        — POST /api/chat
+  telegram / discord / … — comms channels
+
+(In the daemon, api and channel messages go to per-session workers in
+daemon/sessions.py instead; each worker's inbox is an InputMux too.)
+
+Messages carry their source, session id and enqueue time; the delay until
+ai_loop picks them up is tracked per source (see stats()).
+
+Usage:
+    from input_mux import get_input_mux
+    mux = get_input_mux()
+    mux.bind()                                   # inside the running loop
+    await mux.put("hello", source="api", session_id="abc")
+    msg = await mux.get()                        # InputMessage
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("sam.input_mux")
+
+LATENCY_SAMPLES = 200       # per-source wait times kept for percentiles
+PRODUCER_RETRY_S = 2.0      # back-off before restarting a crashed producer
+
+
+@dataclass
+class InputMessage:
+    text: str
+    source: str = "ui"
+    session_id: str = "default"
+    message_id: str = ""
+    enqueued_at: float = field(default_factory=time.monotonic)
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def waited_ms(self) -> float:
+        return (time.monotonic() - self.enqueued_at) * 1000
+
+
+class ThreadsafeInput:
+    """queue.Queue-style put() for synchronous producers such as the Tk text field."""
+
+    def __init__(self, mux: "InputMux", source: str) -> None:
+        self._mux = mux
+        self._source = source
+
+    def put(self, text: str, block: bool = True, timeout: Optional[float] = None) -> None:
+        self._mux.put_threadsafe(text, source=self._source)
+
+    put_nowait = put
+
+
+class InputMux:
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._early: List[InputMessage] = []          # put_threadsafe before bind()
+        self._early_lock = threading.Lock()
+        self._consumer_waiting: Optional[asyncio.Event] = None
+        self._producers: Dict[str, asyncio.Task] = {}
+        self._waits: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+
+    # ── Setup ─────────────────────────────────────────────────────────────────
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Attach to the event loop ai_loop runs on. Safe to call more than once."""
+        loop = loop or asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._consumer_waiting = asyncio.Event()
+        with self._early_lock:
+            early, self._early = self._early, []
+        for msg in early:
+            self._queue.put_nowait(msg)
+
+    def add_producer(self, name: str, produce: Callable[[], Awaitable[None]]) -> None:
+        """
+        Run produce() as a long-lived task feeding this mux (e.g. the voice
+        listener). It is restarted after a crash; a second call with the same
+        name is ignored while the first is alive.
+        """
+        task = self._producers.get(name)
+        if task is not None and not task.done():
+            return
+        self._producers[name] = asyncio.create_task(self._supervise(name, produce), name=f"input-{name}")
+
+    async def _supervise(self, name: str, produce: Callable[[], Awaitable[None]]) -> None:
+        while True:
+            try:
+                await produce()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[InputMux] producer '{name}' crashed: {e}", exc_info=True)
+                await asyncio.sleep(PRODUCER_RETRY_S)
+
+    async def close(self) -> None:
+        for task in self._producers.values():
+            task.cancel()
+        for task in self._producers.values():
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._producers.clear()
+
+    # ── Producers ─────────────────────────────────────────────────────────────
+
+    async def put(self, text: str, source: str, session_id: str = "default",
+                  message_id: str = "", enqueued_at: Optional[float] = None, **meta) -> InputMessage:
+        msg = InputMessage(text, source, session_id, message_id,
+                           enqueued_at if enqueued_at is not None else time.monotonic(), meta)
+        self.put_message(msg)
+        return msg
+
+    def put_message(self, msg: InputMessage) -> None:
+        """Enqueue from the loop thread."""
+        if self._queue is None:
+            with self._early_lock:
+                self._early.append(msg)
+            return
+        self._queue.put_nowait(msg)
+
+    def put_threadsafe(self, text: str, source: str, session_id: str = "default", **meta) -> None:
+        """Enqueue from any thread (Tk callbacks, speech server threads)."""
+        msg = InputMessage(text, source, session_id, meta=meta)
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            with self._early_lock:
+                self._early.append(msg)
+            return
+        loop.call_soon_threadsafe(self.put_message, msg)
+
+    # ── Consumer ──────────────────────────────────────────────────────────────
+
+    async def get(self) -> InputMessage:
+        """Await the next message from any source."""
+        if self._queue is None:
+            self.bind()
+        self._consumer_waiting.set()
+        try:
+            msg = await self._queue.get()
+        finally:
+            self._consumer_waiting.clear()
+        self._record(msg)
+        return msg
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else len(self._early)
+
+    @property
+    def consumer_waiting(self) -> bool:
+        return self._consumer_waiting is not None and self._consumer_waiting.is_set()
+
+    async def wait_for_consumer(self) -> None:
+        """Block until ai_loop is waiting for input (producers that should idle otherwise)."""
+        if self._consumer_waiting is None:
+            self.bind()
+        await self._consumer_waiting.wait()
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    def _record(self, msg: InputMessage) -> None:
+        waited = msg.waited_ms
+        self._waits.setdefault(msg.source, deque(maxlen=LATENCY_SAMPLES)).append(waited)
+        self._counts[msg.source] = self._counts.get(msg.source, 0) + 1
+        if msg.text:
+            logger.debug(f"[InputMux] {msg.source}/{msg.session_id} waited {waited:.1f} ms")
+
+    def stats(self) -> dict:
+        sources = {}
+        for source, waits in self._waits.items():
+            ordered = sorted(waits)
+            sources[source] = {
+                "count": self._counts.get(source, 0),
+                "last_ms": round(waits[-1], 2),
+                "p50_ms": round(ordered[len(ordered) // 2], 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            }
+        return {
+            "pending": self.pending(),
+            "consumer_waiting": self.consumer_waiting,
+            "producers": sorted(n for n, t in self._producers.items() if not t.done()),
+            "sources": sources,
+        }
+
+
+_mux: Optional[InputMux] = None
+
+
+def get_input_mux() -> InputMux:
+    global _mux
+    if _mux is None:
+        _mux = InputMux()
+    return _mux
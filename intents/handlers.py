@@ -9,6 +9,8 @@ from pathlib import Path
 from conversation_state import controller, State, PendingAction
 from tts import edge_speak
 from log.logger import get_logger
+from system import tracing
+from system.tracing import TracedThread    # handler threads run as the turn's "action" span
 
 logger = get_logger("INTENTS")
 
@@ -48,7 +50,13 @@ def handle_intent(intent, parameters, response, ui, temp_memory, **kwargs):
         temp_memory: Temporary memory instance
         **kwargs: Additional dependencies (whatsapp_engine, whatsapp_assistant, watcher)
     """
-    
+    from system.metrics import INTENT_DURATION
+    # Most handlers hand off to a thread, so this is the time the caller is held up
+    with INTENT_DURATION.labels(intent or "none").time(), tracing.span("handle_intent", intent=intent):
+        _route_intent(intent, parameters, response, ui, temp_memory, **kwargs)
+
+
+def _route_intent(intent, parameters, response, ui, temp_memory, **kwargs):
     # Debug logging
     logger.debug(f"handle_intent called: intent='{intent}', has_response={response is not None}, response_len={len(response) if response else 0}")
     
@@ -384,7 +392,7 @@ def handle_intent(intent, parameters, response, ui, temp_memory, **kwargs):
                     logger.error(f"Chat TTS failed: {e}")
                 finally:
                     controller.set_state(State.IDLE)
-            threading.Thread(target=_chat_action, daemon=True).start()
+            TracedThread(target=_chat_action, daemon=True).start()
         else:
             logger.warning("Default handler reached but response is empty/None")
             controller.set_state(State.IDLE)
@@ -413,7 +421,7 @@ def _handle_skill(intent: str, parameters: dict, ui, ctx: dict):
             _say("I ran into a problem with that skill.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_list_skills(ui):
@@ -433,7 +441,7 @@ def _handle_list_skills(ui):
             _say("Couldn't retrieve the skill list.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ==================== ACTION INTENTS ====================
@@ -458,7 +466,7 @@ def _handle_send_message(parameters, response, ui, temp_memory):
             )
         controller.set_state(State.IDLE)
 
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_open_app(parameters, response, ui, temp_memory):
@@ -466,7 +474,7 @@ def _handle_open_app(parameters, response, ui, temp_memory):
     from actions.open_app import open_app
     
     if parameters.get("app_name"):
-        threading.Thread(
+        TracedThread(
             target=open_app,
             kwargs={
                 "parameters": parameters,
@@ -496,7 +504,7 @@ def _handle_weather_report(parameters, response, ui, temp_memory):
             )
         controller.set_state(State.IDLE)
 
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_search(parameters, response, ui, temp_memory):
@@ -516,7 +524,7 @@ def _handle_search(parameters, response, ui, temp_memory):
             )
         controller.set_state(State.IDLE)
 
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_read_messages(ui, whatsapp_assistant):
@@ -533,7 +541,7 @@ def _handle_read_messages(ui, whatsapp_assistant):
             _whatsapp_lock.release()
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=read_action, daemon=True).start()
+    TracedThread(target=read_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -553,7 +561,7 @@ def _handle_whatsapp_summary(ui, whatsapp_assistant):
             _whatsapp_lock.release()
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=whatsapp_summary_action, daemon=True).start()
+    TracedThread(target=whatsapp_summary_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -571,7 +579,7 @@ def _handle_whatsapp_ready(ui, whatsapp_assistant):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=whatsapp_ready_action, daemon=True).start()
+    TracedThread(target=whatsapp_ready_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -592,7 +600,7 @@ def _handle_open_whatsapp_chat(parameters, ui, whatsapp_assistant):
             finally:
                 controller.set_state(State.IDLE)
 
-        threading.Thread(target=open_chat_action, daemon=True).start()
+        TracedThread(target=open_chat_action, daemon=True).start()
         controller.set_state(State.IDLE)
 
 
@@ -610,7 +618,7 @@ def _handle_read_whatsapp(ui, whatsapp_assistant):
             _whatsapp_lock.release()
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=read_whatsapp_action, daemon=True).start()
+    TracedThread(target=read_whatsapp_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -628,7 +636,7 @@ def _handle_reply_whatsapp(ui, whatsapp_engine):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=reply_whatsapp_action, daemon=True).start()
+    TracedThread(target=reply_whatsapp_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -668,7 +676,7 @@ def _handle_reply_to_contact(parameters, ui, whatsapp_assistant, whatsapp_engine
                 _whatsapp_lock.release()
                 controller.set_state(State.IDLE)
 
-        threading.Thread(target=reply_to_contact_action, daemon=True).start()
+        TracedThread(target=reply_to_contact_action, daemon=True).start()
         controller.set_state(State.IDLE)
 
 
@@ -682,7 +690,7 @@ def _handle_confirm_send(ui, whatsapp_engine):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=confirm_send_action, daemon=True).start()
+    TracedThread(target=confirm_send_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -696,7 +704,7 @@ def _handle_cancel_reply(ui, whatsapp_engine):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=cancel_reply_action, daemon=True).start()
+    TracedThread(target=cancel_reply_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -712,7 +720,7 @@ def _handle_edit_reply(parameters, ui, whatsapp_engine):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=edit_reply_action, daemon=True).start()
+    TracedThread(target=edit_reply_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -736,7 +744,7 @@ def _handle_get_time(ui):
             edge_speak("Couldn't read the system time.", ui, blocking=True)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=time_action, daemon=True).start()
+    TracedThread(target=time_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -776,7 +784,7 @@ def _handle_list_processes(ui):
             edge_speak("Couldn't list running processes.", ui, blocking=True)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=list_action, daemon=True).start()
+    TracedThread(target=list_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -822,7 +830,7 @@ def _handle_system_status(ui):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=system_status_action, daemon=True).start()
+    TracedThread(target=system_status_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -854,7 +862,7 @@ def _handle_kill_process(parameters, ui):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=kill_process_action, daemon=True).start()
+    TracedThread(target=kill_process_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -882,7 +890,7 @@ def _handle_performance_mode(ui):
         finally:
             controller.set_state(State.IDLE)
     
-    threading.Thread(target=performance_mode_action, daemon=True).start()
+    TracedThread(target=performance_mode_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -902,7 +910,7 @@ def _handle_auto_mode(response, ui, watcher):
         finally:
             controller.set_state(State.IDLE)
     
-    threading.Thread(target=auto_mode_action, daemon=True).start()
+    TracedThread(target=auto_mode_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -926,7 +934,7 @@ def _handle_system_trend(ui, watcher):
         finally:
             controller.set_state(State.IDLE)
     
-    threading.Thread(target=system_trend_action, daemon=True).start()
+    TracedThread(target=system_trend_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -950,7 +958,7 @@ def _handle_screen_vision(ui):
         finally:
             controller.set_state(State.IDLE)
     
-    threading.Thread(target=screen_vision_action, daemon=True).start()
+    TracedThread(target=screen_vision_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -970,7 +978,7 @@ def _handle_debug_screen(ui):
         except Exception as e:
             logger.error(f"Debug screen failed: {e}")
             _say("Something went wrong analyzing the screen.", ui)
-    threading.Thread(target=debug_screen_action, daemon=True).start()
+    TracedThread(target=debug_screen_action, daemon=True).start()
 
 
 def _handle_vscode_mode(ui):
@@ -1005,7 +1013,7 @@ def _handle_vscode_mode(ui):
         finally:
             controller.set_state(State.IDLE)
     
-    threading.Thread(target=vscode_mode_action, daemon=True).start()
+    TracedThread(target=vscode_mode_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -1068,7 +1076,7 @@ def _handle_whatsapp_call(parameters, ui, whatsapp_assistant):
             _whatsapp_lock.release()
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=call_action, daemon=True).start()
+    TracedThread(target=call_action, daemon=True).start()
     controller.set_state(State.IDLE)
 
 
@@ -1123,7 +1131,7 @@ def _handle_set_reminder(parameters, response, ui, reminder_engine):
             _say(response or f"Reminder set. I'll remind you about '{label}' in {total or 1} {unit}.", ui)
 
         controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_set_alarm(parameters, response, ui):
@@ -1168,7 +1176,7 @@ def _handle_set_alarm(parameters, response, ui):
             _say(f"Couldn't set Windows alarm: {message}", ui)
 
         controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_list_reminders(ui, reminder_engine):
@@ -1184,7 +1192,7 @@ def _handle_list_reminders(ui, reminder_engine):
             lines = ", ".join(f"{r['label']} at {r['fire_at']}" for r in reminders)
             _say(f"You have {len(reminders)} reminder{'s' if len(reminders)>1 else ''}: {lines}.", ui)
         controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_cancel_reminder(parameters, response, ui, reminder_engine):
@@ -1202,7 +1210,7 @@ def _handle_cancel_reminder(parameters, response, ui, reminder_engine):
                 return
         _say("Couldn't find that reminder.", ui)
         controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_read_clipboard(ui):
@@ -1221,7 +1229,7 @@ def _handle_read_clipboard(ui):
             _say("Couldn't read the clipboard.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_create_note(parameters, response, ui, temp_memory=None):
@@ -1250,7 +1258,7 @@ def _handle_create_note(parameters, response, ui, temp_memory=None):
             _say("Couldn't create that note.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_open_project(parameters, ui):
@@ -1335,7 +1343,7 @@ def _handle_open_project(parameters, ui):
             _say("Couldn't open that project.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_start_dictation(ui):
@@ -1376,7 +1384,7 @@ def _handle_start_dictation(ui):
             _say("Couldn't open Notepad.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_housekeeping(intent: str, ui):
@@ -1421,7 +1429,7 @@ def _handle_housekeeping(intent: str, ui):
             _say("Ran into an issue while tidying up.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_find_file(parameters, ui):
@@ -1444,7 +1452,7 @@ def _handle_find_file(parameters, ui):
             _say("File search ran into an issue.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_open_file(parameters, ui):
@@ -1471,7 +1479,7 @@ def _handle_open_file(parameters, ui):
             _say("Couldn't open that file.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_log_entry(parameters, response, ui):
@@ -1490,7 +1498,7 @@ def _handle_log_entry(parameters, response, ui):
             _say("Couldn't write to the log.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_read_email(ui):
@@ -1513,7 +1521,7 @@ def _handle_read_email(ui):
             _say("Couldn't reach your email right now.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_media_play_pause(parameters, ui):
@@ -1529,7 +1537,7 @@ def _handle_media_play_pause(parameters, ui):
             _say("Couldn't control media right now.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_media_next(ui):
@@ -1541,7 +1549,7 @@ def _handle_media_next(ui):
             logger.error(f"Media next failed: {e}")
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_media_prev(ui):
@@ -1553,7 +1561,7 @@ def _handle_media_prev(ui):
             logger.error(f"Media prev failed: {e}")
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_media_volume_up(ui):
@@ -1565,7 +1573,7 @@ def _handle_media_volume_up(ui):
             logger.error(f"Volume up failed: {e}")
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_media_volume_down(ui):
@@ -1577,7 +1585,7 @@ def _handle_media_volume_down(ui):
             logger.error(f"Volume down failed: {e}")
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_media_mute(ui):
@@ -1589,7 +1597,7 @@ def _handle_media_mute(ui):
             logger.error(f"Mute failed: {e}")
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_set_speed(parameters, response, ui):
@@ -1604,7 +1612,7 @@ def _handle_set_speed(parameters, response, ui):
             logger.error(f"Set speed failed: {e}")
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_aircraft_radar(parameters, ui):
@@ -1620,7 +1628,7 @@ def _handle_aircraft_radar(parameters, ui):
             _say("Couldn't reach the aircraft radar right now.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_export_conversation(ui, temp_memory):
@@ -1637,7 +1645,7 @@ def _handle_export_conversation(ui, temp_memory):
             _say("Couldn't export the conversation.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_add_to_whitelist(parameters, response, ui):
@@ -1656,7 +1664,7 @@ def _handle_add_to_whitelist(parameters, response, ui):
             _say("Couldn't update the whitelist.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_organize_files(response, ui):
@@ -1673,7 +1681,7 @@ def _handle_organize_files(response, ui):
             _say("I ran into a problem organising the Downloads folder.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_prepare_workspace(response, ui):
@@ -1724,7 +1732,7 @@ def _handle_prepare_workspace(response, ui):
             _say("Ran into a problem preparing the workspace.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_switch_model(tier: str, ui):
@@ -1739,7 +1747,7 @@ def _handle_switch_model(tier: str, ui):
             _say("Something went wrong switching models.", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ── Terminal execution handlers ───────────────────────────────────────────────
@@ -1778,7 +1786,7 @@ def _handle_run_tests(ui, terminal_runner):
         except Exception as e:
             logger.error(f"run_tests failed: {e}")
             _say("Couldn't set up the test run.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_start_dev_server(ui, terminal_runner):
@@ -1815,7 +1823,7 @@ def _handle_start_dev_server(ui, terminal_runner):
         except Exception as e:
             logger.error(f"start_dev_server failed: {e}")
             _say("Couldn't set up the server start.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_install_dependencies(ui, terminal_runner):
@@ -1847,7 +1855,7 @@ def _handle_install_dependencies(ui, terminal_runner):
         except Exception as e:
             logger.error(f"install_dependencies failed: {e}")
             _say("Couldn't set up the install.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_run_command(parameters, ui, terminal_runner):
@@ -1877,7 +1885,7 @@ def _handle_run_command(parameters, ui, terminal_runner):
         except Exception as e:
             logger.error(f"run_command failed: {e}")
             _say("Couldn't schedule that command.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_confirm_terminal(ui, terminal_runner):
@@ -1894,7 +1902,7 @@ def _handle_confirm_terminal(ui, terminal_runner):
         except Exception as e:
             logger.error(f"confirm_terminal failed: {e}")
             _say("Something went wrong running that command.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_cancel_command(ui, terminal_runner):
@@ -1909,7 +1917,7 @@ def _handle_cancel_command(ui, terminal_runner):
         except Exception as e:
             logger.error(f"cancel_command failed: {e}")
             _say("Couldn't cancel.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ── Google Workspace handlers ─────────────────────────────────────────────────
@@ -1931,7 +1939,7 @@ def _handle_calendar_today(ui):
             logger.error(f"calendar_today failed: {e}")
             msg = f"Couldn't reach the calendar: {e}"
         _say(msg, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_next_meeting(ui):
@@ -1954,7 +1962,7 @@ def _handle_next_meeting(ui):
             logger.error(f"next_meeting failed: {e}")
             msg = f"Couldn't get the next meeting: {e}"
         _say(msg, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_send_email_workspace(parameters: dict, ui):
@@ -1978,7 +1986,7 @@ def _handle_send_email_workspace(parameters: dict, ui):
             logger.error(f"send_email_workspace failed: {e}")
             result = f"Couldn't send the email: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_stop_test(ui):
@@ -2029,7 +2037,7 @@ def _handle_file_manage(parameters: dict, ui):
             logger.error(f"file_manage failed: {e}")
             result = f"File operation failed: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_computer_settings(parameters: dict, ui):
@@ -2042,7 +2050,7 @@ def _handle_computer_settings(parameters: dict, ui):
             logger.error(f"computer_settings failed: {e}")
             result = f"Settings action failed: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_browser_control(parameters: dict, ui):
@@ -2055,7 +2063,7 @@ def _handle_browser_control(parameters: dict, ui):
             logger.error(f"browser_control failed: {e}")
             result = f"Browser action failed: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_quick_command(parameters: dict, ui):
@@ -2068,7 +2076,7 @@ def _handle_quick_command(parameters: dict, ui):
             logger.error(f"quick_command failed: {e}")
             result = f"Command failed: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_computer_control(parameters: dict, ui):
@@ -2081,7 +2089,7 @@ def _handle_computer_control(parameters: dict, ui):
             logger.error(f"computer_control failed: {e}")
             result = f"Control action failed: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_desktop_control(parameters: dict, ui):
@@ -2094,7 +2102,7 @@ def _handle_desktop_control(parameters: dict, ui):
             logger.error(f"desktop_control failed: {e}")
             result = f"Desktop action failed: {e}"
         _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_youtube_video(parameters: dict, ui):
@@ -2108,7 +2116,7 @@ def _handle_youtube_video(parameters: dict, ui):
             result = f"YouTube action failed: {e}"
         if result:
             _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_find_flights(parameters: dict, ui):
@@ -2122,7 +2130,7 @@ def _handle_find_flights(parameters: dict, ui):
             result = f"Flight search failed: {e}"
         if result:
             _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_build_project(parameters: dict, ui, temp_memory=None):
@@ -2158,7 +2166,7 @@ def _handle_build_project(parameters: dict, ui, temp_memory=None):
             result = f"Build failed: {e}"
         if result:
             _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_code_helper(parameters: dict, ui, temp_memory=None):
@@ -2195,7 +2203,7 @@ def _handle_code_helper(parameters: dict, ui, temp_memory=None):
             result = f"Code helper failed: {e}"
         if result:
             _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_agent_task(parameters: dict, response: str, ui, temp_memory=None):
@@ -2235,7 +2243,7 @@ def _handle_agent_task(parameters: dict, response: str, ui, temp_memory=None):
             result = f"Task execution failed: {e}"
         if result:
             _say(result, ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_send_notification(parameters: dict, response: str, ui):
@@ -2246,7 +2254,7 @@ def _handle_send_notification(parameters: dict, response: str, ui):
         body  = (parameters or {}).get("body", response or "")
         notify(title, body)
         _say(f"Notification sent: {title}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_invoke_skill(parameters: dict, response: str, ui, temp_memory):
@@ -2275,7 +2283,7 @@ def _handle_invoke_skill(parameters: dict, response: str, ui, temp_memory):
         except Exception as e:
             logger.error(f"invoke_skill failed: {e}")
             _say("Something went wrong loading that skill.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ==================== PENDING ACTION CONFIRMATION ====================
@@ -2298,7 +2306,7 @@ def _handle_confirm_action(ui):
             _say(f"Something went wrong: {e}", ui)
         finally:
             controller.set_state(State.IDLE)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_cancel_action(ui):
@@ -2308,7 +2316,7 @@ def _handle_cancel_action(ui):
         controller.clear_pending()
         def _action():
             _say("Alright, cancelled.", ui)
-        threading.Thread(target=_action, daemon=True).start()
+        TracedThread(target=_action, daemon=True).start()
     else:
         controller.set_state(State.IDLE)
 
@@ -2324,7 +2332,7 @@ def _handle_silence_sam(ui):
         from tts import stop_speaking
         stop_speaking()
         ui.write_log("AI: [muted — say 'hey Sam' to wake me]")
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_wake_sam(ui):
@@ -2332,7 +2340,7 @@ def _handle_wake_sam(ui):
     def _action():
         controller.set_muted(False)
         _say("I'm here.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ==================== MEETING NOTES ====================
@@ -2352,7 +2360,7 @@ def _handle_meeting_notes_start(ui):
         notify("Sam", f"Meeting mode on. Notes → {notes_file}")
         ui.write_log(f"AI: Meeting mode on. I'm listening silently. Notes → {notes_file}")
         ui.append_output(f"[meeting] Notes file: {notes_file}", "info")
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_meeting_notes_stop(ui):
@@ -2360,7 +2368,7 @@ def _handle_meeting_notes_stop(ui):
     def _action():
         controller.set_mode("normal")
         _say("Meeting mode off. I can talk again.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ==================== LEARNING SYSTEM ====================
@@ -2411,7 +2419,7 @@ def _handle_learn_from_youtube(parameters: dict, ui):
             logger.error(f"learn_from_youtube failed: {e}")
             monitor.update_task(task_id, "error", str(e))
             _say(f"Couldn't get the transcript. {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_learn_this(parameters: dict, response: str, ui):
@@ -2433,7 +2441,7 @@ def _handle_learn_this(parameters: dict, response: str, ui):
         except Exception as e:
             logger.error(f"learn_this failed: {e}")
             _say("Couldn't save that to memory.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ==================== DAILY REPORT ====================
@@ -2454,7 +2462,7 @@ def _handle_daily_report(ui):
         except Exception as e:
             logger.error(f"daily_report failed: {e}")
             _say(f"Couldn't generate the report: {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -2509,7 +2517,7 @@ def _handle_guide_task(parameters: dict, response: str, ui, temp_memory):
         finally:
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_guided_step_turn(user_text: str, ui, temp_memory):
@@ -2649,7 +2657,7 @@ def _handle_guided_step_turn(user_text: str, ui, temp_memory):
             temp_memory.update_parameters({"processing": False})
             controller.set_state(State.IDLE)
 
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _advance_step(
@@ -2708,7 +2716,7 @@ def _handle_create_goal(parameters: dict, response: str, ui):
         except Exception as e:
             logger.error(f"create_goal failed: {e}")
             _say(f"Couldn't create the goal: {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_list_goals(ui):
@@ -2734,7 +2742,7 @@ def _handle_list_goals(ui):
         except Exception as e:
             logger.error(f"list_goals failed: {e}")
             _say(f"Couldn't load goals: {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_update_goal(parameters: dict, response: str, ui):
@@ -2768,7 +2776,7 @@ def _handle_update_goal(parameters: dict, response: str, ui):
         except Exception as e:
             logger.error(f"update_goal failed: {e}")
             _say(f"Couldn't update the goal: {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ── Workflows ─────────────────────────────────────────────────────────────────
@@ -2800,7 +2808,7 @@ def _handle_run_workflow(parameters: dict, response: str, ui):
         except Exception as e:
             logger.error(f"run_workflow failed: {e}")
             _say(f"Workflow failed: {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 def _handle_list_workflows(ui):
@@ -2819,7 +2827,7 @@ def _handle_list_workflows(ui):
         except Exception as e:
             logger.error(f"list_workflows failed: {e}")
             _say(f"Couldn't load workflows: {e}", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ── Comms channels ────────────────────────────────────────────────────────────
@@ -2871,7 +2879,7 @@ def _handle_send_to_channel(parameters: dict, response: str, ui):
         else:
             _say(f"I don't know the channel '{channel}'. I support Discord and Telegram.", ui)
 
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
 
 # ── Personality ───────────────────────────────────────────────────────────────
@@ -2894,5 +2902,5 @@ def _handle_personality_feedback(parameters: dict, response: str, ui):
         except Exception as e:
             logger.error(f"personality_feedback failed: {e}")
             _say("Noted.", ui)
-    threading.Thread(target=_action, daemon=True).start()
+    TracedThread(target=_action, daemon=True).start()
 
@@ -9,7 +9,7 @@ from pathlib import Path
 from log.logger import get_logger, log_function_entry, log_function_exit, log_error, log_api_call, log_performance
 logger = get_logger("LLM")
 
-OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/") + "/chat/completions"
 MODEL = "gpt-4o-mini"
 
 # Ollama (local LLM) config — override via .env
@@ -470,9 +470,18 @@ def get_ollama_output(user_text: str, memory_block: dict | None = None) -> dict:
 
 def get_ai_response(user_text: str, memory_block: dict | None = None) -> dict:
     """Unified LLM entry point — routes to local (Ollama) or cloud based on MODEL_TIER."""
-    if MODEL_TIER == "local" and OLLAMA_AVAILABLE:
-        return get_ollama_output(user_text, memory_block)
-    return get_llm_output(user_text, memory_block)
+    from system.metrics import LLM_ERRORS, LLM_LATENCY
+    provider = "local" if MODEL_TIER == "local" and OLLAMA_AVAILABLE else "openai"
+    t0 = time.monotonic()
+    try:
+        if provider == "local":
+            return get_ollama_output(user_text, memory_block)
+        return get_llm_output(user_text, memory_block)
+    except Exception:
+        LLM_ERRORS.labels(provider).inc()
+        raise
+    finally:
+        LLM_LATENCY.labels(provider, "complete").observe(time.monotonic() - t0)
 
 
 # ── Skill context injection ──────────────────────────────────────────────────
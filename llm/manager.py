@@ -24,8 +24,18 @@ import time
 from dataclasses import dataclass, field
 from typing import AsyncIterator, Literal, Optional
 
+from system.metrics import LLM_ERRORS, LLM_LATENCY, LLM_TTFT
+
 logger = logging.getLogger("sam.llm.manager")
 
+# complete() never raises: when every provider fails it returns this sentinel text
+LLM_ERROR_PREFIX = "[LLM error"
+
+
+def is_llm_error(text: str) -> bool:
+    """True for the text complete() returns when no provider could answer."""
+    return text.startswith(LLM_ERROR_PREFIX)
+
 Provider = Literal["local", "openai", "anthropic", "groq", "gemini", "openrouter", "auto"]
 
 # Cost per 1K tokens in USD (approximate, updated 2025)
@@ -83,9 +93,27 @@ def session_stats() -> dict:
     }
 
 
+def _chat_messages(prompt: str, system: str, history: Optional[list[dict]]) -> list[dict]:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.extend(history or ())
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def _fold_history(prompt: str, history: Optional[list[dict]]) -> str:
+    """Flatten history into the prompt for providers called without a message list."""
+    if not history:
+        return prompt
+    lines = [f"{m['role'].capitalize()}: {m['content']}" for m in history]
+    return "\n".join(lines + [f"User: {prompt}"])
+
+
 class LLMManager:
     def __init__(self) -> None:
         self._ollama_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self._openai_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
         self._ollama_model = os.getenv("OLLAMA_MODEL", "llama3.2")
         self._openai_key = os.getenv("OPENAI_API_KEY", "")
         self._anthropic_key = os.getenv("ANTHROPIC_API_KEY", "")
@@ -120,16 +148,19 @@ class LLMManager:
         try:
             text, usage = await self._dispatch(provider, prompt, system, max_tokens)
         except Exception as e:
+            LLM_ERRORS.labels(provider).inc()
             logger.warning(f"[LLM] {provider} failed ({e}), falling back to local")
             try:
                 text, usage = await self._call_local(prompt, system, max_tokens)
                 provider = "local"
             except Exception as e2:
                 logger.error(f"[LLM] Local fallback also failed: {e2}")
-                text = f"[LLM error: {e2}]"
+                text = f"{LLM_ERROR_PREFIX}: {e2}]"
                 usage = LLMUsage(provider="local", model=self._ollama_model)
 
-        usage.latency_ms = int((time.monotonic() - t0) * 1000)
+        elapsed = time.monotonic() - t0
+        usage.latency_ms = int(elapsed * 1000)
+        LLM_LATENCY.labels(provider, "complete").observe(elapsed)
         _session_usage.append(usage)
         logger.info(f"[LLM] {provider} — {usage.input_tokens}in/{usage.output_tokens}out tokens, {usage.latency_ms}ms, ${usage.cost_usd:.6f}")
         return LLMResponse(text=text, usage=usage, provider=provider)
@@ -142,15 +173,30 @@ class LLMManager:
         system: str = "",
         model_tier: Provider = "auto",
         max_tokens: int = 2048,
+        history: Optional[list[dict]] = None,
     ) -> AsyncIterator[str]:
-        """Yields text chunks as they arrive. Falls back to complete() if provider doesn't stream."""
+        """Yields text chunks as they arrive. Falls back to complete() if provider doesn't stream.
+
+        `history` is prior {"role": "user"|"assistant", "content": ...} turns, sent
+        as chat messages ahead of `prompt` by the streaming providers.
+        """
         provider = self._resolve_provider(prompt, model_tier)
+        t0 = time.monotonic()
+        first = True
         try:
-            async for chunk in self._dispatch_stream(provider, prompt, system, max_tokens):
+            async for chunk in self._dispatch_stream(provider, prompt, system, max_tokens, history):
+                if first:
+                    LLM_TTFT.labels(provider).observe(time.monotonic() - t0)
+                    first = False
                 yield chunk
+            LLM_LATENCY.labels(provider, "stream").observe(time.monotonic() - t0)
         except Exception as e:
+            LLM_ERRORS.labels(provider).inc()
+            if not first:
+                raise       # part of the answer is already out; re-running it would repeat it
             logger.warning(f"[LLM stream] {provider} failed ({e}), using complete()")
-            text = await self.complete(prompt, system=system, model_tier=model_tier, max_tokens=max_tokens)
+            text = await self.complete(_fold_history(prompt, history), system=system,
+                                       model_tier=model_tier, max_tokens=max_tokens)
             yield text
 
     # ── Sync wrapper (for non-async callers) ─────────────────────────────────
@@ -225,19 +271,20 @@ class LLMManager:
             return await loop.run_in_executor(None, lambda: self._call_openrouter(prompt, system, max_tokens))
         return await self._call_local(prompt, system, max_tokens)
 
-    async def _dispatch_stream(self, provider: str, prompt: str, system: str, max_tokens: int) -> AsyncIterator[str]:
+    async def _dispatch_stream(self, provider: str, prompt: str, system: str, max_tokens: int,
+                               history: Optional[list[dict]] = None) -> AsyncIterator[str]:
         if provider == "local":
-            async for chunk in self._stream_local(prompt, system, max_tokens):
+            async for chunk in self._stream_local(prompt, system, max_tokens, history):
                 yield chunk
         elif provider == "openai":
-            async for chunk in self._stream_openai(prompt, system, max_tokens):
+            async for chunk in self._stream_openai(prompt, system, max_tokens, history):
                 yield chunk
         elif provider == "anthropic":
-            async for chunk in self._stream_anthropic(prompt, system, max_tokens):
+            async for chunk in self._stream_anthropic(prompt, system, max_tokens, history):
                 yield chunk
         else:
             # Groq/Gemini/OpenRouter — fall back to complete
-            text, _ = await self._dispatch(provider, prompt, system, max_tokens)
+            text, _ = await self._dispatch(provider, _fold_history(prompt, history), system, max_tokens)
             yield text
 
     # ── Local (Ollama) ────────────────────────────────────────────────────────
@@ -263,12 +310,10 @@ class LLMManager:
         out_tok = data.get("eval_count", len(text.split()))
         return text, LLMUsage("local", self._ollama_model, in_tok, out_tok)
 
-    async def _stream_local(self, prompt: str, system: str, max_tokens: int) -> AsyncIterator[str]:
+    async def _stream_local(self, prompt: str, system: str, max_tokens: int,
+                            history: Optional[list[dict]] = None) -> AsyncIterator[str]:
         import aiohttp
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
+        messages = _chat_messages(prompt, system, history)
 
         async with aiohttp.ClientSession() as session:
             async with session.post(
@@ -301,7 +346,7 @@ class LLMManager:
             messages.append({"role": "system", "content": system})
         messages.append({"role": "user", "content": prompt})
         resp = requests.post(
-            "https://api.openai.com/v1/chat/completions",
+            f"{self._openai_url}/chat/completions",
             headers={"Authorization": f"Bearer {self._openai_key}"},
             json={"model": model, "messages": messages, "max_tokens": max_tokens},
             timeout=60,
@@ -311,16 +356,14 @@ class LLMManager:
         usage = data.get("usage", {})
         return text, LLMUsage("openai", model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
 
-    async def _stream_openai(self, prompt: str, system: str, max_tokens: int) -> AsyncIterator[str]:
+    async def _stream_openai(self, prompt: str, system: str, max_tokens: int,
+                            history: Optional[list[dict]] = None) -> AsyncIterator[str]:
         import aiohttp
         model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
+        messages = _chat_messages(prompt, system, history)
         async with aiohttp.ClientSession() as session:
             async with session.post(
-                "https://api.openai.com/v1/chat/completions",
+                f"{self._openai_url}/chat/completions",
                 headers={"Authorization": f"Bearer {self._openai_key}"},
                 json={"model": model, "messages": messages, "max_tokens": max_tokens, "stream": True},
                 timeout=aiohttp.ClientTimeout(total=120),
@@ -359,13 +402,14 @@ class LLMManager:
         usage = data.get("usage", {})
         return text, LLMUsage("anthropic", model, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
 
-    async def _stream_anthropic(self, prompt: str, system: str, max_tokens: int) -> AsyncIterator[str]:
+    async def _stream_anthropic(self, prompt: str, system: str, max_tokens: int,
+                                history: Optional[list[dict]] = None) -> AsyncIterator[str]:
         import aiohttp
         model = os.getenv("ANTHROPIC_MODEL", "claude-haiku-4-5-20251001")
         payload = {
             "model": model,
             "max_tokens": max_tokens,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": _chat_messages(prompt, "", history),
             "stream": True,
         }
         if system:
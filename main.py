@@ -10,7 +10,6 @@ if __name__ == "__main__":
 
 import asyncio
 import threading
-import queue
 import time
 from difflib import SequenceMatcher
 
@@ -40,7 +39,7 @@ from conversation_state import controller, State
 import sys
 from pathlib import Path
 
-from memory.memory_manager import load_memory, update_memory
+from memory.memory_manager import load_memory, update_memory, memory_for_prompt as prompt_memory
 from memory.temporary_memory import TemporaryMemory
 from assistant.morning_briefing import generate_morning_briefing
 from assistant.daily_planner import generate_daily_plan
@@ -68,6 +67,9 @@ from system.sound_fx import play_startup, play_done
 # Presence engine — continuous environment awareness
 from system.presence_engine import PresenceEngine
 
+# Per-turn span tracing (GET /api/traces)
+from system import tracing
+
 interrupt_commands = ["mute", "quit", "exit", "stop"]
 
 # Phrases that will immediately silence Sam and return to passive (wake-word) mode.
@@ -103,8 +105,11 @@ terminal_runner = TerminalRunner()
 # Initialize global hotkey listener
 _hotkey_listener = HotkeyListener(hotkey="ctrl+alt+s")
 
-# Queue for typed text input from the UI text field
-typed_input_queue: queue.Queue = queue.Queue()
+# Every input source (voice, the UI text field, /api/chat, comms channels) feeds
+# one awaitable multiplexer; the UI text field pushes into it from the Tk thread.
+from input_mux import get_input_mux, ThreadsafeInput
+input_mux = get_input_mux()
+typed_input_queue = ThreadsafeInput(input_mux, source="ui")
 
 # use module-level controller from conversation_state
 
@@ -139,38 +144,48 @@ async def get_voice_input(ui: SamUI, in_conversation: bool = False):
         print(f"You: {text}")
         logger.info(f"[MIC] User said: '{text}'")
 
-        # Filter phantom inputs
-        PHANTOM_WORDS = {'some', 'some.', 'you', 'the', 'from', 'from some', 'a', 'an', 'and', 'or', 'but'}
-        if len(text.strip()) < 3 or text.lower().strip() in PHANTOM_WORDS:
-            logger.warning(f"[MIC] Filtered phantom input: '{text}' — ignoring")
-            return ""
-
-        # Echo-gate: drop transcript if it matches what Sam just said
-        # (happens when speaker output is picked up by the mic)
-        last_sam = temp_memory.get_last_ai_response() or ""
-        if last_sam:
-            t_lower = text.lower().strip()
-            s_lower = last_sam.lower().strip()
-            # Containment check + fuzzy ratio to catch garbled echoes
-            # (e.g. Sam says "1:17", mic captures "117" — exact match fails, ratio catches it)
-            ratio = SequenceMatcher(None, t_lower[:len(s_lower)], s_lower).ratio()
-            if t_lower in s_lower or s_lower.startswith(t_lower) or (len(t_lower) > 20 and ratio > 0.75):
-                logger.warning(f"[MIC] Echo detected (ratio={ratio:.2f}) — dropping: '{text[:60]}'")
+        # The turn's trace starts when the transcript arrives; ai_loop picks it up from the mux
+        tracing.start("turn", source="voice")
+        with tracing.span("echo_gate"):
+            # Filter phantom inputs
+            PHANTOM_WORDS = {'some', 'some.', 'you', 'the', 'from', 'from some', 'a', 'an', 'and', 'or', 'but'}
+            if len(text.strip()) < 3 or text.lower().strip() in PHANTOM_WORDS:
+                logger.warning(f"[MIC] Filtered phantom input: '{text}' — ignoring")
                 return ""
+
+            # Echo-gate: drop transcript if it matches what Sam just said
+            # (happens when speaker output is picked up by the mic)
+            last_sam = temp_memory.get_last_ai_response() or ""
+            if last_sam:
+                t_lower = text.lower().strip()
+                s_lower = last_sam.lower().strip()
+                # Containment check + fuzzy ratio to catch garbled echoes
+                # (e.g. Sam says "1:17", mic captures "117" — exact match fails, ratio catches it)
+                ratio = SequenceMatcher(None, t_lower[:len(s_lower)], s_lower).ratio()
+                if t_lower in s_lower or s_lower.startswith(t_lower) or (len(t_lower) > 20 and ratio > 0.75):
+                    logger.warning(f"[MIC] Echo detected (ratio={ratio:.2f}) — dropping: '{text[:60]}'")
+                    return ""
     else:
         logger.warning("[MIC] record_voice() returned empty — no speech detected or timed out")
 
-    controller.set_state(State.IDLE)
+    if controller.get_state() == State.LISTENING:   # ai_loop may already be handling typed input
+        controller.set_state(State.IDLE)
     return text
 
 
-async def get_any_input(ui: SamUI, in_conversation: bool = False) -> str:
-    """Return typed text immediately if queued, otherwise wait for voice input."""
-    try:
-        return typed_input_queue.get_nowait()
-    except queue.Empty:
-        pass
-    return await get_voice_input(ui, in_conversation=in_conversation)
+async def listen_for_voice(ui: SamUI, in_conversation) -> None:
+    """
+    Voice producer for input_mux: listens only while ai_loop is waiting for
+    input, so text from the UI, API or channels never queues behind a listen
+    timeout. An empty transcript (timeout) is forwarded only when nothing else
+    arrived meanwhile — ai_loop uses it to drop out of conversation mode.
+    """
+    while True:
+        await input_mux.wait_for_consumer()
+        text = await get_voice_input(ui, in_conversation=in_conversation())
+        turn = tracing.detach()
+        if text or (input_mux.consumer_waiting and not input_mux.pending()):
+            await input_mux.put(text, source="voice", trace=turn if text else None)
 
 
 def _is_affirmative(text: str) -> bool:
@@ -185,11 +200,12 @@ def _is_affirmative(text: str) -> bool:
 
 
 async def ai_loop(ui: SamUI):
-    briefing_delivered_today = False
     in_conversation = False  # True after first exchange; keeps mic active without re-saying "Hey Sam"
 
     # Wire the typed input queue into the UI so the text field can push text here
     ui.set_typed_input_queue(typed_input_queue)
+    input_mux.bind()
+    input_mux.add_producer("voice", lambda: listen_for_voice(ui, lambda: in_conversation))
 
     # Track which complex intents we've already suggested the cloud model for (once-per-session)
     _complex_intents_suggested: set = set()
@@ -289,54 +305,63 @@ async def ai_loop(ui: SamUI):
     await asyncio.to_thread(edge_speak, startup_msg, ui, True)
     controller.set_state(State.IDLE)
 
-    # ── Background task: drain & speak presence suggestions every 15 s ──────
+    # ── Background task: speak presence suggestions as the engine hands them over ──
+    presence_suggestions = presence_engine.subscribe_async()
+
     async def _presence_speaker():
         while True:
-            await asyncio.sleep(15)
-            if controller.is_speaking():
+            suggestion = await presence_suggestions.get()
+            msg = suggestion.get("message", "")
+            if not msg:
                 continue
-            try:
-                while True:
-                    suggestion = presence_engine.suggestions.get_nowait()
-                    msg = suggestion.get("message", "")
-                    if msg:
-                        play_done()
-                        ui.write_log(f"Sam: {msg}")
-                        controller.set_state(State.SPEAKING)
-                        await asyncio.to_thread(edge_speak, msg, ui, True)
-                        controller.set_state(State.IDLE)
-            except queue.Empty:
-                pass
+            while controller.is_speaking():
+                await asyncio.sleep(1)
+            play_done()
+            ui.write_log(f"Sam: {msg}")
+            controller.set_state(State.SPEAKING)
+            await asyncio.to_thread(edge_speak, msg, ui, True)
+            controller.set_state(State.IDLE)
 
     asyncio.create_task(_presence_speaker())
 
+    # ── Scheduled: morning briefing at 07:00 (caught up if Sam starts before 08:00) ──
+    async def _morning_briefing(_scheduled_for: float):
+        while controller.is_speaking():
+            await asyncio.sleep(1)
+        try:
+            briefing = await asyncio.to_thread(generate_morning_briefing)
+            ui.write_log(f"AI: {briefing}")
+            controller.set_state(State.SPEAKING)
+            await asyncio.to_thread(edge_speak, briefing, ui, True)
+        except Exception as e:
+            logger.error(f"Morning briefing failed: {e}")
+        finally:
+            controller.set_state(State.IDLE)
+
+    from workflows.scheduler import Scheduler, CronSchedule
+    _schedule = Scheduler()
+    _schedule.add_job("morning_briefing", CronSchedule("0 7 * * *"), _morning_briefing,
+                      catch_up="once", grace_s=3600)
+    await _schedule.start()
+
+    turn = None
     while True:
-        # Morning briefing check
-        current_hour = datetime.now().hour
-        current_date = datetime.now().date()
-        
-        if current_hour == 7 and not briefing_delivered_today:
-            try:
-                briefing = generate_morning_briefing()
-                ui.write_log(f"AI: {briefing}")
-                controller.set_state(State.SPEAKING)
-                await asyncio.to_thread(edge_speak, briefing, ui, True)
-                controller.set_state(State.IDLE)
-                briefing_delivered_today = True
-            except Exception as e:
-                logger.error(f"Morning briefing failed: {e}")
-                controller.set_state(State.IDLE)
-        
-        # Reset briefing flag at midnight (hour 0)
-        if current_hour == 0:
-            briefing_delivered_today = False
+        # Every path through the previous iteration ends here, so this closes its turn
+        if turn is not None:
+            turn.finish()
+            turn = None
 
         # Replay confirmation-accepted requests without fresh voice input
         if _replay_user_text:
             user_text = _replay_user_text
             _replay_user_text = None
+            turn = tracing.start("turn", source="replay")
         else:
-            user_text = await get_any_input(ui, in_conversation=in_conversation)
+            msg = await input_mux.get()
+            user_text = msg.text
+            if user_text:
+                turn = tracing.resume(msg.meta.get("trace") or tracing.Trace("turn", source=msg.source))
+                turn.add_span("input_queue", msg.waited_ms / 1000)
 
         if not user_text:
             # Timed out — if we were in a conversation, drop back to passive
@@ -528,37 +553,9 @@ async def ai_loop(ui: SamUI):
             _handle_guided_step_turn(user_text, ui, temp_memory)
             continue
 
-        long_term_memory = load_memory()
-
-        def minimal_memory_for_prompt(memory: dict) -> dict:
-            result = {}
-
-            identity = memory.get("identity", {})
-            preferences = memory.get("preferences", {})
-            relationships = memory.get("relationships", {})
-            emotional_state = memory.get("emotional_state", {})
-
-            if "name" in identity:
-                result["user_name"] = identity["name"].get("value")
-
-            for k in ["favorite_color", "favorite_food", "favorite_music"]:
-                if k in preferences:
-                    val = preferences[k].get("value")
-                    if isinstance(val, dict) and "value" in val:
-                        val = val["value"]
-                    result[k] = val
-
-            for rel, info in relationships.items():
-                if isinstance(info, dict) and "name" in info and "value" in info["name"]:
-                    result[f"{rel}_name"] = info["name"]["value"]
-
-            for event, info in emotional_state.items():
-                if "value" in info:
-                    result[f"emotion_{event}"] = info["value"]
-
-            return {k: v for k, v in result.items() if v}
-
-        memory_for_prompt = minimal_memory_for_prompt(long_term_memory)
+        with tracing.span("load_memory"):
+            long_term_memory = load_memory()
+            memory_for_prompt = prompt_memory(long_term_memory)
 
         history_lines = temp_memory.get_history_for_prompt()
         recent_history = "\n".join(history_lines.split("\n")[-5:])
@@ -570,7 +567,8 @@ async def ai_loop(ui: SamUI):
             memory_for_prompt["_collected_params"] = str(temp_memory.get_parameters())
 
         # Inject live presence context so the LLM can calibrate tone
-        memory_for_prompt["presence"] = presence_engine.get_state_snapshot()
+        with tracing.span("presence"):
+            memory_for_prompt["presence"] = presence_engine.get_state_snapshot()
 
         # Inject flutter test state so the LLM knows when a UI test is running
         try:
@@ -602,11 +600,12 @@ async def ai_loop(ui: SamUI):
             pass
 
         try:
-            llm_output = await asyncio.to_thread(
-                get_ai_response,
-                user_text=user_text,
-                memory_block=memory_for_prompt
-            )
+            with tracing.span("llm", tier=get_model_tier()):
+                llm_output = await asyncio.to_thread(
+                    get_ai_response,
+                    user_text=user_text,
+                    memory_block=memory_for_prompt
+                )
         except Exception as e:
             ui.write_log(f"AI ERROR: {e}")
             controller.set_state(State.IDLE)
@@ -641,6 +640,7 @@ async def ai_loop(ui: SamUI):
             update_memory(memory_update)
 
         temp_memory.set_last_ai_response(response)
+        turn.tag(intent=intent)
 
         # Log detected intent for debugging
         logger.info(f"Intent detected: '{intent}' | Response: '{response[:50] if response else 'None'}...'")
@@ -744,8 +744,8 @@ def main():
                 elif task.status in ("done", "error", "cancelled"):
                     color = "green" if task.status == "done" else "red"
                     ui.update_agent_task(task.task_id, task.status, color)
-                if task.output_lines:
-                    ui.append_output(task.output_lines[-1], "info")
+                for line in task.output_lines:   # lines since the last event
+                    ui.append_output(line, "info")
             except Exception:
                 pass
         _monitor.subscribe(_on_agent_update)
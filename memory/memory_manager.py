@@ -197,3 +197,33 @@ def update_memory(memory_update: dict) -> dict:
         save_memory(memory)
 
     return memory
+
+
+def memory_for_prompt(memory: dict) -> dict:
+    """Flatten long-term memory to the few fields worth sending with every LLM prompt."""
+    result = {}
+
+    identity = memory.get("identity", {})
+    preferences = memory.get("preferences", {})
+    relationships = memory.get("relationships", {})
+    emotional_state = memory.get("emotional_state", {})
+
+    if "name" in identity:
+        result["user_name"] = identity["name"].get("value")
+
+    for k in ["favorite_color", "favorite_food", "favorite_music"]:
+        if k in preferences:
+            val = preferences[k].get("value")
+            if isinstance(val, dict) and "value" in val:
+                val = val["value"]
+            result[k] = val
+
+    for rel, info in relationships.items():
+        if isinstance(info, dict) and "name" in info and "value" in info["name"]:
+            result[f"{rel}_name"] = info["name"]["value"]
+
+    for event, info in emotional_state.items():
+        if "value" in info:
+            result[f"emotion_{event}"] = info["value"]
+
+    return {k: v for k, v in result.items() if v}
@@ -8,23 +8,33 @@ Tracks user interaction patterns and adapts:
   - Time-of-day usage patterns
   - Feedback signals (positive/negative on responses)
 
-All data stored in SQLite (settings table as JSON blobs).
+All data stored in SQLite (settings table as JSON blobs). Updates re-read
+the stored profile and write it back in one IMMEDIATE transaction, so the
+daemon workers and ai_loop never overwrite each other's changes; the cached
+copy (PROFILE_TTL_S) only serves reads such as get_style_instruction().
 """
 
 from __future__ import annotations
+import asyncio
 import json
 import logging
+import time
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import Literal
+from typing import Callable, Literal
 
 import aiosqlite
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 
 logger = logging.getLogger("sam.personality")
 
 StylePreference = Literal["concise", "balanced", "detailed", "technical"]
 
+# The chat stream reads the profile on every message; re-read the DB at most
+# this often for reads (other processes — e.g. the voice feedback intent — also
+# write it). Updates always start from the stored row.
+PROFILE_TTL_S = 30.0
+
 
 @dataclass
 class PersonalityProfile:
@@ -42,35 +52,73 @@ class PersonalityProfile:
 class PersonalityLearner:
     _SETTINGS_KEY = "personality_profile"
 
+    def __init__(self) -> None:
+        self._profile: PersonalityProfile | None = None
+        self._loaded_at = 0.0
+        self._lock: asyncio.Lock | None = None
+
     # ── Load / Save ───────────────────────────────────────────────────────────
 
+    async def _current(self) -> PersonalityProfile:
+        """Cached profile, re-read from the DB once it is older than PROFILE_TTL_S."""
+        if self._profile is None or time.monotonic() - self._loaded_at > PROFILE_TTL_S:
+            self._profile = await self.load()
+            self._loaded_at = time.monotonic()
+        return self._profile
+
+    def _update_lock(self) -> asyncio.Lock:
+        # Keeps this process's updates from queueing up on the vault's write lock
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @staticmethod
+    def _parse(value: str | None) -> PersonalityProfile:
+        if not value:
+            return PersonalityProfile()
+        try:
+            data = json.loads(value)
+            return PersonalityProfile(**{k: v for k, v in data.items() if k in PersonalityProfile.__dataclass_fields__})
+        except Exception:
+            return PersonalityProfile()
+
     async def load(self) -> PersonalityProfile:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 "SELECT value FROM settings WHERE key = ?", (self._SETTINGS_KEY,)
             )
             row = await cur.fetchone()
-        if not row:
-            return PersonalityProfile()
-        try:
-            data = json.loads(row["value"])
-            return PersonalityProfile(**{k: v for k, v in data.items() if k in PersonalityProfile.__dataclass_fields__})
-        except Exception:
-            return PersonalityProfile()
+        return self._parse(row["value"] if row else None)
 
     async def save(self, profile: PersonalityProfile) -> None:
-        profile.updated_at = datetime.utcnow().isoformat() + "Z"
-        now = profile.updated_at
-        value = json.dumps(asdict(profile))
-        async with aiosqlite.connect(str(DB_PATH)) as db:
-            await db.execute(
-                """INSERT INTO settings (key, value, updated_at) VALUES (?, ?, ?)
-                   ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at""",
-                (self._SETTINGS_KEY, value, now),
-            )
+        async with connect_db(DB_PATH) as db:
+            await self._write(db, profile)
             await db.commit()
 
+    async def _write(self, db, profile: PersonalityProfile) -> None:
+        profile.updated_at = datetime.utcnow().isoformat() + "Z"
+        await db.execute(
+            """INSERT INTO settings (key, value, updated_at) VALUES (?, ?, ?)
+               ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at""",
+            (self._SETTINGS_KEY, json.dumps(asdict(profile)), profile.updated_at),
+        )
+
+    async def _update(self, change: Callable[[PersonalityProfile], None]) -> None:
+        """Apply change() to the stored profile; the IMMEDIATE transaction keeps other processes' writes out."""
+        async with self._update_lock():
+            async with connect_db(DB_PATH) as db:
+                await db.execute("BEGIN IMMEDIATE")
+                cur = await db.execute(
+                    "SELECT value FROM settings WHERE key = ?", (self._SETTINGS_KEY,)
+                )
+                row = await cur.fetchone()
+                profile = self._parse(row[0] if row else None)
+                change(profile)
+                await self._write(db, profile)
+                await db.commit()
+            self._profile, self._loaded_at = profile, time.monotonic()
+
     # ── Learning ──────────────────────────────────────────────────────────────
 
     async def record_interaction(
@@ -79,40 +127,39 @@ class PersonalityLearner:
         response_length: int,
         topics: list[str] | None = None,
     ) -> None:
-        profile = await self.load()
-        profile.total_interactions += 1
+        def change(profile: PersonalityProfile) -> None:
+            profile.total_interactions += 1
 
-        # Nudge verbosity toward observed response length
-        if response_length < 100:
-            profile.verbosity = max(0.0, profile.verbosity - 0.01)
-        elif response_length > 500:
-            profile.verbosity = min(1.0, profile.verbosity + 0.01)
+            # Nudge verbosity toward observed response length
+            if response_length < 100:
+                profile.verbosity = max(0.0, profile.verbosity - 0.01)
+            elif response_length > 500:
+                profile.verbosity = min(1.0, profile.verbosity + 0.01)
 
-        # Track topic frequency
-        if topics:
-            for t in topics:
-                if t not in profile.top_topics:
-                    profile.top_topics.append(t)
-            profile.top_topics = profile.top_topics[-20:]  # keep last 20
+            # Track topic frequency
+            if topics:
+                for t in topics:
+                    if t not in profile.top_topics:
+                        profile.top_topics.append(t)
+                profile.top_topics = profile.top_topics[-20:]  # keep last 20
 
-        await self.save(profile)
+        await self._update(change)
 
     async def record_feedback(self, positive: bool) -> None:
-        profile = await self.load()
-        if positive:
-            profile.positive_signals += 1
-            # More positive feedback → slightly more verbose + detailed
-            profile.verbosity = min(1.0, profile.verbosity + 0.02)
-            profile.technical_depth = min(1.0, profile.technical_depth + 0.01)
-        else:
-            profile.negative_signals += 1
-            # Negative → be more concise
-            profile.verbosity = max(0.0, profile.verbosity - 0.02)
-        await self.save(profile)
+        def change(profile: PersonalityProfile) -> None:
+            if positive:
+                profile.positive_signals += 1
+                # More positive feedback → slightly more verbose + detailed
+                profile.verbosity = min(1.0, profile.verbosity + 0.02)
+                profile.technical_depth = min(1.0, profile.technical_depth + 0.01)
+            else:
+                profile.negative_signals += 1
+                # Negative → be more concise
+                profile.verbosity = max(0.0, profile.verbosity - 0.02)
+
+        await self._update(change)
 
     async def set_style(self, style: StylePreference) -> None:
-        profile = await self.load()
-        profile.style = style
         style_presets = {
             "concise":   (0.2, 0.3),
             "balanced":  (0.5, 0.5),
@@ -120,15 +167,19 @@ class PersonalityLearner:
             "technical": (0.7, 0.9),
         }
         v, d = style_presets.get(style, (0.5, 0.5))
-        profile.verbosity = v
-        profile.technical_depth = d
-        await self.save(profile)
+
+        def change(profile: PersonalityProfile) -> None:
+            profile.style = style
+            profile.verbosity = v
+            profile.technical_depth = d
+
+        await self._update(change)
 
     # ── System prompt injection ───────────────────────────────────────────────
 
     async def get_style_instruction(self) -> str:
         """Return a short instruction to inject into the system prompt."""
-        profile = await self.load()
+        profile = await self._current()
         parts = []
 
         if profile.style == "concise":
@@ -151,7 +202,7 @@ class PersonalityLearner:
         return " ".join(parts) if parts else ""
 
     async def get_profile(self) -> dict:
-        return asdict(await self.load())
+        return asdict(await self._current())
 
 
 # Singleton
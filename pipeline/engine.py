@@ -23,7 +23,7 @@ from typing import Literal, Optional
 
 import aiosqlite
 
-from vault.schema import DB_PATH
+from vault.schema import DB_PATH, connect_db
 
 logger = logging.getLogger("sam.pipeline")
 
@@ -53,7 +53,7 @@ class PipelineEngine:
             "tags": tags or [],
             "history": [{"stage": "draft", "at": now}],
         })
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 "INSERT INTO documents (title, content, type, source, created_at, embedding) VALUES (?, ?, 'pipeline', ?, ?, NULL)",
                 (title, json.dumps({"body": body, "meta": meta}), doc_id, now),
@@ -107,7 +107,7 @@ class PipelineEngine:
     # ── Query ─────────────────────────────────────────────────────────────────
 
     async def list_docs(self, stage: str = "", limit: int = 50) -> list[dict]:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 "SELECT * FROM documents WHERE type = 'pipeline' ORDER BY created_at DESC LIMIT ?",
@@ -131,7 +131,7 @@ class PipelineEngine:
         return docs
 
     async def get_doc(self, doc_id: str) -> Optional[dict]:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 "SELECT * FROM documents WHERE source = ? AND type = 'pipeline'", (doc_id,)
@@ -169,7 +169,7 @@ class PipelineEngine:
         meta["history"] = history
         payload["meta"] = json.dumps(meta)
 
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 "UPDATE documents SET content = ? WHERE source = ? AND type = 'pipeline'",
                 (json.dumps(payload), doc_id),
@@ -186,7 +186,7 @@ class PipelineEngine:
         except Exception:
             payload = {}
         payload["body"] = body
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             await db.execute(
                 "UPDATE documents SET content = ? WHERE source = ? AND type = 'pipeline'",
                 (json.dumps(payload), doc_id),
@@ -2,9 +2,11 @@
 Enhanced git state detection.
 Provides file-level changes, dangerous states, large-file alerts, and dependency change detection.
 """
+import copy
 import subprocess
 from pathlib import Path
 from log.logger import get_logger
+from system.singleflight import group
 
 logger = get_logger("GIT_INTEL")
 
@@ -24,6 +26,10 @@ _DEP_FILES = {
 # Files larger than this (bytes) trigger a staged-large-file alert
 _LARGE_FILE_THRESHOLD = 500_000  # 500 KB
 
+# The presence engine, skills and intents all ask about the same repo in bursts
+GIT_STATUS_TTL_S = 2.0
+_GIT_STATUS = group("git_status", ttl_s=GIT_STATUS_TTL_S)
+
 
 def _run(args: list[str], cwd: str, timeout: int = 5) -> str:
     """Run a git command and return stdout stripped, or '' on error."""
@@ -42,6 +48,9 @@ def get_git_status(cwd: str) -> dict:
     """
     Return a rich dict describing current git state for a repository.
 
+    Concurrent calls for the same cwd share one set of git subprocesses, and
+    the result is reused for GIT_STATUS_TTL_S.
+
     Keys:
         changed_files   list[str]  — all modified/untracked filenames
         staged_files    list[str]  — staged (index) filenames
@@ -54,6 +63,10 @@ def get_git_status(cwd: str) -> dict:
         ahead           int        — commits ahead of upstream (0 if unknown)
         cwd             str        — directory that was queried
     """
+    return copy.deepcopy(_GIT_STATUS.do(cwd, _read_git_status, cwd))
+
+
+def _read_git_status(cwd: str) -> dict:
     result: dict = {
         "changed_files": [],
         "staged_files": [],
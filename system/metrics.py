@@ -0,0 +1,307 @@
+"""
+system/metrics.py — in-process metrics registry with Prometheus text output.
+
+A small, dependency-free subset of prometheus_client: counters, gauges and
+histograms with labels, rendered in the Prometheus text exposition format
+(version 0.0.4) by the daemon's GET /metrics.
+
+Hot paths only pay for a dict lookup (the labelled child is cached), a
+bisect into the bucket list and a short lock — no allocation per call.
+Values that already live elsewhere (WebSocket queue depths, task queue
+sizes) are not tracked continuously; register_collector() callbacks copy
+them into gauges when /metrics is scraped.
+
+Label values are capped at MAX_SERIES combinations per metric; further
+combinations are folded into "other" so an unexpected label (e.g. an intent
+name invented by the LLM) can't grow memory without bound.
+
+Usage:
+    from system.metrics import registry
+    LATENCY = registry.histogram("sam_x_seconds", "X latency", ["kind"])
+    LATENCY.labels("fast").observe(0.012)
+    with LATENCY.labels("slow").time():
+        ...
+    registry.render()      # text for /metrics
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger("sam.metrics")
+
+MAX_SERIES = 500
+
+# Seconds; covers sub-millisecond vault queries up to multi-second LLM turns.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child) -> None:
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def set(self, value: float) -> None:
+        """Mirror a cumulative count that is kept elsewhere (collectors only)."""
+        self._value = float(value)
+
+    def samples(self, name: str):
+        yield name + "_total", (), self._value
+
+
+class _GaugeChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def samples(self, name: str):
+        yield name, (), self._value
+
+
+class _HistogramChild:
+    __slots__ = ("_buckets", "_counts", "_sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)     # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+    def samples(self, name: str):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative = 0
+        for bound, count in zip(self._buckets + (math.inf,), counts):
+            cumulative += count
+            yield name + "_bucket", (("le", _format_value(bound)),), cumulative
+        yield name + "_sum", (), total
+        yield name + "_count", (), cumulative
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._unlabelled = self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is not None:
+            return child
+        if len(key) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {key}")
+        with self._lock:
+            if key not in self._children and len(self._children) >= MAX_SERIES:
+                key = ("other",) * len(key)
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+        return child
+
+    def clear(self) -> None:
+        """Drop all labelled children (collectors that rebuild gauges each scrape)."""
+        with self._lock:
+            self._children = {} if self.label_names else {(): self._unlabelled}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            base = tuple(zip(self.label_names, key))
+            for sample, extra, value in child.samples(self.name):
+                labels = base + extra
+                if labels:
+                    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                    lines.append(f"{sample}{{{body}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{sample} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled.inc(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabelled.set(value)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._unlabelled.set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled.dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled.observe(value)
+
+    def time(self) -> _Timer:
+        return self._unlabelled.time()
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def register_collector(self, fn: Callable[[], None]) -> None:
+        """fn() runs at every scrape, before rendering, to refresh gauges from live state."""
+        if fn not in self._collectors:
+            self._collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in list(self._collectors):
+            try:
+                fn()
+            except Exception as e:
+                logger.warning(f"[Metrics] collector {getattr(fn, '__name__', fn)} failed: {e}")
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Module-level singleton — import this everywhere
+registry = Registry()
+
+
+# ── Metrics shared across modules ────────────────────────────────────────────
+# Declared here so instrumented modules don't depend on each other.
+
+LLM_LATENCY = registry.histogram(
+    "sam_llm_request_duration_seconds", "LLM call latency (whole response)", ["provider", "mode"])
+LLM_TTFT = registry.histogram(
+    "sam_llm_time_to_first_token_seconds", "Time from request to first streamed token", ["provider"])
+LLM_ERRORS = registry.counter(
+    "sam_llm_errors", "LLM calls that raised", ["provider"])
+INTENT_DURATION = registry.histogram(
+    "sam_intent_duration_seconds", "handle_intent dispatch time per intent", ["intent"])
+TTS_SYNTHESIS = registry.histogram(
+    "sam_tts_synthesis_seconds", "edge-tts synthesis time per utterance")
+TTS_PLAYBACK = registry.histogram(
+    "sam_tts_playback_seconds", "Audio playback time per utterance", buckets=(0.5, 1, 2, 5, 10, 20, 30, 60))
+VAULT_QUERY = registry.histogram(
+    "sam_vault_query_duration_seconds", "SQLite statement execution time", ["op", "table"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+WORKFLOW_RUNS = registry.histogram(
+    "sam_workflow_run_duration_seconds", "Workflow run time by trigger and final status", ["trigger", "status"])
+TASK_RUNS = registry.histogram(
+    "sam_task_run_duration_seconds", "Background task run time by class and final status",
+    ["task_class", "status"], buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800))
+TASK_WAIT = registry.histogram(
+    "sam_task_wait_seconds", "Background task time spent queued", ["task_class"],
+    buckets=(0.01, 0.1, 1, 5, 15, 30, 60, 300, 900))
@@ -12,8 +12,11 @@ Runs a background daemon every 10 seconds that:
   8. Queues suggestions when thresholds are crossed
 
 Suggestions are consumed by main.py's ai_loop and delivered as
-sound + UI log — no automatic voice unless the user responds.
+sound + UI log — no automatic voice unless the user responds. ai_loop
+awaits them on an asyncio.Queue from subscribe_async(); without a
+subscriber they collect on engine.suggestions.
 """
+import asyncio
 import os
 import queue
 import subprocess
@@ -54,7 +57,7 @@ class PresenceEngine:
     Usage:
         engine = PresenceEngine()
         engine.start()
-        # main loop periodically calls engine.suggestions.get_nowait()
+        suggestions = engine.subscribe_async()  # in the event loop; await suggestions.get()
         snapshot = engine.get_state_snapshot()  # inject into LLM
     """
 
@@ -98,6 +101,8 @@ class PresenceEngine:
     def __init__(self, poll_interval: int = 10):
         self.state = UserState()
         self.suggestions: queue.Queue = queue.Queue()
+        self._async_subscribers: list = []      # (loop, asyncio.Queue)
+        self._subscribers_lock = threading.Lock()
         self._poll_interval = poll_interval
         self._running = False
         self._thread: Optional[threading.Thread] = None
@@ -676,9 +681,37 @@ class PresenceEngine:
     # Helpers
     # ------------------------------------------------------------------
 
+    def subscribe_async(self) -> "asyncio.Queue":
+        """
+        Return an asyncio.Queue that receives every suggestion, starting with
+        any already waiting on self.suggestions. Must be called from inside
+        the event loop that will read it.
+        """
+        loop = asyncio.get_running_loop()
+        q: asyncio.Queue = asyncio.Queue()
+        with self._subscribers_lock:
+            while True:
+                try:
+                    q.put_nowait(self.suggestions.get_nowait())
+                except queue.Empty:
+                    break
+            self._async_subscribers.append((loop, q))
+        return q
+
     def _queue(self, suggestion: dict):
-        """Put a suggestion on the queue (non-blocking)."""
-        self.suggestions.put(suggestion)
+        """Hand a suggestion to the async subscribers, or queue it until there is one (non-blocking)."""
+        with self._subscribers_lock:
+            subscribers = [(loop, q) for loop, q in self._async_subscribers if not loop.is_closed()]
+            self._async_subscribers = subscribers
+            delivered = False
+            for loop, q in subscribers:
+                try:
+                    loop.call_soon_threadsafe(q.put_nowait, suggestion)
+                    delivered = True
+                except RuntimeError:        # loop closed meanwhile
+                    pass
+            if not delivered:
+                self.suggestions.put(suggestion)
 
     def _defer(self, suggestion: dict):
         """Hold a suggestion until the current focus session ends."""
@@ -0,0 +1,168 @@
+"""
+system/singleflight.py — coalesce identical concurrent lookups into one call.
+
+Dashboards, the orb and channel bots often ask for the same thing at the
+same moment (a reconnect burst re-fetches everything at once). A Group
+lets concurrent callers with the same key share one in-flight computation:
+the first caller runs it, the rest wait for its result (or its exception).
+With ttl_s > 0 a finished result is also reused for that long; errors are
+never cached.
+
+Both sync callers (threads) and async callers are supported, on separate
+in-flight tables: do() for blocking functions, do_async() for coroutines.
+An async caller that is cancelled doesn't cancel the shared computation the
+others are waiting on.
+
+Results are shared objects: callers must not mutate them (return a copy
+from the wrapped function's public wrapper if they might).
+
+Usage:
+    from system.singleflight import group
+    _GIT = group("git_status", ttl_s=2.0)
+    status = _GIT.do(cwd, _read_git_status, cwd)
+    rows = await _ENTITIES.do_async((type, q), _query_entities, type, q)
+
+Counts per group are exported as sam_singleflight_calls{group,outcome} on
+/metrics and returned by stats().
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from system.metrics import registry
+
+MAX_CACHED = 256       # finished results kept per group when ttl_s > 0
+
+CALLS = registry.counter("sam_singleflight_calls", "Coalesced lookups by outcome", ["group", "outcome"])
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Group:
+    def __init__(self, name: str, ttl_s: float = 0.0) -> None:
+        self.name = name
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._counts = {"executed": 0, "coalesced": 0, "cached": 0}
+
+    def _count(self, outcome: str) -> None:
+        self._counts[outcome] += 1
+        CALLS.labels(self.name, outcome).inc()
+
+    def _cached(self, key: Hashable) -> Tuple[bool, Any]:
+        if self.ttl_s <= 0:
+            return False, None
+        hit = self._cache.get(key)
+        if hit is None:
+            return False, None
+        if hit[0] < time.monotonic():
+            del self._cache[key]
+            return False, None
+        return True, hit[1]
+
+    def _store(self, key: Hashable, result: Any) -> None:
+        if self.ttl_s <= 0:
+            return
+        if len(self._cache) >= MAX_CACHED:
+            now = time.monotonic()
+            for stale in [k for k, (expires, _) in self._cache.items() if expires < now] or [next(iter(self._cache))]:
+                del self._cache[stale]
+        self._cache[key] = (time.monotonic() + self.ttl_s, result)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless a call with `key` is in flight (or cached); share its result."""
+        with self._lock:
+            hit, value = self._cached(key)
+            if hit:
+                self._count("cached")
+                return value
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._count("executed")
+            else:
+                self._count("coalesced")
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is None:
+                    self._store(key, call.result)
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Async form of do(): fn(*args, **kwargs) must return an awaitable."""
+        with self._lock:
+            hit, value = self._cached(key)
+            if hit:
+                self._count("cached")
+                return value
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+                task.add_done_callback(lambda t, key=key: self._finished(key, t))
+                self._count("executed")
+            else:
+                self._count("coalesced")
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future) -> None:
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+            if not task.cancelled() and task.exception() is None:
+                self._store(key, task.result())
+
+    def forget(self, key: Hashable) -> None:
+        """Drop a cached result so the next call recomputes it."""
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = sum(self._counts.values())
+            return {
+                **self._counts,
+                "calls": calls,
+                "coalesced_ratio": round((calls - self._counts["executed"]) / calls, 3) if calls else 0.0,
+                "in_flight": len(self._calls) + len(self._tasks),
+                "ttl_s": self.ttl_s,
+            }
+
+
+_groups: Dict[str, Group] = {}
+
+
+def group(name: str, ttl_s: float = 0.0) -> Group:
+    """The named group, created on first use (the first caller's ttl_s wins)."""
+    g = _groups.get(name)
+    if g is None:
+        g = _groups.setdefault(name, Group(name, ttl_s))
+    return g
+
+
+def stats() -> Dict[str, dict]:
+    return {name: g.stats() for name, g in sorted(_groups.items())}
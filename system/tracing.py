@@ -0,0 +1,534 @@
+"""
+system/tracing.py — per-turn span tracing, stored compactly in the vault.
+
+One trace covers one conversational turn, from the transcript arriving (or a
+message reaching the input mux) to the reply having been spoken. Spans nest
+under whichever span is current when they open:
+
+    turn                      ai_loop / session worker
+      echo_gate               get_voice_input, before the input mux
+      input_queue             time the message waited in the input mux
+      load_memory, presence, llm
+      handle_intent
+        action                handler thread (TracedThread)
+          tts                 edge_speak's playback thread
+            synthesis, playback
+
+The current span lives in a ContextVar, so it follows asyncio tasks and
+asyncio.to_thread() automatically. Plain threads start with an empty context;
+use TracedThread (a drop-in threading.Thread) to carry the caller's span
+across. Inside collect_threads(), every TracedThread started (directly or
+from another such thread) is also collected, so a caller can wait for the
+work a handler started in the background. A trace is recorded when its root is finished *and* every span opened
+under it has closed, so a reply spoken from a background thread still counts
+towards the turn. Outside a trace, span() is a ContextVar lookup and nothing
+more.
+
+Finished traces are queued to a writer thread and kept in the vault's
+`traces` table (newest `keep`), one row per trace with the spans packed into
+a JSON array. GET /api/traces lists the slowest recent turns with a
+per-phase breakdown; GET /api/traces/{id} returns the span tree and folded
+stacks for flame-graph tools.
+
+Usage:
+    from system import tracing
+    turn = tracing.start("turn", source="voice")
+    with tracing.span("llm"):
+        ...
+    turn.finish()
+"""
+
+import contextvars
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("sam.tracing")
+
+KEEP_TRACES = 2000        # rows kept in the vault
+RECENT_TRACES = 200       # finished traces kept in memory (served if the vault is unavailable)
+MAX_SPANS = 256           # per trace; further spans are dropped
+STALE_S = 120.0           # record a finished turn anyway if a span is still open after this
+WRITE_BATCH = 50
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS traces (
+        id          TEXT PRIMARY KEY,
+        name        TEXT NOT NULL,
+        started_at  REAL NOT NULL,
+        duration_ms REAL NOT NULL,
+        attrs       TEXT NOT NULL DEFAULT '{}',
+        spans       TEXT NOT NULL
+    )
+"""
+_CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_traces_started ON traces(started_at)",
+    "CREATE INDEX IF NOT EXISTS idx_traces_duration ON traces(duration_ms)",
+)
+
+# (trace, index of the current span in trace._spans)
+_current: contextvars.ContextVar[Optional[Tuple["Trace", int]]] = contextvars.ContextVar("sam_trace", default=None)
+_collector: contextvars.ContextVar[Optional[List[threading.Thread]]] = contextvars.ContextVar(
+    "sam_thread_collector", default=None)
+
+# Span row layout in Trace._spans
+_NAME, _PARENT, _START, _DURATION, _THREAD, _ATTRS = range(6)
+
+
+class Trace:
+    def __init__(self, name: str, **attrs) -> None:
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: List[list] = [[name, -1, 0.0, None, threading.current_thread().name, {}]]
+        self._open = 1
+        self._finished_at: Optional[float] = None
+        self._recorded = False
+
+    def tag(self, **attrs) -> None:
+        """Attach attributes to the whole trace (e.g. the detected intent)."""
+        self.attrs.update(attrs)
+
+    def open_span(self, name: str, parent: int, attrs: Optional[dict] = None) -> int:
+        with self._lock:
+            if self._recorded or len(self._spans) >= MAX_SPANS:
+                return -1
+            self._spans.append([name, parent, time.perf_counter() - self._t0, None,
+                                threading.current_thread().name, attrs or {}])
+            self._open += 1
+            return len(self._spans) - 1
+
+    def close_span(self, index: int, **attrs) -> None:
+        if index < 0:
+            return
+        with self._lock:
+            row = self._spans[index]
+            if row[_DURATION] is not None or self._recorded:
+                return
+            row[_DURATION] = time.perf_counter() - self._t0 - row[_START]
+            row[_ATTRS].update(attrs)
+            self._open -= 1
+            done = self._open == 0
+            self._recorded = self._recorded or done
+        if done:
+            get_recorder().record(self)
+
+    def add_span(self, name: str, duration_s: float, parent: int = 0, **attrs) -> None:
+        """Add an already-measured span that ended just now."""
+        with self._lock:
+            if self._recorded or len(self._spans) >= MAX_SPANS:
+                return
+            end = time.perf_counter() - self._t0
+            self._spans.append([name, parent, max(0.0, end - duration_s), duration_s,
+                                threading.current_thread().name, attrs])
+
+    @contextmanager
+    def activate(self):
+        """Make this trace current for the duration of the block."""
+        token = _current.set((self, 0))
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def finish(self, **attrs) -> None:
+        """Close the root span. The trace is recorded once its remaining spans close."""
+        self.attrs.update(attrs)
+        current = _current.get()
+        if current is not None and current[0] is self:
+            _current.set(None)
+        if self._finished_at is None:
+            self._finished_at = time.monotonic()
+            get_recorder().watch(self)
+            self.close_span(0)
+
+    def to_record(self) -> dict:
+        """Compact form stored in the vault: spans as [name, parent, start_ms, duration_ms, thread, attrs?]."""
+        with self._lock:
+            spans = [list(row) for row in self._spans]
+        threads: Dict[str, int] = {}
+        packed, end = [], 0.0
+        for row in spans:
+            start_ms = round(row[_START] * 1000, 2)
+            duration_ms = None if row[_DURATION] is None else round(row[_DURATION] * 1000, 2)
+            end = max(end, start_ms + (duration_ms or 0.0))
+            entry = [row[_NAME], row[_PARENT], start_ms, duration_ms,
+                     threads.setdefault(row[_THREAD], len(threads))]
+            if row[_ATTRS]:
+                entry.append(row[_ATTRS])
+            packed.append(entry)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(end, 2),
+            "attrs": self.attrs,
+            "threads": list(threads),
+            "spans": packed,
+        }
+
+
+# ── Context helpers ───────────────────────────────────────────────────────────
+
+def current() -> Optional[Trace]:
+    cur = _current.get()
+    return cur[0] if cur else None
+
+
+def start(name: str, **attrs) -> Trace:
+    """Begin a trace and make it current in this task/thread's context."""
+    trace = Trace(name, **attrs)
+    _current.set((trace, 0))
+    return trace
+
+
+def resume(trace: Trace) -> Trace:
+    """Make a trace started elsewhere (e.g. by an input producer) current here."""
+    _current.set((trace, 0))
+    return trace
+
+
+def detach() -> Optional[Trace]:
+    """Clear the current trace and return it, so it can be handed to another task."""
+    trace = current()
+    _current.set(None)
+    return trace
+
+
+@contextmanager
+def span(name: str, **attrs):
+    cur = _current.get()
+    if cur is None:
+        yield
+        return
+    trace, parent = cur
+    index = trace.open_span(name, parent, attrs)
+    token = _current.set((trace, index if index >= 0 else parent))
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        if error:
+            trace.close_span(index, error=error)
+        else:
+            trace.close_span(index)
+
+
+def add_span(name: str, duration_s: float, **attrs) -> None:
+    """Record an already-measured interval under the current span, if any."""
+    cur = _current.get()
+    if cur is not None:
+        cur[0].add_span(name, duration_s, parent=cur[1], **attrs)
+
+
+class TracedThread(threading.Thread):
+    """threading.Thread that runs as one span of the caller's trace (if any)."""
+
+    def __init__(self, *args, span_name: str = "action", **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._collector = _collector.get()
+        if self._collector is not None:
+            self._collector.append(self)
+        self._trace_parent = _current.get()
+        self._trace_span = -1
+        if self._trace_parent is not None:
+            # Opened now, not in run(), so the turn can't be recorded before the thread starts
+            trace, parent = self._trace_parent
+            target = kwargs.get("target") or (args[1] if len(args) > 1 else None)
+            self._trace_span = trace.open_span(span_name, parent, {"fn": getattr(target, "__name__", "?")})
+
+    def run(self) -> None:
+        if self._collector is not None:
+            _collector.set(self._collector)      # threads this one starts are collected too
+        if self._trace_parent is None:
+            super().run()
+            return
+        trace, parent = self._trace_parent
+        _current.set((trace, self._trace_span if self._trace_span >= 0 else parent))
+        try:
+            super().run()
+        finally:
+            trace.close_span(self._trace_span)
+
+
+@contextmanager
+def collect_threads():
+    """Yield a list that gathers every TracedThread started in this context (and by those threads)."""
+    threads: List[threading.Thread] = []
+    token = _collector.set(threads)
+    try:
+        yield threads
+    finally:
+        _collector.reset(token)
+
+
+# ── Analysis ──────────────────────────────────────────────────────────────────
+
+def _spans_by_index(record: dict) -> List[dict]:
+    spans = record["spans"]
+    threads = record.get("threads") or []
+    children: Dict[int, float] = {}
+    for entry in spans:
+        if entry[1] >= 0 and entry[3] is not None:
+            children[entry[1]] = children.get(entry[1], 0.0) + entry[3]
+    out: List[dict] = []
+    for i, entry in enumerate(spans):
+        name, parent, start_ms, duration_ms, thread = entry[:5]
+        own = None if duration_ms is None else round(max(0.0, duration_ms - children.get(i, 0.0)), 2)
+        out.append({
+            "name": name,
+            "depth": out[parent]["depth"] + 1 if 0 <= parent < i else 0,
+            "parent": parent,
+            "start_ms": start_ms,
+            "duration_ms": duration_ms,
+            "self_ms": own,
+            "thread": threads[thread] if thread < len(threads) else str(thread),
+            "attrs": entry[5] if len(entry) > 5 else {},
+        })
+    return out
+
+
+def expand(record: dict) -> List[dict]:
+    """Spans of a stored trace as dicts with depth and self time, in start order."""
+    return sorted(_spans_by_index(record), key=lambda s: (s["start_ms"], s["depth"]))
+
+
+def breakdown(record: dict) -> Dict[str, float]:
+    """Milliseconds per direct child of the root, plus the root's own time as "other"."""
+    phases: Dict[str, float] = {}
+    for span_ in _spans_by_index(record):
+        if span_["depth"] == 1 and span_["duration_ms"] is not None:
+            phases[span_["name"]] = round(phases.get(span_["name"], 0.0) + span_["duration_ms"], 2)
+        elif span_["depth"] == 0 and span_["self_ms"] is not None:
+            phases["other"] = span_["self_ms"]
+    return phases
+
+
+def folded(record: dict) -> List[str]:
+    """Folded stacks ("turn;handle_intent;action 1234", self time in µs) for flame-graph tools."""
+    paths: List[str] = []
+    totals: Dict[str, int] = {}
+    for i, span_ in enumerate(_spans_by_index(record)):
+        parent = span_["parent"]
+        paths.append(f"{paths[parent]};{span_['name']}" if 0 <= parent < i else span_["name"])
+        if span_["self_ms"]:
+            totals[paths[i]] = totals.get(paths[i], 0) + int(span_["self_ms"] * 1000)
+    return [f"{path} {us}" for path, us in totals.items() if us > 0]
+
+
+# ── Storage ───────────────────────────────────────────────────────────────────
+
+class TraceRecorder:
+    def __init__(self, db_path: Optional[Path] = None, keep: int = KEEP_TRACES, enabled: bool = True) -> None:
+        self._db_path = db_path
+        self.keep = keep
+        self.enabled = enabled
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._recent: deque = deque(maxlen=RECENT_TRACES)
+        self._waiting: Dict[str, Trace] = {}
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._persist = True
+        self._recorded = 0
+
+    def watch(self, trace: Trace) -> None:
+        """Called when a trace's root finishes; the writer records it late if a span never closes."""
+        with self._lock:
+            self._waiting[trace.id] = trace
+
+    def record(self, trace: Trace) -> None:
+        with self._lock:
+            self._waiting.pop(trace.id, None)
+        if not self.enabled:
+            return
+        rec = trace.to_record()
+        self._recent.append(rec)
+        self._recorded += 1
+        if self._persist:
+            self._queue.put(rec)
+            self._ensure_writer()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Wait (briefly) until queued traces have been written."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    # ── Writer thread ────────────────────────────────────────────────────────
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            with self._lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(target=self._write_loop, name="sam-trace-writer", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=5.0)]
+            except queue.Empty:
+                self._expire_stale()
+                continue
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            self._expire_stale()
+
+    def _expire_stale(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stale = [t for t in self._waiting.values() if now - (t._finished_at or now) > STALE_S]
+        for trace in stale:
+            with trace._lock:
+                if trace._recorded:
+                    continue
+                trace._recorded = True
+            trace.tag(incomplete=True)
+            self.record(trace)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self._persist:
+            return None
+        try:
+            if self._db_path is None:
+                from vault.schema import DB_PATH
+                self._db_path = DB_PATH
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._db_path), timeout=5)
+            conn.execute(_CREATE_TABLE)
+            for sql in _CREATE_INDEXES:
+                conn.execute(sql)
+            return conn
+        except Exception as e:
+            logger.warning(f"[Tracing] vault unavailable, traces kept in memory only: {e}")
+            self._persist = False
+            return None
+
+    def _write(self, batch: List[dict]) -> None:
+        conn = self._connect()
+        if not conn:
+            return
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO traces (id, name, started_at, duration_ms, attrs, spans) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(r["id"], r["name"], r["started_at"], r["duration_ms"],
+                      json.dumps(r["attrs"], separators=(",", ":"), default=str),
+                      json.dumps({"t": r["threads"], "s": r["spans"]}, separators=(",", ":"), default=str))
+                     for r in batch],
+                )
+                conn.execute(
+                    "DELETE FROM traces WHERE started_at < (SELECT started_at FROM traces "
+                    "ORDER BY started_at DESC LIMIT 1 OFFSET ?)", (self.keep - 1,))
+        except sqlite3.Error as e:
+            logger.warning(f"[Tracing] write failed: {e}")
+        finally:
+            conn.close()
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _from_row(row) -> dict:
+        trace_id, name, started_at, duration_ms, attrs, spans = row
+        packed = json.loads(spans)
+        return {"id": trace_id, "name": name, "started_at": started_at, "duration_ms": duration_ms,
+                "attrs": json.loads(attrs), "threads": packed["t"], "spans": packed["s"]}
+
+    def query(self, limit: int = 20, order: str = "slowest", name: Optional[str] = None,
+              since: Optional[float] = None) -> List[dict]:
+        """Stored traces, slowest or most recent first (blocking; call via asyncio.to_thread)."""
+        self.flush()
+        where, params = [], []
+        if name:
+            where.append("name = ?")
+            params.append(name)
+        if since is not None:
+            where.append("started_at >= ?")
+            params.append(since)
+        conn = self._connect()
+        if conn is None:
+            rows = [r for r in self._recent
+                    if (not name or r["name"] == name) and (since is None or r["started_at"] >= since)]
+            key = (lambda r: r["duration_ms"]) if order == "slowest" else (lambda r: r["started_at"])
+            return sorted(rows, key=key, reverse=True)[:limit]
+        sql = "SELECT id, name, started_at, duration_ms, attrs, spans FROM traces"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ("duration_ms" if order == "slowest" else "started_at") + " DESC LIMIT ?"
+        try:
+            return [self._from_row(row) for row in conn.execute(sql, (*params, limit)).fetchall()]
+        finally:
+            conn.close()
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        self.flush()
+        for rec in self._recent:
+            if rec["id"] == trace_id:
+                return rec
+        conn = self._connect()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT id, name, started_at, duration_ms, attrs, spans FROM traces WHERE id = ?",
+                               (trace_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._from_row(row) if row else None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "persisted": self._persist,
+            "recorded": self._recorded,
+            "in_flight": len(self._waiting),
+            "queued": self._queue.qsize(),
+        }
+
+
+def _recorder_from_config() -> TraceRecorder:
+    try:
+        from config.loader import get
+        cfg = get("daemon", "tracing", {}) or {}
+    except Exception:
+        cfg = {}
+    return TraceRecorder(
+        keep=int(cfg.get("keep", KEEP_TRACES)),
+        enabled=bool(cfg.get("enabled", True)),
+    )
+
+
+_recorder: Optional[TraceRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> TraceRecorder:
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = _recorder_from_config()
+    return _recorder
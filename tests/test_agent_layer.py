@@ -0,0 +1,356 @@
+"""
+Unit tests for the agent layer (agent/).
+No LLM calls, no network — planner/executor collaborators are patched.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 1. PLAN CACHE  (agent/plan_cache.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _research_plan(topic: str) -> dict:
+    return {
+        "goal":  f"research {topic}",
+        "steps": [
+            {"step": 1, "tool": "web_search", "description": f"Search for {topic}",
+             "parameters": {"query": topic}, "critical": True},
+            {"step": 2, "tool": "file_controller", "description": "Save notes",
+             "parameters": {"action": "write", "name": f"{topic}.txt"}, "critical": False},
+        ],
+    }
+
+
+class TestNormalizeGoal(unittest.TestCase):
+
+    def test_topic_prefix_becomes_slot(self):
+        from agent.plan_cache import normalize_goal
+        template, params = normalize_goal("Research quantum computing.")
+        self.assertEqual(template, "research {topic}")
+        self.assertEqual(params, {"topic": "quantum computing"})
+
+    def test_urls_and_numbers_become_slots(self):
+        from agent.plan_cache import normalize_goal
+        template, params = normalize_goal("open https://example.com 3 times")
+        self.assertEqual(template, "open {url0} {num0} times")
+        self.assertEqual(params["url0"], "https://example.com")
+        self.assertEqual(params["num0"], "3")
+
+    def test_plain_goal_has_no_params(self):
+        from agent.plan_cache import normalize_goal
+        template, params = normalize_goal("Check my emails and summarize")
+        self.assertEqual(template, "check my emails and summarize")
+        self.assertEqual(params, {})
+
+
+class TestPlanCache(unittest.TestCase):
+
+    def setUp(self):
+        from agent.plan_cache import PlanCache
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "plan_cache.json"
+        self.cache = PlanCache(path=self.path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_miss_on_empty_cache(self):
+        self.assertIsNone(self.cache.lookup("research rust"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_exact_hit_substitutes_new_params(self):
+        self.cache.record_outcome("research rust", _research_plan("rust"), success=True)
+        plan = self.cache.lookup("research golang")
+        self.assertIsNotNone(plan)
+        self.assertEqual(plan["_cached"], "exact")
+        self.assertEqual(plan["steps"][0]["parameters"]["query"], "golang")
+        self.assertEqual(plan["steps"][1]["parameters"]["name"], "golang.txt")
+
+    def test_param_inside_other_tokens_is_left_alone(self):
+        plan = {"goal": "run the tests 3 times",
+                "steps": [{"step": 1, "tool": "cmd_control",
+                           "parameters": {"task": "python3 -m pytest --count 3", "repeat": "3"}}]}
+        self.cache.record_outcome("run the tests 3 times", plan, success=True)
+        hit = self.cache.lookup("run the tests 5 times")
+        self.assertEqual(hit["steps"][0]["parameters"],
+                         {"task": "python3 -m pytest --count 3", "repeat": "5"})
+
+    def test_similar_hit(self):
+        plan = {"goal": "check my emails and summarize them",
+                "steps": [{"step": 1, "tool": "cmd_control", "parameters": {"task": "emails"}}]}
+        self.cache.record_outcome("check my emails and summarize them", plan, success=True)
+        hit = self.cache.lookup("check emails and summarize them")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit["_cached"], "similar")
+
+    def test_similar_goal_with_other_literal_is_a_miss(self):
+        goal = "delete every old temporary installer file inside the downloads folder right now"
+        plan = {"goal": goal,
+                "steps": [{"step": 1, "tool": "file_controller",
+                           "parameters": {"action": "delete", "folder": "downloads"}}]}
+        self.cache.record_outcome(goal, plan, success=True)
+        self.assertIsNone(self.cache.lookup(goal.replace("downloads", "documents")))
+
+    def test_failure_is_charged_to_the_serving_entry(self):
+        plan = {"goal": "check my emails and summarize them",
+                "steps": [{"step": 1, "tool": "cmd_control", "parameters": {"task": "emails"}}]}
+        self.cache.record_outcome("check my emails and summarize them", plan, success=True)
+        served = self.cache.lookup("check emails and summarize them")
+        self.cache.record_outcome("check emails and summarize them", served, success=False)
+        self.assertEqual(self.cache.stats()["templates"], 0)
+
+    def test_fallback_plans_are_not_stored(self):
+        plan = dict(_research_plan("rust"), _fallback=True)
+        self.cache.record_outcome("research rust", plan, success=True)
+        self.assertEqual(self.cache.stats()["templates"], 0)
+
+    def test_failures_drop_template(self):
+        self.cache.record_outcome("research rust", _research_plan("rust"), success=True)
+        served = self.cache.lookup("research zig")
+        self.cache.record_outcome("research zig", served, success=False)
+        self.assertIsNone(self.cache.lookup("research zig"))
+
+    def test_hit_rate_and_persistence(self):
+        from agent.plan_cache import PlanCache
+        self.cache.record_outcome("research rust", _research_plan("rust"), success=True)
+        self.cache.lookup("research zig")
+        self.cache.lookup("water the plants")
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.5)
+        reloaded = PlanCache(path=self.path)
+        self.assertIsNotNone(reloaded.lookup("research python"))
+
+
+class TestCreatePlanUsesCache(unittest.TestCase):
+
+    def test_cached_plan_skips_llm(self):
+        from agent import planner
+        cached = _research_plan("rust")
+        with patch("agent.plan_cache.plan_cache.lookup", return_value=cached) as lookup:
+            plan = planner.create_plan("research rust")
+        self.assertIs(plan, cached)
+        lookup.assert_called_once_with("research rust")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 2. TASK QUEUE  (agent/task_queue.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class _FakeExecutor:
+    """Records execution order; blocks until released when gate is given."""
+
+    def __init__(self, gate=None):
+        self.order = []
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def execute(self, goal, speak=None, cancel_flag=None):
+        with self._lock:
+            self.order.append(goal)
+        if self.gate:
+            self.gate.wait(timeout=2)
+        return f"done: {goal}"
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTaskQueue(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = Path(self._tmp.name) / "sam.db"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _make_queue(self, **kw):
+        from agent.task_queue import TaskQueue
+        kw.setdefault("db_path", self.db)
+        q = TaskQueue(**kw)
+        q._executor = _FakeExecutor()
+        return q
+
+    def test_priority_order(self):
+        from agent.task_queue import TaskPriority
+        q = self._make_queue(max_concurrent=1)
+        q.submit("low", TaskPriority.LOW)
+        q.submit("high", TaskPriority.HIGH)
+        q.submit("normal")
+        q.start()
+        try:
+            self.assertTrue(_wait_until(lambda: len(q._executor.order) == 3))
+            self.assertEqual(q._executor.order, ["high", "normal", "low"])
+        finally:
+            q.stop()
+
+    def test_class_limit_caps_concurrency(self):
+        gate = threading.Event()
+        q = self._make_queue(max_concurrent=3, class_limits={"agent": 1})
+        q._executor = _FakeExecutor(gate)
+        q.submit("a1")
+        q.submit("a2")
+        q.submit("r1", task_class="research")
+        q.start()
+        try:
+            self.assertTrue(_wait_until(lambda: len(q._executor.order) == 2))
+            time.sleep(0.05)
+            self.assertEqual(sorted(q._executor.order), ["a1", "r1"])
+            self.assertEqual(q.stats()["running"], {"agent": 1, "research": 1})
+            gate.set()
+            self.assertTrue(_wait_until(lambda: len(q._executor.order) == 3))
+        finally:
+            gate.set()
+            q.stop()
+
+    def test_history_is_bounded(self):
+        q = self._make_queue(max_concurrent=1, history_size=2)
+        ids = [q.submit(f"task {i}") for i in range(4)]
+        q.start()
+        try:
+            self.assertTrue(_wait_until(lambda: q.stats()["run_time"]["count"] == 4))
+            self.assertIsNone(q.get_status(ids[0]))
+            self.assertEqual(q.get_status(ids[3])["status"], "completed")
+            self.assertEqual(len(q._tasks), 0)
+            self.assertEqual(len(q.history()), 2)
+        finally:
+            q.stop()
+
+    def test_cancel_pending(self):
+        q = self._make_queue()
+        tid = q.submit("never runs")
+        self.assertTrue(q.cancel(tid))
+        self.assertEqual(q.pending_count(), 0)
+        self.assertEqual(q.get_status(tid)["status"], "cancelled")
+
+    def test_pending_tasks_survive_restart(self):
+        q1 = self._make_queue()
+        q1.submit("resume me")
+        q2 = self._make_queue(max_concurrent=1)
+        q2.start()
+        try:
+            self.assertTrue(_wait_until(lambda: q2._executor.order == ["resume me"]))
+            self.assertTrue(_wait_until(lambda: q2.stats()["wait_time"]["count"] == 1))
+        finally:
+            q2.stop()
+
+    def test_resume_skips_rows_owned_by_live_workers(self):
+        import socket
+        import sqlite3
+        import subprocess
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        q1 = self._make_queue()
+        live, orphan = q1.submit("still running elsewhere"), q1.submit("orphaned")
+        host = socket.gethostname()
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("UPDATE agent_task_queue SET status = 'running', owner = ? WHERE task_id = ?",
+                         (f"{host}:{os.getppid()}", live))
+            conn.execute("UPDATE agent_task_queue SET status = 'running', owner = ? WHERE task_id = ?",
+                         (f"{host}:{exited.pid}", orphan))
+        q2 = self._make_queue(max_concurrent=1)
+        q2.start()
+        try:
+            self.assertTrue(_wait_until(lambda: q2._executor.order == ["orphaned"]))
+            time.sleep(0.05)
+            self.assertEqual(q2._executor.order, ["orphaned"])
+            with sqlite3.connect(self.db) as conn:
+                status = conn.execute("SELECT status FROM agent_task_queue WHERE task_id = ?", (live,)).fetchone()
+            self.assertEqual(status, ("running",))
+        finally:
+            q2.stop()
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 3. AGENT MONITOR  (agent/monitor.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _fresh_monitor(**kw):
+    """A private AgentMonitor instance that bypasses the module singleton."""
+    from agent.monitor import AgentMonitor
+    m = object.__new__(AgentMonitor)
+    m._init(**kw)
+    return m
+
+
+class TestAgentMonitor(unittest.TestCase):
+
+    def test_history_is_bounded_and_keeps_running(self):
+        m = _fresh_monitor(max_tasks=3)
+        running = m.register_task("long")
+        for i in range(5):
+            m.update_task(m.register_task(f"t{i}"), "done")
+        names = [t.name for t in m.get_all_tasks()]
+        self.assertEqual(len(names), 3)
+        self.assertIn("long", names)
+        self.assertEqual(m.get_task(running).status, "running")
+
+    def test_output_lines_are_a_ring_buffer(self):
+        from agent.monitor import MAX_OUTPUT_LINES
+        m = _fresh_monitor()
+        tid = m.register_task("chatty")
+        for i in range(MAX_OUTPUT_LINES + 10):
+            m.append_output(tid, f"line {i}")
+        lines = m.get_task(tid).output_lines
+        self.assertEqual(len(lines), MAX_OUTPUT_LINES)
+        self.assertEqual(lines[-1], f"line {MAX_OUTPUT_LINES + 9}")
+
+    def test_output_burst_is_coalesced(self):
+        m = _fresh_monitor()
+        events = []
+        m.subscribe(lambda t: events.append((t.status, list(t.output_lines))))
+        tid = m.register_task("burst")
+        for i in range(50):
+            m.append_output(tid, f"l{i}")
+        m.update_task(tid, "done")
+        self.assertTrue(_wait_until(lambda: any(s == "done" for s, _ in events)))
+        self.assertLess(len(events), 10)
+        self.assertEqual([l for _, ls in events for l in ls], [f"l{i}" for i in range(50)])
+        self.assertEqual(events[-1][0], "done")
+
+    def test_slow_subscriber_does_not_block_producer(self):
+        m = _fresh_monitor()
+        m.subscribe(lambda t: time.sleep(0.2))
+        start = time.time()
+        tid = m.register_task("fast")
+        for i in range(100):
+            m.append_output(tid, str(i))
+        self.assertLess(time.time() - start, 0.1)
+
+    def test_async_subscriber_receives_dicts(self):
+        import asyncio
+        m = _fresh_monitor()
+
+        async def _run():
+            q = m.subscribe_async()
+            tid = m.register_task("async", "desc")
+            m.update_task(tid, "done", "finished")
+            seen = []
+            while not seen or seen[-1]["status"] != "done":
+                seen.append(await asyncio.wait_for(q.get(), timeout=2))
+            m.unsubscribe_async(q)
+            return seen
+
+        seen = asyncio.run(_run())
+        self.assertEqual(seen[0]["name"], "async")
+        self.assertEqual(seen[-1]["output"], ["finished"])
+
+
+if __name__ == "__main__":
+    unittest.main()
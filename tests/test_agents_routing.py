@@ -0,0 +1,263 @@
+"""
+Unit tests for multi-agent role routing and fan-out (agents/).
+No LLM calls — the orchestrator gets a fake manager that records prompts.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from agents.orchestrator import Orchestrator, AgentTask
+    from agents.sub_agent_runner import SubAgentRunner
+    _HAS_ORCHESTRATOR = True
+except ImportError:           # llm package needs requests/httpx
+    _HAS_ORCHESTRATOR = False
+
+
+def _write_role(folder: Path, role_id: str, name: str, responsibilities: list, keywords=None):
+    folder.mkdir(parents=True, exist_ok=True)
+    lines = [f"id: {role_id}", f"name: {name}", f"description: {name} role", "responsibilities:"]
+    lines += [f"  - {r}" for r in responsibilities]
+    if keywords:
+        lines.append("keywords:")
+        lines += [f"  - {k}" for k in keywords]
+    (folder / f"{role_id}.yaml").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+class _RolesDirCase(unittest.TestCase):
+
+    def setUp(self):
+        from agents.role_loader import clear_role_cache
+        clear_role_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        _write_role(self.dir, "dev-lead", "Development Lead",
+                    ["Code review and debugging", "Git workflow management"])
+        _write_role(self.dir, "personal-assistant", "Personal Assistant",
+                    ["Calendar and schedule management", "Reminders"])
+        _write_role(self.dir / "specialists", "legal-advisor", "Legal Advisor",
+                    ["Contract review", "Compliance questions"], keywords=["contract", "legal"])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 1. ROLE LOADER  (agents/role_loader.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestRoleLoader(_RolesDirCase):
+
+    def test_loads_specialists_subdir(self):
+        from agents.role_loader import load_roles
+        roles = load_roles(str(self.dir))
+        self.assertEqual(set(roles), {"dev-lead", "personal-assistant", "legal-advisor"})
+        self.assertEqual(roles["legal-advisor"].keywords, ["contract", "legal"])
+
+    def test_cached_until_file_changes(self):
+        from agents.role_loader import load_roles
+        first = load_roles(str(self.dir))
+        self.assertIs(load_roles(str(self.dir))["dev-lead"], first["dev-lead"])
+
+        path = self.dir / "dev-lead.yaml"
+        path.write_text(path.read_text().replace("Development Lead", "Dev Lead"), encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        reloaded = load_roles(str(self.dir))
+        self.assertEqual(reloaded["dev-lead"].name, "Dev Lead")
+
+    def test_new_file_is_picked_up(self):
+        from agents.role_loader import load_roles
+        load_roles(str(self.dir))
+        _write_role(self.dir / "specialists", "data-analyst", "Data Analyst", ["CSV analysis"])
+        self.assertIn("data-analyst", load_roles(str(self.dir)))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 2. ROUTER  (agents/router.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestRoleRouter(_RolesDirCase):
+
+    def _router(self):
+        from agents.role_loader import load_roles
+        from agents.router import RoleRouter
+        return RoleRouter(load_roles(str(self.dir)))
+
+    def test_clear_match_is_not_ambiguous(self):
+        decision = self._router().route("please review this contract for me")
+        self.assertEqual(decision.role, "legal-advisor")
+        self.assertFalse(decision.ambiguous)
+
+    def test_capability_keywords_count(self):
+        decision = self._router().route("debug the failing build")
+        self.assertEqual(decision.role, "dev-lead")
+
+    def test_unmatched_task_is_ambiguous(self):
+        decision = self._router().route("hello there")
+        self.assertTrue(decision.ambiguous)
+        self.assertEqual(decision.candidates, [])
+
+    def test_repo_roles_route_locally(self):
+        from agents.role_loader import load_roles
+        from agents.router import RoleRouter
+        router = RoleRouter(load_roles())
+        self.assertEqual(router.route("install nginx on the server").role, "system-admin")
+        self.assertEqual(router.route("schedule a reminder for friday").role, "personal-assistant")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 3. ORCHESTRATOR  (agents/orchestrator.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class _FakeLLM:
+    def __init__(self, reply=""):
+        self.reply = reply
+        self.prompts = []
+
+    async def complete(self, prompt, **kw):
+        self.prompts.append(prompt)
+        return self.reply
+
+
+@unittest.skipUnless(_HAS_ORCHESTRATOR, "llm package dependencies not installed")
+class TestOrchestratorRouting(_RolesDirCase):
+
+    def test_clear_task_skips_llm(self):
+        llm = _FakeLLM()
+        orch = Orchestrator(llm, roles_dir=str(self.dir))
+        role = asyncio.run(orch.route(AgentTask(task="review the git diff and debug it")))
+        self.assertEqual(role, "dev-lead")
+        self.assertEqual(llm.prompts, [])
+        self.assertEqual(orch.stats["local"], 1)
+
+    def test_ambiguous_task_asks_llm(self):
+        llm = _FakeLLM("legal-advisor")
+        orch = Orchestrator(llm, roles_dir=str(self.dir))
+        role = asyncio.run(orch.route(AgentTask(task="hello there")))
+        self.assertEqual(role, "legal-advisor")
+        self.assertEqual(len(llm.prompts), 1)
+
+    def test_unknown_llm_reply_falls_back(self):
+        orch = Orchestrator(_FakeLLM("nobody"), roles_dir=str(self.dir))
+        role = asyncio.run(orch.route(AgentTask(task="hello there")))
+        self.assertEqual(role, "personal-assistant")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 4. SUB-AGENT FAN-OUT  (agents/sub_agent_runner.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class _SlowLLM:
+    """Each role answer takes `delay` seconds; tracks peak concurrency."""
+
+    def __init__(self, delay=0.2, split=""):
+        self.delay = delay
+        self.split = split
+        self.active = 0
+        self.peak = 0
+        self.synth_prompts = []
+
+    async def complete(self, prompt, system="", max_tokens=2048, **kw):
+        if prompt.startswith("Split this goal"):
+            return self.split
+        if prompt.startswith("Combine these"):
+            self.synth_prompts.append(prompt)
+            return "merged answer"
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return f"answer from {system.split('.')[0]}"
+
+
+@unittest.skipUnless(_HAS_ORCHESTRATOR, "llm package dependencies not installed")
+class TestSubAgentFanOut(_RolesDirCase):
+
+    def _runner(self, llm):
+        runner = SubAgentRunner(llm)
+        runner.orchestrator = Orchestrator(llm, roles_dir=str(self.dir))
+        return runner
+
+    def test_roles_run_in_parallel_and_merge_once(self):
+        llm = _SlowLLM(delay=0.2)
+        runner = self._runner(llm)
+        start = time.monotonic()
+        out = asyncio.run(runner.fan_out(
+            "assess our launch", roles=["dev-lead", "legal-advisor", "personal-assistant"]))
+        self.assertLess(time.monotonic() - start, 0.45)
+        self.assertEqual(llm.peak, 3)
+        self.assertEqual(out["result"], "merged answer")
+        self.assertEqual(len(llm.synth_prompts), 1)
+        self.assertTrue(out["success"])
+
+    def test_concurrency_limit(self):
+        llm = _SlowLLM(delay=0.05)
+        runner = self._runner(llm)
+        asyncio.run(runner.fan_out(
+            "assess", roles=["dev-lead", "legal-advisor", "personal-assistant"], max_parallel=1))
+        self.assertEqual(llm.peak, 1)
+
+    def test_token_budget_skips_remaining(self):
+        llm = _SlowLLM(delay=0.0)
+        runner = self._runner(llm)
+        out = asyncio.run(runner.fan_out(
+            "assess", roles=["dev-lead", "legal-advisor"], max_parallel=1, token_budget=260))
+        self.assertEqual([s["success"] for s in out["steps"]], [True, False])
+        self.assertEqual(out["result"], "answer from You are Development Lead")
+
+    def test_failed_synthesis_returns_unmerged_results(self):
+        from agent.monitor import monitor
+
+        class _NoSynthLLM(_SlowLLM):
+            async def complete(self, prompt, **kw):
+                if prompt.startswith("Combine these"):
+                    raise ConnectionError("llm down")
+                return await super().complete(prompt, **kw)
+
+        runner = self._runner(_NoSynthLLM(delay=0.0))
+        out = asyncio.run(runner.fan_out("assess", roles=["dev-lead", "legal-advisor"]))
+        self.assertTrue(out["success"])
+        self.assertIn("answer from You are Development Lead", out["result"])
+        self.assertIn("## legal-advisor", out["result"])
+        task = [t for t in monitor.get_all_tasks() if t.name == "fan_out"][-1]
+        self.assertEqual(task.status, "error")
+
+    def test_llm_error_text_counts_as_failure(self):
+        from agent.monitor import monitor
+
+        class _DownLLM(_SlowLLM):
+            # LLMManager.complete never raises; a failed call comes back as this text
+            async def complete(self, prompt, system="", **kw):
+                if prompt.startswith("Combine these") or system.startswith("You are Legal"):
+                    return "[LLM error: connection refused]"
+                return await super().complete(prompt, system=system, **kw)
+
+        runner = self._runner(_DownLLM(delay=0.0))
+        out = asyncio.run(runner.fan_out("assess", roles=["dev-lead", "legal-advisor", "personal-assistant"]))
+        self.assertEqual([s["success"] for s in out["steps"]], [True, False, True])
+        self.assertNotIn("LLM error", out["result"])
+        self.assertIn("## personal-assistant", out["result"])      # unmerged fallback
+        task = [t for t in monitor.get_all_tasks() if t.name == "fan_out"][-1]
+        self.assertEqual(task.status, "error")
+
+    def test_planned_subtasks_are_routed(self):
+        llm = _SlowLLM(delay=0.0, split="review the contract terms\ndebug the git build")
+        runner = self._runner(llm)
+        out = asyncio.run(runner.run("prepare the release", parallel=True))
+        self.assertEqual([s["role"] for s in out["steps"]], ["legal-advisor", "dev-lead"])
+        self.assertEqual(out["mode"], "fanout")
+
+
+if __name__ == "__main__":
+    unittest.main()
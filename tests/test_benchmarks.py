@@ -0,0 +1,71 @@
+"""
+Unit tests for the benchmark load driver and baseline comparison
+(benchmarks/load.py).
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks import load
+
+
+class TestLoadDriver(unittest.TestCase):
+
+    def test_percentile_interpolates(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertAlmostEqual(load.percentile(values, 50), 50.5)
+        self.assertAlmostEqual(load.percentile(values, 99), 99.01)
+        self.assertEqual(load.percentile([], 95), 0.0)
+        self.assertEqual(load.percentile([3.0], 99), 3.0)
+
+    def test_concurrency_cap_errors_and_extra_metrics(self):
+        in_flight = peak = 0
+
+        async def call(i, samples):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.005)
+            in_flight -= 1
+            if i % 10 == 0:
+                raise RuntimeError("boom")
+            samples.add("ttft", 1.0)
+
+        samples, wall_s = asyncio.run(load.run_load(call, requests=40, concurrency=4))
+        summary = load.summarize(samples, wall_s)
+        self.assertEqual(peak, 4)
+        self.assertEqual((summary["requests"], summary["errors"]), (40, 4))
+        self.assertEqual(samples.last_error, "RuntimeError: boom")
+        self.assertEqual(summary["ttft_p99_ms"], 1.0)
+        self.assertGreater(summary["rps"], 0)
+
+
+class TestBaselines(unittest.TestCase):
+
+    def test_compare_flags_only_real_regressions(self):
+        baseline = {"chat": {"p95_ms": 100.0, "p50_ms": 1.0, "rps": 50.0, "rss_mb": 200.0, "errors": 0},
+                    "workflow": {"p95_ms": 10.0}}
+        results = {"chat": {"p95_ms": 130.0, "p50_ms": 2.5, "rps": 45.0, "rss_mb": 210.0, "errors": 0},
+                   "vault_search": {"p95_ms": 999.0}}
+        regressions = load.compare(results, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("chat.p95_ms: 100.0 → 130.0"))
+
+        results["chat"]["rps"] = 30.0
+        self.assertEqual(len(load.compare(results, baseline, tolerance=0.2)), 2)
+
+    def test_baseline_round_trip(self):
+        path = Path(tempfile.mkdtemp()) / "baselines" / "daemon_load.json"
+        self.assertEqual(load.load_baseline(path), {})
+        load.save_baseline(path, {"chat": {"p95_ms": 12.5}})
+        self.assertEqual(load.load_baseline(path), {"chat": {"p95_ms": 12.5}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Unit tests for the daemon's worker broker (daemon/broker.py): the in-process
+backend, the SQLite backend shared by two "workers", and primary election.
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from daemon import broker
+
+
+class TestLocalBroker(unittest.TestCase):
+
+    def test_queue_and_topic(self):
+        async def main():
+            b = broker.Broker()
+            seen = []
+            b.subscribe("ws", seen.append)
+            await b.publish("ws", {"type": "chat_message"})
+            await b.put("chat", {"message": "hi"})
+            return seen, await b.get("chat")
+
+        seen, item = asyncio.run(main())
+        self.assertEqual(seen, [{"type": "chat_message"}])
+        self.assertEqual(item, {"message": "hi"})
+
+
+class TestSqliteBroker(unittest.TestCase):
+
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp()) / "broker.db"
+
+    def test_two_workers_share_queue_and_topics(self):
+        async def main():
+            api, primary = broker.SqliteBroker(self.path, poll_ms=5), broker.SqliteBroker(self.path, poll_ms=5)
+            await api.start()
+            await primary.start()
+            on_api, on_primary = [], []
+            api.subscribe("ws", on_api.append)
+            primary.subscribe("ws", on_primary.append)
+            try:
+                await api.put("chat", {"message": "from worker 1"})
+                await api.put("chat", {"message": "second"})
+                first = await asyncio.wait_for(primary.get("chat"), 2)
+                second = await asyncio.wait_for(primary.get("chat"), 2)
+
+                await primary.publish("ws", {"type": "chat_message", "payload": {"content": "reply"}})
+                for _ in range(200):
+                    if on_api:
+                        break
+                    await asyncio.sleep(0.005)
+                await asyncio.sleep(0.03)     # a few more polls: nothing may arrive twice
+                return [first, second], on_api, on_primary
+            finally:
+                await api.close()
+                await primary.close()
+
+        items, on_api, on_primary = asyncio.run(main())
+        self.assertEqual([i["message"] for i in items], ["from worker 1", "second"])
+        reply = {"type": "chat_message", "payload": {"content": "reply"}}
+        self.assertEqual(on_api, [reply])
+        self.assertEqual(on_primary, [reply])     # delivered locally, not again from the file
+
+    def test_publish_remote_skips_own_subscribers(self):
+        async def main():
+            a, b = broker.SqliteBroker(self.path, poll_ms=5), broker.SqliteBroker(self.path, poll_ms=5)
+            await a.start()
+            await b.start()
+            on_a, on_b = [], []
+            a.subscribe("ws", on_a.append)
+            b.subscribe("ws", on_b.append)
+            try:
+                await a.publish_remote("ws", [{"n": 1}, {"n": 2}])
+                for _ in range(200):
+                    if len(on_b) == 2:
+                        break
+                    await asyncio.sleep(0.005)
+                await asyncio.sleep(0.03)
+                return on_a, on_b
+            finally:
+                await a.close()
+                await b.close()
+
+        on_a, on_b = asyncio.run(main())
+        self.assertEqual(on_a, [])
+        self.assertEqual(on_b, [{"n": 1}, {"n": 2}])
+
+    def test_queue_items_are_claimed_once(self):
+        async def main():
+            a, b = broker.SqliteBroker(self.path, poll_ms=5), broker.SqliteBroker(self.path, poll_ms=5)
+            await a.start()
+            await b.start()
+            try:
+                for i in range(20):
+                    await a.put("chat", {"n": i})
+                got = []
+
+                async def drain(worker):
+                    while True:
+                        got.append((await worker.get("chat"))["n"])
+
+                tasks = [asyncio.create_task(drain(a)), asyncio.create_task(drain(b))]
+                for _ in range(200):
+                    if len(got) == 20:
+                        break
+                    await asyncio.sleep(0.005)
+                await asyncio.sleep(0.03)
+                for task in tasks:
+                    task.cancel()
+                return got
+            finally:
+                await a.close()
+                await b.close()
+
+        self.assertEqual(sorted(asyncio.run(main())), list(range(20)))
+
+
+try:
+    from daemon import missing_routes
+    _HAS_ROUTES = True
+except ImportError:           # the routes need fastapi, aiosqlite, psutil and pydantic
+    _HAS_ROUTES = False
+
+
+@unittest.skipUnless(_HAS_ROUTES, "daemon route dependencies not installed")
+class TestSchedulerReload(unittest.TestCase):
+
+    def test_workflow_edit_on_other_worker_reaches_primary(self):
+        from unittest import mock
+        from workflows.scheduler import RELOAD_TOPIC
+
+        path = Path(tempfile.mkdtemp()) / "broker.db"
+
+        async def main():
+            api, primary = broker.SqliteBroker(path, poll_ms=5), broker.SqliteBroker(path, poll_ms=5)
+            await api.start()
+            await primary.start()
+            reloads = []
+            primary.subscribe(RELOAD_TOPIC, reloads.append)
+            try:
+                with mock.patch.object(broker, "_broker", api), mock.patch.object(broker, "_primary_lock", None):
+                    missing_routes._reload_schedule()
+                for _ in range(200):
+                    if reloads:
+                        break
+                    await asyncio.sleep(0.005)
+                return reloads
+            finally:
+                await api.close()
+                await primary.close()
+
+        self.assertEqual(asyncio.run(main()), [{"action": "reload"}])
+
+
+class TestPrimaryElection(unittest.TestCase):
+
+    def tearDown(self):
+        broker.release_primary()
+
+    @unittest.skipIf(sys.platform == "win32", "flock semantics")
+    def test_only_one_holder(self):
+        import fcntl
+        lock = Path(tempfile.mkdtemp()) / "daemon.lock"
+        self.assertTrue(broker.acquire_primary(lock))
+        self.assertTrue(broker.is_primary())
+        with open(lock, "a+") as other:       # another worker's attempt
+            with self.assertRaises(OSError):
+                fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        broker.release_primary()
+        self.assertFalse(broker.is_primary())
+        with open(lock, "a+") as other:
+            fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+if __name__ == "__main__":
+    unittest.main()
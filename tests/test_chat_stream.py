@@ -0,0 +1,104 @@
+"""
+Unit tests for /api/chat/stream framing (daemon/chat_stream.py): token
+coalescing by time and size, and cancelling the upstream request.
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from daemon.chat_stream import ChatStream, cancel_on_disconnect
+
+
+async def _tokens(items, delay=0.0, state=None):
+    try:
+        for item in items:
+            if delay:
+                await asyncio.sleep(delay)
+            yield item
+    finally:
+        if state is not None:
+            state["closed"] = True
+
+
+async def _collect(stream):
+    return [frame async for frame in stream.frames()]
+
+
+class TestCoalescing(unittest.TestCase):
+
+    def test_burst_is_sent_as_one_frame(self):
+        stream = ChatStream(_tokens(["Hel", "lo", ", ", "world"]), flush_ms=50)
+        frames = asyncio.run(_collect(stream))
+        self.assertEqual(frames, ["Hello, world"])
+        self.assertFalse(stream.cancelled)
+
+    def test_max_bytes_flushes_early(self):
+        stream = ChatStream(_tokens(["ab"] * 6), flush_ms=10_000, max_bytes=4)
+        self.assertEqual(asyncio.run(_collect(stream)), ["abab"] * 3)
+
+    def test_slow_tokens_flush_on_deadline(self):
+        stream = ChatStream(_tokens(["a", "b", "c"], delay=0.05), flush_ms=10)
+        frames = asyncio.run(_collect(stream))
+        self.assertEqual(frames, ["a", "b", "c"])
+        self.assertEqual(stream.text, "abc")
+
+    def test_provider_error_is_kept_after_delivered_text(self):
+        async def failing():
+            yield "partial"
+            raise RuntimeError("upstream closed")
+
+        stream = ChatStream(failing(), flush_ms=10)
+        self.assertEqual(asyncio.run(_collect(stream)), ["partial"])
+        self.assertIsInstance(stream.error, RuntimeError)
+
+
+class TestCancellation(unittest.TestCase):
+
+    def test_disconnect_cancels_upstream(self):
+        state = {}
+
+        async def main():
+            disconnect = asyncio.Event()
+
+            async def receive():
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            stream = ChatStream(_tokens(["x"] * 1000, delay=0.01, state=state), flush_ms=5)
+            watcher = asyncio.create_task(cancel_on_disconnect(receive, stream))
+            frames = []
+            async for frame in stream.frames():
+                frames.append(frame)
+                if len(frames) == 2:
+                    disconnect.set()
+            await asyncio.sleep(0)
+            return stream, frames, watcher.done()
+
+        stream, frames, watcher_done = asyncio.run(main())
+        self.assertTrue(stream.cancelled)
+        self.assertTrue(watcher_done)
+        self.assertTrue(state["closed"])
+        self.assertLess(len(stream.text), 100)
+
+    def test_consumer_closing_early_cancels_upstream(self):
+        state = {}
+
+        async def main():
+            stream = ChatStream(_tokens(["y"] * 1000, delay=0.01, state=state), flush_ms=5)
+            frames = stream.frames()
+            await frames.__anext__()
+            await frames.aclose()
+            await asyncio.sleep(0.01)
+            return stream
+
+        self.assertTrue(asyncio.run(main()).cancelled)
+        self.assertTrue(state["closed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for the daemon's conditional GET, compression and static caching
+layer (daemon/http_cache.py), driven with plain ASGI callables.
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from daemon import http_cache
+    from vault.schema import bump_tables
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+
+def _scope(path, headers=(), method="GET", query=b""):
+    return {"type": "http", "method": method, "path": path, "query_string": query,
+            "headers": [(k.encode(), v.encode()) for k, v in headers]}
+
+
+def _json_app(payload, calls=None, content_type=b"application/json"):
+    body = json.dumps(payload).encode()
+
+    async def app(scope, receive, send):
+        if calls is not None:
+            calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+def _call(middleware, scope):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, None, send))
+    start = sent[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+@unittest.skipUnless(HAS_DEPS, "fastapi/aiosqlite not installed")
+class TestConditionalGet(unittest.TestCase):
+
+    def test_unchanged_table_answers_304_without_running_route(self):
+        calls = []
+        mw = http_cache.ConditionalGetMiddleware(_json_app({"goals": []}, calls))
+        status, headers, _ = _call(mw, _scope("/api/goals"))
+        etag = headers[b"etag"].decode()
+        self.assertEqual(status, 200)
+
+        status, headers, body = _call(mw, _scope("/api/goals", [("if-none-match", etag)]))
+        self.assertEqual((status, body, calls), (304, b"", ["/api/goals"]))
+
+        bump_tables("goals")
+        status, headers, _ = _call(mw, _scope("/api/goals", [("if-none-match", etag)]))
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers[b"etag"].decode(), etag)
+
+    def test_query_string_and_unlisted_routes(self):
+        mw = http_cache.ConditionalGetMiddleware(_json_app({}))
+        _, headers, _ = _call(mw, _scope("/api/goals", query=b"status=active"))
+        etag = headers[b"etag"].decode()
+        status, _, _ = _call(mw, _scope("/api/goals", [("if-none-match", etag)], query=b"status=done"))
+        self.assertEqual(status, 200)
+        _, headers, _ = _call(mw, _scope("/api/health"))
+        self.assertNotIn(b"etag", headers)
+
+
+@unittest.skipUnless(HAS_DEPS, "fastapi/aiosqlite not installed")
+class TestCompression(unittest.TestCase):
+
+    def test_large_json_is_gzipped(self):
+        payload = {"items": [{"id": i, "title": "task"} for i in range(200)]}
+        mw = http_cache.CompressionMiddleware(_json_app(payload), minimum_size=1024)
+        status, headers, body = _call(mw, _scope("/api/tasks", [("accept-encoding", "gzip, deflate")]))
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(int(headers[b"content-length"]), len(body))
+        self.assertEqual(json.loads(gzip.decompress(body)), payload)
+        self.assertIn(b"Accept-Encoding", headers[b"vary"])
+
+    def test_small_streaming_and_non_json_pass_through(self):
+        accept = [("accept-encoding", "gzip")]
+        mw = http_cache.CompressionMiddleware(_json_app({"ok": True}), minimum_size=1024)
+        self.assertNotIn(b"content-encoding", _call(mw, _scope("/api/health", accept))[1])
+
+        mw = http_cache.CompressionMiddleware(_json_app("x" * 5000, content_type=b"text/html"), minimum_size=10)
+        self.assertNotIn(b"content-encoding", _call(mw, _scope("/", accept))[1])
+
+        async def streaming(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": b"[" + b"1," * 2000, "more_body": True})
+            await send({"type": "http.response.body", "body": b"1]"})
+        status, headers, body = _call(http_cache.CompressionMiddleware(streaming, minimum_size=10),
+                                      _scope("/api/chat/stream", accept))
+        self.assertNotIn(b"content-encoding", headers)
+        self.assertEqual(len(json.loads(body)), 2001)
+
+
+@unittest.skipUnless(HAS_DEPS, "fastapi/aiosqlite not installed")
+class TestStaticCaching(unittest.TestCase):
+
+    def test_hashed_assets_are_immutable(self):
+        self.assertEqual(http_cache.cache_control_for("/dist/assets/index-B3x9_kLq.js"), http_cache.IMMUTABLE)
+        self.assertEqual(http_cache.cache_control_for("/dist/index.html"), http_cache.NO_CACHE)
+        self.assertEqual(http_cache.cache_control_for("/dist/favicon.ico"), http_cache.NO_CACHE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the ai_loop input multiplexer (input_mux.py).
+Producers are plain coroutines and threads — no microphone or UI involved.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from input_mux import InputMessage, InputMux, ThreadsafeInput
+
+
+class TestInputMux(unittest.TestCase):
+
+    def test_text_does_not_wait_behind_voice_listen(self):
+        async def main():
+            mux = InputMux()
+            mux.bind()
+
+            async def slow_voice():
+                await mux.wait_for_consumer()
+                await asyncio.sleep(5)                 # a listen that times out much later
+                await mux.put("", source="voice")
+            mux.add_producer("voice", slow_voice)
+            asyncio.get_running_loop().call_later(
+                0.02, mux.put_message, InputMessage("hello", "telegram", "telegram:42"))
+            start = time.monotonic()
+            msg = await asyncio.wait_for(mux.get(), 1.0)
+            elapsed = time.monotonic() - start
+            await mux.close()
+            return msg, elapsed
+        msg, elapsed = asyncio.run(main())
+        self.assertEqual((msg.text, msg.source, msg.session_id), ("hello", "telegram", "telegram:42"))
+        self.assertLess(elapsed, 0.5)
+
+    def test_threadsafe_put_before_and_after_bind(self):
+        mux = InputMux()
+        ui_input = ThreadsafeInput(mux, source="ui")
+        ui_input.put("early")
+
+        async def main():
+            mux.bind()
+            worker = threading.Thread(target=ui_input.put, args=("late",))
+            worker.start()
+            first = await asyncio.wait_for(mux.get(), 1.0)
+            second = await asyncio.wait_for(mux.get(), 1.0)
+            worker.join()
+            return [first.text, second.text], {first.source, second.source}
+        texts, sources = asyncio.run(main())
+        self.assertEqual(texts, ["early", "late"])
+        self.assertEqual(sources, {"ui"})
+
+    def test_stats_track_wait_per_source(self):
+        async def main():
+            mux = InputMux()
+            mux.bind()
+            await mux.put("a", source="api", enqueued_at=time.monotonic() - 0.05)
+            await mux.put("b", source="discord")
+            await mux.get()
+            await mux.get()
+            return mux.stats()
+        stats = asyncio.run(main())
+        self.assertEqual(set(stats["sources"]), {"api", "discord"})
+        self.assertGreaterEqual(stats["sources"]["api"]["p50_ms"], 50)
+        self.assertEqual(stats["sources"]["discord"]["count"], 1)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_crashed_producer_is_restarted(self):
+        import input_mux
+
+        async def main():
+            mux = InputMux()
+            mux.bind()
+            calls = []
+
+            async def flaky():
+                calls.append(1)
+                if len(calls) == 1:
+                    raise RuntimeError("mic unplugged")
+                await mux.put("back", source="voice")
+            mux.add_producer("voice", flaky)
+            msg = await asyncio.wait_for(mux.get(), 1.0)
+            await mux.close()
+            return msg.text, len(calls)
+        saved, input_mux.PRODUCER_RETRY_S = input_mux.PRODUCER_RETRY_S, 0.01
+        try:
+            self.assertEqual(asyncio.run(main()), ("back", 2))
+        finally:
+            input_mux.PRODUCER_RETRY_S = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Unit tests for the daemon event-loop lag monitor (daemon/loop_monitor.py).
+Stalls are produced on purpose with time.sleep() inside a coroutine.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from daemon.loop_monitor import LoopMonitor
+
+
+def _block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+class TestLoopMonitor(unittest.TestCase):
+
+    def test_stall_is_recorded_with_blocking_stack(self):
+        async def main():
+            monitor = LoopMonitor(interval_s=0.02, threshold_ms=50)
+            await monitor.start()
+            await asyncio.sleep(0.05)
+            _block_the_loop(0.25)
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+            return monitor.stats()
+        stats = asyncio.run(main())
+        self.assertEqual(stats["stalls"], 1)
+        stall = stats["recent_stalls"][0]
+        self.assertGreaterEqual(stall["lag_ms"], 150)
+        self.assertTrue(any("_block_the_loop" in line for line in stall["stack"]))
+
+    def test_offloaded_work_does_not_stall(self):
+        async def main():
+            monitor = LoopMonitor(interval_s=0.02, threshold_ms=50)
+            await monitor.start()
+            await asyncio.to_thread(_block_the_loop, 0.25)
+            await monitor.stop()
+            return monitor.stats()
+        stats = asyncio.run(main())
+        self.assertEqual(stats["stalls"], 0)
+        self.assertLess(stats["lag_ms"]["max"], 50)
+
+    def test_debug_mode_flags_sync_io_on_loop_thread_only(self):
+        path = Path(tempfile.mkdtemp()) / "probe.txt"
+        path.write_text("x")
+
+        def read_probe():
+            with open(path) as f:
+                return f.read()
+
+        async def main():
+            monitor = LoopMonitor(interval_s=0.05, threshold_ms=200, debug=True)
+            await monitor.start()
+            await asyncio.to_thread(read_probe)     # worker thread: fine
+            read_probe()                             # loop thread: flagged
+            read_probe()
+            await monitor.stop()
+            return monitor.stats()["sync_io"]
+        sites = [s for s in asyncio.run(main()) if s["target"] == str(path)]
+        self.assertEqual(len(sites), 1)
+        self.assertEqual((sites[0]["event"], sites[0]["count"]), ("open", 2))
+        self.assertIn("read_probe", sites[0]["stack"][-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
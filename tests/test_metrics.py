@@ -0,0 +1,153 @@
+"""
+Unit tests for the in-process metrics registry (system/metrics.py), the timed
+vault connection and the daemon's HTTP latency middleware.
+"""
+
+import asyncio
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from system import metrics
+from system.metrics import Registry
+
+try:
+    from vault.schema import TimedConnection
+    HAS_AIOSQLITE = True
+except ImportError:
+    HAS_AIOSQLITE = False
+
+try:
+    from daemon.metrics_routes import MetricsMiddleware
+    HAS_FASTAPI = True
+except ImportError:
+    HAS_FASTAPI = False
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_render_counter_and_gauge(self):
+        reg = Registry()
+        errors = reg.counter("sam_test_errors", "Errors", ["provider"])
+        depth = reg.gauge("sam_test_depth", "Depth")
+        errors.labels("openai").inc()
+        errors.labels("openai").inc(2)
+        depth.set(7)
+        text = reg.render()
+        self.assertIn("# TYPE sam_test_errors counter", text)
+        self.assertIn('sam_test_errors_total{provider="openai"} 3', text)
+        self.assertIn("sam_test_depth 7", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        reg = Registry()
+        hist = reg.histogram("sam_test_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            hist.observe(value)
+        lines = reg.render().splitlines()
+        self.assertIn('sam_test_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('sam_test_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('sam_test_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("sam_test_seconds_count 4", lines)
+        self.assertIn("sam_test_seconds_sum 6.05", lines)
+
+    def test_label_overflow_folds_into_other(self):
+        reg = Registry()
+        counter = reg.counter("sam_test_intents", "Intents", ["intent"])
+        for i in range(metrics.MAX_SERIES + 5):
+            counter.labels(f"intent_{i}").inc()
+        text = reg.render()
+        self.assertIn('sam_test_intents_total{intent="other"} 5', text)
+        self.assertEqual(text.count("sam_test_intents_total{"), metrics.MAX_SERIES + 1)
+
+    def test_reregistering_returns_same_metric(self):
+        reg = Registry()
+        first = reg.histogram("sam_test_seconds", "Latency", ["kind"])
+        self.assertIs(reg.histogram("sam_test_seconds", "Latency", ["kind"]), first)
+        with self.assertRaises(ValueError):
+            reg.counter("sam_test_seconds", "Latency", ["kind"])
+
+    def test_collectors_run_at_scrape_and_failures_are_contained(self):
+        reg = Registry()
+        gauge = reg.gauge("sam_test_live", "Live value")
+        state = {"value": 1}
+
+        def broken():
+            raise RuntimeError("boom")
+
+        reg.register_collector(lambda: gauge.set(state["value"]))
+        reg.register_collector(broken)
+        state["value"] = 42
+        self.assertIn("sam_test_live 42", reg.render())
+
+
+@unittest.skipUnless(HAS_AIOSQLITE, "aiosqlite not installed")
+class TestTimedConnection(unittest.TestCase):
+
+    def _count(self, op, table):
+        child = metrics.VAULT_QUERY.labels(op, table)
+        return list(child.samples("x"))[-1][2]
+
+    def test_statements_are_timed_by_op_and_table(self):
+        before = self._count("INSERT", "metrics_probe")
+        conn = sqlite3.connect(":memory:", factory=TimedConnection)
+        conn.execute("CREATE TABLE metrics_probe (a INTEGER)")
+        conn.execute("INSERT INTO metrics_probe VALUES (?)", (1,))
+        conn.executemany("INSERT INTO metrics_probe VALUES (?)", [(2,), (3,)])
+        rows = conn.cursor().execute("SELECT a FROM metrics_probe").fetchall()
+        conn.close()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(self._count("INSERT", "metrics_probe") - before, 2)
+        self.assertEqual(self._count("SELECT", "metrics_probe"), 1)
+
+    def test_shared_versions_see_other_workers_commits(self):
+        import tempfile
+        from vault import schema
+        path = Path(tempfile.mkdtemp()) / "sam.db"
+        schema.share_table_versions(path)
+        other_worker = schema._SharedVersions(path)       # its own reader, as in another process
+        try:
+            writer = sqlite3.connect(str(path), factory=TimedConnection)
+            writer.execute("CREATE TABLE shared_probe (a INTEGER)")
+            writer.commit()
+            before = other_worker.get(("shared_probe",))
+            writer.execute("INSERT INTO shared_probe VALUES (1)")
+            self.assertEqual(other_worker.get(("shared_probe",)), before)      # not committed yet
+            writer.commit()
+            writer.close()
+            after = other_worker.get(("shared_probe",))
+            self.assertNotEqual(after, before)
+            self.assertEqual(schema.table_versions("shared_probe"), after)
+        finally:
+            other_worker.close()
+            schema._shared_versions.close()
+            schema._shared_versions = None
+
+
+@unittest.skipUnless(HAS_FASTAPI, "fastapi not installed")
+class TestMetricsMiddleware(unittest.TestCase):
+
+    def test_latency_is_labelled_by_route_template(self):
+        class _Route:
+            path = "/api/workflows/{id}"
+
+        async def app(scope, receive, send):
+            scope["route"] = _Route()
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        scope = {"type": "http", "method": "GET", "path": "/api/workflows/abc"}
+        asyncio.run(MetricsMiddleware(app)(scope, None, send))
+        text = metrics.registry.render()
+        self.assertIn(
+            'sam_http_request_duration_seconds_count{method="GET",route="/api/workflows/{id}",status="404"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
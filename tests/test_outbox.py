@@ -0,0 +1,150 @@
+"""
+Unit tests for channel reply routing: the per-channel outbound queues
+(comms/outbox.py) against a fake adapter, and ChannelManager correlating a
+session's reply with the chat its message came from.
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from comms.channels.base import ChannelMessage
+from comms.manager import ChannelManager
+from comms.outbox import ChannelLimits, Outbox, TokenBucket
+from daemon.sessions import SessionManager
+from input_mux import InputMessage
+
+FAST = ChannelLimits(max_length=20, rate_per_s=1000, burst=100, chat_rate_per_s=1000, chat_burst=100)
+
+
+class _FakeAdapter:
+    name = "telegram"
+
+    def __init__(self, supports_edits=True):
+        self.supports_edits = supports_edits
+        self.log = []           # ("send" | "edit", chat_id, message_id, text)
+        self._next_id = 0
+
+    async def send_chunk(self, chat_id, text):
+        self._next_id += 1
+        self.log.append(("send", chat_id, self._next_id, text))
+        return self._next_id
+
+    async def edit_message(self, chat_id, message_id, text):
+        self.log.append(("edit", chat_id, message_id, text))
+
+
+async def _pieces(*parts, delay=0.0):
+    for part in parts:
+        if delay:
+            await asyncio.sleep(delay)
+        yield part
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate_per_s=10, burst=3)
+        waits = [bucket.take() for _ in range(5)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1, places=2)
+        self.assertAlmostEqual(waits[4], 0.2, places=2)     # reservations queue up fairly
+
+
+class TestOutbox(unittest.TestCase):
+
+    def test_batches_and_splits_per_chat(self):
+        async def main():
+            adapter = _FakeAdapter()
+            outbox = Outbox(adapter, FAST, batch_ms=20)
+            outbox.put(1, "first")
+            outbox.put(1, "second")
+            outbox.put(2, "a long reply that must be split")
+            await outbox.flush()
+            return adapter.log, outbox.stats()
+
+        log, stats = asyncio.run(main())
+        self.assertEqual([text for _, chat, _, text in log if chat == "1"], ["first\n\nsecond"])
+        self.assertEqual([text for _, chat, _, text in log if chat == "2"],
+                         ["a long reply that", "must be split"])
+        self.assertEqual((stats["sent"], stats["batched"]), (3, 1))
+
+    def test_chat_rate_limit_paces_sends(self):
+        limits = ChannelLimits(max_length=100, rate_per_s=1000, burst=100, chat_rate_per_s=20, chat_burst=1)
+
+        async def main():
+            outbox = Outbox(_FakeAdapter(), limits, batch_ms=0)
+            start = time.monotonic()
+            await outbox.stream(1, _pieces("x" * 150))          # two messages, one token each
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.045)
+
+    def test_stream_edits_in_place(self):
+        async def main():
+            adapter = _FakeAdapter()
+            outbox = Outbox(adapter, FAST, edit_interval_ms=0)
+            text = await outbox.stream(7, _pieces("Hello", " there", " friend, how are you?"))
+            return text, adapter.log
+
+        text, log = asyncio.run(main())
+        self.assertEqual(text, "Hello there friend, how are you?")
+        self.assertEqual(log, [
+            ("send", "7", 1, "Hello"),
+            ("edit", "7", 1, "Hello there"),
+            ("edit", "7", 1, "Hello there friend,"),      # full at max_length: finalised
+            ("send", "7", 2, "how are you?"),
+        ])
+
+    def test_stream_without_edits_sends_once(self):
+        async def main():
+            adapter = _FakeAdapter(supports_edits=False)
+            outbox = Outbox(adapter, FAST, batch_ms=0)
+            await outbox.stream(7, _pieces("Hi", " there"))
+            await outbox.flush()
+            return adapter.log
+
+        self.assertEqual(asyncio.run(main()), [("send", "7", 1, "Hi there")])
+
+
+class TestReplyRouting(unittest.TestCase):
+
+    def test_session_reply_goes_back_to_originating_chat(self):
+        async def main():
+            queue = asyncio.Queue()
+            adapter = _FakeAdapter()
+            channels = ChannelManager(queue)
+            channels._adapters.append(adapter)
+            channels._outboxes["telegram"] = Outbox(adapter, FAST, batch_ms=0)
+
+            await channels._message_handler(ChannelMessage(
+                id="1", channel="telegram", from_="ana", text="ping", timestamp=0,
+                metadata={"chatId": 4242}))
+            item = await queue.get()
+
+            sessions = SessionManager(respond=lambda text, memory: {"intent": "chat", "text": "pong"})
+            sessions.set_reply_router(channels.deliver)
+            sessions.submit(InputMessage(item["message"], item["source"], item["session_id"],
+                                         meta={"reply_to": item["reply_to"]}))
+            sessions.submit(InputMessage("ping", "api", "default"))     # dashboard only
+            for _ in range(200):
+                if adapter.log:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            await sessions.close()
+            await channels.stop()
+            return item["reply_to"], adapter.log
+
+        reply_to, log = asyncio.run(main())
+        self.assertEqual(reply_to, {"channel": "telegram", "chat_id": 4242})
+        self.assertEqual(log, [("send", "4242", 1, "pong")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the adaptive personality learner (personality/model.py):
+updates from several processes sharing one vault must not overwrite each other.
+"""
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from personality import model
+    HAS_AIOSQLITE = True
+except ImportError:
+    HAS_AIOSQLITE = False
+
+
+@unittest.skipUnless(HAS_AIOSQLITE, "aiosqlite not installed")
+class TestSharedProfile(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "sam.db"
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at TEXT)")
+        conn.close()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_updates_from_other_processes_are_kept(self):
+        async def main():
+            # Two learners stand in for two processes, each with a warm profile cache
+            daemon, voice = model.PersonalityLearner(), model.PersonalityLearner()
+            await daemon.get_profile()
+            await voice.get_profile()
+            await daemon.record_interaction("hi", 50)
+            await voice.record_feedback(positive=True)
+            await daemon.record_feedback(positive=False)
+            await voice.record_interaction("again", 50)
+            return await model.PersonalityLearner().load()
+
+        with patch.object(model, "DB_PATH", self.path):
+            profile = asyncio.run(main())
+        self.assertEqual((profile.total_interactions, profile.positive_signals, profile.negative_signals),
+                         (2, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
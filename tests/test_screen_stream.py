@@ -0,0 +1,120 @@
+"""
+Unit tests for delta-encoded screen streaming (actions/tools/screen_stream.py).
+Frames are synthetic numpy arrays — nothing is captured from the real screen.
+"""
+
+import asyncio
+import io
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import numpy as np
+    from PIL import Image
+    from actions.tools.screen_stream import PreparedFrame, ScreenStreamer, unpack_frame, TOPIC
+    _HAS_IMAGING = True
+except ImportError:           # numpy / Pillow not installed
+    _HAS_IMAGING = False
+
+
+def _frame(width=256, height=128, value=100):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+class _FakeManager:
+    """Stands in for ws_service.manager: fixed subscribers and depths, records sends."""
+
+    def __init__(self, depths):
+        self.depths = depths
+        self.sent = []
+
+    def subscribers(self, topic):
+        return dict(self.depths)
+
+    def send_binary(self, ws, topic, data):
+        self.sent.append((ws, unpack_frame(data)))
+        return True
+
+
+@unittest.skipUnless(_HAS_IMAGING, "numpy / Pillow not installed")
+class TestPreparedFrame(unittest.TestCase):
+
+    def test_keyframe_roundtrip(self):
+        frame = PreparedFrame(_frame(), 64, 80, "jpeg")
+        packet = unpack_frame(frame.packet(1, None))
+        self.assertTrue(packet["keyframe"])
+        self.assertEqual((packet["width"], packet["height"]), (256, 128))
+        image = Image.open(io.BytesIO(packet["tiles"][0]["data"]))
+        self.assertEqual(image.size, (256, 128))
+
+    def test_delta_contains_only_changed_tiles(self):
+        before = PreparedFrame(_frame(), 64, 80, "jpeg")
+        pixels = _frame()
+        pixels[70:80, 10:20] = 0                     # inside tile (row 1, col 0)
+        after = PreparedFrame(pixels, 64, 80, "jpeg")
+        changed = after.changed_tiles(before.hashes)
+        self.assertEqual(changed, [4])
+        rects = unpack_frame(after.packet(2, changed))["tiles"]
+        self.assertEqual([(r["x"], r["y"], r["w"], r["h"]) for r in rects], [(0, 64, 64, 64)])
+
+    def test_adjacent_tiles_merge_into_one_rect(self):
+        before = PreparedFrame(_frame(), 64, 80, "jpeg")
+        pixels = _frame()
+        pixels[0:10, 60:140] = 0                     # spans tiles 0, 1, 2 of row 0
+        after = PreparedFrame(pixels, 64, 80, "webp")
+        rects = unpack_frame(after.packet(2, after.changed_tiles(before.hashes)))["tiles"]
+        self.assertEqual([(r["x"], r["w"]) for r in rects], [(0, 192)])
+
+
+@unittest.skipUnless(_HAS_IMAGING, "numpy / Pillow not installed")
+class TestScreenStreamer(unittest.TestCase):
+
+    def _build(self, streamer, depths, now):
+        due = {ws: d for ws, d in depths.items() if streamer._due(ws, d, now)}
+        return streamer._build_packets(streamer._capture(), due, now) if due else []
+
+    def test_each_client_gets_its_own_delta(self):
+        frames = [_frame(), _frame()]
+        frames[1][0:5, 0:5] = 0
+        manager = _FakeManager({"a": 0})
+        streamer = ScreenStreamer(manager, capture=lambda: frames[0], fps=10)
+        first = self._build(streamer, {"a": 0}, now=1.0)
+        streamer._capture = lambda: frames[1]
+        second = self._build(streamer, {"a": 0, "b": 0}, now=2.0)
+        self.assertTrue(unpack_frame(first[0][1])["keyframe"])
+        kinds = {ws: unpack_frame(data)["keyframe"] for ws, data in second}
+        self.assertEqual(kinds, {"a": False, "b": True})
+
+    def test_unchanged_screen_sends_nothing(self):
+        streamer = ScreenStreamer(_FakeManager({}), capture=_frame, fps=10)
+        self._build(streamer, {"a": 0}, now=1.0)
+        self.assertEqual(self._build(streamer, {"a": 0}, now=2.0), [])
+
+    def test_backlogged_client_backs_off(self):
+        streamer = ScreenStreamer(_FakeManager({}), capture=_frame, fps=10)
+        self._build(streamer, {"slow": 0}, now=1.0)
+        for _ in range(3):
+            self.assertFalse(streamer._due("slow", 5, 1.05))
+        self.assertAlmostEqual(streamer._clients["slow"].interval, 0.8)
+        self.assertFalse(streamer._due("slow", 0, 1.3))   # still inside the widened interval
+
+    def test_loop_streams_to_subscribers(self):
+        manager = _FakeManager({"a": 0})
+        streamer = ScreenStreamer(manager, capture=_frame, fps=20)
+
+        async def main():
+            await streamer.start()
+            await asyncio.sleep(0.3)
+            await streamer.stop()
+        asyncio.run(main())
+        self.assertGreaterEqual(len(manager.sent), 1)
+        self.assertTrue(manager.sent[0][1]["keyframe"])
+        self.assertEqual(TOPIC, "screen_frame")
+
+
+if __name__ == "__main__":
+    unittest.main()
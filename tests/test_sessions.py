@@ -0,0 +1,171 @@
+"""
+Unit tests for the daemon's per-session conversation workers (daemon/sessions.py).
+The LLM and intent handlers are replaced by plain functions passed to SessionManager.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from daemon.sessions import SessionManager
+from input_mux import InputMessage
+
+
+def _chat(text):
+    return {"intent": "chat", "text": text, "parameters": {}}
+
+
+class _Replies:
+    def __init__(self):
+        self.items = []
+
+    async def __call__(self, topic, payload):
+        self.items.append((payload["session_id"], payload["content"]))
+
+
+async def _until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+class TestSessionManager(unittest.TestCase):
+
+    def test_slow_session_does_not_block_others(self):
+        def respond(text, memory):
+            if text == "long task":
+                time.sleep(0.5)
+            return _chat(f"re: {text}")
+
+        async def main():
+            replies = _Replies()
+            mgr = SessionManager(respond=respond)
+            mgr.set_broadcast(replies)
+            mgr.submit(InputMessage("long task", "telegram", "telegram:1"))
+            mgr.submit(InputMessage("hi", "api", "default"))
+            await _until(lambda: len(replies.items) == 2)
+            await mgr.close()
+            return replies.items
+        self.assertEqual(asyncio.run(main()),
+                         [("default", "re: hi"), ("telegram:1", "re: long task")])
+
+    def test_llm_concurrency_is_capped_across_sessions(self):
+        lock = threading.Lock()
+        state = {"now": 0, "peak": 0}
+
+        def respond(text, memory):
+            with lock:
+                state["now"] += 1
+                state["peak"] = max(state["peak"], state["now"])
+            time.sleep(0.05)
+            with lock:
+                state["now"] -= 1
+            return _chat("ok")
+
+        async def main():
+            replies = _Replies()
+            mgr = SessionManager(respond=respond, llm_concurrency=2)
+            mgr.set_broadcast(replies)
+            for i in range(6):
+                mgr.submit(InputMessage("q", "discord", f"discord:{i}"))
+            await _until(lambda: len(replies.items) == 6)
+            await mgr.close()
+        asyncio.run(main())
+        self.assertEqual(state["peak"], 2)
+
+    def test_each_session_keeps_its_own_history(self):
+        prompts = {}
+
+        def respond(text, memory):
+            prompts[text] = memory.get("recent_conversation", "")
+            return _chat(f"re: {text}")
+
+        async def main():
+            replies = _Replies()
+            mgr = SessionManager(respond=respond)
+            mgr.set_broadcast(replies)
+            mgr.submit(InputMessage("alpha", "api", "a"))
+            await _until(lambda: len(replies.items) == 1)
+            mgr.submit(InputMessage("beta", "api", "b"))
+            mgr.submit(InputMessage("again", "api", "a"))
+            await _until(lambda: len(replies.items) == 3)
+            await mgr.close()
+        asyncio.run(main())
+        self.assertIn("Ai: re: alpha", prompts["again"])
+        self.assertNotIn("alpha", prompts["beta"])
+
+    def test_idle_worker_is_evicted(self):
+        async def main():
+            replies = _Replies()
+            mgr = SessionManager(respond=lambda text, memory: _chat("ok"), idle_timeout_s=0.05)
+            mgr.set_broadcast(replies)
+            first = mgr.submit(InputMessage("hi", "api", "s"))
+            await _until(lambda: mgr.stats()["active"] == 0)
+            second = mgr.submit(InputMessage("back", "api", "s"))
+            await _until(lambda: len(replies.items) == 2)
+            stats = mgr.stats()
+            await mgr.close()
+            return first is second, stats
+        same, stats = asyncio.run(main())
+        self.assertFalse(same)
+        self.assertEqual((stats["active"], stats["evicted"]), (1, 1))
+
+    def test_action_intent_replies_through_session_ui(self):
+        def act(intent, parameters, response, ui, memory):
+            ui.write_log(f"AI: {response}")
+            ui.set_transcription("ignored")
+
+        async def main():
+            replies = _Replies()
+            mgr = SessionManager(
+                respond=lambda text, memory: {"intent": "get_time", "text": "It's noon.", "parameters": {}},
+                act=act,
+            )
+            mgr.set_broadcast(replies)
+            mgr.submit(InputMessage("time?", "telegram", "telegram:9"))
+            await _until(lambda: replies.items)
+            await mgr.close()
+            return replies.items
+        self.assertEqual(asyncio.run(main()), [("telegram:9", "It's noon.")])
+
+    def test_actions_started_in_threads_run_one_at_a_time(self):
+        from system.tracing import TracedThread
+        running, peak, done = [0], [0], []
+        lock = threading.Lock()
+
+        def action(session):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            done.append(session)
+
+        def act(intent, parameters, response, ui, memory):
+            # Like intents/handlers.py: start the work in a thread and return
+            TracedThread(target=action, args=(parameters["session"],), daemon=True).start()
+
+        async def main():
+            mgr = SessionManager(
+                respond=lambda text, memory: {"intent": "open_app", "text": "", "parameters": {"session": text}},
+                act=act,
+            )
+            for sid in ("a", "b", "c"):
+                mgr.submit(InputMessage(sid, "api", sid))
+            await _until(lambda: len(done) == 3)
+            await mgr.close()
+        asyncio.run(main())
+        self.assertEqual(peak[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
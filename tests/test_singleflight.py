@@ -0,0 +1,111 @@
+"""
+Unit tests for request coalescing (system/singleflight.py): sync and async
+callers sharing one computation, the result TTL, and error handling.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from system.singleflight import Group
+
+
+class TestSyncCalls(unittest.TestCase):
+
+    def test_concurrent_threads_share_one_call(self):
+        g = Group("test_threads")
+        runs = []
+        start = threading.Barrier(8)
+
+        def slow(key):
+            runs.append(key)
+            time.sleep(0.05)
+            return {"key": key}
+
+        results = []
+
+        def caller():
+            start.wait()
+            results.append(g.do("repo", slow, "repo"))
+
+        threads = [threading.Thread(target=caller) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(runs, ["repo"])
+        self.assertEqual(results, [{"key": "repo"}] * 8)
+        stats = g.stats()
+        self.assertEqual((stats["executed"], stats["coalesced"]), (1, 7))
+
+    def test_ttl_and_errors(self):
+        g = Group("test_ttl", ttl_s=0.05)
+        calls = []
+
+        def lookup():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(g.do("k", lookup), 1)
+        self.assertEqual(g.do("k", lookup), 1)        # cached
+        time.sleep(0.06)
+        self.assertEqual(g.do("k", lookup), 2)        # expired
+
+        def failing():
+            calls.append(1)
+            raise ConnectionError("down")
+
+        for _ in range(2):                              # errors are never cached
+            with self.assertRaises(ConnectionError):
+                g.do("bad", failing)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(g.stats()["cached"], 1)
+
+
+class TestAsyncCalls(unittest.TestCase):
+
+    def test_concurrent_tasks_share_one_call(self):
+        g = Group("test_async")
+        runs = []
+
+        async def query(q):
+            runs.append(q)
+            await asyncio.sleep(0.02)
+            return [q]
+
+        async def main():
+            same = await asyncio.gather(*(g.do_async(("search", "alpha"), query, "alpha") for _ in range(5)))
+            other = await g.do_async(("search", "beta"), query, "beta")
+            return same, other
+
+        same, other = asyncio.run(main())
+        self.assertEqual(same, [["alpha"]] * 5)
+        self.assertEqual(other, ["beta"])
+        self.assertEqual(runs, ["alpha", "beta"])
+        self.assertEqual(g.stats()["coalesced_ratio"], round(4 / 6, 3))
+
+    def test_cancelled_caller_does_not_cancel_shared_work(self):
+        g = Group("test_cancel")
+
+        async def query():
+            await asyncio.sleep(0.03)
+            return "done"
+
+        async def main():
+            first = asyncio.ensure_future(g.do_async("k", query))
+            second = asyncio.ensure_future(g.do_async("k", query))
+            await asyncio.sleep(0.005)
+            first.cancel()
+            return await second, first.cancelled()
+
+        self.assertEqual(asyncio.run(main()), ("done", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
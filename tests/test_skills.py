@@ -322,6 +322,21 @@ class TestPresenceEngineSessionWrite(unittest.TestCase):
         self.assertIn("session_duration_minutes", state)
         self.assertIn("timestamp", state)
 
+    def test_suggestions_are_handed_to_async_subscriber(self):
+        import asyncio
+        from system.presence_engine import PresenceEngine
+        engine = PresenceEngine(poll_interval=9999)
+        engine._queue({"type": "early", "message": "queued before ai_loop started"})
+
+        async def main():
+            suggestions = engine.subscribe_async()
+            threading.Thread(target=engine._queue, args=({"type": "later", "message": "hi"},)).start()
+            return [await asyncio.wait_for(suggestions.get(), 2) for _ in range(2)]
+
+        got = asyncio.run(main())
+        self.assertEqual([s["type"] for s in got], ["early", "later"])
+        self.assertTrue(engine.suggestions.empty())
+
 
 # =============================================================================
 # Entry point
@@ -0,0 +1,133 @@
+"""
+Unit tests for per-turn span tracing (system/tracing.py): context propagation
+across asyncio tasks, to_thread() and TracedThread, and vault storage.
+"""
+
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from system import tracing
+
+
+class _TracingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "traces.db"
+        self.recorder = tracing.TraceRecorder(db_path=self.db_path, keep=3)
+        self._saved, tracing._recorder = tracing._recorder, self.recorder
+
+    def tearDown(self):
+        self.recorder.flush()
+        tracing._recorder = self._saved
+
+    def _spans(self, record):
+        return {s["name"]: s for s in tracing.expand(record)}
+
+
+class TestPropagation(_TracingTest):
+
+    def test_spans_follow_to_thread_and_traced_thread(self):
+        done = threading.Event()
+
+        def speak():
+            with tracing.span("synthesis"):
+                time.sleep(0.02)
+            done.set()
+
+        def act():
+            with tracing.span("llm"):
+                time.sleep(0.01)
+            tracing.TracedThread(target=speak, daemon=True, span_name="tts").start()
+
+        async def main():
+            turn = tracing.start("turn", source="voice")
+            with tracing.span("handle_intent"):
+                await asyncio.to_thread(act)
+            turn.finish()
+            recorded_before_tts = self.recorder.stats()["recorded"]
+            await asyncio.to_thread(done.wait, 2)
+            return turn.id, recorded_before_tts
+
+        trace_id, recorded_before_tts = asyncio.run(main())
+        self.assertEqual(recorded_before_tts, 0)     # still waiting on the tts thread
+        record = self.recorder.get(trace_id)
+        spans = self._spans(record)
+        self.assertEqual(spans["llm"]["depth"], 2)
+        self.assertEqual(spans["tts"]["depth"], 2)
+        self.assertEqual(spans["synthesis"]["depth"], 3)
+        self.assertNotEqual(spans["synthesis"]["thread"], spans["turn"]["thread"])
+        self.assertGreaterEqual(record["duration_ms"], spans["synthesis"]["start_ms"] + 20)
+
+    def test_trace_handed_between_tasks(self):
+        async def producer(queue):
+            tracing.start("turn", source="voice")
+            with tracing.span("echo_gate"):
+                pass
+            await queue.put(tracing.detach())
+            self.assertIsNone(tracing.current())
+
+        async def consumer(queue):
+            turn = tracing.resume(await queue.get())
+            with tracing.span("llm"):
+                pass
+            turn.finish(intent="chat")
+            return turn.id
+
+        async def main():
+            queue = asyncio.Queue()
+            await producer(queue)
+            return await asyncio.create_task(consumer(queue))
+
+        record = self.recorder.get(asyncio.run(main()))
+        self.assertEqual([s["name"] for s in tracing.expand(record)], ["turn", "echo_gate", "llm"])
+        self.assertEqual(record["attrs"], {"source": "voice", "intent": "chat"})
+
+    def test_no_trace_is_a_no_op(self):
+        ran = []
+        with tracing.span("llm"):
+            ran.append(1)
+        thread = tracing.TracedThread(target=lambda: ran.append(2))
+        thread.start()
+        thread.join()
+        self.assertEqual(ran, [1, 2])
+        self.assertEqual(self.recorder.stats()["recorded"], 0)
+
+
+class TestStorage(_TracingTest):
+
+    def _record(self, phases):
+        turn = tracing.start("turn")
+        for name, seconds in phases:
+            turn.add_span(name, seconds)
+        turn.finish()
+        return turn.id
+
+    def test_slowest_first_with_breakdown_and_pruning(self):
+        ids = [self._record([("llm", s)]) for s in (0.3, 0.1, 0.5, 0.2)]
+        slowest = self.recorder.query(limit=10, order="slowest")
+        self.assertEqual([r["id"] for r in slowest], [ids[2], ids[3], ids[1]])    # keep=3 pruned the oldest
+        self.assertAlmostEqual(tracing.breakdown(slowest[0])["llm"], 500.0, delta=1)
+        recent = self.recorder.query(limit=1, order="recent")
+        self.assertEqual(recent[0]["id"], ids[3])
+
+    def test_folded_stacks_use_self_time(self):
+        turn = tracing.start("turn")
+        with tracing.span("handle_intent"):
+            tracing.add_span("action", 0.05)
+            time.sleep(0.01)
+        turn.finish()
+        lines = dict(line.rsplit(" ", 1) for line in tracing.folded(self.recorder.get(turn.id)))
+        self.assertIn("turn;handle_intent;action", lines)
+        self.assertAlmostEqual(int(lines["turn;handle_intent;action"]), 50000, delta=100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,609 @@
+"""
+Unit tests for the workflow engine, scheduler, sandbox and HTTP client (workflows/).
+No database — definitions are handed to the engine directly and runs are not persisted.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from workflows.engine import WorkflowEngine, WorkflowValidationError, validate_definition
+    _HAS_ENGINE = True
+except ImportError:           # engine needs aiosqlite
+    _HAS_ENGINE = False
+
+try:
+    from aiohttp import web
+    _HAS_AIOHTTP = True
+except ImportError:
+    _HAS_AIOHTTP = False
+
+
+def _node(node_id, node_type="test.sleep", **extra):
+    return {"id": node_id, "type": node_type, **extra}
+
+
+class _EngineCase(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = WorkflowEngine()
+        self.started = []
+        self.active = 0
+        self.peak = 0
+
+        async def _sleep(config, variables):
+            self.started.append(config.get("name"))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                await asyncio.sleep(config.get("delay", 0.05))
+            finally:
+                self.active -= 1
+            return config.get("value", config.get("name"))
+
+        async def _fail(config, variables):
+            raise RuntimeError("boom")
+
+        self.engine.register_node("test.sleep", _sleep)
+        self.engine.register_node("test.fail", _fail)
+
+    def _run(self, definition, trigger=None):
+        async def _load(_wf_id):
+            return definition
+
+        async def _persist(_run):
+            return None
+
+        self.engine._load_definition = _load
+        self.engine._persist_run = _persist
+        return asyncio.run(self.engine.run_workflow("wf", trigger))
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 1. VALIDATION  (workflows/engine.validate_definition)
+# ═════════════════════════════════════════════════════════════════════════════
+
+@unittest.skipUnless(_HAS_ENGINE, "aiosqlite not installed")
+class TestValidateDefinition(unittest.TestCase):
+
+    def test_cycle_is_rejected(self):
+        definition = {
+            "nodes": [_node("a"), _node("b")],
+            "edges": [{"source": "a", "target": "b"}, {"source": "b", "target": "a"}],
+        }
+        with self.assertRaises(WorkflowValidationError):
+            validate_definition(definition)
+
+    def test_unknown_edge_target_is_rejected(self):
+        definition = {"nodes": [_node("a")], "edges": [{"source": "a", "target": "zz"}]}
+        with self.assertRaises(WorkflowValidationError):
+            validate_definition(definition)
+
+    def test_binding_must_be_upstream(self):
+        definition = {
+            "nodes": [_node("a"), _node("b", inputs={"x": "a.output"})],
+            "edges": [],
+            "settings": {"parallelism": "parallel"},
+        }
+        with self.assertRaises(WorkflowValidationError):
+            validate_definition(definition)
+
+    def test_trigger_edges_are_ignored(self):
+        definition = {
+            "nodes": [_node("t", "trigger.manual"), _node("a")],
+            "edges": [{"source": "t", "target": "a"}],
+        }
+        validate_definition(definition)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 2. DAG EXECUTION  (WorkflowEngine.run_workflow)
+# ═════════════════════════════════════════════════════════════════════════════
+
+@unittest.skipUnless(_HAS_ENGINE, "aiosqlite not installed")
+class TestDagExecution(_EngineCase):
+
+    def test_independent_branches_run_in_parallel(self):
+        definition = {
+            "nodes": [
+                _node("root", config={"name": "root", "delay": 0.01}),
+                _node("left", config={"name": "left", "delay": 0.2}),
+                _node("right", config={"name": "right", "delay": 0.2}),
+                _node("join", config={"name": "join", "delay": 0.01}),
+            ],
+            "edges": [
+                {"source": "root", "target": "left"}, {"source": "root", "target": "right"},
+                {"source": "left", "target": "join"}, {"source": "right", "target": "join"},
+            ],
+        }
+        start = time.monotonic()
+        run = self._run(definition)
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual(run.status, "completed")
+        self.assertEqual(self.started[0], "root")
+        self.assertEqual(self.started[-1], "join")
+        self.assertEqual(self.peak, 2)
+
+    def test_max_parallel_is_respected(self):
+        definition = {
+            "nodes": [_node(f"n{i}", config={"name": i}) for i in range(4)],
+            "edges": [],
+            "settings": {"parallelism": "parallel", "maxParallel": 2},
+        }
+        self._run(definition)
+        self.assertEqual(self.peak, 2)
+
+    def test_output_binding_and_template(self):
+        seen = {}
+
+        async def _capture(config, variables):
+            seen.update(config=config, variables=variables)
+            return None
+
+        self.engine.register_node("test.capture", _capture)
+        definition = {
+            "nodes": [
+                _node("fetch", config={"value": {"status": 200}, "delay": 0}),
+                _node("use", "test.capture", inputs={"code": "fetch.output.status", "who": "trigger.user"},
+                      config={"message": "got {{ code }} for {{ who }}"}),
+            ],
+            "edges": [{"source": "fetch", "target": "use"}],
+        }
+        self._run(definition, {"user": "ada"})
+        self.assertEqual(seen["variables"]["code"], 200)
+        self.assertEqual(seen["config"]["message"], "got 200 for ada")
+
+    def test_false_condition_skips_downstream(self):
+        definition = {
+            "nodes": [
+                _node("check", "logic.condition", config={"expression": "flag"}),
+                _node("then", config={"name": "then"}),
+                _node("after", config={"name": "after"}),
+                _node("else", config={"name": "else"}),
+            ],
+            "edges": [
+                {"source": "check", "target": "then"},
+                {"source": "then", "target": "after"},
+                {"source": "check", "target": "else", "when": False},
+            ],
+        }
+        run = self._run(definition, {"flag": False})
+        status = {s.node_id: s.status for s in run.steps}
+        self.assertEqual(status["then"], "skipped")
+        self.assertEqual(status["after"], "skipped")
+        self.assertEqual(status["else"], "completed")
+        self.assertEqual(run.status, "completed")
+
+    def test_failure_stops_scheduling(self):
+        definition = {
+            "nodes": [_node("bad", "test.fail"), _node("next", config={"name": "next"})],
+            "edges": [{"source": "bad", "target": "next"}],
+        }
+        run = self._run(definition)
+        self.assertEqual(run.status, "failed")
+        self.assertNotIn("next", self.started)
+
+    def test_legacy_sequential_list_keeps_order(self):
+        definition = {"nodes": [_node(f"n{i}", config={"name": i, "delay": 0.01}) for i in range(3)]}
+        run = self._run(definition)
+        self.assertEqual(self.started, [0, 1, 2])
+        self.assertEqual(self.peak, 1)
+        self.assertEqual(run.variables["node_n2_output"], 2)
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 3. SCHEDULER  (workflows/scheduler.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _ts(*args) -> float:
+    return datetime(*args).timestamp()
+
+
+class TestCronSchedule(unittest.TestCase):
+
+    def test_daily(self):
+        from workflows.scheduler import CronSchedule
+        cron = CronSchedule("0 7 * * *")
+        self.assertEqual(cron.next_after(_ts(2026, 3, 2, 6, 59)), _ts(2026, 3, 2, 7, 0))
+        self.assertEqual(cron.next_after(_ts(2026, 3, 2, 7, 0)), _ts(2026, 3, 3, 7, 0))
+
+    def test_step_and_weekday_names(self):
+        from workflows.scheduler import CronSchedule
+        self.assertEqual(CronSchedule("*/15 * * * *").next_after(_ts(2026, 3, 2, 10, 16)),
+                         _ts(2026, 3, 2, 10, 30))
+        # 2026-03-06 is a Friday → next weekday slot is Monday the 9th
+        self.assertEqual(CronSchedule("0 9 * * mon-fri").next_after(_ts(2026, 3, 6, 10, 0)),
+                         _ts(2026, 3, 9, 9, 0))
+
+    def test_day_fields_or_when_both_restricted(self):
+        from workflows.scheduler import CronSchedule
+        # 1st of the month OR any Sunday; 2026-03-08 is a Sunday
+        cron = CronSchedule("0 0 1 * 0")
+        self.assertEqual(cron.next_after(_ts(2026, 3, 2, 0, 0)), _ts(2026, 3, 8, 0, 0))
+
+    def test_stepped_day_of_month_is_restricted(self):
+        from workflows.scheduler import CronSchedule
+        # Odd days OR Mondays: from Mon 2026-03-02, the 3rd (odd) comes before the next Monday
+        cron = CronSchedule("0 0 */2 * mon")
+        self.assertEqual(cron.next_after(_ts(2026, 3, 2, 0, 0)), _ts(2026, 3, 3, 0, 0))
+        self.assertEqual(cron.next_after(_ts(2026, 3, 3, 0, 0)), _ts(2026, 3, 5, 0, 0))
+        self.assertEqual(cron.next_after(_ts(2026, 3, 29, 0, 0)), _ts(2026, 3, 30, 0, 0))
+
+    def test_invalid_expression(self):
+        from workflows.scheduler import CronSchedule
+        for bad in ("* * *", "61 * * * *", "0 0 31 2 *"):
+            with self.assertRaises(ValueError):
+                CronSchedule(bad).next_after(time.time())
+
+
+class TestParseTrigger(unittest.TestCase):
+
+    def test_manual_is_not_scheduled(self):
+        from workflows.scheduler import parse_trigger
+        self.assertIsNone(parse_trigger("manual", {}, {"nodes": []}))
+
+    def test_interval_from_trigger_node(self):
+        from workflows.scheduler import parse_trigger, IntervalSchedule
+        schedule, catch_up, grace = parse_trigger(
+            "manual", {}, {"nodes": [{"type": "trigger.interval", "config": {"every": "15m", "catchUp": "skip"}}]})
+        self.assertIsInstance(schedule, IntervalSchedule)
+        self.assertEqual(schedule.seconds, 900)
+        self.assertEqual((catch_up, grace), ("skip", None))
+
+    def test_bad_policy_rejected(self):
+        from workflows.scheduler import parse_trigger
+        with self.assertRaises(ValueError):
+            parse_trigger("cron", {"cron": "0 7 * * *", "catchUp": "sometimes"})
+
+
+class TestScheduler(unittest.TestCase):
+
+    def _run(self, setup, duration):
+        from workflows.scheduler import Scheduler
+
+        async def _main():
+            sched = Scheduler(persist=False)
+            fired = []
+            setup(sched, fired)
+            await sched.start()
+            await asyncio.sleep(duration)
+            upcoming = sched.upcoming()
+            await sched.stop()
+            return fired, upcoming
+
+        return asyncio.run(_main())
+
+    def test_interval_job_fires_repeatedly(self):
+        from workflows.scheduler import IntervalSchedule
+
+        def setup(sched, fired):
+            async def cb(ts):
+                fired.append(ts)
+            sched.add_job("tick", IntervalSchedule(0.05), cb)
+
+        fired, upcoming = self._run(setup, 0.28)
+        self.assertGreaterEqual(len(fired), 4)
+        self.assertEqual(upcoming[0]["job_id"], "tick")
+
+    def _catch_up(self, policy, grace=None):
+        from workflows.scheduler import IntervalSchedule
+
+        def setup(sched, fired):
+            async def cb(ts):
+                fired.append(ts)
+            job = sched.add_job("j", IntervalSchedule(60), cb, catch_up=policy, grace_s=grace)
+            job.last_fired_at = time.time() - 60 * 5 - 30      # five slots missed
+
+        fired, _ = self._run(setup, 0.02)
+        return fired
+
+    def test_catch_up_policies(self):
+        self.assertEqual(len(self._catch_up("skip")), 0)
+        self.assertEqual(len(self._catch_up("once")), 1)
+        self.assertEqual(len(self._catch_up("all")), 5)
+        self.assertEqual(len(self._catch_up("all", grace=150)), 2)
+
+    def test_overlapping_run_is_skipped(self):
+        from workflows.scheduler import IntervalSchedule
+
+        def setup(sched, fired):
+            async def slow(ts):
+                fired.append(ts)
+                await asyncio.sleep(0.3)
+            sched.add_job("slow", IntervalSchedule(0.05), slow)
+
+        fired, upcoming = self._run(setup, 0.2)
+        self.assertEqual(len(fired), 1)
+        self.assertTrue(upcoming[0]["running"])
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 4. RUN HISTORY  (workflow_runs / workflow_node_runs)
+# ═════════════════════════════════════════════════════════════════════════════
+
+@unittest.skipUnless(_HAS_ENGINE, "aiosqlite not installed")
+class TestRunHistory(_EngineCase):
+
+    def test_output_is_truncated(self):
+        from workflows.engine import _truncate_output, MAX_STORED_OUTPUT
+        self.assertIsNone(_truncate_output(None))
+        self.assertEqual(_truncate_output({"a": 1}), '{"a": 1}')
+        self.assertLess(len(_truncate_output("x" * (MAX_STORED_OUTPUT * 2))), MAX_STORED_OUTPUT + 40)
+
+    def test_run_and_nodes_written_in_one_batch(self):
+        import tempfile
+        import aiosqlite
+        from unittest.mock import patch
+        from vault.schema import init_db
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "sam.db"
+
+            async def _main():
+                await init_db(db_path)
+                async with aiosqlite.connect(str(db_path)) as db:
+                    await db.execute("INSERT INTO workflows (id, name) VALUES ('wf', 'test')")
+                    await db.commit()
+                self.engine._load_definition = lambda _id: asyncio.sleep(0, {
+                    "nodes": [_node("a", config={"name": "a", "delay": 0}), _node("b", "test.fail")],
+                    "settings": {"onError": "continue"},
+                })
+                run = await self.engine.run_workflow("wf", trigger_type="schedule")
+                async with aiosqlite.connect(str(db_path)) as db:
+                    cur = await db.execute("SELECT trigger_type, status, node_count FROM workflow_runs")
+                    runs = await cur.fetchall()
+                    cur = await db.execute(
+                        "SELECT node_id, status, retry_count FROM workflow_node_runs WHERE run_id = ? ORDER BY node_id",
+                        (run.id,))
+                    nodes = await cur.fetchall()
+                return runs, nodes
+
+            with patch("workflows.engine.DB_PATH", db_path):
+                runs, nodes = asyncio.run(_main())
+
+        self.assertEqual([tuple(r) for r in runs], [("schedule", "completed", 2)])
+        self.assertEqual([tuple(n) for n in nodes], [("a", "completed", 0), ("b", "failed", 0)])
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 5. PYTHON SANDBOX  (workflows/sandbox.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestPythonSandbox(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from workflows.sandbox import PythonSandbox
+        cls.sandbox = PythonSandbox(workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sandbox.shutdown()
+
+    def _run(self, code, variables=None, **kw):
+        return asyncio.run(self.sandbox.run(code, variables or {}, **kw))
+
+    def test_result_and_stdout(self):
+        out = self._run("print('hi'); result = sum(variables['xs'])", {"xs": [1, 2, 3]})
+        self.assertTrue(out["ok"])
+        self.assertEqual(out["result"], 6)
+        self.assertEqual(out["stdout"], "hi\n")
+
+    def test_exception_is_structured(self):
+        out = self._run("result = 1 / 0")
+        self.assertFalse(out["ok"])
+        self.assertEqual(out["error_type"], "ZeroDivisionError")
+
+    def test_syntax_error_never_reaches_a_worker(self):
+        runs = self.sandbox.stats()["runs"]
+        out = self._run("def broken(:")
+        self.assertEqual(out["error_type"], "SyntaxError")
+        self.assertEqual(self.sandbox.stats()["runs"], runs)
+
+    def test_timeout_recycles_pool(self):
+        start = time.monotonic()
+        out = self._run("import time; time.sleep(5)", timeout_s=0.5)
+        self.assertEqual(out["error_type"], "TimeoutError")
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(self._run("result = 'alive'")["result"], "alive")
+
+    def test_timeout_does_not_fail_concurrent_snippets(self):
+        from workflows.sandbox import PythonSandbox
+        sandbox = PythonSandbox(workers=2)
+
+        async def main():
+            await sandbox.warm()
+            return await asyncio.gather(
+                sandbox.run("import time; time.sleep(5)", {}, timeout_s=0.3),
+                sandbox.run("import time; time.sleep(0.6); result = 'finished'", {}, timeout_s=5),
+            )
+
+        try:
+            stuck, other = asyncio.run(main())
+        finally:
+            sandbox.shutdown()
+        self.assertEqual(stuck["error_type"], "TimeoutError")
+        self.assertEqual(other["result"], "finished")
+        self.assertEqual(sandbox.stats()["retries"], 1)
+
+    @unittest.skipIf(sys.platform == "win32", "rlimits are POSIX only")
+    def test_cpu_limit(self):
+        out = self._run("while True: pass", timeout_s=10, cpu_s=1)
+        self.assertEqual(out["error_type"], "CpuLimitExceeded")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 6. CONDITION EXPRESSIONS  (workflows/expressions.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+class TestConditionExpressions(unittest.TestCase):
+
+    def _eval(self, source, **variables):
+        from workflows.expressions import compile_expression
+        return compile_expression(source).evaluate(variables)
+
+    def test_comparisons_and_boolean_logic(self):
+        self.assertTrue(self._eval("status == 200 and not failed", status=200, failed=False))
+        self.assertTrue(self._eval("n is none or 1 < n <= 10", n=None))
+        self.assertEqual(self._eval("'big' if n > 5 else 'small'", n=7), "big")
+
+    def test_field_access_on_node_outputs(self):
+        nodes = {"fetch": {"output": {"status": 200, "items": [{"id": "a"}]}, "status": "completed"}}
+        self.assertTrue(self._eval("nodes.fetch.output.status == 200", nodes=nodes))
+        self.assertEqual(self._eval("nodes['fetch'].output.items[0].id", nodes=nodes), "a")
+        self.assertIsNone(self._eval("nodes.fetch.output.missing.deeper", nodes=nodes))
+
+    def test_compiled_form_is_cached(self):
+        from workflows.expressions import compile_expression
+        self.assertIs(compile_expression("x > 1"), compile_expression("x > 1"))
+
+    def test_unsafe_constructs_are_rejected(self):
+        from workflows.expressions import ExpressionError, compile_expression
+        for source in ("__import__('os').system('true')", "x.__class__", "().__class__",
+                       "[i for i in range(10)]", "lambda: 1", "open('f')", "2 ** 1000000",
+                       "x.lower()", "a[1:2]"):
+            with self.subTest(source=source), self.assertRaises(ExpressionError):
+                compile_expression(source)
+
+    def test_cost_is_bounded(self):
+        from workflows.expressions import ExpressionError, compile_expression
+        with self.assertRaises(ExpressionError):
+            compile_expression(" + ".join(["1"] * 500))
+        with self.assertRaises(ExpressionError):
+            self._eval("'a' * 1000000000")
+        with self.assertRaises(ExpressionError):
+            self._eval("fmt % 1", fmt="%0300000000d")
+        self.assertEqual(self._eval("n % 7", n=23), 2)
+
+    def test_runtime_errors_are_expression_errors(self):
+        from workflows.expressions import ExpressionError
+        with self.assertRaises(ExpressionError):
+            self._eval("x / 0", x=1)
+
+    @unittest.skipUnless(_HAS_ENGINE, "aiosqlite not installed")
+    def test_bad_expression_rejected_at_save(self):
+        definition = {"nodes": [_node("c", "logic.condition", config={"expression": "import os"})]}
+        with self.assertRaises(WorkflowValidationError):
+            validate_definition(definition)
+
+
+@unittest.skipUnless(_HAS_ENGINE, "aiosqlite not installed")
+class TestConditionNode(_EngineCase):
+
+    def test_condition_reads_upstream_output(self):
+        definition = {
+            "nodes": [_node("fetch", config={"name": "fetch", "value": {"code": 503}}),
+                      _node("check", "logic.condition", config={"expression": "nodes.fetch.output.code < 500"}),
+                      _node("notify", config={"name": "notify"})],
+            "edges": [{"source": "fetch", "target": "check"},
+                      {"source": "check", "target": "notify"}],
+        }
+        steps = {s.node_id: s for s in self._run(definition).steps}
+        self.assertIs(steps["check"].output, False)
+        self.assertEqual(steps["notify"].status, "skipped")
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# 7. HTTP CLIENT  (workflows/http.py)
+# ═════════════════════════════════════════════════════════════════════════════
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+class TestHttpBody(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_small_body_stays_in_memory(self):
+        from workflows.http import read_body
+        head, size, body_file = asyncio.run(read_body(_chunks(b"ab", b"cd"), 10, spool_dir=self.dir))
+        self.assertEqual((head, size, body_file), (b"abcd", 4, None))
+
+    def test_large_body_is_spooled(self):
+        from workflows.http import read_body, PREVIEW_CHARS
+        parts = [b"x" * 10_000] * 5
+        head, size, body_file = asyncio.run(read_body(_chunks(*parts), 15_000, spool_dir=self.dir))
+        self.assertEqual(size, 50_000)
+        self.assertLessEqual(len(head), PREVIEW_CHARS * 4)
+        self.assertEqual(Path(body_file).stat().st_size, 50_000)
+
+    def test_cache_is_lru(self):
+        from workflows.http import ResponseCache, CachedResponse
+        cache = ResponseCache(max_entries=2)
+        keys = [ResponseCache.key(f"http://h/{i}", {}) for i in range(3)]
+        for k in keys[:2]:
+            cache.put(k, CachedResponse(200, {}, "", 0, etag="e"))
+        cache.get(keys[0])
+        cache.put(keys[2], CachedResponse(200, {}, "", 0, etag="e"))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+
+
+@unittest.skipUnless(_HAS_AIOHTTP, "aiohttp not installed")
+class TestHttpClient(unittest.TestCase):
+
+    def _serve_and_call(self, calls):
+        from workflows.http import HttpClient
+        seen = []
+
+        async def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            if request.path == "/slow":
+                await asyncio.sleep(1)
+            return web.Response(text="hello", headers={"ETag": '"v1"'})
+
+        async def main():
+            app = web.Application()
+            app.router.add_get("/{tail:.*}", handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            client = HttpClient()
+            try:
+                return [await calls(client, f"http://127.0.0.1:{port}") for _ in range(2)], seen
+            finally:
+                await client.close()
+                await runner.cleanup()
+
+        return asyncio.run(main())
+
+    def test_etag_revalidation_reuses_body(self):
+        async def call(client, base):
+            return await client.request("GET", base + "/feed")
+        (first, second), seen = self._serve_and_call(call)
+        self.assertEqual(seen, [None, '"v1"'])
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["body"], "hello")
+
+    def test_timeout(self):
+        async def call(client, base):
+            try:
+                await client.request("GET", base + "/slow", timeout_s=0.2, use_cache=False)
+            except TimeoutError:
+                return "timeout"
+        results, _ = self._serve_and_call(call)
+        self.assertEqual(results, ["timeout", "timeout"])
+
+
+if __name__ == "__main__":
+    unittest.main()
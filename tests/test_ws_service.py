@@ -0,0 +1,260 @@
+"""
+Unit tests for the daemon WebSocket broadcast manager (daemon/ws_service.py):
+per-client queues, topic subscriptions and replay.
+Uses in-memory fake sockets — no server is started.
+"""
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+# Ensure project root is on the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from daemon.ws_service import WebSocketManager
+    _HAS_FASTAPI = True
+except ImportError:           # ws_service imports fastapi.WebSocket
+    _HAS_FASTAPI = False
+
+
+class _FakeSocket:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.received = []
+        self.closed = False
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("gone")
+        await asyncio.sleep(self.delay)
+        self.received.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        await self.gate.wait()
+        self.received.append(data)
+
+    async def close(self):
+        self.closed = True
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+@unittest.skipUnless(_HAS_FASTAPI, "fastapi not installed")
+class TestWebSocketManager(unittest.TestCase):
+
+    def test_slow_client_does_not_block_broadcast(self):
+        async def main():
+            mgr = WebSocketManager()
+            fast, slow = _FakeSocket(), _FakeSocket(delay=1.0)
+            await mgr.connect(fast)
+            await mgr.connect(slow)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for i in range(3):
+                await mgr.broadcast("chat_message", {"i": i})
+            elapsed = loop.time() - start
+            await _drain()
+            return elapsed, fast.received
+        elapsed, received = asyncio.run(main())
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual([m["payload"]["i"] for m in received], [0, 1, 2])
+
+    def test_latest_topic_is_coalesced(self):
+        async def main():
+            mgr = WebSocketManager()
+            ws = _FakeSocket()
+            ws.gate.clear()
+            await mgr.connect(ws)
+            for i in range(5):
+                await mgr.broadcast("screen_view", {"frame": i})
+            stats = mgr.stats()["per_client"][0]
+            ws.gate.set()
+            await _drain()
+            return stats, ws.received
+        stats, received = asyncio.run(main())
+        self.assertEqual(stats["depth"], 1)
+        self.assertEqual(stats["coalesced"], 4)
+        self.assertEqual([m["payload"]["frame"] for m in received], [4])
+
+    def test_full_queue_drops_droppable_then_disconnects_for_reliable(self):
+        async def main():
+            mgr = WebSocketManager(max_queue=2)
+            ws = _FakeSocket()
+            ws.gate.clear()
+            await mgr.connect(ws)
+            await mgr.broadcast("agent_task", {"n": 1})
+            await mgr.broadcast("chat_message", {"n": 2})
+            await mgr.broadcast("chat_message", {"n": 3})     # evicts the agent_task entry
+            dropped = mgr.stats()["dropped"]
+            await mgr.broadcast("chat_message", {"n": 4})     # nothing droppable left
+            await asyncio.sleep(0)
+            return dropped, mgr.client_count, mgr.stats()["slow_disconnects"], ws.closed
+        dropped, count, slow, closed = asyncio.run(main())
+        self.assertEqual(dropped, 1)
+        self.assertEqual((count, slow, closed), (0, 1, True))
+
+    def test_dead_client_is_removed(self):
+        async def main():
+            mgr = WebSocketManager()
+            await mgr.connect(_FakeSocket(fail=True))
+            await mgr.broadcast("task_event", {})
+            await _drain()
+            return mgr.client_count
+        self.assertEqual(asyncio.run(main()), 0)
+
+
+@unittest.skipUnless(_HAS_FASTAPI, "fastapi not installed")
+class TestSubscriptions(unittest.TestCase):
+
+    def test_topic_filter(self):
+        async def main():
+            mgr = WebSocketManager()
+            ws = _FakeSocket()
+            await mgr.connect(ws)
+            await mgr.handle_client_message(ws, json.dumps({"action": "subscribe", "topics": ["chat_message"]}))
+            await mgr.broadcast("screen_view", {"frame": 1})
+            await mgr.broadcast("chat_message", {"text": "hi"})
+            await _drain()
+            return [m["type"] for m in ws.received]
+        self.assertEqual(asyncio.run(main()), ["subscribed", "chat_message"])
+
+    def test_resume_replays_missed_messages(self):
+        async def main():
+            mgr = WebSocketManager()
+            for i in range(5):
+                await mgr.broadcast("chat_message", {"i": i})
+            ws = _FakeSocket()
+            await mgr.connect(ws)
+            await mgr.handle_client_message(ws, json.dumps(
+                {"action": "subscribe", "topics": ["chat_message"], "since": {"chat_message": 3}}))
+            await mgr.broadcast("chat_message", {"i": 5})
+            await _drain()
+            return ws.received
+        received = asyncio.run(main())
+        self.assertEqual(received[0]["payload"]["seq"], {"chat_message": 5})
+        self.assertEqual([(m["seq"], m["payload"]["i"]) for m in received[1:]], [(4, 3), (5, 4), (6, 5)])
+
+    def test_gap_when_buffer_has_moved_on(self):
+        from daemon import ws_service
+
+        async def main():
+            mgr = WebSocketManager()
+            for i in range(3):
+                await mgr.broadcast("screen_view", {"frame": i})     # ring holds only the last frame
+            ws = _FakeSocket()
+            await mgr.connect(ws)
+            mgr.subscribe(ws, ["screen_view"], {"screen_view": 0})
+            await _drain()
+            return ws.received
+        self.assertEqual(ws_service.REPLAY_SIZES["screen_view"], 1)
+        received = asyncio.run(main())
+        self.assertEqual([m["type"] for m in received], ["subscribed", "replay_gap", "screen_view"])
+        self.assertEqual(received[1]["payload"], {"topic": "screen_view", "first_seq": 3})
+
+    def test_unsubscribe_from_all_topics_default(self):
+        async def main():
+            mgr = WebSocketManager()
+            ws = _FakeSocket()
+            await mgr.connect(ws)
+            mgr.unsubscribe(ws, ["screen_view"])
+            await mgr.broadcast("screen_view", {})
+            await mgr.broadcast("task_event", {})
+            await _drain()
+            return [m["type"] for m in ws.received]
+        self.assertEqual(asyncio.run(main()), ["task_event"])
+
+    def test_binary_stream_topic_is_opt_in(self):
+        async def main():
+            mgr = WebSocketManager()
+            legacy, viewer = _FakeSocket(), _FakeSocket()
+            await mgr.connect(legacy)
+            await mgr.connect(viewer)
+            mgr.subscribe(viewer, ["screen_frame"])
+            targets = list(mgr.subscribers("screen_frame"))
+            for ws in targets:
+                mgr.send_binary(ws, "screen_frame", b"SVF1...")
+            await _drain()
+            return targets, legacy.received, viewer.received
+        targets, legacy, viewer = asyncio.run(main())
+        self.assertEqual(len(targets), 1)
+        self.assertEqual(legacy, [])
+        self.assertEqual(viewer[-1], b"SVF1...")
+
+
+@unittest.skipUnless(_HAS_FASTAPI, "fastapi not installed")
+class TestBrokeredBroadcast(unittest.TestCase):
+
+    def test_broadcasts_from_other_workers_are_delivered(self):
+        from daemon.broker import Broker
+
+        async def main():
+            broker = Broker()
+            mgr = WebSocketManager()
+            mgr.attach_broker(broker)
+            ws = _FakeSocket()
+            await mgr.connect(ws)
+            await mgr.broadcast("chat_message", {"text": "local"})
+            # What another worker's broadcast looks like when the broker hands it over
+            broker._dispatch("ws", {"type": "chat_message", "payload": {"text": "remote"}})
+            await _drain()
+            return [(m["payload"]["text"], m["seq"]) for m in ws.received]
+        self.assertEqual(asyncio.run(main()), [("local", 1), ("remote", 2)])
+
+    def test_relay_never_blocks_broadcast(self):
+        from daemon.broker import Broker
+
+        class _SlowBroker(Broker):
+            distributed = True
+
+            def __init__(self):
+                super().__init__()
+                self.gate = asyncio.Event()
+                self.batches = []
+
+            async def publish_remote(self, topic, messages):
+                await self.gate.wait()
+                self.batches.append([(m["type"], m["payload"]["n"]) for m in messages])
+
+        async def main():
+            broker = _SlowBroker()
+            mgr = WebSocketManager()
+            mgr.attach_broker(broker)
+            ws = _FakeSocket()
+            await mgr.connect(ws)
+            await mgr.broadcast("chat_message", {"n": 0})
+            await _drain()                      # relay task now waits on the broker
+            for n in range(1, 4):
+                await mgr.broadcast("system_status", {"n": n})
+            await mgr.broadcast("screen_view", {"n": 9})
+            await mgr.broadcast("chat_message", {"n": 4})
+            await _drain()
+            delivered = [(m["type"], m["payload"]["n"]) for m in ws.received]
+            broker.gate.set()
+            await _drain()
+            await mgr.detach_broker()
+            return delivered, broker.batches, mgr.stats()
+
+        delivered, batches, stats = asyncio.run(main())
+        # Local clients never waited on the broker
+        self.assertEqual([d for d in delivered if d[0] != "system_status"],
+                         [("chat_message", 0), ("screen_view", 9), ("chat_message", 4)])
+        self.assertIn(("system_status", 3), delivered)
+        self.assertEqual(batches, [[("chat_message", 0)], [("chat_message", 4), ("system_status", 3)]])
+        self.assertEqual((stats["relayed"], stats["relay_coalesced"]), (3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
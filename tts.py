@@ -1,6 +1,7 @@
 import io
 import threading
 import asyncio
+import time
 import sounddevice as sd
 import soundfile as sf
 import edge_tts
@@ -135,7 +136,8 @@ def edge_speak(text: str, ui=None, blocking=False, force=False):
                 pass
             finished_event.set()
 
-    threading.Thread(target=_thread, daemon=True).start()
+    from system.tracing import TracedThread
+    TracedThread(target=_thread, daemon=True, span_name="tts").start()
 
     if blocking:
         if not finished_event.wait(timeout=30):
@@ -150,8 +152,11 @@ async def _speak_async(text: str):
         pitch=PITCH,
     )
 
+    from system.metrics import TTS_PLAYBACK, TTS_SYNTHESIS
+    from system.tracing import add_span
     audio_bytes = io.BytesIO()
     chunk_count = 0
+    started = time.perf_counter()
 
     logger.debug("TTS: streaming audio from edge-tts...")
     async for chunk in communicate.stream():
@@ -169,10 +174,13 @@ async def _speak_async(text: str):
     logger.debug(f"TTS: received {chunk_count} audio chunks — reading with soundfile")
     audio_bytes.seek(0)
     data, samplerate = sf.read(audio_bytes, dtype="float32")
+    TTS_SYNTHESIS.observe(time.perf_counter() - started)
+    add_span("synthesis", time.perf_counter() - started, chunks=chunk_count)
 
     channels = data.shape[1] if len(data.shape) > 1 else 1
     logger.debug(f"TTS: playing audio — samplerate={samplerate}, channels={channels}, samples={len(data)}")
 
+    started = time.perf_counter()
     with sd.OutputStream(
         samplerate=samplerate,
         channels=channels,
@@ -184,6 +192,8 @@ async def _speak_async(text: str):
                 logger.debug("TTS: stop flag set — aborting playback")
                 break
             stream.write(data[start:start + block_size])
+    TTS_PLAYBACK.observe(time.perf_counter() - started)
+    add_span("playback", time.perf_counter() - started)
 
 def stop_speaking():
     stop_speaking_flag.set()
\ No newline at end of file
@@ -6,7 +6,13 @@ Run directly: python vault/schema.py
 """
 
 import asyncio
+import functools
+import itertools
 import os
+import re
+import sqlite3
+import threading
+import time
 from pathlib import Path
 
 try:
@@ -21,7 +27,151 @@ _DEFAULT_DB = Path.home() / ".sam" / "sam.db"
 DB_PATH = Path(os.environ.get("SAM_DB_PATH", str(_DEFAULT_DB)))
 
 
+# ── Timed connections ─────────────────────────────────────────────────────────
+# connect_db() is aiosqlite.connect() with every statement timed into the
+# sam_vault_query_duration_seconds histogram, labelled by verb and table.
+# Timing runs in aiosqlite's worker thread, so it measures SQLite's work
+# (execute and first row), not time spent waiting for that thread.
+#
+# The same connections keep a version counter per table, bumped by every
+# write and again when it commits (a reader between the two must not cache
+# the pre-commit rows under the new version). The daemon derives ETags from
+# these; writes that bypass connect_db() (other processes, plain sqlite3)
+# are not counted.
+#
+# With several daemon workers the counters must be shared: after
+# share_table_versions(), every commit also bumps its tables' rows in
+# vault_table_versions inside the same transaction, and table_versions()
+# reads that table (again only when PRAGMA data_version says another
+# connection has committed since the last look).
+
+_TABLE_RE = re.compile(r"\b(?:from|into|update|table(?:\s+if\s+(?:not\s+)?exists)?)\s+[\"`\[]?(\w+)", re.I)
+
+
+_WRITE_OPS = {"INSERT", "UPDATE", "DELETE", "REPLACE"}
+_version_seq = itertools.count(1)
+_table_versions: dict = {}
+
+
+_VERSIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS vault_table_versions (
+        name    TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+"""
+_BUMP_SHARED = ("INSERT INTO vault_table_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1")
+
+
+class _SharedVersions:
+    """Write counters kept in the vault itself, so every process sees every commit."""
+
+    def __init__(self, path: Path) -> None:
+        self._conn = sqlite3.connect(str(path), timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute(_VERSIONS_DDL)
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._versions: dict = {}
+
+    def get(self, tables: tuple) -> tuple:
+        with self._lock:
+            # data_version only moves when another connection commits: cheap to poll per request
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._versions = dict(self._conn.execute("SELECT name, version FROM vault_table_versions"))
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_shared_versions = None
+
+
+def share_table_versions(path: Path | str | None = None) -> None:
+    """Keep table versions in the vault so several worker processes agree on them."""
+    global _shared_versions
+    if _shared_versions is None:
+        _shared_versions = _SharedVersions(Path(path) if path else DB_PATH)
+
+
+def table_versions(*tables: str) -> tuple:
+    """Current write counters for the given tables (0 = not written since start)."""
+    if _shared_versions is not None:
+        return _shared_versions.get(tables)
+    return tuple(_table_versions.get(t, 0) for t in tables)
+
+
+def bump_tables(*tables: str) -> None:
+    for table in tables:
+        _table_versions[table] = next(_version_seq)
+
+
+@functools.lru_cache(maxsize=1024)
+def _statement_labels(sql: str) -> tuple:
+    words = sql.split(None, 1)
+    match = _TABLE_RE.search(sql)
+    return (words[0].upper() if words else "?"), (match.group(1).lower() if match else "-")
+
+
+class _TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=(), /):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _observe(self.connection, sql, start)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _observe(self.connection, sql, start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection whose statements are timed, directly or through its cursors."""
+
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute builds a plain Cursor internally, so it is timed here too
+    def execute(self, sql, parameters=(), /):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        dirty = self.__dict__.pop("_dirty_tables", None)
+        if dirty and _shared_versions is not None:
+            # Same transaction as the writes; the untimed base method keeps this out of _dirty_tables
+            sqlite3.Connection.executemany(self, _BUMP_SHARED, [(t,) for t in sorted(dirty)])
+        super().commit()
+        if dirty:
+            bump_tables(*dirty)
+
+
+def _observe(conn, sql: str, start: float) -> None:
+    from system.metrics import VAULT_QUERY
+    op, table = _statement_labels(sql)
+    VAULT_QUERY.labels(op, table).observe(time.perf_counter() - start)
+    if op in _WRITE_OPS and table != "-":
+        bump_tables(table)
+        conn.__dict__.setdefault("_dirty_tables", set()).add(table)
+
+
+def connect_db(path: Path | str | None = None) -> "aiosqlite.Connection":
+    """Open the vault (await it, or use it with `async with`) with per-statement timing."""
+    return aiosqlite.connect(str(path or DB_PATH), factory=TimedConnection)
+
+
 CREATE_STATEMENTS = [
+    # Per-table write counters shared by daemon workers (see share_table_versions)
+    _VERSIONS_DDL,
+
     # Conversations — top-level session containers
     """
     CREATE TABLE IF NOT EXISTS conversations (
@@ -178,6 +328,40 @@ CREATE_STATEMENTS = [
     )
     """,
 
+    # Workflow runs — one row per execution, written when the run ends
+    """
+    CREATE TABLE IF NOT EXISTS workflow_runs (
+        id            TEXT PRIMARY KEY,
+        workflow_id   TEXT NOT NULL,
+        version       INTEGER NOT NULL DEFAULT 1,
+        trigger_type  TEXT NOT NULL DEFAULT 'manual',
+        status        TEXT NOT NULL,
+        error_message TEXT,
+        started_at    INTEGER NOT NULL,
+        completed_at  INTEGER,
+        duration_ms   INTEGER,
+        node_count    INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+
+    # Workflow node runs — per-node result of a workflow run (times in epoch ms)
+    """
+    CREATE TABLE IF NOT EXISTS workflow_node_runs (
+        id            TEXT PRIMARY KEY,
+        run_id        TEXT NOT NULL REFERENCES workflow_runs(id) ON DELETE CASCADE,
+        workflow_id   TEXT NOT NULL,
+        node_id       TEXT NOT NULL,
+        node_type     TEXT NOT NULL,
+        status        TEXT NOT NULL,
+        error_message TEXT,
+        retry_count   INTEGER NOT NULL DEFAULT 0,
+        started_at    INTEGER,
+        completed_at  INTEGER,
+        duration_ms   INTEGER NOT NULL DEFAULT 0,
+        output        TEXT
+    )
+    """,
+
     # Documents — text chunks with optional embedding for RAG
     """
     CREATE TABLE IF NOT EXISTS documents (
@@ -204,6 +388,9 @@ INDEX_STATEMENTS = [
     "CREATE INDEX IF NOT EXISTS idx_audit_log_created ON audit_log(created_at)",
     "CREATE INDEX IF NOT EXISTS idx_approvals_status ON approval_requests(status)",
     "CREATE INDEX IF NOT EXISTS idx_approvals_agent ON approval_requests(agent_id)",
+    "CREATE INDEX IF NOT EXISTS idx_workflow_runs_workflow ON workflow_runs(workflow_id, started_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_workflow_node_runs_run ON workflow_node_runs(run_id)",
+    "CREATE INDEX IF NOT EXISTS idx_workflow_node_runs_node ON workflow_node_runs(workflow_id, node_id)",
 ]
 
 
@@ -215,7 +402,7 @@ async def init_db(db_path: Path | None = None) -> Path:
     path = Path(db_path) if db_path else DB_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    async with aiosqlite.connect(str(path)) as db:
+    async with connect_db(path) as db:
         # Enable WAL mode for better concurrent read performance
         await db.execute("PRAGMA journal_mode=WAL")
         await db.execute("PRAGMA foreign_keys=ON")
@@ -1,3 +1,9 @@
-from workflows.engine import WorkflowEngine
-
 __all__ = ["WorkflowEngine"]
+
+
+def __getattr__(name):
+    # Lazy so sandbox worker processes and the scheduler don't pull in the engine/vault
+    if name == "WorkflowEngine":
+        from workflows.engine import WorkflowEngine
+        return WorkflowEngine
+    raise AttributeError(name)
@@ -5,10 +5,39 @@ Ported from Jarvis src/workflows/engine.ts + executor.ts
 Supports:
   - Manual triggers (run on demand)
   - Cron triggers (scheduled via asyncio)
-  - Sequential + parallel node execution
+  - DAG execution: ready nodes run as soon as their upstream edges resolve,
+    up to settings.maxParallel at once
+  - Output-to-input bindings between nodes
+  - Python nodes run in a sandboxed process pool (workflows/sandbox.py)
+  - HTTP nodes share a pooled, caching client (workflows/http.py)
+  - Condition nodes use compiled safe expressions (workflows/expressions.py)
   - HTTP, Python-code, LLM, notify node types
   - Retry with exponential backoff
 
+Definition shape (stored as JSON in workflows.nodes):
+    {
+      "nodes": [{"id": "fetch", "type": "action.http_request", "config": {...}},
+                {"id": "check", "type": "logic.condition",
+                 "inputs": {"status": "fetch.output.status"},
+                 "config": {"expression": "status == 200"}},
+                {"id": "notify", "type": "action.notify",
+                 "config": {"message": "Got {{ status }}"}}],
+      "edges": [{"source": "fetch", "target": "check"},
+                {"source": "check", "target": "notify", "when": true}],
+      "settings": {"maxParallel": 4, "onError": "stop"}
+    }
+
+    inputs   — "<node_id>.output[.path]" or "trigger.<key>"; bound values become
+               variables for that node and can be used as {{ name }} in config.
+               Condition expressions can also read upstream results directly
+               as nodes.<node_id>.output[.path] / nodes.<node_id>.status.
+    when     — edge is taken only if the source output's truthiness matches;
+               edges out of a logic.condition node default to when=true.
+               A node whose incoming edges are all untaken is skipped, and the
+               skip propagates downstream.
+    Without edges, "parallelism": "sequential" (default) runs nodes in list
+    order and "parallel" runs them all at once, as before.
+
 Usage:
     from workflows.engine import WorkflowEngine
     engine = WorkflowEngine(llm_manager)
@@ -19,20 +48,169 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import re
+import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Callable, Literal, Optional
 
 import aiosqlite
 
-from vault.schema import DB_PATH
+from system.metrics import WORKFLOW_RUNS
+from vault.schema import DB_PATH, connect_db
+from workflows.expressions import ExpressionError, compile_expression
 
 logger = logging.getLogger("sam.workflows")
 
 ExecutionStatus = Literal["running", "completed", "failed", "cancelled"]
 StepStatus = Literal["pending", "running", "completed", "failed", "skipped"]
 
+DEFAULT_MAX_PARALLEL = 4
+MAX_STORED_OUTPUT = 4000          # chars of each node output kept in workflow_node_runs
+MAX_RUNS_PER_WORKFLOW = 500       # older run history is pruned at write time
+_TEMPLATE_RE = re.compile(r"\{\{\s*([\w.]+)\s*\}\}")
+
+
+class WorkflowValidationError(ValueError):
+    """Raised for definitions that cannot be scheduled (cycles, dangling edges)."""
+
+
+@dataclass
+class _Edge:
+    source: str
+    target: str
+    when: Optional[bool] = None
+    ordering_only: bool = False      # implicit edge of a legacy sequential list
+
+
+def _build_graph(definition: dict) -> tuple[list[dict], list[_Edge], int]:
+    """Return (action_nodes, edges, max_parallel) for a stored definition."""
+    settings = definition.get("settings", {}) or {}
+    nodes: list[dict] = definition.get("nodes", []) or []
+    # Filter out trigger nodes — they fired already
+    action_nodes = [n for n in nodes if not n.get("type", "").startswith("trigger.")]
+    trigger_ids = {n.get("id") for n in nodes} - {n.get("id") for n in action_nodes}
+    types = {n.get("id"): n.get("type", "") for n in action_nodes}
+
+    raw_edges = definition.get("edges", []) or []
+    edges: list[_Edge] = []
+    for e in raw_edges:
+        source = e.get("source", e.get("from"))
+        target = e.get("target", e.get("to"))
+        if source in trigger_ids or target in trigger_ids:
+            continue
+        when = e.get("when")
+        if when is None and types.get(source) == "logic.condition":
+            when = True
+        edges.append(_Edge(source, target, None if when is None else bool(when)))
+
+    if raw_edges:
+        max_parallel = settings.get("maxParallel", DEFAULT_MAX_PARALLEL)
+    elif settings.get("parallelism", "sequential") == "parallel":
+        max_parallel = settings.get("maxParallel", max(len(action_nodes), 1))
+    else:
+        edges = [
+            _Edge(a.get("id"), b.get("id"), ordering_only=True)
+            for a, b in zip(action_nodes, action_nodes[1:])
+        ]
+        max_parallel = 1
+    return action_nodes, edges, max(int(max_parallel), 1)
+
+
+def validate_definition(definition: dict) -> None:
+    """
+    Check a workflow definition before it is saved.
+    Raises WorkflowValidationError on duplicate ids, dangling edges or
+    bindings, cycles, and condition expressions that don't compile.
+    """
+    nodes, edges, _ = _build_graph(definition)
+    ids = [n.get("id") for n in nodes]
+    if len(ids) != len(set(ids)):
+        raise WorkflowValidationError("Duplicate node ids in workflow.")
+    known = set(ids)
+    for e in edges:
+        if e.source not in known or e.target not in known:
+            raise WorkflowValidationError(f"Edge {e.source} -> {e.target} references an unknown node.")
+
+    preds: dict = {i: set() for i in ids}
+    for e in edges:
+        preds[e.target].add(e.source)
+    order = _topological_order(ids, edges)
+    if order is None:
+        raise WorkflowValidationError("Workflow graph contains a cycle.")
+
+    ancestors: dict = {}
+    for nid in order:
+        ancestors[nid] = set(preds[nid])
+        for p in preds[nid]:
+            ancestors[nid] |= ancestors[p]
+    for node in nodes:
+        for name, ref in (node.get("inputs") or {}).items():
+            source = str(ref).split(".", 1)[0]
+            if source == "trigger":
+                continue
+            if source not in ancestors[node.get("id")]:
+                raise WorkflowValidationError(
+                    f"Input '{name}' of node {node.get('id')} binds to {source}, which is not upstream."
+                )
+        if node.get("type") == "logic.condition":
+            expr = str((node.get("config") or {}).get("expression", "True"))
+            if "{{" in expr:
+                continue                   # templated — compiled after rendering at run time
+            try:
+                compile_expression(expr)
+            except ExpressionError as e:
+                raise WorkflowValidationError(f"Condition on node {node.get('id')}: {e}") from e
+
+
+def _topological_order(ids: list, edges: list[_Edge]) -> Optional[list]:
+    indegree = {i: 0 for i in ids}
+    succs: dict = {i: [] for i in ids}
+    for e in edges:
+        indegree[e.target] += 1
+        succs[e.source].append(e.target)
+    ready = deque(i for i in ids if indegree[i] == 0)
+    order = []
+    while ready:
+        nid = ready.popleft()
+        order.append(nid)
+        for t in succs[nid]:
+            indegree[t] -= 1
+            if indegree[t] == 0:
+                ready.append(t)
+    return order if len(order) == len(ids) else None
+
+
+def _resolve_path(value: Any, path: list[str]) -> Any:
+    for part in path:
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, (list, tuple)) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def _render(value: Any, variables: dict) -> Any:
+    """Substitute {{ name }} placeholders in string config values."""
+    if isinstance(value, str):
+        if "{{" not in value:
+            return value
+
+        def _sub(m: re.Match) -> str:
+            path = m.group(1).split(".")
+            return str(_resolve_path(variables, path)) if path[0] in variables else m.group(0)
+
+        return _TEMPLATE_RE.sub(_sub, value)
+    if isinstance(value, dict):
+        return {k: _render(v, variables) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_render(v, variables) for v in value]
+    return value
+
 
 @dataclass
 class NodeResult:
@@ -42,6 +220,8 @@ class NodeResult:
     output: Any = None
     error: str = ""
     duration_ms: int = 0
+    attempts: int = 0
+    started_at: float = 0.0        # epoch seconds; 0 when the node never ran
 
 
 @dataclass
@@ -54,6 +234,7 @@ class WorkflowRun:
     error: str = ""
     started_at: str = ""
     completed_at: str = ""
+    trigger_type: str = "manual"
 
 
 class WorkflowEngine:
@@ -64,7 +245,9 @@ class WorkflowEngine:
 
     # ── Public API ────────────────────────────────────────────────────────────
 
-    async def run_workflow(self, workflow_id: str, trigger_data: dict | None = None) -> WorkflowRun:
+    async def run_workflow(
+        self, workflow_id: str, trigger_data: dict | None = None, trigger_type: str = "manual"
+    ) -> WorkflowRun:
         """Load a workflow from DB and execute it."""
         definition = await self._load_definition(workflow_id)
         if not definition:
@@ -76,36 +259,17 @@ class WorkflowEngine:
             status="running",
             variables=trigger_data or {},
             started_at=datetime.utcnow().isoformat() + "Z",
+            trigger_type=trigger_type,
         )
 
         settings = definition.get("settings", {})
-        parallelism = settings.get("parallelism", "sequential")
-        nodes: list[dict] = definition.get("nodes", [])
-        # Filter out trigger nodes — they fired already
-        action_nodes = [n for n in nodes if not n.get("type", "").startswith("trigger.")]
+        on_error = settings.get("onError", "stop")
+        started = time.monotonic()
 
         try:
-            if parallelism == "parallel":
-                results = await asyncio.gather(
-                    *[self._execute_node(n, run.variables) for n in action_nodes],
-                    return_exceptions=True,
-                )
-                for r in results:
-                    if isinstance(r, Exception):
-                        run.steps.append(NodeResult("?", "?", "failed", error=str(r)))
-                    else:
-                        run.steps.append(r)
-            else:
-                for node in action_nodes:
-                    result = await self._execute_node(node, run.variables)
-                    run.steps.append(result)
-                    if result.output is not None:
-                        run.variables[f"node_{node['id']}_output"] = result.output
-                    if result.status == "failed" and settings.get("onError", "stop") == "stop":
-                        run.status = "failed"
-                        run.error = result.error
-                        break
-
+            validate_definition(definition)
+            nodes, edges, max_parallel = _build_graph(definition)
+            await self._run_graph(run, nodes, edges, max_parallel, on_error)
             if run.status != "failed":
                 run.status = "completed"
         except Exception as e:
@@ -113,6 +277,7 @@ class WorkflowEngine:
             run.error = str(e)
             logger.error(f"[Workflow] Run {run.id} failed: {e}")
 
+        WORKFLOW_RUNS.labels(trigger_type, run.status).observe(time.monotonic() - started)
         run.completed_at = datetime.utcnow().isoformat() + "Z"
         await self._persist_run(run)
         return run
@@ -122,7 +287,7 @@ class WorkflowEngine:
 
     async def list_workflows(self) -> list[dict]:
         """Return all workflows from the vault."""
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute(
                 "SELECT id, name, description, trigger_type, execution_count FROM workflows ORDER BY created_at DESC"
@@ -134,12 +299,94 @@ class WorkflowEngine:
         """Register a custom node handler: async fn(config, variables) -> Any."""
         self._node_handlers[node_type] = handler
 
+    # ── Graph scheduling ──────────────────────────────────────────────────────
+
+    async def _run_graph(
+        self, run: WorkflowRun, nodes: list[dict], edges: list[_Edge], max_parallel: int, on_error: str
+    ) -> None:
+        """Run nodes as their upstream edges resolve, at most max_parallel at a time."""
+        by_id = {n.get("id"): n for n in nodes}
+        incoming: dict = {nid: [] for nid in by_id}
+        outgoing: dict = {nid: [] for nid in by_id}
+        for e in edges:
+            incoming[e.target].append(e)
+            outgoing[e.source].append(e)
+        waiting = {nid: len(incoming[nid]) for nid in by_id}
+        ready = deque(nid for nid in by_id if waiting[nid] == 0)
+        results: dict[str, NodeResult] = {}
+        running: dict[asyncio.Task, str] = {}
+        stopped = False
+
+        def _finish(nid: str, result: NodeResult) -> None:
+            results[nid] = result
+            run.steps.append(result)
+            if result.status == "completed" and result.output is not None:
+                run.variables[f"node_{nid}_output"] = result.output
+            for e in outgoing[nid]:
+                waiting[e.target] -= 1
+                if waiting[e.target] == 0:
+                    ready.append(e.target)
+
+        def _edge_taken(e: _Edge) -> bool:
+            src = results[e.source]
+            if e.ordering_only:
+                return True
+            if src.status != "completed":
+                return False
+            return e.when is None or bool(src.output) == e.when
+
+        try:
+            while ready or running:
+                while ready and len(running) < max_parallel and not stopped:
+                    nid = ready.popleft()
+                    node = by_id[nid]
+                    if incoming[nid] and not any(_edge_taken(e) for e in incoming[nid]):
+                        _finish(nid, NodeResult(nid, node.get("type", "unknown"), "skipped",
+                                                error="No upstream branch taken"))
+                        continue
+                    variables = self._node_variables(node, run.variables, results)
+                    task = asyncio.create_task(self._execute_node(node, variables))
+                    running[task] = nid
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    nid = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = NodeResult(nid, by_id[nid].get("type", "unknown"), "failed", error=str(e))
+                    _finish(nid, result)
+                    if result.status == "failed" and on_error == "stop" and not stopped:
+                        stopped = True
+                        run.status = "failed"
+                        run.error = result.error
+        finally:
+            for task in running:
+                task.cancel()
+
+    @staticmethod
+    def _node_variables(node: dict, variables: dict, results: dict) -> dict:
+        """Run variables plus this node's bound inputs from upstream outputs."""
+        scoped = dict(variables)
+        for name, ref in (node.get("inputs") or {}).items():
+            parts = str(ref).split(".")
+            if parts[0] == "trigger":
+                scoped[name] = _resolve_path(variables, parts[1:])
+                continue
+            upstream = results.get(parts[0])
+            value = {"output": upstream.output, "status": upstream.status} if upstream else None
+            scoped[name] = _resolve_path(value, parts[1:]) if len(parts) > 1 else (upstream.output if upstream else None)
+        if node.get("type") == "logic.condition" and "nodes" not in scoped:
+            scoped["nodes"] = {nid: {"output": r.output, "status": r.status} for nid, r in results.items()}
+        return scoped
+
     # ── Node execution ────────────────────────────────────────────────────────
 
     async def _execute_node(self, node: dict, variables: dict) -> NodeResult:
         node_id = node.get("id", "?")
         node_type = node.get("type", "unknown")
-        config = node.get("config", {})
+        config = _render(node.get("config", {}), variables)
         retry_policy = node.get("retryPolicy", {"maxRetries": 1, "delayMs": 1000, "backoff": "fixed"})
         max_retries = retry_policy.get("maxRetries", 1)
         delay_ms = retry_policy.get("delayMs", 1000)
@@ -149,13 +396,15 @@ class WorkflowEngine:
         if not handler:
             return NodeResult(node_id, node_type, "skipped", error=f"No handler for {node_type}")
 
+        started_at = time.time()
         t0 = asyncio.get_event_loop().time()
         last_error = ""
         for attempt in range(max_retries):
             try:
                 output = await handler(config, variables)
                 duration = int((asyncio.get_event_loop().time() - t0) * 1000)
-                return NodeResult(node_id, node_type, "completed", output=output, duration_ms=duration)
+                return NodeResult(node_id, node_type, "completed", output=output, duration_ms=duration,
+                                  attempts=attempt + 1, started_at=started_at)
             except Exception as e:
                 last_error = str(e)
                 logger.warning(f"[Workflow] Node {node_id} attempt {attempt + 1} failed: {e}")
@@ -164,7 +413,8 @@ class WorkflowEngine:
                     await asyncio.sleep(sleep_s)
 
         duration = int((asyncio.get_event_loop().time() - t0) * 1000)
-        return NodeResult(node_id, node_type, "failed", error=last_error, duration_ms=duration)
+        return NodeResult(node_id, node_type, "failed", error=last_error, duration_ms=duration,
+                          attempts=max_retries, started_at=started_at)
 
     # ── Built-in node types ───────────────────────────────────────────────────
 
@@ -179,20 +429,34 @@ class WorkflowEngine:
         })
 
     async def _node_http(self, config: dict, variables: dict) -> dict:
-        import aiohttp
-        url = config.get("url", "")
-        method = config.get("method", "GET").upper()
-        headers = config.get("headers", {})
+        from workflows.http import get_http_client, DEFAULT_TIMEOUT_S
         body = config.get("body", None)
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, headers=headers, json=body) as resp:
-                return {"status": resp.status, "body": await resp.text()}
+        return await get_http_client().request(
+            config.get("method", "GET"),
+            config.get("url", ""),
+            headers=config.get("headers", {}),
+            json_body=body if not isinstance(body, str) else None,
+            data=body if isinstance(body, str) else None,
+            timeout_s=float(config.get("timeout_s", DEFAULT_TIMEOUT_S)),
+            max_body_bytes=config.get("max_body_bytes"),
+            stream_to_file=bool(config.get("stream_to_file", False)),
+            use_cache=bool(config.get("cache", True)),
+        )
 
     async def _node_python(self, config: dict, variables: dict) -> Any:
-        code = config.get("code", "")
-        local_vars = {"variables": variables, "result": None}
-        exec(code, {}, local_vars)  # noqa: S102
-        return local_vars.get("result")
+        from workflows.sandbox import get_sandbox, SandboxError, DEFAULT_TIMEOUT_S, DEFAULT_CPU_S, DEFAULT_MEMORY_MB
+        outcome = await get_sandbox().run(
+            config.get("code", ""),
+            variables,
+            timeout_s=float(config.get("timeout_s", DEFAULT_TIMEOUT_S)),
+            cpu_s=config.get("cpu_seconds", DEFAULT_CPU_S),
+            memory_mb=config.get("memory_mb", DEFAULT_MEMORY_MB),
+        )
+        if outcome.get("stdout"):
+            logger.info(f"[Workflow python] {outcome['stdout'][-500:]}")
+        if not outcome["ok"]:
+            raise SandboxError(f"{outcome['error_type']}: {outcome['error']}")
+        return outcome["result"]
 
     async def _node_llm(self, config: dict, variables: dict) -> str:
         if not self._llm:
@@ -212,13 +476,13 @@ class WorkflowEngine:
         return msg
 
     async def _node_condition(self, config: dict, variables: dict) -> bool:
-        expr = config.get("expression", "True")
-        return bool(eval(expr, {}, variables))  # noqa: S307
+        expr = compile_expression(str(config.get("expression", "True")))
+        return bool(expr.evaluate(variables))
 
     # ── DB helpers ────────────────────────────────────────────────────────────
 
     async def _load_definition(self, workflow_id: str) -> dict | None:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        async with connect_db(DB_PATH) as db:
             db.row_factory = aiosqlite.Row
             cur = await db.execute("SELECT nodes FROM workflows WHERE id = ?", (workflow_id,))
             row = await cur.fetchone()
@@ -230,9 +494,65 @@ class WorkflowEngine:
             return None
 
     async def _persist_run(self, run: WorkflowRun) -> None:
-        async with aiosqlite.connect(str(DB_PATH)) as db:
+        """Write the run and all of its node results in one transaction."""
+        started_ms = _iso_to_ms(run.started_at)
+        completed_ms = _iso_to_ms(run.completed_at)
+        node_rows = [
+            (
+                str(uuid.uuid4()), run.id, run.workflow_id, step.node_id, step.node_type, step.status,
+                step.error or None, max(step.attempts - 1, 0),
+                int(step.started_at * 1000) if step.started_at else None,
+                int(step.started_at * 1000) + step.duration_ms if step.started_at else None,
+                step.duration_ms, _truncate_output(step.output),
+            )
+            for step in run.steps
+        ]
+        async with connect_db(DB_PATH) as db:
+            await db.execute(
+                """INSERT INTO workflow_runs
+                   (id, workflow_id, trigger_type, status, error_message, started_at, completed_at,
+                    duration_ms, node_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (run.id, run.workflow_id, run.trigger_type, run.status, run.error or None,
+                 started_ms, completed_ms, completed_ms - started_ms, len(run.steps)),
+            )
+            await db.executemany(
+                """INSERT INTO workflow_node_runs
+                   (id, run_id, workflow_id, node_id, node_type, status, error_message, retry_count,
+                    started_at, completed_at, duration_ms, output)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                node_rows,
+            )
             await db.execute(
                 "UPDATE workflows SET execution_count = execution_count + 1 WHERE id = ?",
                 (run.workflow_id,),
             )
+            pruned = await db.execute(
+                """DELETE FROM workflow_runs WHERE workflow_id = ? AND id NOT IN (
+                       SELECT id FROM workflow_runs WHERE workflow_id = ?
+                       ORDER BY started_at DESC LIMIT ?)""",
+                (run.workflow_id, run.workflow_id, MAX_RUNS_PER_WORKFLOW),
+            )
+            if pruned.rowcount:
+                await db.execute(
+                    "DELETE FROM workflow_node_runs WHERE workflow_id = ? AND run_id NOT IN "
+                    "(SELECT id FROM workflow_runs WHERE workflow_id = ?)",
+                    (run.workflow_id, run.workflow_id),
+                )
             await db.commit()
+
+
+def _iso_to_ms(value: str) -> int:
+    if not value:
+        return int(time.time() * 1000)
+    dt = datetime.fromisoformat(value.rstrip("Z")).replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def _truncate_output(output: Any) -> str | None:
+    if output is None:
+        return None
+    text = output if isinstance(output, str) else json.dumps(output, default=str)
+    if len(text) > MAX_STORED_OUTPUT:
+        text = text[:MAX_STORED_OUTPUT] + f"... [{len(text) - MAX_STORED_OUTPUT} more chars]"
+    return text
@@ -0,0 +1,240 @@
+"""
+Safe expressions for workflow condition nodes.
+
+Expressions are parsed once into a restricted AST and compiled into nested
+closures; compiled forms are cached by source. Evaluation has no loops,
+comprehensions, lambdas, imports or attribute access on Python objects, so
+cost is bounded by the size of the expression.
+
+Allowed:
+  literals           1, 2.5, "text", true/false/none (and Python spellings), [..], (..)
+  names              variables of the run, e.g.  status
+  field access       fetch.output.body  /  row["key"]  /  items[0]
+                     (dict keys and list indexes only; missing fields are None)
+  comparisons        == != < <= > >= in, not in, is, is not
+  boolean logic      and or not,   a if cond else b
+  arithmetic         + - * / // %   (no **; % on numbers only, no string formatting)
+  functions          len str int float bool abs min max round lower upper strip
+                     startswith endswith contains
+
+Usage:
+    from workflows.expressions import compile_expression
+    expr = compile_expression("fetch.status == 200 and 'ok' in fetch.body")
+    expr.evaluate(variables)   # -> True / False / value
+"""
+
+from __future__ import annotations
+import ast
+import operator
+from functools import lru_cache
+from typing import Any, Callable
+
+MAX_SOURCE_LEN = 2000
+MAX_NODES = 300
+MAX_SEQUENCE_LEN = 100_000        # cap for str/list results of + and *
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that are malformed, disallowed, or fail to evaluate."""
+
+
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_, ast.IsNot: operator.is_not,
+}
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+}
+_UNARY = {ast.Not: operator.not_, ast.USub: operator.neg, ast.UAdd: operator.pos}
+_CONSTANT_NAMES = {"true": True, "false": False, "none": None, "null": None}
+
+
+def _str_fn(method: str) -> Callable:
+    def fn(value, *args):
+        return getattr(str(value), method)(*args) if value is not None else None
+    return fn
+
+
+_FUNCTIONS: dict[str, Callable] = {
+    "len": len, "str": str, "int": int, "float": float, "bool": bool,
+    "abs": abs, "min": min, "max": max, "round": round,
+    "lower": _str_fn("lower"), "upper": _str_fn("upper"), "strip": _str_fn("strip"),
+    "startswith": _str_fn("startswith"), "endswith": _str_fn("endswith"),
+    "contains": lambda container, item: container is not None and item in container,
+}
+
+
+def _get_field(value: Any, key: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get(key)
+    if isinstance(value, (list, tuple, str)) and isinstance(key, int):
+        return value[key] if -len(value) <= key < len(value) else None
+    return None
+
+
+def _bounded(value: Any) -> Any:
+    if isinstance(value, (str, list, tuple)) and len(value) > MAX_SEQUENCE_LEN:
+        raise ExpressionError("Expression result too large")
+    return value
+
+
+def _safe_mul(a: Any, b: Any) -> Any:
+    for seq, n in ((a, b), (b, a)):
+        if isinstance(seq, (str, list, tuple)) and isinstance(n, int) and len(seq) * n > MAX_SEQUENCE_LEN:
+            raise ExpressionError("Expression result too large")
+    return a * b
+
+
+def _safe_mod(a: Any, b: Any) -> Any:
+    # str/bytes % would be printf-style formatting: "%0300000000d" % 1 allocates before _bounded sees it
+    if isinstance(a, (str, bytes)):
+        raise ExpressionError("% is only allowed on numbers")
+    return a % b
+
+
+class CompiledExpression:
+    __slots__ = ("source", "_fn")
+
+    def __init__(self, source: str, fn: Callable[[dict], Any]) -> None:
+        self.source = source
+        self._fn = fn
+
+    def evaluate(self, variables: dict) -> Any:
+        try:
+            return self._fn(variables)
+        except ExpressionError:
+            raise
+        except Exception as e:
+            raise ExpressionError(f"{e.__class__.__name__} evaluating '{self.source}': {e}") from e
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+@lru_cache(maxsize=512)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse, validate and compile an expression. Raises ExpressionError."""
+    source = (source or "").strip()
+    if not source:
+        raise ExpressionError("Empty expression")
+    if len(source) > MAX_SOURCE_LEN:
+        raise ExpressionError(f"Expression longer than {MAX_SOURCE_LEN} characters")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from e
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ExpressionError(f"Expression has more than {MAX_NODES} nodes")
+    return CompiledExpression(source, _compile(tree.body))
+
+
+def _compile(node: ast.AST) -> Callable[[dict], Any]:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            raise ExpressionError(f"Unsupported literal {value!r}")
+        return lambda v: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name.startswith("_"):
+            raise ExpressionError(f"Name '{name}' is not allowed")
+        if name.lower() in _CONSTANT_NAMES:
+            const = _CONSTANT_NAMES[name.lower()]
+            return lambda v: v.get(name, const) if name in v else const
+        return lambda v: v.get(name)
+
+    if isinstance(node, ast.Attribute):
+        attr = node.attr
+        if attr.startswith("_"):
+            raise ExpressionError(f"Field '{attr}' is not allowed")
+        base = _compile(node.value)
+        return lambda v: _get_field(base(v), attr)
+
+    if isinstance(node, ast.Subscript):
+        if isinstance(node.slice, ast.Slice):
+            raise ExpressionError("Slices are not supported")
+        base, key = _compile(node.value), _compile(node.slice)
+        return lambda v: _get_field(base(v), key(v))
+
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        items = [_compile(e) for e in node.elts]
+        kind = {ast.List: list, ast.Tuple: tuple, ast.Set: frozenset}[type(node)]
+        return lambda v: kind(i(v) for i in items)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(e) for e in node.values]
+        if isinstance(node.op, ast.And):
+            def _and(v):
+                result = True
+                for p in parts:
+                    result = p(v)
+                    if not result:
+                        return result
+                return result
+            return _and
+
+        def _or(v):
+            result = False
+            for p in parts:
+                result = p(v)
+                if result:
+                    return result
+            return result
+        return _or
+
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Operator {type(node.op).__name__} is not allowed")
+        operand = _compile(node.operand)
+        return lambda v: op(operand(v))
+
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Mult):
+            op = _safe_mul
+        elif isinstance(node.op, ast.Mod):
+            op = _safe_mod
+        else:
+            op = _BINARY.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Operator {type(node.op).__name__} is not allowed")
+        left, right = _compile(node.left), _compile(node.right)
+        return lambda v: _bounded(op(left(v), right(v)))
+
+    if isinstance(node, ast.Compare):
+        first = _compile(node.left)
+        ops = []
+        for op_node, comparator in zip(node.ops, node.comparators):
+            op = _COMPARE.get(type(op_node))
+            if op is None:
+                raise ExpressionError(f"Comparison {type(op_node).__name__} is not allowed")
+            ops.append((op, _compile(comparator)))
+
+        def _compare(v):
+            left = first(v)
+            for op, right_fn in ops:
+                right = right_fn(v)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+        return _compare
+
+    if isinstance(node, ast.IfExp):
+        test, body, orelse = _compile(node.test), _compile(node.body), _compile(node.orelse)
+        return lambda v: body(v) if test(v) else orelse(v)
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise ExpressionError("Only these functions are allowed: " + ", ".join(sorted(_FUNCTIONS)))
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        fn = _FUNCTIONS[node.func.id]
+        args = [_compile(a) for a in node.args]
+        return lambda v: _bounded(fn(*(a(v) for a in args)))
+
+    raise ExpressionError(f"{type(node).__name__} is not allowed in expressions")
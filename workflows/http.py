@@ -0,0 +1,263 @@
+"""
+HTTP Client — pooled, streaming, caching client for action.http_request nodes.
+
+One aiohttp session is shared by every WorkflowEngine instance:
+  - connection pooling with a global and a per-host connection limit
+  - response bodies are streamed; anything over max_body_bytes is spooled to
+    a temp file and only a text preview is kept in the run output
+  - GET responses carrying an ETag or Last-Modified are remembered, and the
+    next request for the same URL is sent conditionally; a 304 reuses the
+    cached body
+  - per-request total/connect timeouts
+
+Usage:
+    from workflows.http import get_http_client
+    response = await get_http_client().request("GET", url, timeout_s=10)
+    # {"status", "headers", "body", "size", "truncated", "body_file", "cached", "elapsed_ms"}
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+logger = logging.getLogger("sam.workflows.http")
+
+DEFAULT_TIMEOUT_S = 30.0
+DEFAULT_MAX_BODY_BYTES = 1_000_000     # larger bodies are spooled to disk
+PREVIEW_CHARS = 4000
+CHUNK_SIZE = 64 * 1024
+CACHE_ENTRIES = 256
+SPOOL_DIR = Path(tempfile.gettempdir()) / "sam-workflow-http"
+SPOOL_MAX_AGE_S = 24 * 3600
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: dict
+    body: str
+    size: int
+    etag: str = ""
+    last_modified: str = ""
+
+
+class ResponseCache:
+    """Small LRU of validator-bearing GET responses, keyed by URL + request headers."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES) -> None:
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._max = max_entries
+
+    @staticmethod
+    def key(url: str, headers: dict) -> tuple:
+        return url, tuple(sorted((k.lower(), str(v)) for k, v in headers.items()))
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: tuple, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: tuple) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+async def read_body(
+    chunks: AsyncIterator[bytes],
+    max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    to_file: bool = False,
+    spool_dir: Path = SPOOL_DIR,
+) -> tuple[bytes, int, Optional[str]]:
+    """
+    Drain a chunk stream. Returns (head, total_size, body_file): head is the
+    whole body if it fit in memory, otherwise the first bytes for a preview,
+    and body_file is the spooled temp file path (or None).
+    """
+    head = bytearray()
+    size = 0
+    spool = None
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if spool is None and (to_file or size > max_body_bytes):
+                spool = _open_spool(spool_dir)
+                spool.write(head)
+            if spool is not None:
+                spool.write(chunk)
+                if len(head) < PREVIEW_CHARS * 4:
+                    head += chunk[:PREVIEW_CHARS * 4 - len(head)]
+            else:
+                head += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            Path(spool.name).unlink(missing_ok=True)
+        raise
+    if spool is None:
+        return bytes(head), size, None
+    spool.close()
+    return bytes(head), size, spool.name
+
+
+def _open_spool(spool_dir: Path):
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    _prune_spool(spool_dir)
+    return tempfile.NamedTemporaryFile(dir=spool_dir, prefix="body-", suffix=".bin", delete=False)
+
+
+def _prune_spool(spool_dir: Path) -> None:
+    cutoff = time.time() - SPOOL_MAX_AGE_S
+    for path in spool_dir.glob("body-*.bin"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+class HttpClient:
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        cache_entries: int = CACHE_ENTRIES,
+    ) -> None:
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._max_body_bytes = max_body_bytes
+        self._cache = ResponseCache(cache_entries)
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"requests": 0, "revalidated": 0, "spooled": 0, "timeouts": 0}
+
+    def _get_session(self):
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # A session is bound to the loop it was created on (tests, CLI runs).
+            connector = aiohttp.TCPConnector(
+                limit=self._limit, limit_per_host=self._limit_per_host, ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[dict] = None,
+        json_body: Any = None,
+        data: Any = None,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        max_body_bytes: Optional[int] = None,
+        stream_to_file: bool = False,
+        use_cache: bool = True,
+    ) -> dict:
+        import aiohttp
+        method = method.upper()
+        headers = dict(headers or {})
+        limit = int(max_body_bytes or self._max_body_bytes)
+        cacheable = use_cache and method == "GET" and not stream_to_file
+        cache_key = ResponseCache.key(url, headers) if cacheable else None
+        cached = self._cache.get(cache_key) if cacheable else None
+
+        send_headers = dict(headers)
+        if cached is not None:
+            lowered = {k.lower() for k in headers}
+            if cached.etag and "if-none-match" not in lowered:
+                send_headers["If-None-Match"] = cached.etag
+            if cached.last_modified and "if-modified-since" not in lowered:
+                send_headers["If-Modified-Since"] = cached.last_modified
+
+        timeout = aiohttp.ClientTimeout(total=timeout_s, connect=min(10.0, timeout_s))
+        started = time.monotonic()
+        self._stats["requests"] += 1
+        try:
+            async with self._get_session().request(
+                method, url, headers=send_headers, json=json_body, data=data, timeout=timeout,
+            ) as resp:
+                if resp.status == 304 and cached is not None:
+                    self._stats["revalidated"] += 1
+                    return {"status": cached.status, "headers": cached.headers, "body": cached.body,
+                            "size": cached.size, "truncated": False, "body_file": None,
+                            "cached": True, "elapsed_ms": _elapsed_ms(started)}
+
+                head, size, body_file = await read_body(
+                    resp.content.iter_chunked(CHUNK_SIZE), limit, to_file=stream_to_file,
+                )
+                text = head.decode(resp.charset or "utf-8", errors="replace")
+                response_headers = dict(resp.headers)
+                if body_file:
+                    self._stats["spooled"] += 1
+                    logger.debug(f"[HTTP] {method} {url}: {size} bytes spooled to {body_file}")
+                    text = text[:PREVIEW_CHARS]
+                elif cacheable:
+                    self._remember(cache_key, resp.status, response_headers, text, size)
+                return {"status": resp.status, "headers": response_headers, "body": text,
+                        "size": size, "truncated": body_file is not None, "body_file": body_file,
+                        "cached": False, "elapsed_ms": _elapsed_ms(started)}
+        except asyncio.TimeoutError as e:
+            self._stats["timeouts"] += 1
+            raise TimeoutError(f"HTTP {method} {url} timed out after {timeout_s:g}s") from e
+
+    def _remember(self, key: tuple, status: int, headers: dict, body: str, size: int) -> None:
+        lowered = {k.lower(): v for k, v in headers.items()}
+        etag = lowered.get("etag", "")
+        last_modified = lowered.get("last-modified", "")
+        if status != 200 or not (etag or last_modified) or "no-store" in lowered.get("cache-control", ""):
+            self._cache.discard(key)
+            return
+        self._cache.put(key, CachedResponse(status, headers, body, size, etag, last_modified))
+
+    def stats(self) -> dict:
+        return {**self._stats, "cached_urls": len(self._cache)}
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.monotonic() - started) * 1000)
+
+
+def _client_from_config() -> HttpClient:
+    try:
+        from config.loader import get
+        cfg = get("workflows", "http", {}) or {}
+    except Exception:
+        cfg = {}
+    return HttpClient(
+        limit=int(cfg.get("max_connections", 100)),
+        limit_per_host=int(cfg.get("max_connections_per_host", 8)),
+        max_body_bytes=int(cfg.get("max_body_bytes", DEFAULT_MAX_BODY_BYTES)),
+        cache_entries=int(cfg.get("cache_entries", CACHE_ENTRIES)),
+    )
+
+
+_client: Optional[HttpClient] = None
+
+
+def get_http_client() -> HttpClient:
+    global _client
+    if _client is None:
+        _client = _client_from_config()
+    return _client
@@ -0,0 +1,263 @@
+"""
+Python Sandbox — runs action.run_python workflow nodes in a warm process pool.
+
+User code never executes on the daemon's event loop. Each snippet runs in a
+worker process with:
+  - a wall-clock timeout (the pool is recycled if a worker has to be killed;
+    snippets running on its other workers are retried once on the new pool)
+  - a CPU-time limit and an address-space limit (POSIX only, via `resource`)
+  - a per-worker cache of compiled code objects keyed by source hash
+  - structured results: {"ok", "result", "stdout", "error", "error_type", "cpu_ms"}
+
+Snippet contract (unchanged from the in-process version): read `variables`,
+assign the return value to `result`. print() output is captured.
+
+Usage:
+    from workflows.sandbox import get_sandbox
+    outcome = await get_sandbox().run(code, variables, timeout_s=10)
+"""
+
+from __future__ import annotations
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+
+logger = logging.getLogger("sam.workflows.sandbox")
+
+DEFAULT_TIMEOUT_S = 30.0
+DEFAULT_CPU_S = 10
+DEFAULT_MEMORY_MB = 512
+MAX_STDOUT = 10_000
+CODE_CACHE_SIZE = 256
+
+try:
+    import resource          # POSIX only
+except ImportError:          # Windows — wall-clock timeout still applies
+    resource = None
+
+
+class SandboxError(RuntimeError):
+    """Raised by WorkflowEngine when a sandboxed snippet fails."""
+
+
+# ── Worker side (runs in the pool processes) ──────────────────────────────────
+
+_code_cache: "OrderedDict[str, Any]" = OrderedDict()
+
+
+class _CpuLimitExceeded(Exception):
+    pass
+
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimitExceeded("CPU time limit exceeded")
+
+
+def _worker_init() -> None:
+    if resource is not None:
+        import signal
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+
+def _compiled(source: str, source_hash: str):
+    code = _code_cache.get(source_hash)
+    if code is None:
+        code = compile(source, f"<workflow:{source_hash[:12]}>", "exec")
+        _code_cache[source_hash] = code
+        if len(_code_cache) > CODE_CACHE_SIZE:
+            _code_cache.popitem(last=False)
+    else:
+        _code_cache.move_to_end(source_hash)
+    return code
+
+
+@contextlib.contextmanager
+def _limits(cpu_s: Optional[float], memory_mb: Optional[int]):
+    """Apply per-snippet rlimits; CPU is cumulative per process so offset by usage so far."""
+    if resource is None:
+        yield
+        return
+    saved = {}
+    try:
+        if cpu_s:
+            used = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(used.ru_utime + used.ru_stime + cpu_s) + 1
+            saved[resource.RLIMIT_CPU] = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, saved[resource.RLIMIT_CPU][1]))
+        if memory_mb:
+            saved[resource.RLIMIT_AS] = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024, saved[resource.RLIMIT_AS][1]))
+        yield
+    finally:
+        for which, limit in saved.items():
+            try:
+                resource.setrlimit(which, limit)
+            except (ValueError, OSError):
+                pass
+
+
+def _execute(source: str, source_hash: str, variables: dict, cpu_s, memory_mb) -> dict:
+    stdout = io.StringIO()
+    local_vars = {"variables": variables, "result": None}
+    started = time.process_time()
+    outcome: dict = {"ok": True, "result": None, "error": "", "error_type": ""}
+    try:
+        code = _compiled(source, source_hash)
+        with _limits(cpu_s, memory_mb), contextlib.redirect_stdout(stdout):
+            exec(code, {"__name__": "__workflow__"}, local_vars)  # noqa: S102
+        outcome["result"] = _portable(local_vars.get("result"))
+    except BaseException as e:             # MemoryError, limit signals, SystemExit…
+        outcome.update(
+            ok=False,
+            error=str(e) or e.__class__.__name__,
+            error_type="CpuLimitExceeded" if isinstance(e, _CpuLimitExceeded) else e.__class__.__name__,
+            traceback=traceback.format_exc(limit=-3),
+        )
+    outcome["stdout"] = stdout.getvalue()[-MAX_STDOUT:]
+    outcome["cpu_ms"] = int((time.process_time() - started) * 1000)
+    return outcome
+
+
+def _portable(value: Any) -> Any:
+    """Make a value safe to send back across the process boundary."""
+    try:
+        pickle.dumps(value)
+        return value
+    except Exception:
+        return json.loads(json.dumps(value, default=repr))
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+# ── Parent side ───────────────────────────────────────────────────────────────
+
+class PythonSandbox:
+    def __init__(self, workers: Optional[int] = None, max_tasks_per_worker: int = 200) -> None:
+        self._workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._max_tasks = max_tasks_per_worker
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._syntax_ok: "OrderedDict[str, bool]" = OrderedDict()
+        self._stats = {"runs": 0, "failures": 0, "timeouts": 0, "restarts": 0, "retries": 0}
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                initializer=_worker_init,
+                max_tasks_per_child=self._max_tasks,
+            )
+        return self._pool
+
+    async def warm(self) -> None:
+        """Start every worker now so the first workflow doesn't pay process spawn time."""
+        loop = asyncio.get_running_loop()
+        pool = self._ensure_pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, _noop) for _ in range(self._workers)))
+
+    def check_syntax(self, source: str) -> str:
+        """Compile once in the parent (cached by hash) so syntax errors never cost a round trip."""
+        source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        if source_hash not in self._syntax_ok:
+            compile(source, "<workflow>", "exec")         # raises SyntaxError
+            self._syntax_ok[source_hash] = True
+            if len(self._syntax_ok) > CODE_CACHE_SIZE:
+                self._syntax_ok.popitem(last=False)
+        return source_hash
+
+    async def run(
+        self,
+        source: str,
+        variables: dict,
+        timeout_s: float = DEFAULT_TIMEOUT_S,
+        cpu_s: Optional[float] = DEFAULT_CPU_S,
+        memory_mb: Optional[int] = DEFAULT_MEMORY_MB,
+    ) -> dict:
+        try:
+            source_hash = self.check_syntax(source)
+        except SyntaxError as e:
+            self._stats["failures"] += 1
+            return {"ok": False, "result": None, "stdout": "", "error": str(e),
+                    "error_type": "SyntaxError", "cpu_ms": 0}
+
+        loop = asyncio.get_running_loop()
+        self._stats["runs"] += 1
+        deadline = time.monotonic() + timeout_s
+        for attempt in range(2):
+            pool = self._ensure_pool()
+            future = loop.run_in_executor(
+                pool, _execute, source, source_hash, _portable(variables), cpu_s, memory_mb
+            )
+            try:
+                outcome = await asyncio.wait_for(future, timeout=max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                self._restart(pool)
+                outcome = {"ok": False, "result": None, "stdout": "", "cpu_ms": None,
+                           "error": f"Timed out after {timeout_s:g}s", "error_type": "TimeoutError"}
+            except BrokenProcessPool as e:
+                if self._pool is not pool and attempt == 0:
+                    # Another snippet's timeout recycled the pool under us: run again on the new one
+                    self._stats["retries"] += 1
+                    continue
+                self._restart(pool)
+                outcome = {"ok": False, "result": None, "stdout": "", "cpu_ms": None,
+                           "error": f"Sandbox worker died: {e}", "error_type": "BrokenProcessPool"}
+            break
+        if not outcome["ok"]:
+            self._stats["failures"] += 1
+        return outcome
+
+    def stats(self) -> dict:
+        return {**self._stats, "workers": self._workers, "compiled_sources": len(self._syntax_ok)}
+
+    def _restart(self, pool: ProcessPoolExecutor) -> None:
+        """Kill a pool with a stuck/dead worker; the next run() starts a fresh one."""
+        if self._pool is not pool:
+            return                         # already replaced by a concurrent timeout
+        self._pool = None
+        self._stats["restarts"] += 1
+        logger.warning("[Sandbox] recycling process pool")
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            with contextlib.suppress(Exception):
+                proc.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _sandbox_from_config() -> PythonSandbox:
+    try:
+        from config.loader import get
+        cfg = get("workflows", "sandbox", {}) or {}
+    except Exception:
+        cfg = {}
+    return PythonSandbox(
+        workers=int(cfg["workers"]) if cfg.get("workers") else None,
+        max_tasks_per_worker=int(cfg.get("max_tasks_per_worker", 200)),
+    )
+
+
+_sandbox: Optional[PythonSandbox] = None
+
+
+def get_sandbox() -> PythonSandbox:
+    global _sandbox
+    if _sandbox is None:
+        _sandbox = _sandbox_from_config()
+    return _sandbox
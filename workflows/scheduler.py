@@ -0,0 +1,506 @@
+"""
+Workflow Scheduler — cron and interval triggers without polling.
+
+Jobs sit in a min-heap keyed by their next fire time; the scheduler task
+sleeps until the earliest deadline (or until a job is added/removed) and
+does no work in between. Last fire times are persisted to the vault
+(scheduler_state table) so a restart can catch up on runs it missed:
+
+  catch_up="skip"  — missed runs are dropped; wait for the next slot
+  catch_up="once"  — one run fires immediately for the whole gap (default)
+  catch_up="all"   — every missed slot fires (capped at MAX_CATCH_UP)
+
+grace_s limits catch-up to runs missed within that many seconds.
+
+Workflows opt in with trigger_type "cron" / "interval" and a trigger_config
+like {"cron": "0 7 * * 1-5"} or {"every": "15m", "catchUp": "skip"}, or with
+a trigger.cron / trigger.interval node carrying the same config.
+
+Usage:
+    from workflows.scheduler import get_scheduler
+    await get_scheduler().start()        # daemon lifespan
+    get_scheduler().upcoming(20)         # API
+
+Only the primary daemon worker runs the scheduler. Other workers ask it to
+reload after a workflow edit by publishing on the broker's RELOAD_TOPIC.
+"""
+
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger("sam.workflows.scheduler")
+
+MAX_SLEEP_S = 3600        # re-check the wall clock at least hourly
+MAX_CATCH_UP = 10
+RELOAD_TOPIC = "scheduler"    # broker topic: {"action": "reload"} from non-primary workers
+CATCH_UP_POLICIES = ("skip", "once", "all")
+
+
+# ── Schedules ─────────────────────────────────────────────────────────────────
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DAYS = {d: i for i, d in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+_ALIASES = {
+    "@yearly": "0 0 1 1 *", "@annually": "0 0 1 1 *", "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0", "@daily": "0 0 * * *", "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+
+def _parse_field(text: str, lo: int, hi: int, names: dict | None = None) -> set[int]:
+    values: set[int] = set()
+    for part in text.lower().split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+            if step < 1:
+                raise ValueError(f"Bad cron step in '{text}'")
+        if part in ("*", ""):
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = _cron_value(a, names), _cron_value(b, names)
+        else:
+            start = _cron_value(part, names)
+            end = hi if step > 1 else start
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"Cron field '{text}' out of range {lo}-{hi}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _is_wildcard(text: str) -> bool:
+    return text.strip() == "*"
+
+
+def _cron_value(token: str, names: dict | None) -> int:
+    if names and token in names:
+        return names[token]
+    return int(token)
+
+
+class CronSchedule:
+    """Standard 5-field cron (minute hour day-of-month month day-of-week), local time."""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression.strip()
+        fields = _ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, _MONTHS)
+        dow = _parse_field(fields[4], 0, 7, _DAYS)
+        self.weekdays = {d % 7 for d in dow}
+        # When both day fields are restricted, either may match. Only a bare
+        # "*" is unrestricted: "*/2" restricts the days like any other list.
+        self._dom_any = _is_wildcard(fields[2])
+        self._dow_any = _is_wildcard(fields[4])
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom_ok = dt.day in self.days
+        dow_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._dom_any or self._dow_any:
+            return dom_ok and dow_ok
+        return dom_ok or dow_ok
+
+    def next_after(self, ts: float) -> float:
+        dt = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt.timestamp()
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+    def describe(self) -> str:
+        return f"cron {self.expression}"
+
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_UNIT_S = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value) -> float:
+    """30 -> 30.0, "15m" -> 900.0, "2h" -> 7200.0"""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        m = _DURATION_RE.match(str(value).lower())
+        if not m:
+            raise ValueError(f"Bad interval '{value}'")
+        seconds = float(m.group(1)) * _UNIT_S[m.group(2)]
+    if seconds <= 0:
+        raise ValueError("Interval must be positive")
+    return seconds
+
+
+class IntervalSchedule:
+    """Fires every N seconds, counted from the previous scheduled fire."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = parse_duration(seconds)
+
+    def next_after(self, ts: float) -> float:
+        return ts + self.seconds
+
+    def describe(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def parse_trigger(trigger_type: str, trigger_config: dict | None, definition: dict | None = None):
+    """
+    Return (schedule, catch_up, grace_s) for a workflow, or None if it is not
+    time-triggered. Raises ValueError for malformed cron/interval specs.
+    """
+    config = dict(trigger_config or {})
+    kind = trigger_type or "manual"
+    if kind not in ("cron", "interval", "schedule"):
+        for node in (definition or {}).get("nodes", []) or []:
+            if node.get("type") in ("trigger.cron", "trigger.interval", "trigger.schedule"):
+                kind = node["type"].split(".", 1)[1]
+                config = {**(node.get("config") or {}), **config}
+                break
+        else:
+            return None
+
+    cron = config.get("cron") or config.get("expression")
+    interval = config.get("interval_seconds", config.get("seconds", config.get("every")))
+    if kind == "cron" or (kind == "schedule" and cron):
+        if not cron:
+            raise ValueError("Cron trigger needs a 'cron' expression")
+        schedule = CronSchedule(cron)
+    else:
+        if interval is None:
+            raise ValueError("Interval trigger needs 'every' or 'interval_seconds'")
+        schedule = IntervalSchedule(interval)
+
+    catch_up = config.get("catchUp", config.get("catch_up", "once"))
+    if catch_up not in CATCH_UP_POLICIES:
+        raise ValueError(f"catchUp must be one of {CATCH_UP_POLICIES}")
+    grace = config.get("graceSeconds", config.get("grace_s"))
+    return schedule, catch_up, (parse_duration(grace) if grace is not None else None)
+
+
+# ── Scheduler core ────────────────────────────────────────────────────────────
+
+@dataclass
+class ScheduledJob:
+    job_id: str
+    schedule: object                       # CronSchedule | IntervalSchedule
+    callback: Callable[[float], Awaitable]  # async fn(scheduled_for_ts)
+    name: str = ""
+    catch_up: str = "once"
+    grace_s: Optional[float] = None
+    last_fired_at: Optional[float] = None
+    next_fire_at: Optional[float] = None
+    version: int = 0
+    running: Optional[asyncio.Task] = field(default=None, repr=False)
+    fired: int = 0
+    skipped_overlaps: int = 0
+
+
+class Scheduler:
+    """
+    Min-heap job scheduler for one asyncio loop. add_job/remove_job must be
+    called from that loop's thread.
+    """
+
+    def __init__(self, db_path=None, persist: bool = True) -> None:
+        self._db_path = db_path
+        self._persist = persist
+        self._jobs: dict[str, ScheduledJob] = {}
+        self._heap: list = []                  # (fire_at, seq, job_id, version)
+        self._seq = itertools.count()
+        self._versions = itertools.count(1)
+        self._state: dict[str, float] = {}     # job_id -> last_fired_at from vault
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._state = await self._load_state()
+        for job in list(self._jobs.values()):
+            self._arm(job)
+        self._task = asyncio.create_task(self._run(), name="sam-scheduler")
+        logger.info(f"[Scheduler] started with {len(self._jobs)} job(s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add_job(
+        self,
+        job_id: str,
+        schedule,
+        callback: Callable[[float], Awaitable],
+        name: str = "",
+        catch_up: str = "once",
+        grace_s: Optional[float] = None,
+    ) -> ScheduledJob:
+        """Add or replace a job. callback receives the scheduled fire timestamp."""
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"catch_up must be one of {CATCH_UP_POLICIES}")
+        old = self._jobs.get(job_id)
+        job = ScheduledJob(job_id, schedule, callback, name=name or job_id,
+                           catch_up=catch_up, grace_s=grace_s)
+        if old:
+            job.last_fired_at, job.running = old.last_fired_at, old.running
+        self._jobs[job_id] = job
+        if self._task:
+            self._arm(job)
+            self._wakeup.set()
+        return job
+
+    def remove_job(self, job_id: str) -> bool:
+        job = self._jobs.pop(job_id, None)
+        if job and self._wakeup:
+            self._wakeup.set()         # stale heap entries are dropped lazily
+        return job is not None
+
+    def jobs(self) -> list[ScheduledJob]:
+        return list(self._jobs.values())
+
+    def upcoming(self, limit: int = 20) -> list[dict]:
+        """Next fire time per job, soonest first."""
+        jobs = sorted((j for j in self._jobs.values() if j.next_fire_at), key=lambda j: j.next_fire_at)
+        return [
+            {
+                "job_id": j.job_id,
+                "name": j.name,
+                "schedule": j.schedule.describe(),
+                "next_run_at": datetime.fromtimestamp(j.next_fire_at).isoformat(),
+                "last_run_at": datetime.fromtimestamp(j.last_fired_at).isoformat() if j.last_fired_at else None,
+                "in_seconds": max(0, round(j.next_fire_at - time.time(), 1)),
+                "catch_up": j.catch_up,
+                "running": bool(j.running and not j.running.done()),
+            }
+            for j in jobs[:limit]
+        ]
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _arm(self, job: ScheduledJob) -> None:
+        """Fire any catch-up runs for this job and push its next regular slot."""
+        now = time.time()
+        job.version = next(self._versions)
+        if job.last_fired_at is None:
+            job.last_fired_at = self._state.get(job.job_id)
+
+        missed: list[float] = []
+        if job.last_fired_at is not None and job.catch_up != "skip":
+            t = job.schedule.next_after(job.last_fired_at)
+            while t <= now and len(missed) < MAX_CATCH_UP:
+                if job.grace_s is None or now - t <= job.grace_s:
+                    missed.append(t)
+                t = job.schedule.next_after(t)
+            if job.catch_up == "once":
+                missed = missed[-1:]
+        if missed:
+            logger.info(f"[Scheduler] catching up {len(missed)} missed run(s) of {job.job_id}")
+            self._fire(job, *missed)
+
+        job.next_fire_at = job.schedule.next_after(now)
+        heapq.heappush(self._heap, (job.next_fire_at, next(self._seq), job.job_id, job.version))
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, _, job_id, version = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if not job or job.version != version:
+                    continue
+                self._fire(job, fire_at)
+                nxt = job.schedule.next_after(fire_at)
+                if nxt <= now:                      # fell behind (suspend, long stall)
+                    nxt = job.schedule.next_after(now)
+                job.next_fire_at = nxt
+                heapq.heappush(self._heap, (nxt, next(self._seq), job_id, version))
+
+            timeout = min(self._heap[0][0] - time.time(), MAX_SLEEP_S) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, job: ScheduledJob, *slots: float) -> None:
+        """Run the callback for each slot in turn (several only when catching up)."""
+        if job.running and not job.running.done():
+            job.skipped_overlaps += 1
+            logger.warning(f"[Scheduler] {job.job_id} still running — skipping slot")
+            return
+        job.last_fired_at = slots[-1]
+        job.fired += len(slots)
+        job.running = asyncio.create_task(self._invoke(job, slots), name=f"sched-{job.job_id}")
+        if self._persist:
+            asyncio.create_task(self._save_state(job.job_id, slots[-1]))
+
+    @staticmethod
+    async def _invoke(job: ScheduledJob, slots: tuple) -> None:
+        for scheduled_for in slots:
+            try:
+                await job.callback(scheduled_for)
+            except Exception as e:
+                logger.error(f"[Scheduler] job {job.job_id} failed: {e}", exc_info=True)
+
+    # ── Persistence (vault: scheduler_state) ─────────────────────────────────
+
+    def _resolve_db(self):
+        if self._db_path:
+            return self._db_path
+        from vault.schema import DB_PATH
+        return DB_PATH
+
+    async def _load_state(self) -> dict[str, float]:
+        if not self._persist:
+            return {}
+        try:
+            from vault.schema import connect_db
+            db_path = Path(self._resolve_db())
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            async with connect_db(db_path) as db:
+                await db.execute(_STATE_DDL)
+                cur = await db.execute("SELECT job_id, last_fired_at FROM scheduler_state")
+                return {row[0]: row[1] for row in await cur.fetchall()}
+        except Exception as e:
+            logger.warning(f"[Scheduler] could not load state ({e}); missed runs won't be caught up")
+            self._persist = False
+            return {}
+
+    async def _save_state(self, job_id: str, fired_at: float) -> None:
+        try:
+            from vault.schema import connect_db
+            async with connect_db(self._resolve_db()) as db:
+                await db.execute(
+                    """INSERT INTO scheduler_state (job_id, last_fired_at, updated_at)
+                       VALUES (?, ?, datetime('now'))
+                       ON CONFLICT(job_id) DO UPDATE SET
+                           last_fired_at = excluded.last_fired_at, updated_at = excluded.updated_at""",
+                    (job_id, fired_at),
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"[Scheduler] could not persist {job_id}: {e}")
+
+
+_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS scheduler_state (
+        job_id        TEXT PRIMARY KEY,
+        last_fired_at REAL NOT NULL,
+        updated_at    TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+"""
+
+
+# ── Workflow triggers ─────────────────────────────────────────────────────────
+
+class WorkflowScheduler(Scheduler):
+    """Scheduler whose jobs are the vault's cron/interval-triggered workflows."""
+
+    JOB_PREFIX = "workflow:"
+
+    def __init__(self, engine=None, db_path=None, persist: bool = True) -> None:
+        super().__init__(db_path=db_path, persist=persist)
+        self._engine = engine
+        self._specs: dict[str, tuple] = {}     # workflow_id -> raw trigger spec
+
+    async def start(self) -> None:
+        await self.reload()
+        await super().start()
+
+    async def reload(self) -> None:
+        """Re-read workflow triggers; only added/changed/removed workflows are touched."""
+        rows = await self._load_workflows()
+        seen = set()
+        for wf_id, name, trigger_type, trigger_config, nodes in rows:
+            spec = (trigger_type, trigger_config, nodes)
+            try:
+                definition = json.loads(nodes or "{}")
+                parsed = parse_trigger(trigger_type, json.loads(trigger_config or "{}"), definition)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"[Scheduler] workflow {wf_id} has a bad trigger: {e}")
+                continue
+            if not parsed:
+                continue
+            seen.add(wf_id)
+            if self._specs.get(wf_id) == spec:
+                continue
+            schedule, catch_up, grace = parsed
+            self._specs[wf_id] = spec
+            self.add_job(self.JOB_PREFIX + wf_id, schedule, self._runner(wf_id),
+                         name=name, catch_up=catch_up, grace_s=grace)
+        for wf_id in set(self._specs) - seen:
+            del self._specs[wf_id]
+            self.remove_job(self.JOB_PREFIX + wf_id)
+
+    def request_reload(self) -> None:
+        """Schedule reload() on the running loop if this process runs the scheduler."""
+        if self._task:
+            asyncio.create_task(self.reload())
+
+    def _runner(self, workflow_id: str) -> Callable[[float], Awaitable]:
+        async def _run(scheduled_for: float):
+            if self._engine is None:
+                from workflows.engine import WorkflowEngine
+                self._engine = WorkflowEngine()
+            await self._engine.run_workflow(workflow_id, trigger_data={
+                "trigger": "schedule",
+                "scheduled_for": datetime.fromtimestamp(scheduled_for).isoformat(),
+            }, trigger_type="schedule")
+        return _run
+
+    async def _load_workflows(self) -> list[tuple]:
+        try:
+            from vault.schema import connect_db
+            async with connect_db(self._resolve_db()) as db:
+                cur = await db.execute(
+                    "SELECT id, name, trigger_type, trigger_config, nodes FROM workflows WHERE status = 'active'"
+                )
+                return [tuple(r) for r in await cur.fetchall()]
+        except Exception as e:
+            logger.warning(f"[Scheduler] could not load workflows: {e}")
+            return []
+
+
+_scheduler: Optional[WorkflowScheduler] = None
+
+
+def get_scheduler() -> WorkflowScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = WorkflowScheduler()
+    return _scheduler